@@ -0,0 +1,88 @@
+"""
+Arquivamento de contratos encerrados (models/arquivo_model.py).
+
+Move cartas acordo, produtos/serviços e eventos encerrados há mais de N anos,
+com os seus aditivos e os logs anteriores ao limite, para o banco de arquivo
+(contrato_arquivo.db, ao lado do banco principal). As listagens e o dashboard
+passam a consultar apenas os contratos vigentes; o histórico completo continua
+pesquisável com o comando "buscar".
+
+Uso:
+    python arquivar_contratos.py arquivar [--anos 5] [--lote 200] [--banco contrato.db] [--arquivo ARQ]
+    python arquivar_contratos.py buscar carta_acordo [--demanda 12] [--texto termo] [--limite 50]
+    python arquivar_contratos.py situacao
+"""
+import argparse
+import os
+import sys
+import time
+
+import models.db_manager as db_manager
+from models.arquivo_model import (arquivar_contratos_encerrados, buscar_historico, contar_arquivados,
+                                  caminho_arquivo, TABELAS_ARQUIVADAS, TAMANHO_LOTE)
+
+
+def arquivar(args):
+    inicio = time.perf_counter()
+    resumo = arquivar_contratos_encerrados(anos=args.anos, tamanho_lote=args.lote, caminho=args.arquivo)
+    print(f"Encerrados antes de {resumo.pop('limite')}, arquivados em {time.perf_counter() - inicio:.1f} s:")
+    for tabela, quantidade in resumo.items():
+        print(f"  {tabela:<18} {quantidade}")
+    return 0
+
+
+def buscar(args):
+    colunas, linhas = buscar_historico(args.tabela, codigo_demanda=args.demanda, texto=args.texto,
+                                       limite=args.limite, caminho=args.arquivo)
+    print(" | ".join(colunas))
+    for linha in linhas:
+        print(" | ".join("" if valor is None else str(valor) for valor in linha))
+    print(f"{len(linhas)} linhas")
+    return 0
+
+
+def situacao(args):
+    arquivados = contar_arquivados(args.arquivo)
+    conn = db_manager.get_connection()
+    try:
+        print(f"{'tabela':<18} {'principal':>10} {'arquivo':>10}")
+        for tabela in TABELAS_ARQUIVADAS:
+            principal = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+            print(f"{tabela:<18} {principal:>10} {arquivados.get(tabela, 0):>10}")
+    finally:
+        conn.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arquivamento de contratos encerrados")
+    parser.add_argument("--banco", help="banco SQLite (padrão: contrato.db)")
+    parser.add_argument("--arquivo", help="banco de arquivo (padrão: <banco>_arquivo.db)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    parser_arquivar = comandos.add_parser("arquivar", help="move os contratos encerrados para o arquivo")
+    parser_arquivar.add_argument("--anos", type=int, default=5,
+                                 help="anos desde o fim da vigência (padrão: 5)")
+    parser_arquivar.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="contratos por transação")
+
+    parser_buscar = comandos.add_parser("buscar", help="pesquisa no banco principal e no arquivo")
+    parser_buscar.add_argument("tabela", choices=TABELAS_ARQUIVADAS)
+    parser_buscar.add_argument("--demanda", type=int, help="código da demanda")
+    parser_buscar.add_argument("--texto", help="trecho procurado")
+    parser_buscar.add_argument("--limite", type=int, default=50)
+
+    comandos.add_parser("situacao", help="linhas no banco principal e no arquivo")
+
+    args = parser.parse_args()
+    if args.banco:
+        if not os.path.exists(args.banco):
+            print(f"Banco não encontrado: {args.banco}")
+            return 1
+        db_manager.DB_PATH = args.banco
+    args.arquivo = args.arquivo or caminho_arquivo()
+    db_manager.init_db()
+    return {"arquivar": arquivar, "buscar": buscar, "situacao": situacao}[args.comando](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
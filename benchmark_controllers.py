@@ -0,0 +1,328 @@
+"""
+Mede, sem interface gráfica, o tempo das principais operações da camada de
+controllers: listagens, buscas, inclusão/edição/exclusão de aditivos, resumo do
+dashboard e a cascata de seleção do custeio.
+
+Os resultados são gravados em JSON para comparação entre versões.
+
+Uso:
+    python benchmark_controllers.py --banco dados_sinteticos.db [--repeticoes 10]
+                                    [--saida resultado.json] [--comparar anterior.json]
+    python benchmark_controllers.py --gerar 100000 [--semente 42] [--perfil]
+
+As operações de escrita rodam sobre uma cópia temporária do banco; o banco
+informado nunca é alterado.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import models.db_manager as db_manager
+from utils.desempenho import resumir_tempos
+
+# Variação a partir da qual a comparação aponta regressão (20% mais lento)
+LIMITE_REGRESSAO = 1.2
+
+
+def medir(funcao, repeticoes):
+    """Executa a função `repeticoes` vezes e retorna os tempos em ms"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def contar_linhas(conn):
+    """Retorna a quantidade de linhas de cada tabela medida"""
+    tabelas = ["demanda", "carta_acordo", "eventos", "produtos_servicos", "aditivos",
+               "fornecedores", "titulo_eventos", "custeio", "logs"]
+    return {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] for tabela in tabelas}
+
+
+def _amostras(conn):
+    """Escolhe registros existentes usados como parâmetros das operações"""
+    def primeiro(sql):
+        linha = conn.execute(sql).fetchone()
+        return linha[0] if linha else None
+
+    return {
+        "codigo_demanda": primeiro("SELECT codigo_demanda FROM carta_acordo ORDER BY id DESC LIMIT 1"),
+        "id_carta": primeiro("SELECT MAX(id) FROM carta_acordo"),
+        "id_evento": primeiro("SELECT MAX(id) FROM eventos"),
+        "fornecedor": primeiro("SELECT razao_social FROM fornecedores ORDER BY id DESC LIMIT 1"),
+        "titulo_evento": primeiro("SELECT titulo FROM titulo_eventos ORDER BY id DESC LIMIT 1"),
+    }
+
+
+def _ultimo_aditivo():
+    conn = db_manager.get_connection()
+    try:
+        return conn.execute("SELECT MAX(id) FROM aditivos").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def operacoes(amostras):
+    """Monta a lista (nome, função) das operações medidas"""
+    from controllers.demanda_controller import (listar_demandas, obter_demanda, buscar_demandas,
+                                                obter_demanda_360, obter_demandas_360)
+    from controllers.carta_acordo_controller import listar_cartas_acordo, obter_cartas_por_demanda
+    from controllers.eventos_controller import listar_eventos, obter_eventos_por_demanda
+    from controllers.produtos_servicos_controller import listar_produtos_servicos, obter_produtos_por_demanda
+    from controllers.aditivos_controller import (listar_aditivos, obter_aditivos_por_contrato, historico_aditivos,
+                                                 adicionar_aditivo, editar_aditivo, excluir_aditivo)
+    from controllers.fornecedores_controller import listar_fornecedores, buscar_fornecedor_por_nome
+    from controllers.titulo_eventos_controller import buscar_titulo_evento_por_nome
+    from controllers.dashboard_controller import obter_resumo_dashboard
+    from controllers.custeio_controller import CusteioController
+    from utils.custeio_utils import HIERARCHY
+
+    codigo_demanda = amostras["codigo_demanda"]
+    id_carta = amostras["id_carta"]
+    id_evento = amostras["id_evento"]
+
+    def cascata_custeio():
+        # Simula o usuário escolhendo o primeiro item de cada nível
+        controller = CusteioController()
+        instituicoes = controller.get_institutions()
+        if not instituicoes:
+            return
+        projetos = controller.get_projects(instituicoes[0])
+        if not projetos:
+            return
+        tas = controller.get_tas(instituicoes[0], projetos[0])
+        if not tas:
+            return
+        resultados = controller.get_results(instituicoes[0], projetos[0], tas[0])
+        if resultados:
+            controller.get_subprojects(instituicoes[0], projetos[0], tas[0], resultados[0])
+
+    # A tela de custeio mantém o mesmo controller: a consulta agrupada é feita
+    # uma vez e as escolhas seguintes saem da memória até o custeio mudar
+    controller_facetas = CusteioController()
+
+    def facetas_custeio():
+        # Mesma escolha da cascata, com as facetas dos cinco níveis
+        controller = controller_facetas
+        selecao = {}
+        for campo in HIERARCHY:
+            opcoes = controller.get_facets(selecao)[campo]
+            if not opcoes:
+                return
+            selecao[campo] = opcoes[0][0]
+
+    def ciclo_aditivo(tipo_contrato, id_contrato):
+        # Inclui, edita e exclui um aditivo; o banco volta ao estado anterior
+        dados = {
+            "id_contrato": id_contrato,
+            "tipo_contrato": tipo_contrato,
+            "tipo_aditivo": "valor",
+            "descricao": "Aditivo de benchmark",
+            "valor_aditivo": 1000.0,
+            "nova_vigencia_final": "31/12/2030",
+            "data_registro": datetime.now().strftime("%d/%m/%Y"),
+        }
+        tempos = {}
+        inicio = time.perf_counter()
+        adicionar_aditivo(**dados)
+        tempos["adicionar"] = (time.perf_counter() - inicio) * 1000
+
+        id_aditivo = _ultimo_aditivo()
+        inicio = time.perf_counter()
+        editar_aditivo(id_aditivo, **dict(dados, valor_aditivo=2000.0))
+        tempos["editar"] = (time.perf_counter() - inicio) * 1000
+
+        inicio = time.perf_counter()
+        excluir_aditivo(id_aditivo)
+        tempos["excluir"] = (time.perf_counter() - inicio) * 1000
+        return tempos
+
+    lista = [
+        ("listar_demandas", listar_demandas),
+        ("listar_cartas_acordo", listar_cartas_acordo),
+        ("listar_eventos", listar_eventos),
+        ("listar_produtos_servicos", listar_produtos_servicos),
+        ("listar_aditivos", listar_aditivos),
+        ("listar_fornecedores", listar_fornecedores),
+        ("obter_resumo_dashboard", obter_resumo_dashboard),
+        ("cascata_custeio", cascata_custeio),
+        ("facetas_custeio", facetas_custeio),
+    ]
+    if codigo_demanda is not None:
+        lista += [
+            ("obter_demanda", lambda: obter_demanda(codigo_demanda)),
+            ("buscar_demandas", lambda: buscar_demandas(str(codigo_demanda)[:2], 20)),
+            ("obter_demanda_360", lambda: obter_demanda_360(codigo_demanda)),
+            ("obter_demandas_360_lote_1000", lambda: obter_demandas_360(range(1, 1001))),
+            ("obter_cartas_por_demanda", lambda: obter_cartas_por_demanda(codigo_demanda)),
+            ("obter_eventos_por_demanda", lambda: obter_eventos_por_demanda(codigo_demanda)),
+            ("obter_produtos_por_demanda", lambda: obter_produtos_por_demanda(codigo_demanda)),
+        ]
+    if id_carta is not None:
+        lista.append(("obter_aditivos_por_contrato", lambda: obter_aditivos_por_contrato(id_carta)))
+        lista.append(("historico_aditivos_1000_cartas",
+                      lambda: historico_aditivos("carta_acordo", range(max(1, id_carta - 999), id_carta + 1))))
+    if amostras["fornecedor"]:
+        lista.append(("buscar_fornecedor_por_nome", lambda: buscar_fornecedor_por_nome(amostras["fornecedor"])))
+    if amostras["titulo_evento"]:
+        lista.append(("buscar_titulo_evento_por_nome",
+                      lambda: buscar_titulo_evento_por_nome(amostras["titulo_evento"])))
+
+    ciclos = []
+    if id_carta is not None:
+        ciclos.append(("carta_acordo", id_carta))
+    if id_evento is not None:
+        ciclos.append(("eventos", id_evento))
+    return lista, ciclos, ciclo_aditivo
+
+
+def executar(banco, repeticoes):
+    """Executa o benchmark sobre uma cópia do banco e retorna o resultado"""
+    pasta = tempfile.mkdtemp(prefix="sisproj_bench_")
+    copia = os.path.join(pasta, "benchmark.db")
+    shutil.copyfile(banco, copia)
+
+    caminho_anterior = db_manager.DB_PATH
+    db_manager.DB_PATH = copia
+    try:
+        db_manager.init_db()
+        conn = sqlite3.connect(copia)
+        linhas = contar_linhas(conn)
+        amostras = _amostras(conn)
+        versao_schema = db_manager.obter_versao_schema(conn)
+        conn.close()
+
+        lista, ciclos, ciclo_aditivo = operacoes(amostras)
+        resultados = {}
+        for nome, funcao in lista:
+            funcao()  # aquecimento (cache de páginas do SQLite)
+            resultados[nome] = resumir_tempos(medir(funcao, repeticoes))
+            print(f"  {nome:<32} {resultados[nome]['mediana_ms']:>10.2f} ms")
+
+        for tipo_contrato, id_contrato in ciclos:
+            tempos = {"adicionar": [], "editar": [], "excluir": []}
+            for _ in range(repeticoes):
+                for etapa, duracao in ciclo_aditivo(tipo_contrato, id_contrato).items():
+                    tempos[etapa].append(duracao)
+            for etapa, valores in tempos.items():
+                nome = f"{etapa}_aditivo_{tipo_contrato}"
+                resultados[nome] = resumir_tempos(valores)
+                print(f"  {nome:<32} {resultados[nome]['mediana_ms']:>10.2f} ms")
+    finally:
+        db_manager.DB_PATH = caminho_anterior
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "versao_schema": versao_schema,
+        "banco": os.path.basename(banco),
+        "linhas": linhas,
+        "repeticoes": repeticoes,
+        "operacoes": resultados,
+    }
+
+
+def _commit_atual():
+    """Hash do commit atual, quando executado dentro do repositório git"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def comparar(atual, anterior):
+    """Imprime a variação da mediana de cada operação em relação a um resultado anterior
+
+    Returns:
+        list: nomes das operações que ficaram mais lentas que LIMITE_REGRESSAO
+    """
+    regressoes = []
+    print(f"\nComparação com {anterior.get('commit') or anterior.get('data')}:")
+    for nome, estatisticas in atual["operacoes"].items():
+        base = anterior.get("operacoes", {}).get(nome)
+        if not base or not base.get("mediana_ms"):
+            continue
+        razao = estatisticas["mediana_ms"] / base["mediana_ms"]
+        marca = "  <-- regressão" if razao > LIMITE_REGRESSAO else ""
+        print(f"  {nome:<32} {base['mediana_ms']:>10.2f} -> {estatisticas['mediana_ms']:>10.2f} ms"
+              f"  ({razao:5.2f}x){marca}")
+        if razao > LIMITE_REGRESSAO:
+            regressoes.append(nome)
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da camada de controllers")
+    parser.add_argument("--banco", help="banco SQLite a medir (padrão: contrato.db)")
+    parser.add_argument("--gerar", type=int, metavar="LINHAS",
+                        help="gera um banco sintético temporário com esta quantidade de linhas")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: benchmark_<data>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--perfil", action="store_true",
+                        help="inclui no JSON o perfil por função/instrução SQL (utils.perfilador)")
+    args = parser.parse_args()
+
+    pasta_gerada = None
+    if args.gerar:
+        from gerar_dados_sinteticos import gerar_banco
+        pasta_gerada = tempfile.mkdtemp(prefix="sisproj_dados_")
+        banco = os.path.join(pasta_gerada, f"sintetico_{args.gerar}.db")
+        print(f"Gerando banco sintético com {args.gerar} linhas...")
+        gerar_banco(banco, args.gerar, args.semente)
+    else:
+        banco = args.banco or db_manager.DB_PATH
+
+    if not os.path.exists(banco):
+        print(f"Banco não encontrado: {banco}")
+        return 1
+
+    if args.perfil:
+        from utils.perfilador import ativar_perfil
+        ativar_perfil()
+
+    print(f"Medindo {banco} ({args.repeticoes} repetições)")
+    try:
+        resultado = executar(banco, args.repeticoes)
+    finally:
+        if pasta_gerada:
+            shutil.rmtree(pasta_gerada, ignore_errors=True)
+    if args.gerar:
+        resultado["semente"] = args.semente
+    if args.perfil:
+        from utils.perfilador import obter_perfil
+        resultado["perfil"] = obter_perfil()
+
+    saida = args.saida or f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultado gravado em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo))
+        if regressoes:
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
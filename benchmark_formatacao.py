@@ -0,0 +1,105 @@
+"""
+Micro-benchmark da formatação de moeda e das máscaras de campo (utils.validator).
+
+Compara, sobre uma coluna de valores como a de uma listagem, a formatação
+antiga linha a linha (f-string + cadeia de .replace) com formatar_coluna_brl,
+e a conversão antiga (re.sub + .replace) com converter_coluna_brl. Também mede
+as máscaras aplicadas a cada tecla nos formulários.
+
+Uso:
+    python benchmark_formatacao.py [--linhas 100000] [--repeticoes 5] [--semente 42]
+"""
+import argparse
+import random
+import re
+import time
+
+from utils.desempenho import resumir_tempos
+from utils.validator import (formatar_coluna_brl, converter_coluna_brl, mascarar_data,
+                             mascarar_cnpj, mascarar_nup_sei, mascarar_valor_brl)
+
+
+def _formatar_antigo(valores):
+    resultado = []
+    for valor in valores:
+        try:
+            resultado.append(f"R$ {float(valor):,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+        except (TypeError, ValueError):
+            resultado.append("R$ 0,00")
+    return resultado
+
+
+def _converter_antigo(textos):
+    resultado = []
+    for valor_str in textos:
+        valor_limpo = re.sub(r'[^\d,.]', '', valor_str.replace('R$', '').strip())
+        try:
+            resultado.append(float(valor_limpo.replace('.', '').replace(',', '.')))
+        except ValueError:
+            resultado.append(0.0)
+    return resultado
+
+
+def _mascarar_data_antigo(texto):
+    texto = re.sub(r'\D', '', texto)[:8]
+    if len(texto) > 4:
+        return f"{texto[:2]}/{texto[2:4]}/{texto[4:]}"
+    if len(texto) > 2:
+        return f"{texto[:2]}/{texto[2:]}"
+    return texto
+
+
+def _mascarar_valor_antigo(texto):
+    texto = re.sub(r'\D', '', texto)
+    valor = int(texto) / 100 if texto else 0.0
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return resumir_tempos(tempos)["mediana_ms"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark da formatação de BRL e máscaras")
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(args.semente)
+    # Valores de contrato arredondados, com repetição como nas tabelas reais
+    valores = [round(aleatorio.choice((1000, 5000, 25000, 100000)) * aleatorio.randint(1, 40), 2)
+               for _ in range(args.linhas)]
+    textos = _formatar_antigo(valores)
+    digitados = [str(aleatorio.randint(10 ** 13, 10 ** 14 - 1)) for _ in range(args.linhas)]
+
+    comparacoes = [
+        ("formatar coluna BRL", lambda: _formatar_antigo(valores), lambda: formatar_coluna_brl(valores)),
+        ("converter coluna BRL", lambda: _converter_antigo(textos), lambda: converter_coluna_brl(textos)),
+        ("máscara de data", lambda: [_mascarar_data_antigo(t) for t in digitados],
+         lambda: [mascarar_data(t) for t in digitados]),
+        ("máscara de valor", lambda: [_mascarar_valor_antigo(t) for t in digitados],
+         lambda: [mascarar_valor_brl(t) for t in digitados]),
+    ]
+
+    assert _formatar_antigo(valores) == formatar_coluna_brl(valores)
+    assert _converter_antigo(textos) == converter_coluna_brl(textos)
+
+    print(f"{args.linhas} linhas, mediana de {args.repeticoes} repetições")
+    for nome, antigo, novo in comparacoes:
+        tempo_antigo = medir(antigo, args.repeticoes)
+        tempo_novo = medir(novo, args.repeticoes)
+        print(f"  {nome:<22} {tempo_antigo:>9.1f} ms -> {tempo_novo:>9.1f} ms"
+              f"  ({tempo_antigo / tempo_novo:4.1f}x)")
+    # CNPJ e NUP não tinham equivalente isolado; medidos apenas como referência
+    for nome, mascara in (("máscara de CNPJ", mascarar_cnpj), ("máscara de NUP/SEI", mascarar_nup_sei)):
+        print(f"  {nome:<22} {medir(lambda: [mascara(t) for t in digitados], args.repeticoes):>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Mede o tempo de abertura dos formulários de edição (Evento, Carta de Acordo e
+Produto/Serviço) com e sem a construção sob demanda das abas.
+
+Uso:
+    python benchmark_formularios.py [--repeticoes 20] [--banco caminho.db]
+
+Requer um ambiente gráfico (a janela é criada oculta).
+"""
+import argparse
+import statistics
+import sys
+import time
+import tkinter as tk
+
+import models.db_manager as db_manager
+
+
+def medir(root, criar_formulario, repeticoes):
+    """Cria e destrói o formulário várias vezes, retornando os tempos em ms"""
+    tempos = []
+    for _ in range(repeticoes):
+        container = tk.Frame(root)
+        container.pack()
+        inicio = time.perf_counter()
+        formulario = criar_formulario(container)
+        formulario.pack()
+        root.update_idletasks()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        container.destroy()
+        root.update()
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de abertura dos formulários")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--banco", help="banco SQLite a usar (padrão: contrato.db)")
+    args = parser.parse_args()
+
+    if args.banco:
+        db_manager.DB_PATH = args.banco
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Ambiente gráfico indisponível: {e}")
+        return 1
+    root.withdraw()
+
+    from utils.ui_utils import Estilos, AbasPreguicosas
+    from utils.dados_referencia import invalidar_dados_referencia
+    from controllers.eventos_controller import listar_eventos
+    from controllers.carta_acordo_controller import listar_cartas_acordo
+    from controllers.produtos_servicos_controller import listar_produtos_servicos
+    from views.eventos_view import EventoForm
+    from views.carta_acordo_view import CartaAcordoForm
+    from views.produtos_servicos_view import ProdutoServicoForm
+
+    Estilos.configurar()
+    nada = lambda: None
+
+    casos = []
+    eventos = listar_eventos()
+    if eventos:
+        casos.append(("Evento", lambda m: EventoForm(m, nada, nada, evento=eventos[0])))
+    cartas = listar_cartas_acordo()
+    if cartas:
+        casos.append(("Carta de Acordo", lambda m: CartaAcordoForm(m, nada, nada, carta=cartas[0])))
+    produtos = listar_produtos_servicos()
+    if produtos:
+        casos.append(("Produto/Serviço", lambda m: ProdutoServicoForm(m, nada, nada, produto=produtos[0])))
+
+    if not casos:
+        print("Nenhum registro encontrado para abrir em modo de edição.")
+        return 1
+
+    print(f"{'Formulário':<18} {'Modo':<12} {'1ª abertura':>12} {'Mediana':>10} {'Mínimo':>10}")
+    for nome, criar in casos:
+        for preguicoso in (False, True):
+            AbasPreguicosas.construcao_preguicosa = preguicoso
+            invalidar_dados_referencia()
+            tempos = medir(root, criar, args.repeticoes)
+            modo = "sob demanda" if preguicoso else "completo"
+            print(f"{nome:<18} {modo:<12} {tempos[0]:>10.1f}ms "
+                  f"{statistics.median(tempos):>8.1f}ms {min(tempos):>8.1f}ms")
+
+    AbasPreguicosas.construcao_preguicosa = True
+    root.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,486 @@
+"""
+Teste de carga com vários usuários simultâneos sobre o mesmo banco SQLite.
+
+Cada processo simula um analista com o app aberto, repetindo durante um tempo
+fixo uma mistura de chamadas aos controllers (MISTURA): listagens, buscas,
+abertura do formulário de evento, gravação de evento, inclusão de aditivo e
+resumo do dashboard. Ao final, para cada modo de journal e quantidade de
+processos, informa por operação:
+
+- vazão (operações por segundo, somando todos os processos);
+- latência p50/p95/p99;
+- taxa de SQLITE_BUSY (operações que encontraram o banco travado ao menos uma vez);
+- erros "database is locked" (operações que desistiram após o tempo limite);
+- tempo de espera por trava.
+
+Uso:
+    python carga_multiusuario.py --banco dados_sinteticos.db [--processos 1,2,4,8]
+                                 [--duracao 20] [--modos delete,wal] [--saida carga.json]
+    python carga_multiusuario.py --gerar 100000 [--semente 42] [--pausa-ms 200] [--sem-fila]
+
+Cada combinação roda sobre uma cópia nova do banco; o banco informado nunca é
+alterado. Como no app (main.py), cada processo usa a fila de escrita, exceto
+com --sem-fila.
+
+A espera por trava é medida emulando o busy handler do SQLite: as conexões
+abrem com timeout=0 e ConexaoCarga repete a instrução que recebeu SQLITE_BUSY
+com os mesmos intervalos do SQLite (ATRASOS_BUSY_MS), até o tempo limite do
+app (5 s). Como no SQLite, não espera quando a conexão já mantém uma transação
+aberta (exceto no COMMIT), pois a espera poderia travar os dois processos.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import models.db_manager as db_manager
+from benchmark_controllers import contar_linhas, _commit_atual
+from utils.desempenho import resumir_tempos
+
+# Peso de cada operação na mistura simulada
+MISTURA = {
+    "listar": 30,
+    "buscar": 20,
+    "abrir_formulario": 25,
+    "salvar_evento": 10,
+    "adicionar_aditivo": 5,
+    "dashboard": 10,
+}
+
+MODOS_JOURNAL = ("delete", "wal")
+
+# Tempo limite do sqlite3.connect padrão, usado pelo app
+TIMEOUT_TRAVA = 5.0
+
+# Intervalos entre tentativas do busy handler padrão do SQLite (sqliteDefaultBusyCallback)
+ATRASOS_BUSY_MS = (1, 2, 5, 10, 15, 20, 25, 25, 25, 50, 50, 100)
+
+# Registros sorteados como parâmetros das operações
+AMOSTRAS_POR_TABELA = 1000
+
+# Contadores do processo: ocorrências de SQLITE_BUSY e espera acumulada (a fila
+# de escrita grava em outra thread)
+_trava_contadores = threading.Lock()
+_contadores = {"busy": 0, "espera_ms": 0.0}
+
+
+def _eh_busy(erro):
+    return (getattr(erro, "sqlite_errorcode", 0) & 0xFF) == sqlite3.SQLITE_BUSY
+
+
+def _eh_commit(sql):
+    return sql.lstrip()[:6].upper() in ("COMMIT", "END")
+
+
+def _com_espera(conexao, funcao, pode_esperar):
+    """Executa funcao(), repetindo-a enquanto o SQLite responder SQLITE_BUSY"""
+    inicio = None
+    tentativa = 0
+    while True:
+        try:
+            resultado = funcao()
+        except sqlite3.OperationalError as erro:
+            if not _eh_busy(erro):
+                raise
+            agora = time.perf_counter()
+            if inicio is None:
+                inicio = agora
+                with _trava_contadores:
+                    _contadores["busy"] += 1
+            decorrido = agora - inicio
+            if not pode_esperar or decorrido >= conexao.timeout_trava:
+                _somar_espera(decorrido)
+                raise
+            atraso = ATRASOS_BUSY_MS[min(tentativa, len(ATRASOS_BUSY_MS) - 1)] / 1000
+            time.sleep(min(atraso, conexao.timeout_trava - decorrido))
+            tentativa += 1
+            continue
+        if inicio is not None:
+            _somar_espera(time.perf_counter() - inicio)
+        return resultado
+
+
+def _somar_espera(segundos):
+    with _trava_contadores:
+        _contadores["espera_ms"] += segundos * 1000
+
+
+class CursorCarga(sqlite3.Cursor):
+    """Cursor cujas instruções esperam pela trava como o busy handler do SQLite"""
+
+    def execute(self, sql, parametros=()):
+        conexao = self.connection
+        resultado = _com_espera(conexao, lambda: sqlite3.Cursor.execute(self, sql, parametros),
+                                not conexao.mantem_trava or _eh_commit(sql))
+        conexao.mantem_trava = conexao.in_transaction
+        return resultado
+
+    def executemany(self, sql, parametros):
+        conexao = self.connection
+        parametros = list(parametros)
+        resultado = _com_espera(conexao, lambda: sqlite3.Cursor.executemany(self, sql, parametros),
+                                not conexao.mantem_trava)
+        conexao.mantem_trava = conexao.in_transaction
+        return resultado
+
+
+class ConexaoCarga(sqlite3.Connection):
+    """Conexão sem busy handler nativo (timeout=0), com a espera medida em Python
+
+    mantem_trava indica que a transação corrente já executou instruções e,
+    portanto, pode estar segurando uma trava de leitura ou escrita.
+    """
+
+    timeout_trava = TIMEOUT_TRAVA
+
+    def __init__(self, *args, **kwargs):
+        kwargs["timeout"] = 0
+        super().__init__(*args, **kwargs)
+        self.mantem_trava = False
+
+    def cursor(self, factory=CursorCarga):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+    def commit(self):
+        _com_espera(self, super().commit, True)
+        self.mantem_trava = False
+
+    def rollback(self):
+        super().rollback()
+        self.mantem_trava = False
+
+
+def _amostras(conn, semente):
+    """Sorteia registros existentes usados como parâmetros das operações"""
+    rng = random.Random(semente)
+
+    def sortear(sql):
+        valores = [linha[0] for linha in conn.execute(sql) if linha[0] is not None]
+        return rng.sample(valores, min(len(valores), AMOSTRAS_POR_TABELA))
+
+    return {
+        "codigos_demanda": sortear("SELECT codigo FROM demanda"),
+        "ids_carta": sortear("SELECT id FROM carta_acordo"),
+        "ids_evento": sortear("SELECT id FROM eventos"),
+        "fornecedores": sortear("SELECT razao_social FROM fornecedores"),
+    }
+
+
+def _operacoes(amostras, rng, indice):
+    """Monta {nome: função} das operações da mistura para um processo"""
+    from controllers.demanda_controller import listar_demandas, buscar_demandas
+    from controllers.carta_acordo_controller import listar_cartas_acordo
+    from controllers.eventos_controller import listar_eventos, obter_evento, editar_evento
+    from controllers.aditivos_controller import listar_aditivos, obter_aditivos_por_contrato, adicionar_aditivo
+    from controllers.fornecedores_controller import buscar_fornecedor_por_nome
+    from controllers.dashboard_controller import obter_resumo_dashboard
+
+    codigos = amostras["codigos_demanda"]
+    cartas = amostras["ids_carta"]
+    eventos = amostras["ids_evento"]
+    fornecedores = amostras["fornecedores"]
+    listagens = [listar_demandas, listar_cartas_acordo, listar_eventos, listar_aditivos]
+    gravacoes = [0]
+
+    def listar():
+        rng.choice(listagens)()
+
+    def buscar():
+        if fornecedores and rng.random() < 0.3:
+            buscar_fornecedor_por_nome(rng.choice(fornecedores))
+        elif codigos:
+            buscar_demandas(str(rng.choice(codigos))[:3], 20)
+
+    def abrir_formulario():
+        # O que o formulário de evento carrega ao abrir
+        if eventos:
+            id_evento = rng.choice(eventos)
+            obter_evento(id_evento)
+            db_manager.obter_versao_registro("eventos", id_evento)
+            obter_aditivos_por_contrato(id_evento, "eventos")
+
+    def salvar_evento():
+        if eventos:
+            id_evento = rng.choice(eventos)
+            versao = db_manager.obter_versao_registro("eventos", id_evento)
+            gravacoes[0] += 1
+            editar_evento(id_evento, versao_esperada=versao,
+                          observacao=f"Teste de carga {indice}/{gravacoes[0]}")
+
+    def incluir_aditivo():
+        if cartas:
+            adicionar_aditivo(id_contrato=rng.choice(cartas), tipo_contrato="carta_acordo",
+                              tipo_aditivo="valor", descricao="Aditivo de teste de carga",
+                              valor_aditivo=1000.0, nova_vigencia_final="31/12/2030",
+                              data_registro=datetime.now().strftime("%d/%m/%Y"))
+
+    return {
+        "listar": listar,
+        "buscar": buscar,
+        "abrir_formulario": abrir_formulario,
+        "salvar_evento": salvar_evento,
+        "adicionar_aditivo": incluir_aditivo,
+        "dashboard": obter_resumo_dashboard,
+    }
+
+
+def _novo_resultado():
+    return {"tempos_ms": [], "esperas_ms": [], "com_busy": 0, "travamentos": 0, "conflitos": 0,
+            "erros": 0, "exemplos_erro": []}
+
+
+def executar_processo(indice, banco, duracao, semente, pausa_ms, timeout, usar_fila, amostras,
+                      barreira, resultados):
+    """Corpo de cada processo: um usuário repetindo a mistura de operações"""
+    from models.fila_escrita import ativar_fila_escrita, desativar_fila_escrita
+    from utils.session import Session
+
+    db_manager.DB_PATH = banco
+    ConexaoCarga.timeout_trava = timeout
+    # get_connection passa a abrir ConexaoCarga (mesmo ponto usado pelo perfilador)
+    db_manager.fabrica_conexao = lambda: ConexaoCarga
+    Session.login((indice, f"carga{indice}", None, "usuario"))
+    if usar_fila:
+        ativar_fila_escrita()
+
+    rng = random.Random(semente * 1000 + indice)
+    operacoes = _operacoes(amostras, rng, indice)
+    nomes = list(MISTURA)
+    pesos = [MISTURA[nome] for nome in nomes]
+    por_operacao = {nome: _novo_resultado() for nome in nomes}
+
+    barreira.wait()
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        nome = rng.choices(nomes, pesos)[0]
+        resultado = por_operacao[nome]
+        with _trava_contadores:
+            busy_antes, espera_antes = _contadores["busy"], _contadores["espera_ms"]
+        inicio = time.perf_counter()
+        try:
+            operacoes[nome]()
+        except db_manager.ConflitoEdicao:
+            resultado["conflitos"] += 1
+        except sqlite3.OperationalError as erro:
+            if _eh_busy(erro):
+                resultado["travamentos"] += 1
+            else:
+                resultado["erros"] += 1
+                if len(resultado["exemplos_erro"]) < 3:
+                    resultado["exemplos_erro"].append(str(erro))
+        except Exception as erro:
+            resultado["erros"] += 1
+            if len(resultado["exemplos_erro"]) < 3:
+                resultado["exemplos_erro"].append(f"{type(erro).__name__}: {erro}")
+        resultado["tempos_ms"].append((time.perf_counter() - inicio) * 1000)
+        with _trava_contadores:
+            if _contadores["busy"] > busy_antes:
+                resultado["com_busy"] += 1
+            resultado["esperas_ms"].append(_contadores["espera_ms"] - espera_antes)
+        if pausa_ms:
+            time.sleep(rng.expovariate(1000 / pausa_ms))
+
+    if usar_fila:
+        desativar_fila_escrita()
+    resultados.put((indice, por_operacao))
+
+
+def _consolidar(por_processo, duracao):
+    """Junta os resultados dos processos em estatísticas por operação (e o total)"""
+    juntos = {nome: _novo_resultado() for nome in list(MISTURA) + ["total"]}
+    for por_operacao in por_processo:
+        for nome, resultado in por_operacao.items():
+            for destino in (juntos[nome], juntos["total"]):
+                destino["tempos_ms"] += resultado["tempos_ms"]
+                destino["esperas_ms"] += resultado["esperas_ms"]
+                for chave in ("com_busy", "travamentos", "conflitos", "erros"):
+                    destino[chave] += resultado[chave]
+                destino["exemplos_erro"] = (destino["exemplos_erro"] + resultado["exemplos_erro"])[:3]
+
+    estatisticas = {}
+    for nome, resultado in juntos.items():
+        quantidade = len(resultado["tempos_ms"])
+        if not quantidade:
+            continue
+        latencia = resumir_tempos(resultado["tempos_ms"])
+        esperas = resultado["esperas_ms"]
+        estatisticas[nome] = {
+            "operacoes": quantidade,
+            "vazao_ops_s": round(quantidade / duracao, 2),
+            "p50_ms": latencia["mediana_ms"],
+            "p95_ms": latencia["p95_ms"],
+            "p99_ms": latencia["p99_ms"],
+            "max_ms": latencia["max_ms"],
+            "taxa_busy": round(resultado["com_busy"] / quantidade, 4),
+            "erros_travamento": resultado["travamentos"],
+            "taxa_erros_travamento": round(resultado["travamentos"] / quantidade, 4),
+            "conflitos_edicao": resultado["conflitos"],
+            "outros_erros": resultado["erros"],
+            "espera_trava_total_ms": round(sum(esperas), 3),
+            "espera_trava_media_ms": round(sum(esperas) / quantidade, 3),
+            "espera_trava_p95_ms": resumir_tempos(esperas)["p95_ms"],
+            "exemplos_erro": resultado["exemplos_erro"],
+        }
+    return estatisticas
+
+
+def preparar_copia(banco, pasta, modo):
+    """Copia o banco, aplica as migrações e define o modo de journal"""
+    copia = os.path.join(pasta, f"carga_{modo}.db")
+    for sufixo in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(copia + sufixo):
+            os.remove(copia + sufixo)
+    shutil.copyfile(banco, copia)
+
+    caminho_anterior = db_manager.DB_PATH
+    db_manager.DB_PATH = copia
+    try:
+        db_manager.init_db()
+    finally:
+        db_manager.DB_PATH = caminho_anterior
+
+    conn = sqlite3.connect(copia)
+    try:
+        modo_aplicado = conn.execute(f"PRAGMA journal_mode={modo}").fetchone()[0]
+    finally:
+        conn.close()
+    if modo_aplicado.lower() != modo:
+        raise RuntimeError(f"O banco não aceitou journal_mode={modo} (ficou {modo_aplicado})")
+    return copia
+
+
+def executar_carga(banco, processos, duracao, semente=42, pausa_ms=0, timeout=TIMEOUT_TRAVA, usar_fila=True):
+    """Roda a mistura com `processos` processos simultâneos sobre `banco`
+
+    Returns:
+        dict: estatísticas por operação (ver _consolidar)
+    """
+    conn = sqlite3.connect(banco)
+    try:
+        amostras = _amostras(conn, semente)
+    finally:
+        conn.close()
+
+    # spawn também no Linux: cada processo começa do zero, como um app aberto no Windows
+    contexto = multiprocessing.get_context("spawn")
+    barreira = contexto.Barrier(processos + 1)
+    resultados = contexto.Queue()
+    trabalhadores = [
+        contexto.Process(target=executar_processo, name=f"carga-{indice}",
+                         args=(indice, banco, duracao, semente, pausa_ms, timeout, usar_fila, amostras,
+                               barreira, resultados))
+        for indice in range(processos)
+    ]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    barreira.wait()
+    # Lê antes do join: um processo não termina enquanto o resultado não sai da fila
+    por_processo = [resultados.get()[1] for _ in trabalhadores]
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    return _consolidar(por_processo, duracao)
+
+
+def imprimir(estatisticas):
+    print(f"    {'operação':<18} {'ops/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'busy':>7} {'locked':>7} {'espera':>9}")
+    for nome, dados in estatisticas.items():
+        print(f"    {nome:<18} {dados['vazao_ops_s']:>8.1f} {dados['p50_ms']:>8.1f} {dados['p95_ms']:>8.1f} "
+              f"{dados['p99_ms']:>8.1f} {dados['taxa_busy']:>7.1%} {dados['erros_travamento']:>7} "
+              f"{dados['espera_trava_media_ms']:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com vários usuários simultâneos")
+    parser.add_argument("--banco", help="banco SQLite de origem (padrão: contrato.db)")
+    parser.add_argument("--gerar", type=int, metavar="LINHAS",
+                        help="gera um banco sintético temporário com esta quantidade de linhas")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--processos", default="1,2,4,8",
+                        help="quantidades de processos simultâneos, separadas por vírgula")
+    parser.add_argument("--duracao", type=float, default=20, help="segundos de carga em cada combinação")
+    parser.add_argument("--modos", default=",".join(MODOS_JOURNAL),
+                        help="modos de journal a medir (delete = rollback journal, wal)")
+    parser.add_argument("--pausa-ms", type=float, default=0,
+                        help="pausa média entre operações de um usuário (0 = sem pausa)")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_TRAVA,
+                        help="segundos de espera pela trava antes de 'database is locked'")
+    parser.add_argument("--sem-fila", action="store_true", help="não ativa a fila de escrita nos processos")
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: carga_<data>.json)")
+    args = parser.parse_args()
+
+    quantidades = [int(valor) for valor in args.processos.split(",") if valor.strip()]
+    modos = [modo.strip().lower() for modo in args.modos.split(",") if modo.strip()]
+    invalidos = [modo for modo in modos if modo not in MODOS_JOURNAL]
+    if invalidos or not quantidades or min(quantidades) < 1:
+        parser.error("informe --processos com inteiros positivos e --modos entre delete e wal")
+
+    pasta = tempfile.mkdtemp(prefix="sisproj_carga_")
+    try:
+        if args.gerar:
+            from gerar_dados_sinteticos import gerar_banco
+            banco = os.path.join(pasta, f"sintetico_{args.gerar}.db")
+            print(f"Gerando banco sintético com {args.gerar} linhas...")
+            gerar_banco(banco, args.gerar, args.semente)
+        else:
+            banco = args.banco or db_manager.DB_PATH
+        if not os.path.exists(banco):
+            print(f"Banco não encontrado: {banco}")
+            return 1
+
+        conn = sqlite3.connect(banco)
+        linhas = contar_linhas(conn)
+        conn.close()
+
+        execucoes = []
+        for modo in modos:
+            for processos in quantidades:
+                copia = preparar_copia(banco, pasta, modo)
+                print(f"\n[{modo}] {processos} processo(s), {args.duracao:g} s")
+                estatisticas = executar_carga(copia, processos, args.duracao, args.semente, args.pausa_ms,
+                                              args.timeout, not args.sem_fila)
+                imprimir(estatisticas)
+                execucoes.append({"journal_mode": modo, "processos": processos, "operacoes": estatisticas})
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    resultado = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_atual(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "banco": "sintetico" if args.gerar else os.path.basename(banco),
+        "linhas": linhas,
+        "semente": args.semente,
+        "duracao_s": args.duracao,
+        "pausa_ms": args.pausa_ms,
+        "timeout_s": args.timeout,
+        "fila_escrita": not args.sem_fila,
+        "mistura": MISTURA,
+        "execucoes": execucoes,
+    }
+    saida = args.saida or f"carga_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultado gravado em {saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
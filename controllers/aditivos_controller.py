@@ -1,7 +1,19 @@
-from models.aditivos_model import create_aditivo, get_all_aditivos, update_aditivo, delete_aditivo
-from models.carta_acordo_model import update_carta_acordo, get_all_cartas
+from models.aditivos_model import (create_aditivo, get_all_aditivos, update_aditivo, delete_aditivo, get_aditivo,
+                                   get_aditivos_by_contrato, get_aditivo_history, is_ultimo_aditivo)
+from models.carta_acordo_model import update_carta_acordo, get_carta_acordo
+from models.eventos_model import update_evento, get_evento
 from utils.session import Session
 from utils.logger import log_action
+from utils.barramento import publicar, INSERIR, ATUALIZAR, EXCLUIR
+
+def _atualizar_contrato(tipo_contrato, id_contrato, **valores):
+    """Grava os novos valores no contrato e publica a alteração, se houver"""
+    if tipo_contrato == 'eventos':
+        alteradas = update_evento(id_contrato, **valores)
+    else:
+        alteradas = update_carta_acordo(id_contrato, **valores)
+    if alteradas:
+        publicar(tipo_contrato, id_contrato, ATUALIZAR, alteradas)
 
 def adicionar_aditivo(**kwargs):
     """
@@ -11,86 +23,35 @@ def adicionar_aditivo(**kwargs):
         int: ID do aditivo inserido
     """
     # Criar o aditivo
-    create_aditivo(**kwargs)
+    id_aditivo = create_aditivo(**kwargs)
     
     # Atualizar o contrato com a nova vigência final e valor total
     id_contrato = kwargs['id_contrato']
     tipo_contrato = kwargs.get('tipo_contrato', 'carta_acordo')
     
     if tipo_contrato == 'eventos':
-        # Atualizar evento
-        from controllers.eventos_controller import listar_eventos, editar_evento
-        
-        eventos = listar_eventos()
-        evento_atual = None
-        for evento in eventos:
-            if evento[0] == id_contrato:
-                evento_atual = evento
-                break
+        # Atualizar apenas o valor total do evento
+        evento_atual = get_evento(id_contrato)
         
         if evento_atual:
-            # Calcular novo valor total do evento
             valor_atual = float(evento_atual[14]) if evento_atual[14] else 0  # total_contrato está no índice 14
             valor_aditivo = float(kwargs['valor_aditivo']) if kwargs['valor_aditivo'] else 0
-            novo_valor_total = valor_atual + valor_aditivo
-            
-            # Atualizar o evento com o novo valor total
-            editar_evento(
-                id_contrato,
-                codigo_demanda=evento_atual[1],
-                instituicao=evento_atual[2],
-                instrumento=evento_atual[3],
-                subprojeto=evento_atual[4],
-                ta=evento_atual[5],
-                pta=evento_atual[6],
-                acao=evento_atual[7],
-                resultado=evento_atual[8],
-                meta=evento_atual[9],
-                titulo_evento=evento_atual[10],
-                fornecedor=evento_atual[11],
-                observacao=evento_atual[12],
-                valor_estimado=evento_atual[13],
-                total_contrato=novo_valor_total
-            )
-    else:
-        # Código original para cartas de acordo
-        cartas = get_all_cartas()
-        carta_atual = None
-        for carta in cartas:
-            if carta[0] == id_contrato:
-                carta_atual = carta
-                break
+            _atualizar_contrato(tipo_contrato, id_contrato, total_contrato=valor_atual + valor_aditivo)
+    elif tipo_contrato == 'carta_acordo':
+        # Atualizar apenas a vigência final e o valor total da carta de acordo
+        carta_atual = get_carta_acordo(id_contrato)
         
         if carta_atual:
-            # Atualizar a vigência final e o valor total do contrato
             valor_atual = float(carta_atual[18]) if carta_atual[18] else 0
             valor_aditivo = float(kwargs['valor_aditivo']) if kwargs['valor_aditivo'] else 0
-            novo_valor_total = valor_atual + valor_aditivo
-            
-            # Atualizar o contrato
-            update_carta_acordo(id_contrato, 
-                               codigo_demanda=carta_atual[1],
-                               instituicao=carta_atual[2],
-                               instrumento=carta_atual[3],
-                               subprojeto=carta_atual[4],
-                               ta=carta_atual[5],
-                               pta=carta_atual[6],
-                               acao=carta_atual[7],
-                               resultado=carta_atual[8],
-                               meta=carta_atual[9],
-                               contrato=carta_atual[10],
-                               vigencia_inicial=carta_atual[11],
-                               vigencia_final=kwargs['nova_vigencia_final'],
-                               instituicao_2=carta_atual[13],
-                               cnpj=carta_atual[14],
-                               titulo_projeto=carta_atual[15],
-                               objetivo=carta_atual[16],
-                               valor_estimado=carta_atual[17],
-                               total_contrato=novo_valor_total,
-                               observacoes=carta_atual[19])
+            _atualizar_contrato(tipo_contrato, id_contrato,
+                                vigencia_final=kwargs['nova_vigencia_final'],
+                                total_contrato=valor_atual + valor_aditivo)
     
     usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
     log_action(usuario, f"Cadastro de Aditivo para Contrato {id_contrato}")
+    publicar("aditivos", id_aditivo, INSERIR, tipo_contrato=tipo_contrato, id_contrato=id_contrato)
+    return id_aditivo
 
 def listar_aditivos():
     """
@@ -101,6 +62,15 @@ def listar_aditivos():
     """
     return get_all_aditivos()
 
+def obter_aditivo(id_aditivo):
+    """
+    Obtém um aditivo pelo ID
+    
+    Returns:
+        tuple: Registro do aditivo ou None se não existir
+    """
+    return get_aditivo(id_aditivo)
+
 def obter_aditivos_por_contrato(id_contrato, tipo_contrato="carta_acordo"):
     """
     Obtém todos os aditivos de um contrato específico
@@ -110,10 +80,32 @@ def obter_aditivos_por_contrato(id_contrato, tipo_contrato="carta_acordo"):
         tipo_contrato: Tipo do contrato (padrão: carta_acordo)
         
     Returns:
-        list: Lista de aditivos do contrato
+        list: Lista de aditivos do contrato, em ordem de cadastro
+    """
+    return get_aditivos_by_contrato(id_contrato, tipo_contrato)
+
+def historico_aditivos(tipo_contrato, ids_contrato):
+    """
+    Obtém o histórico dos aditivos de vários contratos de um mesmo tipo
+    
+    Args:
+        tipo_contrato: Tipo dos contratos (carta_acordo, eventos ou produtos_servicos)
+        ids_contrato: IDs dos contratos
+        
+    Returns:
+        dict: {id_contrato: [aditivo, ...]}, cada aditivo com sequencia, valor_acumulado,
+              valor_total_atualizado, vigencia_atual e ultimo
+    """
+    return get_aditivo_history(tipo_contrato, ids_contrato)
+
+def eh_ultimo_aditivo(id_aditivo):
+    """
+    Verifica se o aditivo é o último do seu contrato (o único que pode ser editado ou excluído)
+    
+    Returns:
+        bool: True se for o último, False caso contrário, None se o aditivo não existir
     """
-    aditivos = listar_aditivos()
-    return [aditivo for aditivo in aditivos if aditivo[1] == id_contrato and aditivo[2] == tipo_contrato]
+    return is_ultimo_aditivo(id_aditivo)
 
 def editar_aditivo(id_aditivo, **kwargs):
     """
@@ -126,8 +118,7 @@ def editar_aditivo(id_aditivo, **kwargs):
     # Verificar se é o último aditivo (somente o último pode ser editado)
     id_contrato = kwargs['id_contrato']
     tipo_contrato = kwargs.get('tipo_contrato', 'carta_acordo')
-    aditivos_contrato = obter_aditivos_por_contrato(id_contrato, tipo_contrato)
-    if aditivos_contrato and aditivos_contrato[-1][0] != id_aditivo:
+    if eh_ultimo_aditivo(id_aditivo) is False:
         raise ValueError("Somente o último aditivo pode ser editado.")
         
     update_aditivo(id_aditivo, **kwargs)
@@ -135,99 +126,37 @@ def editar_aditivo(id_aditivo, **kwargs):
     # Atualizar o contrato com a nova vigência final e recalcular o valor total
     
     if tipo_contrato == 'eventos':
-        # Atualizar evento
-        from controllers.eventos_controller import listar_eventos, editar_evento
-        
-        eventos = listar_eventos()
-        evento_atual = None
-        for evento in eventos:
-            if evento[0] == id_contrato:
-                evento_atual = evento
-                break
+        evento_atual = get_evento(id_contrato)
         
         if evento_atual:
-            # Buscar todos os aditivos do evento para recalcular o valor total
+            # Valor base do evento (valor estimado) somado a todos os aditivos
             aditivos = obter_aditivos_por_contrato(id_contrato, tipo_contrato)
-            
-            # Valor base do evento (valor estimado)
             valor_base = float(evento_atual[13]) if evento_atual[13] else 0
-            
-            # Somar todos os valores dos aditivos
             valor_total_aditivos = sum(float(aditivo[5]) if aditivo[5] else 0 for aditivo in aditivos)
-            
-            # Novo valor total
-            novo_valor_total = valor_base + valor_total_aditivos
-            
-            # Atualizar o evento
-            editar_evento(
-                id_contrato,
-                codigo_demanda=evento_atual[1],
-                instituicao=evento_atual[2],
-                instrumento=evento_atual[3],
-                subprojeto=evento_atual[4],
-                ta=evento_atual[5],
-                pta=evento_atual[6],
-                acao=evento_atual[7],
-                resultado=evento_atual[8],
-                meta=evento_atual[9],
-                titulo_evento=evento_atual[10],
-                fornecedor=evento_atual[11],
-                observacao=evento_atual[12],
-                valor_estimado=evento_atual[13],
-                total_contrato=novo_valor_total
-            )
-    else:
-        # Código original para cartas de acordo
-        cartas = get_all_cartas()
-        carta_atual = None
-        for carta in cartas:
-            if carta[0] == id_contrato:
-                carta_atual = carta
-                break
+            _atualizar_contrato(tipo_contrato, id_contrato, total_contrato=valor_base + valor_total_aditivos)
+    elif tipo_contrato == 'carta_acordo':
+        carta_atual = get_carta_acordo(id_contrato)
         
         if carta_atual:
-            # Buscar todos os aditivos do contrato para recalcular o valor total
+            # Valor base do contrato (valor estimado) somado a todos os aditivos
             aditivos = obter_aditivos_por_contrato(id_contrato)
-            
-            # Valor base do contrato (valor estimado)
             valor_base = float(carta_atual[17]) if carta_atual[17] else 0
-            
-            # Somar todos os valores dos aditivos
             valor_total_aditivos = sum(float(aditivo[5]) if aditivo[5] else 0 for aditivo in aditivos)
             
-            # Novo valor total
-            novo_valor_total = valor_base + valor_total_aditivos
-            
             # Encontrar a data de vigência final mais recente entre os aditivos
             nova_vigencia_final = carta_atual[12]  # Valor padrão
             for aditivo in aditivos:
                 if aditivo[6] and aditivo[6] > nova_vigencia_final:
                     nova_vigencia_final = aditivo[6]
             
-            # Atualizar o contrato
-            update_carta_acordo(id_contrato, 
-                               codigo_demanda=carta_atual[1],
-                               instituicao=carta_atual[2],
-                               instrumento=carta_atual[3],
-                               subprojeto=carta_atual[4],
-                               ta=carta_atual[5],
-                               pta=carta_atual[6],
-                               acao=carta_atual[7],
-                               resultado=carta_atual[8],
-                               meta=carta_atual[9],
-                               contrato=carta_atual[10],
-                               vigencia_inicial=carta_atual[11],
-                               vigencia_final=nova_vigencia_final,
-                               instituicao_2=carta_atual[13],
-                               cnpj=carta_atual[14],
-                               titulo_projeto=carta_atual[15],
-                               objetivo=carta_atual[16],
-                               valor_estimado=carta_atual[17],
-                               total_contrato=novo_valor_total,
-                               observacoes=carta_atual[19])
+            _atualizar_contrato(tipo_contrato, id_contrato,
+                                vigencia_final=nova_vigencia_final,
+                                total_contrato=valor_base + valor_total_aditivos)
     
     usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
     log_action(usuario, f"Edição de Aditivo {id_aditivo}")
+    publicar("aditivos", int(id_aditivo), ATUALIZAR, kwargs.keys(),
+             tipo_contrato=tipo_contrato, id_contrato=id_contrato)
 
 def excluir_aditivo(id_aditivo):
     """
@@ -237,12 +166,7 @@ def excluir_aditivo(id_aditivo):
         id_aditivo: ID do aditivo a ser excluído
     """
     # Buscar o aditivo antes de excluir para obter o id_contrato
-    aditivos = listar_aditivos()
-    aditivo_excluir = None
-    for aditivo in aditivos:
-        if aditivo[0] == id_aditivo:
-            aditivo_excluir = aditivo
-            break
+    aditivo_excluir = get_aditivo(id_aditivo)
     
     if not aditivo_excluir:
         return
@@ -250,8 +174,7 @@ def excluir_aditivo(id_aditivo):
     # Verificar se é o último aditivo (somente o último pode ser excluído)
     id_contrato = aditivo_excluir[1]
     tipo_contrato = aditivo_excluir[2]
-    aditivos_contrato = obter_aditivos_por_contrato(id_contrato, tipo_contrato)
-    if aditivos_contrato and aditivos_contrato[-1][0] != id_aditivo:
+    if not eh_ultimo_aditivo(id_aditivo):
         raise ValueError("Somente o último aditivo pode ser excluído.")
     
     # Excluir o aditivo
@@ -260,99 +183,35 @@ def excluir_aditivo(id_aditivo):
     # Atualizar o contrato
     
     if tipo_contrato == 'eventos':
-        # Atualizar evento
-        from controllers.eventos_controller import listar_eventos, editar_evento
-        
-        eventos = listar_eventos()
-        evento_atual = None
-        for evento in eventos:
-            if evento[0] == id_contrato:
-                evento_atual = evento
-                break
+        evento_atual = get_evento(id_contrato)
         
         if evento_atual:
-            # Buscar todos os aditivos restantes do evento para recalcular o valor total
+            # Valor base do evento (valor estimado) somado aos aditivos restantes
             aditivos_restantes = obter_aditivos_por_contrato(id_contrato, tipo_contrato)
-            
-            # Valor base do evento (valor estimado)
             valor_base = float(evento_atual[13]) if evento_atual[13] else 0
-            
-            # Somar todos os valores dos aditivos restantes
             valor_total_aditivos = sum(float(aditivo[5]) if aditivo[5] else 0 for aditivo in aditivos_restantes)
-            
-            # Novo valor total
-            novo_valor_total = valor_base + valor_total_aditivos
-            
-            # Atualizar o evento
-            editar_evento(
-                id_contrato,
-                codigo_demanda=evento_atual[1],
-                instituicao=evento_atual[2],
-                instrumento=evento_atual[3],
-                subprojeto=evento_atual[4],
-                ta=evento_atual[5],
-                pta=evento_atual[6],
-                acao=evento_atual[7],
-                resultado=evento_atual[8],
-                meta=evento_atual[9],
-                titulo_evento=evento_atual[10],
-                fornecedor=evento_atual[11],
-                observacao=evento_atual[12],
-                valor_estimado=evento_atual[13],
-                total_contrato=novo_valor_total
-            )
-    else:
-        # Código original para cartas de acordo
-        cartas = get_all_cartas()
-        carta_atual = None
-        for carta in cartas:
-            if carta[0] == id_contrato:
-                carta_atual = carta
-                break
+            _atualizar_contrato(tipo_contrato, id_contrato, total_contrato=valor_base + valor_total_aditivos)
+    elif tipo_contrato == 'carta_acordo':
+        carta_atual = get_carta_acordo(id_contrato)
         
         if carta_atual:
-            # Buscar todos os aditivos restantes do contrato para recalcular o valor total
+            # Valor base do contrato (valor estimado) somado aos aditivos restantes
             aditivos_restantes = obter_aditivos_por_contrato(id_contrato)
-            
-            # Valor base do contrato (valor estimado)
             valor_base = float(carta_atual[17]) if carta_atual[17] else 0
-            
-            # Somar todos os valores dos aditivos restantes
             valor_total_aditivos = sum(float(aditivo[5]) if aditivo[5] else 0 for aditivo in aditivos_restantes)
             
-            # Novo valor total
-            novo_valor_total = valor_base + valor_total_aditivos
-            
-            # Encontrar a data de vigência final mais recente entre os aditivos restantes
             if aditivos_restantes:
                 # Se ainda houver aditivos, usar a vigência final do último
-                nova_vigencia_final = aditivos_restantes[-1][6]  # Nova vigência final do último aditivo restante
+                nova_vigencia_final = aditivos_restantes[-1][6]
             else:
-                # Se não houver mais aditivos, voltar para a vigência final original do contrato
-                # Aqui estamos usando o valor atual, mas idealmente deveria ser o valor original antes de qualquer aditivo
+                # Se não houver mais aditivos, manter a vigência final atual do contrato
+                # (idealmente deveria ser o valor original antes de qualquer aditivo)
                 nova_vigencia_final = carta_atual[12]
             
-            # Atualizar o contrato
-            update_carta_acordo(id_contrato, 
-                               codigo_demanda=carta_atual[1],
-                               instituicao=carta_atual[2],
-                               instrumento=carta_atual[3],
-                               subprojeto=carta_atual[4],
-                               ta=carta_atual[5],
-                               pta=carta_atual[6],
-                               acao=carta_atual[7],
-                               resultado=carta_atual[8],
-                               meta=carta_atual[9],
-                               contrato=carta_atual[10],
-                               vigencia_inicial=carta_atual[11],
-                               vigencia_final=nova_vigencia_final,
-                               instituicao_2=carta_atual[13],
-                               cnpj=carta_atual[14],
-                               titulo_projeto=carta_atual[15],
-                               objetivo=carta_atual[16],
-                               valor_estimado=carta_atual[17],
-                               total_contrato=novo_valor_total,
-                               observacoes=carta_atual[19])
+            _atualizar_contrato(tipo_contrato, id_contrato,
+                                vigencia_final=nova_vigencia_final,
+                                total_contrato=valor_base + valor_total_aditivos)
     
     usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
     log_action(usuario, f"Exclusão de Aditivo {id_aditivo}")
+    publicar("aditivos", int(id_aditivo), EXCLUIR, tipo_contrato=tipo_contrato, id_contrato=id_contrato)
@@ -0,0 +1,38 @@
+from models.arquivo_model import (arquivar_contratos_encerrados, buscar_historico, get_aditivos_historico,
+                                  contar_arquivados, CONTRATOS_ARQUIVADOS)
+from utils.session import Session
+from utils.logger import log_action
+from utils.barramento import publicar, RECARREGAR
+
+def arquivar_contratos(anos=5, tamanho_lote=200):
+    """
+    Move para o banco de arquivo os contratos encerrados há mais de `anos` anos
+
+    Returns:
+        dict: quantidades movidas por tabela (ver arquivar_contratos_encerrados)
+    """
+    resumo = arquivar_contratos_encerrados(anos=anos, tamanho_lote=tamanho_lote)
+
+    usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
+    contratos = sum(resumo[tabela] for tabela in CONTRATOS_ARQUIVADOS)
+    log_action(usuario, f"Arquivamento de {contratos} contratos encerrados antes de {resumo['limite']}")
+
+    # Muitas linhas saem de uma vez: as telas abertas recarregam em vez de remover uma a uma
+    for tabela in CONTRATOS_ARQUIVADOS + ('aditivos',):
+        publicar(tabela, None, RECARREGAR)
+    return resumo
+
+def pesquisar_historico(tipo_contrato, codigo_demanda=None, texto=None, limite=500):
+    """
+    Pesquisa contratos no banco principal e no arquivo
+
+    Returns:
+        tuple: (colunas, linhas); a coluna `arquivado` indica a origem
+    """
+    return buscar_historico(tipo_contrato, codigo_demanda=codigo_demanda, texto=texto, limite=limite)
+
+def listar_aditivos_historico(tipo_contrato, id_contrato):
+    return get_aditivos_historico(tipo_contrato, id_contrato)
+
+def obter_totais_arquivados():
+    return contar_arquivados()
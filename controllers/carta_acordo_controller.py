@@ -1,4 +1,6 @@
-from models.carta_acordo_model import create_carta_acordo, get_all_cartas, update_carta_acordo, delete_carta_acordo
+from models.carta_acordo_model import (create_carta_acordo, get_all_cartas, get_cartas_by_demanda,
+                                       update_carta_acordo, delete_carta_acordo, get_carta_acordo)
+from utils.barramento import publicar, INSERIR, ATUALIZAR, EXCLUIR
 from utils.session import Session
 from utils.logger import log_action
 
@@ -12,21 +14,28 @@ def adicionar_carta_acordo(**kwargs):
     carta_id = create_carta_acordo(**kwargs)
     usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
     log_action(usuario, "Cadastro de Carta Acordo")
+    publicar("carta_acordo", carta_id, INSERIR)
     return carta_id
 
 def listar_cartas_acordo():
     return get_all_cartas()
 
-def editar_carta_acordo(id_carta, **kwargs):
-    update_carta_acordo(id_carta, **kwargs)
-    usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
-    log_action(usuario, f"Edição de Carta Acordo {id_carta}")
+def obter_carta_acordo(id_carta):
+    return get_carta_acordo(id_carta)
+
+def editar_carta_acordo(id_carta, versao_esperada=None, **kwargs):
+    alteradas = update_carta_acordo(id_carta, versao_esperada, **kwargs)
+    if alteradas:
+        usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
+        log_action(usuario, f"Edição de Carta Acordo {id_carta}")
+        publicar("carta_acordo", id_carta, ATUALIZAR, alteradas)
+    return alteradas
 
 def excluir_carta_acordo(id_carta):
     delete_carta_acordo(id_carta)
     usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
     log_action(usuario, f"Exclusão de Carta Acordo {id_carta}")
+    publicar("carta_acordo", int(id_carta), EXCLUIR)
 
 def obter_cartas_por_demanda(codigo_demanda):
-    cartas = listar_cartas_acordo()
-    return [carta for carta in cartas if carta[1] == int(codigo_demanda)]
+    return get_cartas_by_demanda(int(codigo_demanda))
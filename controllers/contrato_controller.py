@@ -1,5 +1,5 @@
-import sqlite3
 from datetime import datetime
+from models.db_manager import get_connection, executar_escrita, obter_coluna, obter_versao_registro, ConflitoEdicao
 
 def adicionar_contrato(tipo_contrato, id_referencia, numero_contrato, data_assinatura, observacoes=""):
     """
@@ -15,41 +15,39 @@ def adicionar_contrato(tipo_contrato, id_referencia, numero_contrato, data_assin
     Returns:
         ID do contrato adicionado
     """
-    conn = sqlite3.connect("contrato.db")
-    cursor = conn.cursor()
-    
-    # Criação da tabela de contratos, se não existir
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS contratos (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        tipo_contrato TEXT, -- ('carta_acordo', 'produtos_servicos', 'eventos')
-        id_referencia INTEGER, -- ID da carta acordo, produto/serviço ou evento
-        numero_contrato TEXT,
-        data_assinatura TEXT,
-        data_registro TEXT,
-        observacoes TEXT
-    )
-    ''')
-    
-    # Registrar o contrato
-    data_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute('''
-    INSERT INTO contratos (tipo_contrato, id_referencia, numero_contrato, data_assinatura, data_registro, observacoes)
-    VALUES (?, ?, ?, ?, ?, ?)
-    ''', (tipo_contrato, id_referencia, numero_contrato, data_assinatura, data_registro, observacoes))
-    
-    id_contrato = cursor.lastrowid
-    
-    # Registrar na tabela de logs
-    cursor.execute('''
-    INSERT INTO logs (usuario, acao, data_hora)
-    VALUES (?, ?, ?)
-    ''', ("admin", f"Cadastro de Contrato {numero_contrato}", data_registro))
-    
-    conn.commit()
-    conn.close()
-    
-    return id_contrato
+    def gravar(conn):
+        cursor = conn.cursor()
+    
+        # Criação da tabela de contratos, se não existir
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contratos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo_contrato TEXT, -- ('carta_acordo', 'produtos_servicos', 'eventos')
+            id_referencia INTEGER, -- ID da carta acordo, produto/serviço ou evento
+            numero_contrato TEXT,
+            data_assinatura TEXT,
+            data_registro TEXT,
+            observacoes TEXT
+        )
+        ''')
+    
+        # Registrar o contrato
+        data_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute('''
+        INSERT INTO contratos (tipo_contrato, id_referencia, numero_contrato, data_assinatura, data_registro, observacoes)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (tipo_contrato, id_referencia, numero_contrato, data_assinatura, data_registro, observacoes))
+    
+        id_contrato = cursor.lastrowid
+    
+        # Registrar na tabela de logs
+        cursor.execute('''
+        INSERT INTO logs (usuario, acao, data_hora)
+        VALUES (?, ?, ?)
+        ''', ("admin", f"Cadastro de Contrato {numero_contrato}", data_registro))
+        return id_contrato
+
+    return executar_escrita(gravar)
 
 def listar_contratos(tipo_contrato=None, id_referencia=None):
     """
@@ -62,7 +60,7 @@ def listar_contratos(tipo_contrato=None, id_referencia=None):
     Returns:
         Lista de contratos
     """
-    conn = sqlite3.connect("contrato.db")
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Verificar se a tabela existe
@@ -106,7 +104,7 @@ def obter_contrato_por_referencia(tipo_contrato, id_referencia):
     Returns:
         Contrato ou None se não encontrado
     """
-    conn = sqlite3.connect("contrato.db")
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Verificar se a tabela existe
@@ -138,53 +136,49 @@ def editar_contrato(id_contrato, numero_contrato=None, data_assinatura=None, obs
     Returns:
         True se a edição foi bem-sucedida, False caso contrário
     """
-    conn = sqlite3.connect("contrato.db")
-    cursor = conn.cursor()
+    def gravar(conn):
+        cursor = conn.cursor()
     
-    # Verificar se o contrato existe
-    cursor.execute("SELECT id FROM contratos WHERE id = ?", (id_contrato,))
-    if not cursor.fetchone():
-        conn.close()
-        return False
+        # Verificar se o contrato existe
+        cursor.execute("SELECT id FROM contratos WHERE id = ?", (id_contrato,))
+        if not cursor.fetchone():
+            return False
     
-    # Coletar os campos a serem atualizados
-    campos = []
-    valores = []
+        # Coletar os campos a serem atualizados
+        campos = []
+        valores = []
     
-    if numero_contrato is not None:
-        campos.append("numero_contrato = ?")
-        valores.append(numero_contrato)
+        if numero_contrato is not None:
+            campos.append("numero_contrato = ?")
+            valores.append(numero_contrato)
         
-    if data_assinatura is not None:
-        campos.append("data_assinatura = ?")
-        valores.append(data_assinatura)
+        if data_assinatura is not None:
+            campos.append("data_assinatura = ?")
+            valores.append(data_assinatura)
         
-    if observacoes is not None:
-        campos.append("observacoes = ?")
-        valores.append(observacoes)
-    
-    if not campos:
-        conn.close()
-        return False
-    
-    # Adicionar o ID do contrato aos valores
-    valores.append(id_contrato)
-    
-    # Atualizar o contrato
-    sql = f"UPDATE contratos SET {', '.join(campos)} WHERE id = ?"
-    cursor.execute(sql, valores)
-    
-    # Registrar na tabela de logs
-    data_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute('''
-    INSERT INTO logs (usuario, acao, data_hora)
-    VALUES (?, ?, ?)
-    ''', ("admin", f"Edição de Contrato ID {id_contrato}", data_registro))
-    
-    conn.commit()
-    conn.close()
-    
-    return True
+        if observacoes is not None:
+            campos.append("observacoes = ?")
+            valores.append(observacoes)
+    
+        if not campos:
+            return False
+    
+        # Adicionar o ID do contrato aos valores
+        valores.append(id_contrato)
+    
+        # Atualizar o contrato
+        sql = f"UPDATE contratos SET {', '.join(campos)} WHERE id = ?"
+        cursor.execute(sql, valores)
+    
+        # Registrar na tabela de logs
+        data_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute('''
+        INSERT INTO logs (usuario, acao, data_hora)
+        VALUES (?, ?, ?)
+        ''', ("admin", f"Edição de Contrato ID {id_contrato}", data_registro))
+        return True
+
+    return executar_escrita(gravar)
 
 def excluir_contrato(id_contrato):
     """
@@ -196,26 +190,45 @@ def excluir_contrato(id_contrato):
     Returns:
         True se a exclusão foi bem-sucedida, False caso contrário
     """
-    conn = sqlite3.connect("contrato.db")
-    cursor = conn.cursor()
-    
-    # Verificar se o contrato existe
-    cursor.execute("SELECT id FROM contratos WHERE id = ?", (id_contrato,))
-    if not cursor.fetchone():
-        conn.close()
-        return False
-    
-    # Excluir o contrato
-    cursor.execute("DELETE FROM contratos WHERE id = ?", (id_contrato,))
-    
-    # Registrar na tabela de logs
-    data_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute('''
-    INSERT INTO logs (usuario, acao, data_hora)
-    VALUES (?, ?, ?)
-    ''', ("admin", f"Exclusão de Contrato ID {id_contrato}", data_registro))
+    def gravar(conn):
+        cursor = conn.cursor()
+    
+        # Verificar se o contrato existe
+        cursor.execute("SELECT id FROM contratos WHERE id = ?", (id_contrato,))
+        if not cursor.fetchone():
+            return False
+    
+        # Excluir o contrato
+        cursor.execute("DELETE FROM contratos WHERE id = ?", (id_contrato,))
+    
+        # Registrar na tabela de logs
+        data_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute('''
+        INSERT INTO logs (usuario, acao, data_hora)
+        VALUES (?, ?, ?)
+        ''', ("admin", f"Exclusão de Contrato ID {id_contrato}", data_registro))
+        return True
+
+    return executar_escrita(gravar)
+
+def versao_do_registro(tipo_contrato, registro):
+    """
+    Retorna a row_version de um registro de contrato já carregado (SELECT *)
     
-    conn.commit()
-    conn.close()
+    Args:
+        tipo_contrato: tipo do contrato ('carta_acordo', 'produtos_servicos', 'eventos')
+        registro: linha da tabela do contrato
+        
+    Returns:
+        int: versão do registro no momento em que foi lido
+    """
+    return obter_coluna(tipo_contrato, registro, "row_version")
+
+def obter_versao_atual(tipo_contrato, id_referencia):
+    """
+    Retorna a row_version gravada no banco para um contrato
     
-    return True 
\ No newline at end of file
+    Usado pelos formulários depois de alterações feitas pelo próprio usuário em
+    outra parte da tela (por exemplo, aditivos que atualizam o valor total).
+    """
+    return obter_versao_registro(tipo_contrato, id_referencia)
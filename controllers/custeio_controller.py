@@ -5,7 +5,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.custeio_utils import CusteioManager
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 
 class CusteioController:
@@ -122,6 +122,46 @@ class CusteioController:
         clean_filters = {k: v for k, v in filters.items() if v}
         return self.manager.filter_by_selection(clean_filters)
     
+    def get_facets(self, filters: Dict[str, str]) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Get the options and row counts of the five hierarchy levels under the current selections.
+        
+        Args:
+            filters: Dictionary of field-value pairs with the current selections
+            
+        Returns:
+            Dictionary with field names as keys and lists of (value, row count) as values
+        """
+        return self.manager.get_facets(filters)
+    
+    def count_custeio(self, filters: Dict[str, str]) -> int:
+        """
+        Count the custeio rows matching the provided filters.
+        
+        Args:
+            filters: Dictionary of field-value pairs to filter by
+            
+        Returns:
+            Number of matching rows
+        """
+        return self.manager.count_by_selection(filters)
+    
+    def filter_custeio_page(self, filters: Dict[str, str], page: int = 0,
+                            page_size: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get one page of the custeio data matching the provided filters.
+        
+        Args:
+            filters: Dictionary of field-value pairs to filter by
+            page: Page number, starting at 0
+            page_size: Number of rows per page
+            
+        Returns:
+            List of dictionaries containing the rows of the page
+        """
+        clean_filters = {k: v for k, v in filters.items() if v}
+        return self.manager.filter_by_selection_page(clean_filters, page * page_size, page_size)
+    
     def get_hierarchical_data(self) -> Dict[str, List[str]]:
         """
         Get all hierarchical data for populating UI components.
@@ -0,0 +1,39 @@
+from models.db_manager import get_connection
+
+def obter_resumo_dashboard(limite_recentes=5):
+    """Retorna os totais e os registros recentes exibidos no dashboard
+
+    Usa COUNT(*) e LIMIT em vez de carregar todas as linhas das tabelas.
+
+    Args:
+        limite_recentes: quantidade de eventos e cartas recentes
+
+    Returns:
+        dict: total_cartas, total_eventos, total_produtos,
+              eventos_recentes (id, titulo_evento, fornecedor, valor_estimado) e
+              cartas_recentes (id, instituicao, titulo_projeto, total_contrato)
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    resumo = {}
+    for chave, tabela in (("total_cartas", "carta_acordo"),
+                          ("total_eventos", "eventos"),
+                          ("total_produtos", "produtos_servicos")):
+        cursor.execute(f"SELECT COUNT(*) FROM {tabela}")
+        resumo[chave] = cursor.fetchone()[0]
+
+    cursor.execute("""
+    SELECT id, titulo_evento, fornecedor, valor_estimado
+    FROM eventos ORDER BY id DESC LIMIT ?
+    """, (limite_recentes,))
+    resumo["eventos_recentes"] = cursor.fetchall()
+
+    cursor.execute("""
+    SELECT id, instituicao, titulo_projeto, total_contrato
+    FROM carta_acordo ORDER BY id DESC LIMIT ?
+    """, (limite_recentes,))
+    resumo["cartas_recentes"] = cursor.fetchall()
+
+    conn.close()
+    return resumo
@@ -1,22 +1,69 @@
 # controllers/demanda_controller.py
-from models.demanda_model import create_demanda, get_all_demandas, update_demanda, delete_demanda
+import sqlite3
+
+from models.demanda_model import (create_demanda, get_all_demandas, get_demanda, search_demandas,
+                                  update_demanda, delete_demanda)
+from models.demanda_360_model import get_demanda_360, get_demandas_360
 from utils.session import Session
 from utils.logger import log_action
 
 def adicionar_demanda(*args, **kwargs):
-    create_demanda(*args, **kwargs)
+    """
+    Adiciona uma nova demanda
+    
+    Returns:
+        int: código da demanda inserida
+    """
+    codigo = create_demanda(*args, **kwargs)
     usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
     log_action(usuario, "Cadastro de Demanda")
+    return codigo
 
 def listar_demandas():
     return get_all_demandas()
 
+def obter_demanda(codigo):
+    """Retorna a demanda pelo código ou None (aceita código como texto)"""
+    try:
+        codigo = int(codigo)
+    except (TypeError, ValueError):
+        return None
+    return get_demanda(codigo)
+
+def buscar_demandas(termo, limite=50):
+    """Busca demandas por prefixo do código, NUP/SEI, ofício ou solicitante"""
+    return search_demandas(termo, limite)
+
 def editar_demanda(codigo, *args, **kwargs):
     update_demanda(codigo, *args, **kwargs)
     usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
     log_action(usuario, f"Edição de Demanda {codigo}")
 
 def excluir_demanda(codigo):
-    delete_demanda(codigo)
+    """Exclui uma demanda sem contratos vinculados
+
+    Raises:
+        ValueError: se a demanda ainda tiver contratos (a chave estrangeira recusa a exclusão)
+    """
+    try:
+        delete_demanda(codigo)
+    except sqlite3.IntegrityError:
+        raise ValueError("A demanda possui contratos vinculados. "
+                         "Exclua os contratos antes de excluir a demanda.") from None
     usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
     log_action(usuario, f"Exclusão de Demanda {codigo}")
+
+def obter_demanda_360(codigo):
+    """Retorna a demanda com todos os seus contratos, aditivos e totais (ou None)
+
+    Ver models/demanda_360_model.py para o formato do resultado.
+    """
+    return get_demanda_360(codigo)
+
+def obter_demandas_360(codigos):
+    """Versão em lote de obter_demanda_360, para relatórios com muitas demandas
+
+    Returns:
+        dict: {codigo: estrutura de obter_demanda_360}
+    """
+    return get_demandas_360(codigos)
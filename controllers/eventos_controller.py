@@ -1,4 +1,6 @@
-from models.db_manager import get_connection
+from models.db_manager import get_connection, executar_escrita
+from models.eventos_model import update_evento, get_evento
+from utils.barramento import publicar, INSERIR, ATUALIZAR, EXCLUIR
 
 def adicionar_evento(codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
                    titulo_evento, fornecedor, observacao, valor_estimado, total_contrato):
@@ -7,22 +9,21 @@ def adicionar_evento(codigo_demanda, instituicao, instrumento, subprojeto, ta, p
     Returns:
         int: ID do evento inserido
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    def gravar(conn):
+        cursor = conn.cursor()
     
-    cursor.execute("""
-    INSERT INTO eventos (codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
-                       titulo_evento, fornecedor, observacao, valor_estimado, total_contrato)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
-          titulo_evento, fornecedor, observacao, valor_estimado, total_contrato))
+        cursor.execute("""
+        INSERT INTO eventos (codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
+                           titulo_evento, fornecedor, observacao, valor_estimado, total_contrato)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
+              titulo_evento, fornecedor, observacao, valor_estimado, total_contrato))
     
-    # Obter o ID do evento inserido
-    evento_id = cursor.lastrowid
-    
-    conn.commit()
-    conn.close()
+        # Obter o ID do evento inserido
+        return cursor.lastrowid
+    evento_id = executar_escrita(gravar)
     
+    publicar("eventos", evento_id, INSERIR)
     return evento_id
 
 def listar_eventos():
@@ -43,34 +44,30 @@ def obter_eventos_por_demanda(codigo_demanda):
     conn.close()
     return eventos
 
-def editar_evento(id_evento, codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
-                titulo_evento, fornecedor, observacao, valor_estimado, total_contrato):
-    """Edita um evento existente"""
-    conn = get_connection()
-    cursor = conn.cursor()
+def obter_evento(id_evento):
+    """Retorna um evento pelo ID ou None se não existir"""
+    return get_evento(id_evento)
+
+def editar_evento(id_evento, versao_esperada=None, **kwargs):
+    """Edita um evento existente
     
-    cursor.execute("""
-    UPDATE eventos SET 
-        codigo_demanda = ?, instituicao = ?, instrumento = ?, subprojeto = ?, ta = ?, pta = ?, acao = ?, resultado = ?, meta = ?,
-        titulo_evento = ?, fornecedor = ?, observacao = ?, valor_estimado = ?, total_contrato = ?
-    WHERE id = ?
-    """, (codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
-          titulo_evento, fornecedor, observacao, valor_estimado, total_contrato, id_evento))
+    Apenas os campos informados em kwargs que mudaram são gravados.
     
-    conn.commit()
-    conn.close()
+    Args:
+        versao_esperada: row_version carregada no formulário; se informada, a
+            gravação falha com ConflitoEdicao caso o evento tenha mudado
+    
+    Returns:
+        list: colunas gravadas (vazia se nada mudou)
+    """
+    alteradas = update_evento(id_evento, versao_esperada, **kwargs)
+    if alteradas:
+        publicar("eventos", id_evento, ATUALIZAR, alteradas)
+    return alteradas
 
 def atualizar_valor_total_contrato(id_evento, novo_valor_total):
     """Atualiza apenas o valor total do contrato de um evento específico"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-    UPDATE eventos SET total_contrato = ? WHERE id = ?
-    """, (novo_valor_total, id_evento))
-    
-    conn.commit()
-    conn.close()
+    return editar_evento(id_evento, total_contrato=novo_valor_total)
 
 def obter_valor_total_contrato(id_evento):
     """Obtém o valor total atual do contrato de um evento específico"""
@@ -86,8 +83,8 @@ def obter_valor_total_contrato(id_evento):
 
 def excluir_evento(id_evento):
     """Exclui um evento pelo ID"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM eventos WHERE id = ?", (id_evento,))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM eventos WHERE id = ?", (id_evento,))
+    executar_escrita(gravar)
+    publicar("eventos", int(id_evento), EXCLUIR)
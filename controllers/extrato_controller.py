@@ -0,0 +1,347 @@
+"""Geração em lote dos extratos de contratos (HTML e CSV)
+
+O extrato de um contrato traz o valor base, cada aditivo com o total
+acumulado, as alterações de vigência e a demanda vinculada. A carga é feita
+por conjunto (models/extrato_model.py) dentro de uma sessão de relatório, de
+modo que todos os extratos de uma execução refletem o mesmo estado do banco.
+
+A montagem, a formatação e a gravação dos arquivos são distribuídas em lotes
+entre processos (ProcessPoolExecutor). O manifesto <pasta>/extratos.json
+guarda, para cada contrato, o hash dos dados usados no extrato: uma nova
+execução pula os contratos cujo hash não mudou e cujos arquivos existem, e
+uma execução interrompida continua de onde parou.
+"""
+import csv
+import hashlib
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from models.extrato_model import get_contratos_extrato
+from models.instantaneo_colunar import data_numero
+from models.sessao_relatorio import SessaoRelatorio
+from utils.validator import formatar_brl
+from utils.session import Session
+from utils.logger import log_action
+
+FORMATOS = ("html", "csv")
+NOME_MANIFESTO = "extratos.json"
+
+# Alterar quando o layout dos extratos mudar: todos são regerados
+VERSAO_EXTRATO = 1
+
+# Intervalo mínimo entre gravações do manifesto durante a geração
+INTERVALO_MANIFESTO_S = 2.0
+
+NOMES_TIPO = {
+    "carta_acordo": "Carta Acordo",
+    "eventos": "Evento",
+    "produtos_servicos": "Produto/Serviço",
+}
+
+
+def _chave(contrato):
+    return f"{contrato['tipo']}:{contrato['id']}"
+
+
+def _nome_arquivo(contrato, formato):
+    return f"extrato_{contrato['tipo']}_{contrato['id']}.{formato}"
+
+
+def _hash_contrato(contrato):
+    dados = json.dumps([VERSAO_EXTRATO, contrato], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(dados.encode("utf-8")).hexdigest()
+
+
+def _aplicar_data_corte(contrato, data_corte):
+    """Mantém apenas os aditivos registrados até a data de corte ('dd/mm/aaaa')"""
+    if data_corte:
+        corte = data_numero(data_corte)
+        contrato["aditivos"] = [aditivo for aditivo in contrato["aditivos"]
+                                if data_numero(aditivo["data_registro"]) <= corte]
+    contrato["data_corte"] = data_corte or None
+    return contrato
+
+
+def montar_extrato(contrato):
+    """
+    Linhas do extrato de um contrato
+
+    O total acumulado é recalculado sobre os aditivos recebidos (após a data
+    de corte, se houver). A vigência anterior da primeira alteração não é
+    conhecida: nas cartas acordo o aditivo sobrescreve a vigência do contrato.
+
+    Returns:
+        dict: valor_base, aditivos (com valor_acumulado e total_atualizado),
+              vigencias (com anterior e nova) e valor_total
+    """
+    valor_base = float(contrato["valor_estimado"] or 0)
+    acumulado = 0.0
+    vigencia = None
+    aditivos, vigencias = [], []
+    for sequencia, aditivo in enumerate(contrato["aditivos"], start=1):
+        acumulado += float(aditivo["valor_aditivo"] or 0)
+        aditivos.append({
+            "sequencia": sequencia,
+            "tipo_aditivo": aditivo["tipo_aditivo"] or "",
+            "descricao": aditivo["descricao"] or "",
+            "data_registro": aditivo["data_registro"] or "",
+            "valor_aditivo": float(aditivo["valor_aditivo"] or 0),
+            "valor_acumulado": acumulado,
+            "total_atualizado": valor_base + acumulado,
+        })
+        if aditivo["nova_vigencia_final"]:
+            vigencias.append({
+                "sequencia": sequencia,
+                "data_registro": aditivo["data_registro"] or "",
+                "anterior": vigencia or "—",
+                "nova": aditivo["nova_vigencia_final"],
+            })
+            vigencia = aditivo["nova_vigencia_final"]
+    return {"valor_base": valor_base, "aditivos": aditivos, "vigencias": vigencias,
+            "valor_total": valor_base + acumulado}
+
+
+def _texto(valor):
+    return "" if valor is None else str(valor)
+
+
+def _renderizar_html(contrato, extrato):
+    e = lambda valor: html.escape(_texto(valor))
+    demanda = contrato["demanda"]
+    partes = [
+        "<!DOCTYPE html>",
+        '<html lang="pt-BR"><head><meta charset="utf-8">',
+        f"<title>Extrato {e(NOMES_TIPO[contrato['tipo']])} {e(contrato['id'])}</title>",
+        "<style>body{font-family:Arial,sans-serif;margin:2em;color:#222}"
+        "table{border-collapse:collapse;width:100%;margin-bottom:1.5em}"
+        "th,td{border:1px solid #bbb;padding:4px 8px;text-align:left}"
+        "td.valor{text-align:right;white-space:nowrap}th{background:#eee}</style>",
+        "</head><body>",
+        f"<h1>Extrato do contrato — {e(NOMES_TIPO[contrato['tipo']])} nº {e(contrato['id'])}</h1>",
+        "<table>",
+        f"<tr><th>Descrição</th><td>{e(contrato['descricao'])}</td></tr>",
+        f"<tr><th>Contratado</th><td>{e(contrato['contratado'])}</td></tr>",
+        f"<tr><th>Número</th><td>{e(contrato['numero'])}</td></tr>",
+        f"<tr><th>Instituição</th><td>{e(contrato['instituicao'])}</td></tr>",
+        f"<tr><th>Vigência</th><td>{e(contrato['vigencia_inicial'])} a {e(contrato['vigencia_final'])}</td></tr>",
+        f"<tr><th>Valor base</th><td class=\"valor\">{formatar_brl(extrato['valor_base'])}</td></tr>",
+        f"<tr><th>Valor com aditivos</th><td class=\"valor\">{formatar_brl(extrato['valor_total'])}</td></tr>",
+        "</table>",
+        "<h2>Demanda vinculada</h2>",
+    ]
+    if demanda:
+        partes += [
+            "<table>",
+            f"<tr><th>Código</th><td>{e(demanda['codigo'])}</td></tr>",
+            f"<tr><th>Solicitante</th><td>{e(demanda['solicitante'])}</td></tr>",
+            f"<tr><th>Status</th><td>{e(demanda['status'])}</td></tr>",
+            f"<tr><th>NUP SEI</th><td>{e(demanda['nup_sei'])}</td></tr>",
+            f"<tr><th>Ofício</th><td>{e(demanda['oficio'])}</td></tr>",
+            f"<tr><th>Data de entrada</th><td>{e(demanda['data_entrada'])}</td></tr>",
+            "</table>",
+        ]
+    else:
+        partes.append(f"<p>Demanda {e(contrato['codigo_demanda'])} não encontrada.</p>")
+
+    partes.append("<h2>Aditivos</h2>")
+    if extrato["aditivos"]:
+        partes.append("<table><tr><th>#</th><th>Tipo</th><th>Descrição</th><th>Registro</th>"
+                      "<th>Valor</th><th>Acumulado</th><th>Total atualizado</th></tr>")
+        for aditivo in extrato["aditivos"]:
+            partes.append(
+                f"<tr><td>{aditivo['sequencia']}</td><td>{e(aditivo['tipo_aditivo'])}</td>"
+                f"<td>{e(aditivo['descricao'])}</td><td>{e(aditivo['data_registro'])}</td>"
+                f"<td class=\"valor\">{formatar_brl(aditivo['valor_aditivo'])}</td>"
+                f"<td class=\"valor\">{formatar_brl(aditivo['valor_acumulado'])}</td>"
+                f"<td class=\"valor\">{formatar_brl(aditivo['total_atualizado'])}</td></tr>")
+        partes.append("</table>")
+    else:
+        partes.append("<p>Nenhum aditivo registrado.</p>")
+
+    partes.append("<h2>Alterações de vigência</h2>")
+    if extrato["vigencias"]:
+        partes.append("<table><tr><th>Aditivo</th><th>Registro</th><th>Vigência anterior</th>"
+                      "<th>Nova vigência</th></tr>")
+        for vigencia in extrato["vigencias"]:
+            partes.append(
+                f"<tr><td>{vigencia['sequencia']}</td><td>{e(vigencia['data_registro'])}</td>"
+                f"<td>{e(vigencia['anterior'])}</td><td>{e(vigencia['nova'])}</td></tr>")
+        partes.append("</table>")
+    else:
+        partes.append("<p>Nenhuma alteração de vigência.</p>")
+
+    rodape = f"Aditivos registrados até {e(contrato['data_corte'])}. " if contrato["data_corte"] else ""
+    partes.append(f"<p><small>{rodape}Gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')}.</small></p>")
+    partes.append("</body></html>")
+    return "\n".join(partes)
+
+
+def _decimal(valor):
+    return f"{valor:.2f}".replace(".", ",")
+
+
+def _linhas_csv(contrato, extrato):
+    demanda = contrato["demanda"] or {}
+    yield ["secao", "campo", "valor"]
+    for campo in ("tipo", "id", "codigo_demanda", "descricao", "contratado", "numero", "instituicao",
+                  "vigencia_inicial", "vigencia_final"):
+        yield ["contrato", campo, _texto(contrato[campo])]
+    yield ["contrato", "valor_base", _decimal(extrato["valor_base"])]
+    yield ["contrato", "valor_total", _decimal(extrato["valor_total"])]
+    for campo in ("solicitante", "status", "nup_sei", "oficio", "data_entrada"):
+        yield ["demanda", campo, _texto(demanda.get(campo))]
+    yield []
+    yield ["sequencia", "tipo_aditivo", "descricao", "data_registro", "valor_aditivo", "valor_acumulado",
+           "total_atualizado"]
+    for aditivo in extrato["aditivos"]:
+        yield [aditivo["sequencia"], aditivo["tipo_aditivo"], aditivo["descricao"], aditivo["data_registro"],
+               _decimal(aditivo["valor_aditivo"]), _decimal(aditivo["valor_acumulado"]),
+               _decimal(aditivo["total_atualizado"])]
+    yield []
+    yield ["sequencia", "data_registro", "vigencia_anterior", "nova_vigencia"]
+    for vigencia in extrato["vigencias"]:
+        yield [vigencia["sequencia"], vigencia["data_registro"], vigencia["anterior"], vigencia["nova"]]
+
+
+def _gravar_atomico(caminho, escrever, encoding="utf-8", **opcoes):
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding=encoding, **opcoes) as arquivo:
+        escrever(arquivo)
+    os.replace(temporario, caminho)
+
+
+def _gerar_lote(pasta, formatos, contratos):
+    """Monta e grava os extratos de um lote (executado nos processos auxiliares)
+
+    Returns:
+        list: (chave, arquivos) de cada contrato gravado
+    """
+    gerados = []
+    for contrato in contratos:
+        extrato = montar_extrato(contrato)
+        arquivos = []
+        for formato in formatos:
+            nome = _nome_arquivo(contrato, formato)
+            caminho = os.path.join(pasta, nome)
+            if formato == "html":
+                conteudo = _renderizar_html(contrato, extrato)
+                _gravar_atomico(caminho, lambda arquivo: arquivo.write(conteudo))
+            else:
+                _gravar_atomico(caminho, lambda arquivo: csv.writer(arquivo, delimiter=";").writerows(
+                    _linhas_csv(contrato, extrato)), encoding="utf-8-sig", newline="")
+            arquivos.append(nome)
+        gerados.append((_chave(contrato), arquivos))
+    return gerados
+
+
+def _ler_manifesto(caminho):
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            manifesto = json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+    return manifesto.get("contratos", {}) if isinstance(manifesto, dict) else {}
+
+
+def _gravar_manifesto(caminho, contratos):
+    _gravar_atomico(caminho, lambda arquivo: json.dump(
+        {"versao": VERSAO_EXTRATO, "contratos": contratos}, arquivo, ensure_ascii=False))
+
+
+def _atualizado(registro, hash_dados, pasta, formatos, contrato):
+    return (registro is not None and registro.get("hash") == hash_dados
+            and all(os.path.exists(os.path.join(pasta, _nome_arquivo(contrato, formato))) for formato in formatos))
+
+
+def gerar_extratos(pasta, formatos=FORMATOS, processos=None, tipos=None, codigo_demanda=None, data_corte=None,
+                   forcar=False, progresso=None, tamanho_lote=25):
+    """
+    Gera os extratos dos contratos em paralelo, pulando os que já estão atualizados
+
+    Args:
+        pasta: pasta de destino (criada se necessário)
+        formatos: "html" e/ou "csv"
+        processos: processos auxiliares (padrão: núcleos da máquina; 1 gera no próprio processo)
+        tipos: tipos de contrato (padrão: todos)
+        codigo_demanda: apenas os contratos desta demanda
+        data_corte: 'dd/mm/aaaa'; considera só os aditivos registrados até esta data
+        forcar: regera todos, ignorando o manifesto
+        progresso: função chamada com (concluidos, total) a cada lote
+        tamanho_lote: contratos por tarefa enviada aos processos
+
+    Returns:
+        dict: total, gerados, ignorados, falhas e duracao_s
+    """
+    formatos = tuple(formatos)
+    invalidos = [formato for formato in formatos if formato not in FORMATOS]
+    if invalidos or not formatos:
+        raise ValueError(f"Formatos inválidos: {', '.join(invalidos) or '(nenhum)'}")
+    if data_corte and not data_numero(data_corte):
+        raise ValueError(f"Data de corte inválida (use dd/mm/aaaa): {data_corte}")
+
+    inicio = time.perf_counter()
+    with SessaoRelatorio() as sessao, sessao.usar():
+        contratos = get_contratos_extrato(tipos, codigo_demanda)
+
+    os.makedirs(pasta, exist_ok=True)
+    caminho_manifesto = os.path.join(pasta, NOME_MANIFESTO)
+    manifesto = {} if forcar else _ler_manifesto(caminho_manifesto)
+
+    pendentes, hashes = [], {}
+    for contrato in contratos:
+        _aplicar_data_corte(contrato, data_corte)
+        chave = _chave(contrato)
+        hashes[chave] = _hash_contrato(contrato)
+        if not _atualizado(manifesto.get(chave), hashes[chave], pasta, formatos, contrato):
+            pendentes.append(contrato)
+
+    total, concluidos, falhas = len(contratos), len(contratos) - len(pendentes), 0
+    lotes = [pendentes[i:i + tamanho_lote] for i in range(0, len(pendentes), tamanho_lote)]
+    ultima_gravacao = time.monotonic()
+
+    def registrar(gerados):
+        nonlocal concluidos, ultima_gravacao
+        agora = datetime.now().isoformat(timespec="seconds")
+        for chave, arquivos in gerados:
+            manifesto[chave] = {"hash": hashes[chave], "arquivos": arquivos, "gerado_em": agora}
+        concluidos += len(gerados)
+        if time.monotonic() - ultima_gravacao >= INTERVALO_MANIFESTO_S:
+            _gravar_manifesto(caminho_manifesto, manifesto)
+            ultima_gravacao = time.monotonic()
+        if progresso:
+            progresso(concluidos, total)
+
+    if progresso:
+        progresso(concluidos, total)
+    try:
+        if lotes and (processos == 1 or len(lotes) == 1):
+            for lote in lotes:
+                registrar(_gerar_lote(pasta, formatos, lote))
+        elif lotes:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                tarefas = {executor.submit(_gerar_lote, pasta, formatos, lote): lote for lote in lotes}
+                for tarefa in as_completed(tarefas):
+                    try:
+                        registrar(tarefa.result())
+                    except Exception as e:
+                        # O lote fica fora do manifesto e é tentado de novo na próxima execução
+                        falhas += len(tarefas[tarefa])
+                        print(f"Erro ao gerar extratos: {e}")
+    finally:
+        _gravar_manifesto(caminho_manifesto, manifesto)
+
+    resultado = {
+        "total": total,
+        "gerados": len(pendentes) - falhas,
+        "ignorados": total - len(pendentes),
+        "falhas": falhas,
+        "duracao_s": time.perf_counter() - inicio,
+    }
+    usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
+    log_action(usuario, f"Gerou extratos de contratos: {resultado['gerados']} gerados, "
+                        f"{resultado['ignorados']} já atualizados")
+    return resultado
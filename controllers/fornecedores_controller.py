@@ -1,4 +1,4 @@
-from models.db_manager import get_connection
+from models.db_manager import get_connection, executar_escrita
 
 def adicionar_fornecedor(razao_social, cnpj, observacao):
     """Adiciona um novo fornecedor
@@ -6,21 +6,17 @@ def adicionar_fornecedor(razao_social, cnpj, observacao):
     Returns:
         int: ID do fornecedor inserido
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    def gravar(conn):
+        cursor = conn.cursor()
     
-    cursor.execute("""
-    INSERT INTO fornecedores (razao_social, cnpj, observacao)
-    VALUES (?, ?, ?)
-    """, (razao_social, cnpj, observacao))
+        cursor.execute("""
+        INSERT INTO fornecedores (razao_social, cnpj, observacao)
+        VALUES (?, ?, ?)
+        """, (razao_social, cnpj, observacao))
     
-    # Obter o ID do fornecedor inserido
-    fornecedor_id = cursor.lastrowid
-    
-    conn.commit()
-    conn.close()
-    
-    return fornecedor_id
+        # Obter o ID do fornecedor inserido
+        return cursor.lastrowid
+    return executar_escrita(gravar)
 
 def listar_fornecedores():
     """Retorna todos os fornecedores cadastrados"""
@@ -46,22 +42,19 @@ def buscar_fornecedor_por_nome(razao_social):
 
 def editar_fornecedor(id_fornecedor, razao_social, cnpj, observacao):
     """Edita um fornecedor existente"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-    UPDATE fornecedores SET 
-        razao_social = ?, cnpj = ?, observacao = ?
-    WHERE id = ?
-    """, (razao_social, cnpj, observacao, id_fornecedor))
-    
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+    
+        cursor.execute("""
+        UPDATE fornecedores SET 
+            razao_social = ?, cnpj = ?, observacao = ?
+        WHERE id = ?
+        """, (razao_social, cnpj, observacao, id_fornecedor))
+    executar_escrita(gravar)
 
 def excluir_fornecedor(id_fornecedor):
     """Exclui um fornecedor pelo ID"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM fornecedores WHERE id = ?", (id_fornecedor,))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM fornecedores WHERE id = ?", (id_fornecedor,))
+    executar_escrita(gravar)
@@ -1,4 +1,6 @@
-from models.db_manager import get_connection
+from models.db_manager import get_connection, executar_escrita
+from models.produtos_servicos_model import update_produto_servico
+from utils.barramento import publicar, INSERIR, ATUALIZAR, EXCLUIR
 
 def adicionar_produto_servico(codigo_demanda, fornecedor, modalidade, objetivo, 
                            vigencia_inicial, vigencia_final, observacao, valor_estimado, total_contrato,
@@ -9,24 +11,23 @@ def adicionar_produto_servico(codigo_demanda, fornecedor, modalidade, objetivo,
     Returns:
         int: ID do produto/serviço inserido
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    def gravar(conn):
+        cursor = conn.cursor()
     
-    cursor.execute("""
-    INSERT INTO produtos_servicos (codigo_demanda, fornecedor, modalidade, objetivo,
-                               vigencia_inicial, vigencia_final, observacao, valor_estimado, total_contrato,
-                               instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (codigo_demanda, fornecedor, modalidade, objetivo, 
-         vigencia_inicial, vigencia_final, observacao, valor_estimado, total_contrato,
-         instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta))
+        cursor.execute("""
+        INSERT INTO produtos_servicos (codigo_demanda, fornecedor, modalidade, objetivo,
+                                   vigencia_inicial, vigencia_final, observacao, valor_estimado, total_contrato,
+                                   instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (codigo_demanda, fornecedor, modalidade, objetivo, 
+             vigencia_inicial, vigencia_final, observacao, valor_estimado, total_contrato,
+             instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta))
     
-    # Obter o ID do produto/serviço inserido
-    produto_id = cursor.lastrowid
-    
-    conn.commit()
-    conn.close()
+        # Obter o ID do produto/serviço inserido
+        return cursor.lastrowid
+    produto_id = executar_escrita(gravar)
     
+    publicar("produtos_servicos", produto_id, INSERIR)
     return produto_id
 
 def listar_produtos_servicos():
@@ -47,31 +48,36 @@ def obter_produtos_por_demanda(codigo_demanda):
     conn.close()
     return produtos
 
-def editar_produto_servico(id_produto, codigo_demanda, fornecedor, modalidade, objetivo, 
-                        vigencia_inicial, vigencia_final, observacao, valor_estimado, total_contrato,
-                        instituicao=None, instrumento=None, subprojeto=None, ta=None, pta=None, 
-                        acao=None, resultado=None, meta=None):
-    """Edita um produto/serviço existente"""
+def obter_produto_servico(id_produto):
+    """Retorna um produto/serviço pelo ID ou None se não existir"""
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.execute("SELECT * FROM produtos_servicos WHERE id = ?", (id_produto,))
+    produto = cursor.fetchone()
+    conn.close()
+    return produto
+
+def editar_produto_servico(id_produto, versao_esperada=None, **kwargs):
+    """Edita um produto/serviço existente
     
-    cursor.execute("""
-    UPDATE produtos_servicos SET 
-        codigo_demanda = ?, fornecedor = ?, modalidade = ?, objetivo = ?,
-        vigencia_inicial = ?, vigencia_final = ?, observacao = ?, valor_estimado = ?, total_contrato = ?,
-        instituicao = ?, instrumento = ?, subprojeto = ?, ta = ?, pta = ?, acao = ?, resultado = ?, meta = ?
-    WHERE id = ?
-    """, (codigo_demanda, fornecedor, modalidade, objetivo, 
-         vigencia_inicial, vigencia_final, observacao, valor_estimado, total_contrato,
-         instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta, id_produto))
+    Apenas os campos informados em kwargs que mudaram são gravados.
     
-    conn.commit()
-    conn.close()
+    Args:
+        versao_esperada: row_version carregada no formulário; se informada, a
+            gravação falha com ConflitoEdicao caso o registro tenha mudado
+    
+    Returns:
+        list: colunas gravadas (vazia se nada mudou)
+    """
+    alteradas = update_produto_servico(id_produto, versao_esperada, **kwargs)
+    if alteradas:
+        publicar("produtos_servicos", id_produto, ATUALIZAR, alteradas)
+    return alteradas
 
 def excluir_produto_servico(id_produto):
     """Exclui um produto/serviço pelo ID"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM produtos_servicos WHERE id = ?", (id_produto,))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM produtos_servicos WHERE id = ?", (id_produto,))
+    executar_escrita(gravar)
+    publicar("produtos_servicos", int(id_produto), EXCLUIR)
@@ -0,0 +1,197 @@
+import csv
+from contextlib import contextmanager
+
+from models.db_manager import get_connection
+from models.demanda_360_model import get_demandas_360, TIPOS_CONTRATO
+from models.sessao_relatorio import SessaoRelatorio
+from models import instantaneo_colunar
+from utils.session import Session
+from utils.logger import log_action
+
+COLUNAS_CONTRATOS = [
+    "codigo_demanda", "solicitante", "status_demanda", "tipo", "id", "descricao", "contratado", "numero",
+    "vigencia_inicial", "vigencia_final", "valor_estimado", "quantidade_aditivos", "valor_aditivos",
+    "valor_com_aditivos", "total_contrato",
+]
+
+COLUNAS_ADITIVOS = [
+    "codigo_demanda", "tipo_contrato", "id_contrato", "id", "tipo_aditivo", "descricao", "valor_aditivo",
+    "valor_acumulado", "nova_vigencia_final", "data_registro",
+]
+
+def abrir_sessao_relatorio():
+    """Abre uma sessão de relatório (instantâneo do banco, ver models/sessao_relatorio.py)"""
+    return SessaoRelatorio()
+
+@contextmanager
+def _em_instantaneo(sessao):
+    """Usa a sessão informada; sem ela, as leituras vão direto ao banco
+
+    Um instantâneo por chamada custaria, fora do WAL, uma cópia do banco
+    inteiro em memória a cada relatório (p.ex. cada chamada ao servidor).
+    """
+    if sessao is None:
+        yield None
+        return
+    with sessao.usar():
+        yield sessao
+
+def _carregar_demandas():
+    conn = get_connection()
+    try:
+        codigos = [linha[0] for linha in conn.execute("SELECT codigo FROM demanda ORDER BY codigo")]
+    finally:
+        conn.close()
+    return get_demandas_360(codigos)
+
+def obter_resumo_por_status(sessao=None):
+    """
+    Totais de demandas, contratos e valores por status da demanda, lidos do instantâneo
+
+    Returns:
+        list: dicts com status, demandas, contratos, aditivos, valor_estimado,
+              valor_aditivos e total_contrato, em ordem de status
+    """
+    with _em_instantaneo(sessao):
+        demandas = _carregar_demandas()
+
+    resumo = {}
+    for item in demandas.values():
+        status = item["demanda"]["status"] or "(sem status)"
+        linha = resumo.setdefault(status, {"status": status, "demandas": 0, "contratos": 0, "aditivos": 0,
+                                           "valor_estimado": 0.0, "valor_aditivos": 0.0, "total_contrato": 0.0})
+        totais = item["totais"]
+        linha["demandas"] += 1
+        linha["contratos"] += totais["quantidade_contratos"]
+        linha["aditivos"] += totais["quantidade_aditivos"]
+        for chave in ("valor_estimado", "valor_aditivos", "total_contrato"):
+            linha[chave] += totais[chave]
+    return [resumo[status] for status in sorted(resumo)]
+
+def _numero(valor):
+    """Valor numérico no formato das planilhas em português (vírgula decimal)"""
+    return f"{float(valor or 0):.2f}".replace(".", ",")
+
+def _gravar_csv(caminho, colunas, linhas):
+    # utf-8-sig e ponto e vírgula: o Excel em português abre o arquivo diretamente
+    with open(caminho, "w", newline="", encoding="utf-8-sig") as arquivo:
+        escritor = csv.writer(arquivo, delimiter=";")
+        escritor.writerow(colunas)
+        escritor.writerows(linhas)
+
+def registrar_exportacao(descricao, quantidade):
+    """Registra no log uma exportação de relatório (no servidor, em modo cliente)"""
+    usuario = Session.get_user()[1] if Session.get_user() else 'desconhecido'
+    log_action(usuario, f"Exportação de relatório de {descricao} ({quantidade} linhas)")
+
+def obter_linhas_contratos(sessao=None):
+    """
+    Linhas do relatório de contratos (colunas de COLUNAS_CONTRATOS)
+
+    Com uma sessão, todas as leituras vêm do mesmo instantâneo, sem travar
+    quem estiver gravando; sem ela, são feitas diretamente no banco.
+    """
+    with _em_instantaneo(sessao):
+        demandas = _carregar_demandas()
+
+    linhas = []
+    for codigo, item in demandas.items():
+        demanda = item["demanda"]
+        for tipo in TIPOS_CONTRATO:
+            for contrato in item["contratos"][tipo]:
+                linhas.append([
+                    codigo, demanda["solicitante"], demanda["status"], tipo, contrato["id"],
+                    contrato["descricao"], contrato["contratado"], contrato["numero"],
+                    contrato["vigencia_inicial"], contrato["vigencia_final"],
+                    _numero(contrato["valor_estimado"]), len(contrato["aditivos"]),
+                    _numero(contrato["valor_aditivos"]), _numero(contrato["valor_com_aditivos"]),
+                    _numero(contrato["total_contrato"]),
+                ])
+    return linhas
+
+def exportar_contratos_csv(caminho, sessao=None):
+    """
+    Exporta uma linha por contrato, com a demanda e os valores com aditivos
+
+    O arquivo é gravado onde o relatório é pedido; em modo cliente, as linhas
+    vêm do servidor (obter_linhas_contratos).
+
+    Returns:
+        int: quantidade de contratos exportados
+    """
+    linhas = obter_linhas_contratos(sessao=sessao)
+    _gravar_csv(caminho, COLUNAS_CONTRATOS, linhas)
+    registrar_exportacao("contratos", len(linhas))
+    return len(linhas)
+
+def obter_linhas_aditivos(sessao=None):
+    """Linhas do relatório de aditivos (colunas de COLUNAS_ADITIVOS), com o valor acumulado do contrato"""
+    with _em_instantaneo(sessao):
+        demandas = _carregar_demandas()
+
+    linhas = []
+    for codigo, item in demandas.items():
+        for tipo in TIPOS_CONTRATO:
+            for contrato in item["contratos"][tipo]:
+                for aditivo in contrato["aditivos"]:
+                    linhas.append([
+                        codigo, tipo, contrato["id"], aditivo["id"], aditivo["tipo_aditivo"],
+                        aditivo["descricao"], _numero(aditivo["valor_aditivo"]),
+                        _numero(aditivo["valor_acumulado"]), aditivo["nova_vigencia_final"],
+                        aditivo["data_registro"],
+                    ])
+    return linhas
+
+def exportar_aditivos_csv(caminho, sessao=None):
+    """
+    Exporta uma linha por aditivo, com o valor acumulado do contrato
+
+    Returns:
+        int: quantidade de aditivos exportados
+    """
+    linhas = obter_linhas_aditivos(sessao=sessao)
+    _gravar_csv(caminho, COLUNAS_ADITIVOS, linhas)
+    registrar_exportacao("aditivos", len(linhas))
+    return len(linhas)
+
+# Instantâneo colunar aberto pela primeira agregação (ver models/instantaneo_colunar.py)
+_instantaneo = None
+
+def _obter_instantaneo():
+    """Instantâneo colunar em dia com o banco, ou None se indisponível"""
+    global _instantaneo
+    if not instantaneo_colunar.disponivel():
+        return None
+    pasta = instantaneo_colunar.pasta_padrao()
+    try:
+        if _instantaneo is None or _instantaneo.pasta != pasta:
+            _instantaneo = instantaneo_colunar.InstantaneoColunar(pasta)
+            _instantaneo.abrir()
+        if _instantaneo.desatualizado():
+            _instantaneo.atualizar()
+    except OSError as e:
+        print(f"Erro ao atualizar o instantâneo colunar, usando o banco: {e}")
+        _instantaneo = None
+        return None
+    return _instantaneo
+
+def agrupar_totais(tabela, por, somar=(), filtros=None):
+    """
+    Quantidade de registros e somas por categoria (instituição, fornecedor, tipo de aditivo...)
+
+    Calcula sobre o instantâneo colunar, atualizado antes com as alterações
+    pendentes; sem NumPy, usa GROUP BY no banco com o mesmo resultado.
+
+    Args:
+        tabela: eventos, carta_acordo, produtos_servicos, aditivos ou custeio
+        por: coluna categórica ou lista delas
+        somar: colunas numéricas a somar
+        filtros: ver TabelaColunar.agrupar
+
+    Returns:
+        list: dicts com os valores de `por`, quantidade e soma_<coluna>
+    """
+    instantaneo = _obter_instantaneo()
+    if instantaneo is None:
+        return instantaneo_colunar.agrupar_sql(tabela, por, somar, filtros)
+    return instantaneo.agrupar(tabela, por, somar, filtros)
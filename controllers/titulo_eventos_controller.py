@@ -1,4 +1,4 @@
-from models.db_manager import get_connection
+from models.db_manager import get_connection, executar_escrita
 
 def adicionar_titulo_evento(titulo, cidade, estado, data_inicio, data_fim):
     """Adiciona um novo título de evento
@@ -6,21 +6,17 @@ def adicionar_titulo_evento(titulo, cidade, estado, data_inicio, data_fim):
     Returns:
         int: ID do título de evento inserido
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    def gravar(conn):
+        cursor = conn.cursor()
     
-    cursor.execute("""
-    INSERT INTO titulo_eventos (titulo, cidade, estado, data_inicio, data_fim)
-    VALUES (?, ?, ?, ?, ?)
-    """, (titulo, cidade, estado, data_inicio, data_fim))
+        cursor.execute("""
+        INSERT INTO titulo_eventos (titulo, cidade, estado, data_inicio, data_fim)
+        VALUES (?, ?, ?, ?, ?)
+        """, (titulo, cidade, estado, data_inicio, data_fim))
     
-    # Obter o ID do título de evento inserido
-    titulo_evento_id = cursor.lastrowid
-    
-    conn.commit()
-    conn.close()
-    
-    return titulo_evento_id
+        # Obter o ID do título de evento inserido
+        return cursor.lastrowid
+    return executar_escrita(gravar)
 
 def listar_titulos_eventos():
     """Retorna todos os títulos de eventos cadastrados"""
@@ -46,22 +42,19 @@ def buscar_titulo_evento_por_nome(titulo):
 
 def editar_titulo_evento(id_titulo_evento, titulo, cidade, estado, data_inicio, data_fim):
     """Edita um título de evento existente"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-    UPDATE titulo_eventos SET 
-        titulo = ?, cidade = ?, estado = ?, data_inicio = ?, data_fim = ?
-    WHERE id = ?
-    """, (titulo, cidade, estado, data_inicio, data_fim, id_titulo_evento))
-    
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+    
+        cursor.execute("""
+        UPDATE titulo_eventos SET 
+            titulo = ?, cidade = ?, estado = ?, data_inicio = ?, data_fim = ?
+        WHERE id = ?
+        """, (titulo, cidade, estado, data_inicio, data_fim, id_titulo_evento))
+    executar_escrita(gravar)
 
 def excluir_titulo_evento(id_titulo_evento):
     """Exclui um título de evento pelo ID"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM titulo_eventos WHERE id = ?", (id_titulo_evento,))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM titulo_eventos WHERE id = ?", (id_titulo_evento,))
+    executar_escrita(gravar)
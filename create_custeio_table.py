@@ -1,6 +1,47 @@
-import pandas as pd
 import sqlite3
 import os
+import models.db_manager as db_manager
+from utils.perfil_planilha import perfilar, comparar_com_tabela, possui_erros, resumo, ler_registros
+
+CREATE_CUSTEIO = '''
+CREATE TABLE custeio (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instituicao_parceira TEXT,
+    cod_projeto TEXT,
+    cod_ta TEXT,
+    resultado TEXT,
+    subprojeto TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+'''
+
+CUSTEIO_COLUMNS = ['instituicao_parceira', 'cod_projeto', 'cod_ta', 'resultado', 'subprojeto']
+
+def profile_spreadsheet(excel_path):
+    """Profile the spreadsheet (one streaming pass) and compare it with the custeio schema
+
+    Returns:
+        The profile dict, or None when the file cannot be imported
+    """
+    print(f"Profiling spreadsheet: {excel_path}")
+    profile = perfilar(excel_path, progresso=lambda rows: print(f"  {rows} rows read...", flush=True))
+
+    # Compared against the columns the rows are loaded into
+    target = sqlite3.connect(":memory:")
+    target.execute(CREATE_CUSTEIO)
+    comparar_com_tabela(profile, target, 'custeio')
+    target.close()
+
+    print(resumo(profile))
+    missing = [column for column in CUSTEIO_COLUMNS
+               if column not in {c['coluna_destino'] for c in profile['colunas']}]
+    if missing:
+        print(f"Error: columns missing from the spreadsheet: {', '.join(missing)}")
+        return None
+    if possui_erros(profile):
+        print("Error: the spreadsheet does not match the custeio table")
+        return None
+    return profile
 
 def create_custeio_table():
     print("Starting the process to create custeio table...")
@@ -18,62 +59,34 @@ def create_custeio_table():
         return False
     
     try:
-        # Read the Excel file
-        print(f"Reading Excel file: {excel_path}")
-        df = pd.read_excel(excel_path)
-        
-        # Clean column names (remove dots and standardize)
-        df.columns = [col.replace('DIM_PROJETO.', '').lower() for col in df.columns]
+        # Check the file before dropping the current table
+        profile = profile_spreadsheet(excel_path)
+        if profile is None:
+            return False
         
-        # Fill NaN values with empty strings for text columns
-        df = df.fillna('')
+        # Bring the schema up to date (a new database gets custeio from the migrations)
+        db_manager.DB_PATH = db_path
+        db_manager.init_db()
         
         # Connect to the SQLite database
         print(f"Connecting to database: {db_path}")
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
-        # Check if the table already exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='custeio';")
-        if cursor.fetchone():
-            print("Table 'custeio' already exists. Dropping it to recreate...")
-            cursor.execute("DROP TABLE custeio;")
-        
-        # Create the new table
-        print("Creating 'custeio' table...")
-        cursor.execute('''
-        CREATE TABLE custeio (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            instituicao_parceira TEXT,
-            cod_projeto TEXT,
-            cod_ta TEXT,
-            resultado TEXT,
-            subprojeto TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        ''')
-        
-        # Insert data into the table
-        print(f"Inserting {len(df)} rows of data...")
-        for _, row in df.iterrows():
-            cursor.execute('''
-            INSERT INTO custeio (instituicao_parceira, cod_projeto, cod_ta, resultado, subprojeto)
-            VALUES (?, ?, ?, ?, ?);
-            ''', (
-                row['instituicao_parceira'],
-                row['cod_projeto'],
-                row['cod_ta'],
-                row['resultado'],
-                row['subprojeto']
-            ))
+        # Empty the table instead of dropping it: row_version, uuid and the
+        # version, replication and change-log triggers added by the migrations stay in place
+        print("Removing the current rows from 'custeio'...")
+        cursor.execute("DELETE FROM custeio;")
         
-        # Create indexes for better query performance
-        print("Creating indexes...")
-        cursor.execute("CREATE INDEX idx_instituicao ON custeio (instituicao_parceira);")
-        cursor.execute("CREATE INDEX idx_cod_projeto ON custeio (cod_projeto);")
-        cursor.execute("CREATE INDEX idx_cod_ta ON custeio (cod_ta);")
-        cursor.execute("CREATE INDEX idx_resultado ON custeio (resultado);")
-        cursor.execute("CREATE INDEX idx_subprojeto ON custeio (subprojeto);")
+        # Insert data into the table, streaming the rows (empty cells become '')
+        print(f"Inserting {profile['linhas']} rows of data...")
+        cursor.executemany('''
+        INSERT INTO custeio (instituicao_parceira, cod_projeto, cod_ta, resultado, subprojeto)
+        VALUES (?, ?, ?, ?, ?);
+        ''', (
+            tuple('' if value is None else value for value in row)
+            for row in ler_registros(excel_path, CUSTEIO_COLUMNS)
+        ))
         
         # Commit the changes and close the connection
         conn.commit()
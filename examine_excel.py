@@ -1,73 +1,69 @@
-import pandas as pd
-import sqlite3
+"""
+Examine a source spreadsheet before importing it.
+
+The file is read as a stream (utils/perfil_planilha.py): types, empty values,
+distinct counts and min/max per column are computed in one pass with constant
+memory, and compared with the schema of the target table.
+
+Usage:
+    python examine_excel.py [listagem_Custeio.xlsx] [--tabela custeio] [--aba Planilha1] [--saida perfil.json]
+"""
+import argparse
+import json
 import os
+import sqlite3
+import sys
+
+from utils.perfil_planilha import perfilar, comparar_com_tabela, possui_erros, resumo
+
 
-# Print current working directory
-print(f"Current working directory: {os.getcwd()}")
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de uma planilha de origem (XLSX/CSV)")
+    parser.add_argument("arquivo", nargs="?", default="listagem_Custeio.xlsx")
+    parser.add_argument("--aba", help="aba do Excel (padrão: a primeira)")
+    parser.add_argument("--tabela", default="custeio", help="tabela de destino para comparar o esquema")
+    parser.add_argument("--banco", default="contrato.db")
+    parser.add_argument("--saida", help="grava o perfil em JSON")
+    args = parser.parse_args()
 
-# Check if the Excel file exists
-excel_path = 'listagem_Custeio.xlsx'
-if os.path.exists(excel_path):
-    print(f"Excel file found: {excel_path}")
-else:
-    print(f"Excel file not found at: {excel_path}")
+    # Print current working directory
+    print(f"Current working directory: {os.getcwd()}")
 
-# Read the Excel file
-try:
-    df = pd.read_excel(excel_path)
-    
-    # Display basic information about the dataframe
-    print("\nDataFrame Info:")
-    print(f"Number of rows: {len(df)}")
-    print(f"Number of columns: {len(df.columns)}")
-    
-    # Display column names
-    print("\nColumn Names:")
-    for col in df.columns:
-        print(f"- {col}")
-    
-    # Display data types
-    print("\nData Types:")
-    print(df.dtypes)
-    
-    # Display first few rows
-    print("\nFirst 5 rows:")
-    print(df.head())
-    
-    # Check for null values
-    print("\nNull Values Count:")
-    print(df.isnull().sum())
-    
-except Exception as e:
-    print(f"Error reading Excel file: {e}")
+    # Check if the spreadsheet exists
+    if os.path.exists(args.arquivo):
+        print(f"File found: {args.arquivo}")
+    else:
+        print(f"File not found at: {args.arquivo}")
+        return 1
 
-# Check if the database file exists
-db_path = 'contrato.db'
-if os.path.exists(db_path):
-    print(f"\nDatabase file found: {db_path}")
-    
-    # Connect to the database and list tables
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Get list of tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        
-        print("\nExisting tables in the database:")
-        for table in tables:
-            print(f"- {table[0]}")
-            
-            # Get table schema
-            cursor.execute(f"PRAGMA table_info({table[0]});")
-            columns = cursor.fetchall()
-            print(f"  Schema for {table[0]}:")
-            for col in columns:
-                print(f"  - {col[1]} ({col[2]})")
-        
-        conn.close()
+        perfil = perfilar(args.arquivo, args.aba,
+                          progresso=lambda linhas: print(f"  {linhas} linhas lidas...", flush=True))
     except Exception as e:
-        print(f"Error connecting to database: {e}")
-else:
-    print(f"\nDatabase file not found at: {db_path}")
+        print(f"Error reading file: {e}")
+        return 1
+
+    # Compare with the target table, when the database is available
+    if os.path.exists(args.banco):
+        conn = sqlite3.connect(args.banco)
+        try:
+            comparar_com_tabela(perfil, conn, args.tabela)
+        except ValueError as e:
+            print(e)
+        finally:
+            conn.close()
+    else:
+        print(f"Database file not found at: {args.banco} (schema not compared)")
+
+    print()
+    print(resumo(perfil))
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(perfil, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nPerfil gravado em {args.saida}")
+    return 1 if possui_erros(perfil) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""
+Gera um banco SQLite com dados sintéticos em volume realista (demandas, cartas de
+acordo, eventos, produtos/serviços, aditivos, fornecedores, custeio e logs), para
+medição de desempenho.
+
+A geração é determinística: a mesma semente e a mesma quantidade de linhas
+produzem sempre o mesmo banco.
+
+Uso:
+    python gerar_dados_sinteticos.py --linhas 100000 [--semente 42]
+                                     [--banco dados_sinteticos.db] [--substituir]
+
+O total de linhas (de 1 mil a 10 milhões) é distribuído entre as tabelas conforme
+PROPORCOES. O banco de produção (contrato.db) nunca é usado como destino.
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import models.db_manager as db_manager
+
+# Fração do total de linhas gerada para cada tabela
+PROPORCOES = {
+    "demanda": 0.05,
+    "fornecedores": 0.01,
+    "titulo_eventos": 0.005,
+    "custeio": 0.02,
+    "carta_acordo": 0.08,
+    "eventos": 0.08,
+    "produtos_servicos": 0.08,
+    "aditivos": 0.18,
+    "logs": 0.485,
+}
+
+LINHAS_MINIMO = 1_000
+LINHAS_MAXIMO = 10_000_000
+
+# Linhas enviadas ao banco por executemany
+TAMANHO_LOTE = 50_000
+
+INSTITUICOES = ["OPAS", "FIOCRUZ", "UNESCO", "PNUD", "OEI", "IICA", "UNFPA", "UFRJ", "UnB", "USP"]
+SOLICITANTES = ["AISA/MS", "ASPAR/MS", "SAES/MS", "SVS/MS", "SCTIE/MS", "SESAI/MS", "SGTES/MS", "SE/MS"]
+STATUS_DEMANDA = ["Em Análise", "Aprovada", "Em Execução", "Concluída", "Cancelada"]
+MODALIDADES = ["Contrato", "Carta Acordo", "Dispensa", "Pregão", "Inexigibilidade"]
+TIPOS_ADITIVO = ["valor", "tempo", "ambos"]
+TIPOS_CONTRATO = ["carta_acordo", "eventos", "produtos_servicos"]
+PREFIXOS_FORNECEDOR = ["Comercial", "Serviços", "Tecnologia", "Eventos", "Consultoria", "Distribuidora"]
+SUFIXOS_FORNECEDOR = ["Ltda", "S.A.", "ME", "EIRELI"]
+NOMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Costa", "Almeida", "Ribeiro",
+         "Carvalho", "Gomes", "Martins", "Araújo", "Barbosa", "Rocha", "Lima", "Mendes"]
+TEMAS = ["Saúde Indígena", "Vigilância em Saúde", "Atenção Primária", "Saúde Digital",
+         "Formação Profissional", "Assistência Farmacêutica", "Saúde Mental", "Vacinação"]
+CIDADES = [("Brasília", "DF"), ("Rio de Janeiro", "RJ"), ("São Paulo", "SP"), ("Recife", "PE"),
+           ("Manaus", "AM"), ("Porto Alegre", "RS"), ("Salvador", "BA"), ("Belém", "PA")]
+USUARIOS = ["admin", "analista1", "analista2", "gestor"]
+ACOES_LOG = ["Login realizado", "Cadastro de Demanda", "Edição de Demanda {}", "Cadastro de Carta Acordo",
+             "Edição de Carta Acordo {}", "Cadastro de Aditivo para Contrato {}", "Edição de Aditivo {}"]
+
+DATA_BASE = date(2019, 1, 1)
+
+
+def distribuir_linhas(linhas):
+    """Distribui o total de linhas entre as tabelas (ao menos 1 linha por tabela)
+
+    Args:
+        linhas: total de linhas a gerar
+
+    Returns:
+        dict: {tabela: quantidade}
+    """
+    return {tabela: max(1, int(linhas * fracao)) for tabela, fracao in PROPORCOES.items()}
+
+
+def _data(rng, dias=2500):
+    """Data aleatória no formato dd/mm/aaaa usado pelos formulários"""
+    return (DATA_BASE + timedelta(days=rng.randrange(dias))).strftime("%d/%m/%Y")
+
+
+def _cnpj(rng):
+    """CNPJ formatado (apenas o formato; os dígitos verificadores não são válidos)"""
+    d = f"{rng.randrange(10**14):014d}"
+    return f"{d[:2]}.{d[2:5]}.{d[5:8]}/{d[8:12]}-{d[12:]}"
+
+
+def _nup(rng):
+    """Número único de protocolo do SEI"""
+    return f"{rng.randrange(10**5):05d}.{rng.randrange(10**6):06d}/{rng.randrange(2019, 2026)}-{rng.randrange(100):02d}"
+
+
+def _valor(rng, minimo=1_000, maximo=2_000_000):
+    """Valor monetário com distribuição assimétrica (muitos contratos pequenos)"""
+    return round(minimo + (maximo - minimo) * rng.random() ** 3, 2)
+
+
+def _gerar_hierarquia_custeio(rng, quantidade):
+    """Gera os caminhos instituição -> projeto -> TA -> resultado -> subprojeto"""
+    for _ in range(quantidade):
+        instituicao = rng.choice(INSTITUICOES)
+        projeto = f"TC {rng.randrange(1, 40) + 100 * (INSTITUICOES.index(instituicao) + 1)}"
+        yield (
+            instituicao,
+            projeto,
+            f"TA {rng.randrange(1, 8)}",
+            f"RE {rng.randrange(1, 12):02d}",
+            f"Meta {rng.randrange(1, 15):02d}",
+        )
+
+
+def _linhas_demanda(rng, quantidade):
+    for _ in range(quantidade):
+        entrada = _data(rng)
+        yield (entrada, rng.choice(SOLICITANTES), entrada, f"OF{rng.randrange(1, 9999)}",
+               _nup(rng), rng.choice(STATUS_DEMANDA))
+
+
+def _linhas_fornecedores(rng, quantidade):
+    for i in range(1, quantidade + 1):
+        nome = f"{rng.choice(PREFIXOS_FORNECEDOR)} {rng.choice(NOMES)} {i} {rng.choice(SUFIXOS_FORNECEDOR)}"
+        yield (nome, _cnpj(rng), "")
+
+
+def _linhas_titulo_eventos(rng, quantidade):
+    for i in range(1, quantidade + 1):
+        cidade, estado = rng.choice(CIDADES)
+        inicio = _data(rng)
+        yield (f"Encontro de {rng.choice(TEMAS)} {i}", cidade, estado, inicio, inicio)
+
+
+def _linhas_custeio(rng, quantidade):
+    criado_em = datetime(2025, 1, 1).strftime("%Y-%m-%d %H:%M:%S")
+    for instituicao, projeto, ta, resultado, subprojeto in _gerar_hierarquia_custeio(rng, quantidade):
+        yield (instituicao, projeto, ta, resultado, subprojeto, criado_em)
+
+
+def _custeio_contrato(rng, caminhos):
+    """Campos de custeio de um contrato a partir de um caminho existente em custeio"""
+    instituicao, projeto, ta, resultado, subprojeto = rng.choice(caminhos)
+    return (instituicao, projeto, subprojeto, ta, str(rng.randrange(2019, 2026)),
+            f"{rng.randrange(1, 10):02d}", resultado, f"{rng.randrange(1, 15):02d}")
+
+
+def _linhas_carta_acordo(rng, quantidade, total_demandas, caminhos):
+    for i in range(1, quantidade + 1):
+        estimado = _valor(rng)
+        yield ((rng.randrange(1, total_demandas + 1),) + _custeio_contrato(rng, caminhos) + (
+            f"CON{i:07d}", _data(rng), _data(rng), f"Instituto {rng.choice(NOMES)}", _cnpj(rng),
+            f"Projeto de {rng.choice(TEMAS)}", "Apoio técnico", estimado, estimado, ""))
+
+
+def _linhas_eventos(rng, quantidade, total_demandas, caminhos, fornecedores, titulos):
+    for _ in range(quantidade):
+        estimado = _valor(rng, maximo=500_000)
+        yield ((rng.randrange(1, total_demandas + 1),) + _custeio_contrato(rng, caminhos) + (
+            rng.choice(titulos), rng.choice(fornecedores), "", estimado, estimado))
+
+
+def _linhas_produtos_servicos(rng, quantidade, total_demandas, caminhos, fornecedores):
+    for _ in range(quantidade):
+        estimado = _valor(rng)
+        yield ((rng.randrange(1, total_demandas + 1), rng.choice(fornecedores), rng.choice(MODALIDADES),
+                f"Aquisição para {rng.choice(TEMAS)}", _data(rng), _data(rng), "", estimado, estimado)
+               + _custeio_contrato(rng, caminhos))
+
+
+def _linhas_aditivos(rng, quantidade, totais_contratos):
+    for _ in range(quantidade):
+        tipo_contrato = rng.choice(TIPOS_CONTRATO)
+        tipo_aditivo = rng.choice(TIPOS_ADITIVO)
+        valor = _valor(rng, 100, 200_000) if tipo_aditivo != "tempo" else 0.0
+        vigencia = _data(rng, 3500) if tipo_aditivo != "valor" else ""
+        yield (rng.randrange(1, totais_contratos[tipo_contrato] + 1), tipo_contrato, tipo_aditivo,
+               f"Aditivo de {tipo_aditivo}", valor, vigencia, _data(rng))
+
+
+def _linhas_logs(rng, quantidade):
+    inicio = datetime(2023, 1, 1)
+    for i in range(quantidade):
+        instante = inicio + timedelta(seconds=i * 37 + rng.randrange(30))
+        yield (rng.choice(USUARIOS), rng.choice(ACOES_LOG).format(rng.randrange(1, 5000)),
+               instante.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+SQL_INSERCAO = {
+    "demanda": "INSERT INTO demanda (data_entrada, solicitante, data_protocolo, oficio, nup_sei, status) "
+               "VALUES (?, ?, ?, ?, ?, ?)",
+    "fornecedores": "INSERT INTO fornecedores (razao_social, cnpj, observacao) VALUES (?, ?, ?)",
+    "titulo_eventos": "INSERT INTO titulo_eventos (titulo, cidade, estado, data_inicio, data_fim) "
+                      "VALUES (?, ?, ?, ?, ?)",
+    "custeio": "INSERT INTO custeio (instituicao_parceira, cod_projeto, cod_ta, resultado, subprojeto, created_at) "
+               "VALUES (?, ?, ?, ?, ?, ?)",
+    "carta_acordo": """INSERT INTO carta_acordo (
+            codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
+            contrato, vigencia_inicial, vigencia_final, instituicao_2, cnpj, titulo_projeto, objetivo,
+            valor_estimado, total_contrato, observacoes
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+    "eventos": """INSERT INTO eventos (codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
+            titulo_evento, fornecedor, observacao, valor_estimado, total_contrato)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+    "produtos_servicos": """INSERT INTO produtos_servicos (
+            codigo_demanda, fornecedor, modalidade, objetivo, vigencia_inicial, vigencia_final,
+            observacao, valor_estimado, total_contrato, instituicao, instrumento, subprojeto,
+            ta, pta, acao, resultado, meta
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+    "aditivos": """INSERT INTO aditivos (
+            id_contrato, tipo_contrato, tipo_aditivo, descricao,
+            valor_aditivo, nova_vigencia_final, data_registro
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)""",
+    "logs": "INSERT INTO logs (usuario, acao, data_hora) VALUES (?, ?, ?)",
+}
+
+
+def _inserir(conn, tabela, linhas):
+    """Insere as linhas em lotes e retorna a quantidade inserida"""
+    total = 0
+    linhas = iter(linhas)
+    while True:
+        lote = list(itertools.islice(linhas, TAMANHO_LOTE))
+        if not lote:
+            return total
+        conn.executemany(SQL_INSERCAO[tabela], lote)
+        total += len(lote)
+
+
+def gerar_banco(caminho, linhas, semente=42, progresso=print):
+    """Cria um banco novo em `caminho` com dados sintéticos
+
+    Args:
+        caminho: arquivo do banco a criar (não pode existir)
+        linhas: total aproximado de linhas, distribuído conforme PROPORCOES
+        semente: semente do gerador pseudoaleatório
+        progresso: função chamada com mensagens de andamento (ou None)
+
+    Returns:
+        dict: {tabela: linhas inseridas}
+    """
+    if not LINHAS_MINIMO <= linhas <= LINHAS_MAXIMO:
+        raise ValueError(f"A quantidade de linhas deve estar entre {LINHAS_MINIMO} e {LINHAS_MAXIMO}.")
+    if os.path.basename(caminho) == "contrato.db":
+        raise ValueError("O banco de produção não pode ser usado como destino.")
+    if os.path.exists(caminho):
+        raise FileExistsError(f"O banco {caminho} já existe.")
+
+    avisar = progresso or (lambda mensagem: None)
+    quantidades = distribuir_linhas(linhas)
+    rng = random.Random(semente)
+
+    caminho_anterior = db_manager.DB_PATH
+    db_manager.DB_PATH = caminho
+    try:
+        db_manager.init_db()
+        conn = db_manager.get_connection()
+    finally:
+        db_manager.DB_PATH = caminho_anterior
+
+    # Banco descartável: sem journal e sem fsync durante a carga
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    # Os gatilhos de contador disparariam uma vez por linha; são recriados ao final
+    gatilhos = [linha[0] for linha in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'trg_contador_%'")]
+    for gatilho in gatilhos:
+        conn.execute(f"DROP TRIGGER {gatilho}")
+
+    caminhos_custeio = list(_gerar_hierarquia_custeio(random.Random(semente), min(quantidades["custeio"], 5000)))
+    fornecedores = [f"Fornecedor {rng.choice(NOMES)} {i}" for i in range(1, 201)]
+    titulos = [f"Encontro de {tema}" for tema in TEMAS]
+
+    geradores = {
+        "demanda": lambda n: _linhas_demanda(rng, n),
+        "fornecedores": lambda n: _linhas_fornecedores(rng, n),
+        "titulo_eventos": lambda n: _linhas_titulo_eventos(rng, n),
+        "custeio": lambda n: _linhas_custeio(random.Random(semente), n),
+        "carta_acordo": lambda n: _linhas_carta_acordo(rng, n, quantidades["demanda"], caminhos_custeio),
+        "eventos": lambda n: _linhas_eventos(rng, n, quantidades["demanda"], caminhos_custeio,
+                                             fornecedores, titulos),
+        "produtos_servicos": lambda n: _linhas_produtos_servicos(rng, n, quantidades["demanda"],
+                                                                 caminhos_custeio, fornecedores),
+        "aditivos": lambda n: _linhas_aditivos(rng, n, quantidades),
+        "logs": lambda n: _linhas_logs(rng, n),
+    }
+
+    inseridas = {}
+    try:
+        for tabela, quantidade in quantidades.items():
+            inicio = time.perf_counter()
+            conn.execute("BEGIN")
+            inseridas[tabela] = _inserir(conn, tabela, geradores[tabela](quantidade))
+            conn.commit()
+            avisar(f"  {tabela:<20} {inseridas[tabela]:>10} linhas  {time.perf_counter() - inicio:8.2f}s")
+
+        db_manager.criar_contadores_alteracao(conn.cursor())
+        conn.executemany(
+            "INSERT OR REPLACE INTO contador_alteracoes (tabela, versao) VALUES (?, 1)",
+            [(tabela,) for tabela in inseridas if tabela in db_manager.TABELAS_MONITORADAS]
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    return inseridas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de dados sintéticos para benchmarks")
+    parser.add_argument("--linhas", type=int, default=10_000,
+                        help=f"total de linhas ({LINHAS_MINIMO} a {LINHAS_MAXIMO})")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--banco", default="dados_sinteticos.db")
+    parser.add_argument("--substituir", action="store_true", help="apaga o banco de destino se existir")
+    args = parser.parse_args()
+
+    if args.substituir and os.path.exists(args.banco):
+        os.remove(args.banco)
+
+    print(f"Gerando {args.linhas} linhas em {args.banco} (semente {args.semente})")
+    inicio = time.perf_counter()
+    try:
+        inseridas = gerar_banco(args.banco, args.linhas, args.semente)
+    except (ValueError, FileExistsError) as e:
+        print(e)
+        return 1
+    print(f"Total: {sum(inseridas.values())} linhas em {time.perf_counter() - inicio:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
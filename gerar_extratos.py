@@ -0,0 +1,64 @@
+"""
+Geração em lote dos extratos de contratos (controllers/extrato_controller.py).
+
+Gera um extrato HTML e/ou CSV por contrato, com valor base, aditivos e total
+acumulado, alterações de vigência e a demanda vinculada. Os extratos são
+gravados em paralelo; os que não mudaram desde a última execução são pulados
+(manifesto <pasta>/extratos.json), de modo que uma execução interrompida pode
+ser repetida e continua de onde parou.
+
+Uso:
+    python gerar_extratos.py [--pasta extratos] [--formatos html,csv] [--processos 4]
+    python gerar_extratos.py --tipo carta_acordo --ate 31/12/2024
+    python gerar_extratos.py --demanda 123 --forcar
+
+Opção global: --banco contrato.db
+"""
+import argparse
+import os
+import sys
+
+import models.db_manager as db_manager
+from controllers.extrato_controller import gerar_extratos, FORMATOS
+from models.demanda_360_model import TIPOS_CONTRATO
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extratos de contratos em lote")
+    parser.add_argument("--banco", help="banco SQLite (padrão: contrato.db)")
+    parser.add_argument("--pasta", default="extratos", help="pasta de destino")
+    parser.add_argument("--formatos", default=",".join(FORMATOS), help="html e/ou csv, separados por vírgula")
+    parser.add_argument("--processos", type=int, help="processos em paralelo (padrão: núcleos da máquina)")
+    parser.add_argument("--tipo", action="append", choices=list(TIPOS_CONTRATO),
+                        help="tipo de contrato (pode repetir; padrão: todos)")
+    parser.add_argument("--demanda", type=int, help="apenas os contratos desta demanda")
+    parser.add_argument("--ate", help="data de corte dos aditivos (dd/mm/aaaa)")
+    parser.add_argument("--forcar", action="store_true", help="regera todos os extratos")
+    args = parser.parse_args()
+
+    if args.banco:
+        if not os.path.exists(args.banco):
+            print(f"Banco não encontrado: {args.banco}")
+            return 1
+        db_manager.DB_PATH = args.banco
+    db_manager.init_db()
+
+    def progresso(concluidos, total):
+        print(f"\r  {concluidos}/{total} extratos", end="", flush=True)
+
+    try:
+        resultado = gerar_extratos(args.pasta, args.formatos.split(","), args.processos, args.tipo, args.demanda,
+                                   args.ate, args.forcar, progresso)
+    except ValueError as e:
+        print(e)
+        return 1
+    print()
+    print(f"{resultado['total']} contratos: {resultado['gerados']} extratos gerados, "
+          f"{resultado['ignorados']} já atualizados, {resultado['falhas']} falhas "
+          f"em {resultado['duracao_s']:.1f} s")
+    print(f"Pasta: {os.path.abspath(args.pasta)}")
+    return 1 if resultado["falhas"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Instantâneo colunar para relatórios (models/instantaneo_colunar.py).
+
+Grava ou atualiza a cópia colunar (vetores NumPy em <banco>_analitico/) e
+executa agrupamentos sobre ela, comparando com o mesmo GROUP BY no SQLite.
+A aplicação atualiza o instantâneo sozinha na primeira agregação; este script
+serve para a carga inicial de bancos grandes e para conferir os resultados.
+
+Uso:
+    python instantaneo_analitico.py atualizar [--completo]
+    python instantaneo_analitico.py agrupar eventos instituicao --somar valor_estimado,total_contrato
+    python instantaneo_analitico.py agrupar aditivos tipo_contrato,tipo_aditivo --somar valor_aditivo --comparar
+
+Opção global: --banco contrato.db
+"""
+import argparse
+import os
+import sys
+import time
+
+import models.db_manager as db_manager
+from models import instantaneo_colunar
+
+
+def atualizar(args):
+    instantaneo = instantaneo_colunar.InstantaneoColunar()
+    instantaneo.abrir()
+    resultado = instantaneo.atualizar(completo=args.completo)
+    print(f"Atualização {resultado['modo']} em {resultado['duracao_ms']:.0f} ms "
+          f"(seq {resultado['ultimo_seq']}, {resultado['alteracoes']} registros alterados)")
+    for tabela in instantaneo_colunar.COLUNAS_ANALITICAS:
+        situacao = "regravada" if tabela in resultado["tabelas"] else "sem alterações"
+        print(f"  {tabela}: {instantaneo.tabela(tabela).linhas} linhas, {situacao}")
+    print(f"Pasta: {instantaneo.pasta}")
+    return 0
+
+
+def agrupar(args):
+    por = args.por.split(",")
+    somar = args.somar.split(",") if args.somar else []
+    instantaneo = instantaneo_colunar.InstantaneoColunar()
+    if not instantaneo.abrir() or instantaneo.desatualizado():
+        instantaneo.atualizar()
+
+    inicio = time.perf_counter()
+    linhas = instantaneo.agrupar(args.tabela, por, somar)
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    for linha in linhas:
+        print("  ".join(f"{chave}={valor:.2f}" if isinstance(valor, float) else f"{chave}={valor}"
+                        for chave, valor in linha.items()))
+    total = instantaneo.tabela(args.tabela).linhas
+    print(f"\n{len(linhas)} grupos, {total} linhas em {duracao_ms:.1f} ms (instantâneo colunar)")
+
+    if args.comparar:
+        inicio = time.perf_counter()
+        esperado = instantaneo_colunar.agrupar_sql(args.tabela, por, somar)
+        duracao_sql_ms = (time.perf_counter() - inicio) * 1000
+        iguais = len(esperado) == len(linhas) and all(
+            all(abs(a[chave] - b[chave]) <= 0.005 if isinstance(b[chave], float) else a[chave] == b[chave]
+                for chave in b)
+            for a, b in zip(linhas, esperado)
+        )
+        print(f"GROUP BY no SQLite: {duracao_sql_ms:.1f} ms, resultado {'igual' if iguais else 'DIFERENTE'}")
+        if not iguais:
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Instantâneo colunar para relatórios")
+    parser.add_argument("--banco", help="banco SQLite (padrão: contrato.db)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    parser_atualizar = comandos.add_parser("atualizar", help="grava ou atualiza o instantâneo")
+    parser_atualizar.add_argument("--completo", action="store_true",
+                                  help="relê todas as tabelas em vez de aplicar apenas as alterações")
+
+    parser_agrupar = comandos.add_parser("agrupar", help="quantidade e somas por categoria")
+    parser_agrupar.add_argument("tabela", choices=list(instantaneo_colunar.COLUNAS_ANALITICAS))
+    parser_agrupar.add_argument("por", help="colunas categóricas, separadas por vírgula")
+    parser_agrupar.add_argument("--somar", help="colunas numéricas, separadas por vírgula")
+    parser_agrupar.add_argument("--comparar", action="store_true",
+                                help="executa também o GROUP BY no SQLite e compara")
+
+    args = parser.parse_args()
+    if not instantaneo_colunar.disponivel():
+        print("NumPy não está instalado: o instantâneo colunar não está disponível (pip install numpy)")
+        return 1
+    if args.banco:
+        if not os.path.exists(args.banco):
+            print(f"Banco não encontrado: {args.banco}")
+            return 1
+        db_manager.DB_PATH = args.banco
+    db_manager.init_db()
+    try:
+        return {"atualizar": atualizar, "agrupar": agrupar}[args.comando](args)
+    except ValueError as e:
+        print(e)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,21 @@
-# main.py
+import time
+_INICIO = time.perf_counter()
+
+import os
 import tkinter as tk
-from models.db_manager import init_db
+from utils.desempenho import Cronometro
+
+# Cronômetro da inicialização (relatório exibido com SISPROJ_TEMPOS=1)
+cronometro = Cronometro("Inicialização", inicio=_INICIO)
+
+# As telas do sistema (dashboard, formulários) só são importadas após o login
+from models.db_manager import init_db, podar_log_alteracoes
+from models.fila_escrita import ativar_fila_escrita, desativar_fila_escrita
 from views.login_view import LoginView
-from controllers.auth_controller import login
-from views.dashboard_view import DashboardView
+import controllers.auth_controller as auth_controller
 from utils.ui_utils import mostrar_mensagem, Estilos, Cores
+from utils.perfilador import ativar_pelo_ambiente
+cronometro.registrar("importações", _INICIO)
 
 def on_login_success():
     """Callback quando o login é bem-sucedido"""
@@ -17,37 +28,75 @@ def on_login_failure():
 
 def main_app():
     """Inicia a aplicação principal após o login"""
-    app = tk.Tk()
-    app.title("SISPROJ - PESSOA JURÍDICA")
-    app.state('zoomed')  # Maximiza a janela no Windows
+    cronometro_app = Cronometro("Abertura do dashboard")
+    
+    with cronometro_app.fase("importar dashboard"):
+        from views.dashboard_view import DashboardView
+        from utils.sincronizacao import MonitorAlteracoes
+    
+    with cronometro_app.fase("criar janela"):
+        app = tk.Tk()
+        app.title("SISPROJ - PESSOA JURÍDICA")
+        app.state('zoomed')  # Maximiza a janela no Windows
+        
+        # Define tema para a aplicação
+        app.configure(background=Cores.BACKGROUND_CLARO)
+        Estilos.configurar()
     
-    # Define tema para a aplicação
-    app.configure(background=Cores.BACKGROUND_CLARO)
-    Estilos.configurar()
+    # Carrega o dashboard (os dados são carregados após a primeira pintura)
+    with cronometro_app.fase("construir dashboard"):
+        DashboardView(app)
     
-    # Carrega o dashboard
-    DashboardView(app)
+    # Alterações gravadas por outras instâncias no mesmo banco chegam às telas abertas
+    MonitorAlteracoes(app).iniciar()
     
+    def primeira_pintura():
+        cronometro_app.registrar("até a primeira pintura", cronometro_app.inicio)
+        cronometro_app.exibir_se_habilitado()
+    
+    app.after_idle(primeira_pintura)
     app.mainloop()
 
 if __name__ == "__main__":
-    # Inicializa o banco de dados
-    init_db()
+    # Perfil de controllers/models e log de consultas lentas (SISPROJ_PERFIL)
+    ativar_pelo_ambiente()
     
-    # Inicia a tela de login
-    root = tk.Tk()
-    root.configure(background=Cores.BACKGROUND_CLARO)
-    Estilos.configurar()
+    # Modo cliente: os controllers chamam o serviço (servidor_api.py) em vez do banco local
+    servidor = os.environ.get("SISPROJ_SERVIDOR")
+    if servidor:
+        from utils.cliente_api import ativar_cliente
+        ativar_cliente(servidor)
+    else:
+        # Inicializa o banco de dados (só executa migrações pendentes)
+        with cronometro.fase("init_db"):
+            init_db()
+            podar_log_alteracoes()
+        # Todas as gravações passam pela thread escritora (commit em grupo)
+        ativar_fila_escrita()
     
-    LoginView(root, lambda u, p: login(u, p, on_login_success, on_login_failure))
+    # Inicia a tela de login
+    with cronometro.fase("janela de login"):
+        root = tk.Tk()
+        root.configure(background=Cores.BACKGROUND_CLARO)
+        Estilos.configurar()
+        
+        LoginView(root, lambda u, p: auth_controller.login(u, p, on_login_success, on_login_failure))
+        
+        # Centraliza a janela de login
+        window_width = 400
+        window_height = 450
+        screen_width = root.winfo_screenwidth()
+        screen_height = root.winfo_screenheight()
+        x_cordinate = int((screen_width/2) - (window_width/2))
+        y_cordinate = int((screen_height/2) - (window_height/2))
+        root.geometry(f"{window_width}x{window_height}+{x_cordinate}+{y_cordinate}")
     
-    # Centraliza a janela de login
-    window_width = 400
-    window_height = 450
-    screen_width = root.winfo_screenwidth()
-    screen_height = root.winfo_screenheight()
-    x_cordinate = int((screen_width/2) - (window_width/2))
-    y_cordinate = int((screen_height/2) - (window_height/2))
-    root.geometry(f"{window_width}x{window_height}+{x_cordinate}+{y_cordinate}")
+    def login_exibido():
+        cronometro.registrar("até a primeira pintura", cronometro.inicio)
+        cronometro.exibir_se_habilitado()
     
+    root.after_idle(login_exibido)
     root.mainloop()
+    
+    # Confirma as gravações ainda na fila (p.ex. registros de log) antes de sair
+    desativar_fila_escrita()
@@ -1,20 +1,20 @@
 # models/aditivos_model.py
-from .db_manager import get_connection
+from .db_manager import get_connection, executar_escrita
 
 def create_aditivo(**kwargs):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO aditivos (
-            id_contrato, tipo_contrato, tipo_aditivo, descricao,
-            valor_aditivo, nova_vigencia_final, data_registro
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        kwargs['id_contrato'], kwargs['tipo_contrato'], kwargs['tipo_aditivo'], kwargs['descricao'],
-        kwargs['valor_aditivo'], kwargs['nova_vigencia_final'], kwargs['data_registro']
-    ))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO aditivos (
+                id_contrato, tipo_contrato, tipo_aditivo, descricao,
+                valor_aditivo, nova_vigencia_final, data_registro
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            kwargs['id_contrato'], kwargs['tipo_contrato'], kwargs['tipo_aditivo'], kwargs['descricao'],
+            kwargs['valor_aditivo'], kwargs['nova_vigencia_final'], kwargs['data_registro']
+        ))
+        return cursor.lastrowid
+    return executar_escrita(gravar)
 
 def get_all_aditivos():
     conn = get_connection()
@@ -25,23 +25,135 @@ def get_all_aditivos():
     return rows
 
 def update_aditivo(id_aditivo, **kwargs):
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE aditivos SET
+                id_contrato=?, tipo_contrato=?, tipo_aditivo=?, descricao=?,
+                valor_aditivo=?, nova_vigencia_final=?, data_registro=?
+            WHERE id=?
+        """, (
+            kwargs['id_contrato'], kwargs['tipo_contrato'], kwargs['tipo_aditivo'], kwargs['descricao'],
+            kwargs['valor_aditivo'], kwargs['nova_vigencia_final'], kwargs['data_registro'], id_aditivo
+        ))
+    executar_escrita(gravar)
+
+def delete_aditivo(id_aditivo):
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM aditivos WHERE id=?", (id_aditivo,))
+    executar_escrita(gravar)
+
+def get_aditivo(id_aditivo):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM aditivos WHERE id=?", (id_aditivo,))
+    row = cursor.fetchone()
+    conn.close()
+    return row
+
+def get_aditivos_by_contrato(id_contrato, tipo_contrato):
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM aditivos WHERE tipo_contrato=? AND id_contrato=? ORDER BY id",
+                   (tipo_contrato, id_contrato))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+def is_ultimo_aditivo(id_aditivo):
+    """Indica se o aditivo é o último (maior id) do seu contrato, ou None se não existir
+
+    A subconsulta MAX(id) é resolvida por uma única busca no índice
+    idx_aditivos_contrato (tipo_contrato, id_contrato, id), sem depender da
+    quantidade de aditivos do contrato.
+    """
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        UPDATE aditivos SET
-            id_contrato=?, tipo_contrato=?, tipo_aditivo=?, descricao=?,
-            valor_aditivo=?, nova_vigencia_final=?, data_registro=?
-        WHERE id=?
-    """, (
-        kwargs['id_contrato'], kwargs['tipo_contrato'], kwargs['tipo_aditivo'], kwargs['descricao'],
-        kwargs['valor_aditivo'], kwargs['nova_vigencia_final'], kwargs['data_registro'], id_aditivo
-    ))
-    conn.commit()
+        SELECT a.id = (SELECT MAX(b.id) FROM aditivos b
+                       WHERE b.tipo_contrato = a.tipo_contrato AND b.id_contrato = a.id_contrato)
+        FROM aditivos a WHERE a.id=?
+    """, (id_aditivo,))
+    row = cursor.fetchone()
     conn.close()
+    return None if row is None else bool(row[0])
+
+# Tabela de origem de cada tipo de contrato (todas têm a coluna valor_estimado)
+TABELAS_CONTRATO = {
+    "carta_acordo": "carta_acordo",
+    "eventos": "eventos",
+    "produtos_servicos": "produtos_servicos",
+}
+
+# Quantidade de contratos por consulta IN (...), abaixo do limite de parâmetros do SQLite
+TAMANHO_LOTE_HISTORICO = 500
+
+_SQL_HISTORICO = """
+    WITH historico AS (
+        SELECT a.id, a.id_contrato, a.tipo_aditivo, a.descricao, a.valor_aditivo,
+               a.nova_vigencia_final, a.data_registro,
+               ROW_NUMBER() OVER contrato AS sequencia,
+               SUM(COALESCE(a.valor_aditivo, 0)) OVER contrato AS valor_acumulado,
+               COUNT(NULLIF(a.nova_vigencia_final, '')) OVER contrato AS grupo_vigencia,
+               COUNT(*) OVER (PARTITION BY a.id_contrato) AS quantidade
+        FROM aditivos a
+        WHERE a.tipo_contrato = ? AND a.id_contrato IN ({marcadores})
+        WINDOW contrato AS (PARTITION BY a.id_contrato ORDER BY a.id)
+    )
+    SELECT h.id, h.id_contrato, h.sequencia, h.tipo_aditivo, h.descricao, h.valor_aditivo,
+           h.nova_vigencia_final, h.data_registro, h.valor_acumulado,
+           COALESCE(c.valor_estimado, 0) AS valor_estimado,
+           COALESCE(c.valor_estimado, 0) + h.valor_acumulado AS valor_total_atualizado,
+           MAX(NULLIF(h.nova_vigencia_final, '')) OVER (
+               PARTITION BY h.id_contrato, h.grupo_vigencia
+           ) AS vigencia_atual,
+           h.sequencia = h.quantidade AS ultimo
+    FROM historico h
+    LEFT JOIN {tabela} c ON c.id = h.id_contrato
+    ORDER BY h.id_contrato, h.id
+"""
+
+_COLUNAS_HISTORICO = ("id", "id_contrato", "sequencia", "tipo_aditivo", "descricao", "valor_aditivo",
+                      "nova_vigencia_final", "data_registro", "valor_acumulado", "valor_estimado",
+                      "valor_total_atualizado", "vigencia_atual", "ultimo")
+
+def get_aditivo_history(tipo_contrato, ids_contrato):
+    """Histórico dos aditivos de vários contratos de um mesmo tipo
+
+    Numeração, valor acumulado, vigência em vigor e marcação do último aditivo
+    são calculados pelo SQLite com funções de janela (PARTITION BY contrato
+    ORDER BY id), em uma consulta por lote de contratos. A vigência em vigor é
+    a nova_vigencia_final do aditivo mais recente que a informou até aquela
+    linha (None enquanto nenhum aditivo alterou a vigência).
+
+    Args:
+        tipo_contrato: carta_acordo, eventos ou produtos_servicos
+        ids_contrato: IDs dos contratos
+
+    Returns:
+        dict: {id_contrato: [aditivo, ...]} em ordem de cadastro; cada aditivo é um
+              dict com as colunas de _COLUNAS_HISTORICO. Contratos sem aditivos
+              ficam com lista vazia.
+    """
+    tabela = TABELAS_CONTRATO.get(tipo_contrato)
+    if tabela is None:
+        raise ValueError(f"Tipo de contrato inválido: {tipo_contrato}")
+
+    ids = list(dict.fromkeys(int(id_contrato) for id_contrato in ids_contrato))
+    historico = {id_contrato: [] for id_contrato in ids}
+    if not ids:
+        return historico
 
-def delete_aditivo(id_aditivo):
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM aditivos WHERE id=?", (id_aditivo,))
-    conn.commit()
+    for inicio in range(0, len(ids), TAMANHO_LOTE_HISTORICO):
+        lote = ids[inicio:inicio + TAMANHO_LOTE_HISTORICO]
+        sql = _SQL_HISTORICO.format(marcadores=",".join("?" for _ in lote), tabela=tabela)
+        cursor.execute(sql, [tipo_contrato] + lote)
+        for row in cursor.fetchall():
+            aditivo = dict(zip(_COLUNAS_HISTORICO, row))
+            aditivo["ultimo"] = bool(aditivo["ultimo"])
+            historico[aditivo["id_contrato"]].append(aditivo)
     conn.close()
+    return historico
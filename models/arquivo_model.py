@@ -0,0 +1,387 @@
+# models/arquivo_model.py
+"""Arquivamento dos contratos encerrados em um banco de arquivo anexado
+
+Contratos com a vigência encerrada há anos continuam em carta_acordo,
+produtos_servicos e eventos, junto com os seus aditivos e registros em
+contratos, e pesam em toda varredura e índice. O arquivamento move esses
+contratos (e os registros de logs antigos) para contrato_arquivo.db, anexado com ATTACH, em lotes: cada
+lote é copiado e excluído do banco principal na mesma transação.
+
+As listagens e o dashboard continuam consultando apenas as tabelas do banco
+principal. O histórico completo fica disponível sob demanda em
+abrir_historico(), que cria visões temporárias historico_<tabela> unindo
+(UNION ALL) as tabelas principais e as arquivadas.
+
+Os ids são preservados no arquivo; como as tabelas usam AUTOINCREMENT, um id
+arquivado não é reutilizado no banco principal.
+"""
+import os
+import re
+import sqlite3
+from datetime import date
+
+from . import db_manager
+
+ESQUEMA_ARQUIVO = "arquivo"
+
+# Contratos arquivados, com a coluna que indica o encerramento
+CONTRATOS_ARQUIVADOS = ("carta_acordo", "produtos_servicos", "eventos")
+
+# aditivos e contratos (número e assinatura) acompanham o contrato arquivado
+TABELAS_ARQUIVADAS = CONTRATOS_ARQUIVADOS + ("aditivos", "contratos", "logs")
+
+# Colunas pesquisadas por texto no histórico
+COLUNAS_BUSCA = {
+    "carta_acordo": ("contrato", "instituicao", "instituicao_2", "titulo_projeto"),
+    "produtos_servicos": ("fornecedor", "objetivo", "instituicao"),
+    "eventos": ("titulo_evento", "fornecedor", "instituicao"),
+    "aditivos": ("tipo_aditivo", "descricao"),
+    "contratos": ("numero_contrato", "observacoes"),
+    "logs": ("usuario", "acao"),
+}
+
+TAMANHO_LOTE = 200
+
+# Restrições de chave estrangeira na definição das tabelas principais. No
+# arquivo, a tabela referenciada (demanda) não existe e, com PRAGMA
+# foreign_keys ligado, toda inclusão falharia ("no such table: arquivo.demanda")
+_REFERENCIAS = re.compile(
+    r",\s*FOREIGN\s+KEY\s*\([^)]*\)\s*REFERENCES\s+\w+\s*(\([^)]*\))?"
+    r"|\s+REFERENCES\s+\w+\s*(\([^)]*\))?",
+    re.IGNORECASE,
+)
+_ACOES_REFERENCIA = re.compile(
+    r"\s+ON\s+(DELETE|UPDATE)\s+(SET\s+NULL|SET\s+DEFAULT|CASCADE|RESTRICT|NO\s+ACTION)",
+    re.IGNORECASE,
+)
+
+
+def _sem_referencias(definicao):
+    """Definição da tabela sem as cláusulas FOREIGN KEY / REFERENCES"""
+    return _REFERENCIAS.sub("", _ACOES_REFERENCIA.sub("", definicao))
+
+
+def caminho_arquivo():
+    """Banco de arquivo ao lado do banco principal (contrato.db -> contrato_arquivo.db)"""
+    base, _ = os.path.splitext(db_manager.DB_PATH)
+    return base + "_arquivo.db"
+
+
+def _data_iso(coluna):
+    """Expressão SQL que converte uma data DD/MM/AAAA em AAAA-MM-DD, comparável como texto"""
+    return f"(substr({coluna}, 7, 4) || '-' || substr({coluna}, 4, 2) || '-' || substr({coluna}, 1, 2))"
+
+
+def _data_completa(coluna):
+    return f"{coluna} LIKE '__/__/____'"
+
+
+def _colunas(cursor, esquema, tabela):
+    cursor.execute(f"PRAGMA {esquema}.table_info({tabela})")
+    return [(linha[1], linha[2]) for linha in cursor.fetchall()]
+
+
+def _anexar(conn, caminho):
+    conn.execute(f"ATTACH DATABASE ? AS {ESQUEMA_ARQUIVO}", (caminho,))
+
+
+def _preparar_arquivo(cursor):
+    """Cria no arquivo as tabelas que faltam, com a definição das principais sem as chaves estrangeiras
+
+    Colunas acrescentadas depois ao banco principal são adicionadas também
+    ao arquivo, para que a cópia por nome de coluna não perca dados. Tabelas
+    de arquivos criados antes da migração 8, com as cláusulas REFERENCES,
+    são recriadas sem elas.
+    """
+    for tabela in TABELAS_ARQUIVADAS:
+        cursor.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (tabela,))
+        definicao = cursor.fetchone()[0]
+        definicao = _sem_referencias(re.sub(r'^CREATE TABLE\s+(IF NOT EXISTS\s+)?"?\w+"?',
+                                            f"CREATE TABLE IF NOT EXISTS {ESQUEMA_ARQUIVO}.{tabela}",
+                                            definicao))
+
+        cursor.execute(f"SELECT sql FROM {ESQUEMA_ARQUIVO}.sqlite_master WHERE type = 'table' AND name = ?",
+                       (tabela,))
+        existente = cursor.fetchone()
+        if existente and _REFERENCIAS.search(existente[0]):
+            colunas = ", ".join(nome for nome, _ in _colunas(cursor, ESQUEMA_ARQUIVO, tabela))
+            cursor.execute(f"ALTER TABLE {ESQUEMA_ARQUIVO}.{tabela} RENAME TO {tabela}_anterior")
+            cursor.execute(_sem_referencias(re.sub(
+                r'^CREATE TABLE\s+(IF NOT EXISTS\s+)?"?\w+"?',
+                f"CREATE TABLE {ESQUEMA_ARQUIVO}.{tabela}", existente[0])))
+            cursor.execute(f"INSERT INTO {ESQUEMA_ARQUIVO}.{tabela} ({colunas}) "
+                           f"SELECT {colunas} FROM {ESQUEMA_ARQUIVO}.{tabela}_anterior")
+            cursor.execute(f"DROP TABLE {ESQUEMA_ARQUIVO}.{tabela}_anterior")
+        cursor.execute(definicao)
+
+        existentes = {nome for nome, _ in _colunas(cursor, ESQUEMA_ARQUIVO, tabela)}
+        for nome, tipo in _colunas(cursor, "main", tabela):
+            if nome not in existentes:
+                cursor.execute(f"ALTER TABLE {ESQUEMA_ARQUIVO}.{tabela} ADD COLUMN {nome} {tipo}")
+
+    for tabela in CONTRATOS_ARQUIVADOS:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {ESQUEMA_ARQUIVO}.idx_{tabela}_demanda "
+                       f"ON {tabela}(codigo_demanda)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {ESQUEMA_ARQUIVO}.idx_aditivos_contrato "
+                   f"ON aditivos(tipo_contrato, id_contrato)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {ESQUEMA_ARQUIVO}.idx_contratos_referencia "
+                   f"ON contratos(tipo_contrato, id_referencia)")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {ESQUEMA_ARQUIVO}.idx_logs_data ON logs(data_hora)")
+
+
+def _consulta_encerrados(tabela):
+    """SELECT dos ids de contratos encerrados antes de :limite, paginado por id
+
+    Cartas e produtos/serviços se encerram em vigencia_final; eventos não têm
+    vigência e são considerados pela data de entrada da demanda. Em todos os
+    casos, um aditivo posterior ao limite (nova vigência ou registro) mantém
+    o contrato no banco principal.
+    """
+    aditivo_recente = f"""
+        NOT EXISTS (
+            SELECT 1 FROM main.aditivos a
+            WHERE a.tipo_contrato = '{tabela}' AND a.id_contrato = c.id
+              AND ((nullif(a.nova_vigencia_final, '') IS NOT NULL
+                    AND NOT ({_data_completa('a.nova_vigencia_final')}
+                             AND {_data_iso('a.nova_vigencia_final')} < :limite))
+                   OR ({_data_completa('a.data_registro')} AND {_data_iso('a.data_registro')} >= :limite))
+        )"""
+    if tabela == "eventos":
+        return f"""
+        SELECT c.id FROM main.eventos c
+        JOIN main.demanda d ON d.codigo = c.codigo_demanda
+        WHERE c.id > :ultimo
+          AND {_data_completa('d.data_entrada')} AND {_data_iso('d.data_entrada')} < :limite
+          AND {aditivo_recente}
+        ORDER BY c.id LIMIT :lote
+        """
+    return f"""
+    SELECT c.id FROM main.{tabela} c
+    WHERE c.id > :ultimo
+      AND {_data_completa('c.vigencia_final')} AND {_data_iso('c.vigencia_final')} < :limite
+      AND {aditivo_recente}
+    ORDER BY c.id LIMIT :lote
+    """
+
+
+def _copiar(cursor, tabela, filtro, parametros):
+    """Copia para o arquivo as linhas de main.<tabela> que atendem ao filtro"""
+    colunas = ", ".join(nome for nome, _ in _colunas(cursor, "main", tabela))
+    cursor.execute(f"INSERT OR REPLACE INTO {ESQUEMA_ARQUIVO}.{tabela} ({colunas}) "
+                   f"SELECT {colunas} FROM main.{tabela} WHERE {filtro}", parametros)
+    return cursor.rowcount
+
+
+def _mover_contratos(cursor, tabela, ids, possui_exclusoes):
+    """Move um lote de contratos, os seus aditivos e registros em contratos
+
+    Os filhos são copiados e excluídos antes do contrato: a exclusão do
+    contrato excluiria em cascata (trg_cascata_<tabela>) o que ainda não
+    tivesse sido copiado.
+
+    Returns:
+        tuple: (contratos, aditivos, registros em contratos)
+    """
+    marcadores = ",".join("?" for _ in ids)
+    filtro_aditivos = f"tipo_contrato = ? AND id_contrato IN ({marcadores})"
+    filtro_registros = f"tipo_contrato = ? AND id_referencia IN ({marcadores})"
+    parametros_filhos = [tabela] + ids
+
+    _copiar(cursor, tabela, f"id IN ({marcadores})", ids)
+    aditivos = _copiar(cursor, "aditivos", filtro_aditivos, parametros_filhos)
+    registros = _copiar(cursor, "contratos", filtro_registros, parametros_filhos)
+
+    cursor.execute(f"DELETE FROM main.aditivos WHERE {filtro_aditivos}", parametros_filhos)
+    cursor.execute(f"DELETE FROM main.contratos WHERE {filtro_registros}", parametros_filhos)
+    cursor.execute(f"DELETE FROM main.{tabela} WHERE id IN ({marcadores})", ids)
+
+    if possui_exclusoes:
+        # Arquivar não é excluir: os gatilhos registraram as linhas em
+        # registros_excluidos, o que replicaria a exclusão para outros escritórios
+        for origem, filtro, parametros in ((tabela, f"id IN ({marcadores})", ids),
+                                           ("aditivos", filtro_aditivos, parametros_filhos)):
+            cursor.execute(
+                f"DELETE FROM main.registros_excluidos WHERE uuid IN "
+                f"(SELECT uuid FROM {ESQUEMA_ARQUIVO}.{origem} WHERE {filtro})", parametros)
+    return len(ids), aditivos, registros
+
+
+def arquivar_contratos_encerrados(anos=5, referencia=None, tamanho_lote=TAMANHO_LOTE, caminho=None):
+    """Move para o banco de arquivo os contratos encerrados há mais de `anos` anos
+
+    Cada lote de até `tamanho_lote` contratos (com os aditivos) é copiado e
+    excluído em uma única transação, de modo que uma interrupção nunca deixa
+    um contrato nos dois bancos ou em nenhum. Os registros de logs anteriores
+    ao limite também são movidos.
+
+    Args:
+        anos: anos desde o fim da vigência para considerar o contrato encerrado
+        referencia: data (date) a partir da qual contar os anos (padrão: hoje)
+        tamanho_lote: contratos por transação
+        caminho: banco de arquivo (padrão: caminho_arquivo())
+
+    Returns:
+        dict: contratos movidos por tabela, aditivos, contratos (registros de
+              numero/assinatura), logs e o limite usado
+    """
+    referencia = referencia or date.today()
+    try:
+        limite = referencia.replace(year=referencia.year - anos)
+    except ValueError:  # 29/02
+        limite = referencia.replace(year=referencia.year - anos, day=28)
+    limite = limite.isoformat()
+
+    conn = db_manager.get_connection()
+    # Transações controladas explicitamente, lote a lote
+    conn.isolation_level = None
+    resumo = {tabela: 0 for tabela in CONTRATOS_ARQUIVADOS}
+    resumo.update(aditivos=0, contratos=0, logs=0, limite=limite)
+    try:
+        _anexar(conn, caminho or caminho_arquivo())
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        _preparar_arquivo(cursor)
+        cursor.execute("COMMIT")
+
+        cursor.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'registros_excluidos'")
+        possui_exclusoes = cursor.fetchone() is not None
+
+        for tabela in CONTRATOS_ARQUIVADOS:
+            consulta = _consulta_encerrados(tabela)
+            ultimo = 0
+            while True:
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    cursor.execute(consulta, {"ultimo": ultimo, "limite": limite, "lote": tamanho_lote})
+                    ids = [linha[0] for linha in cursor.fetchall()]
+                    if ids:
+                        contratos, aditivos, registros = _mover_contratos(cursor, tabela, ids,
+                                                                          possui_exclusoes)
+                        resumo[tabela] += contratos
+                        resumo["aditivos"] += aditivos
+                        resumo["contratos"] += registros
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+                if len(ids) < tamanho_lote:
+                    break
+                ultimo = ids[-1]
+
+        # data_hora é gravada por CURRENT_TIMESTAMP (AAAA-MM-DD HH:MM:SS)
+        ultimo = 0
+        while True:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("SELECT id FROM main.logs WHERE id > ? AND data_hora < ? ORDER BY id LIMIT ?",
+                               (ultimo, limite, tamanho_lote))
+                ids = [linha[0] for linha in cursor.fetchall()]
+                if ids:
+                    marcadores = ",".join("?" for _ in ids)
+                    resumo["logs"] += _copiar(cursor, "logs", f"id IN ({marcadores})", ids)
+                    cursor.execute(f"DELETE FROM main.logs WHERE id IN ({marcadores})", ids)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            if len(ids) < tamanho_lote:
+                break
+            ultimo = ids[-1]
+    finally:
+        conn.close()
+    return resumo
+
+
+def abrir_historico(caminho=None):
+    """Abre uma conexão com as visões historico_<tabela> (principal + arquivo)
+
+    As visões são temporárias (existem só nesta conexão), pois uma visão
+    permanente não pode referenciar um banco anexado. Cada visão tem as
+    colunas da tabela principal e a coluna `arquivado` (0 ou 1). Sem banco de
+    arquivo, as visões cobrem apenas as tabelas principais.
+    """
+    caminho = caminho or caminho_arquivo()
+    conn = db_manager.get_connection()
+    try:
+        cursor = conn.cursor()
+        anexado = os.path.exists(caminho)
+        if anexado:
+            _anexar(conn, caminho)
+        for tabela in TABELAS_ARQUIVADAS:
+            colunas = [nome for nome, _ in _colunas(cursor, "main", tabela)]
+            arquivadas = set()
+            if anexado:
+                arquivadas = {nome for nome, _ in _colunas(cursor, ESQUEMA_ARQUIVO, tabela)}
+            lista = ", ".join(colunas)
+            consulta = f"SELECT {lista}, 0 AS arquivado FROM main.{tabela}"
+            if arquivadas:
+                lista_arquivo = ", ".join(nome if nome in arquivadas else f"NULL AS {nome}" for nome in colunas)
+                consulta += f" UNION ALL SELECT {lista_arquivo}, 1 AS arquivado FROM {ESQUEMA_ARQUIVO}.{tabela}"
+            cursor.execute(f"DROP VIEW IF EXISTS temp.historico_{tabela}")
+            cursor.execute(f"CREATE TEMP VIEW historico_{tabela} AS {consulta}")
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def buscar_historico(tabela, codigo_demanda=None, texto=None, limite=500, caminho=None):
+    """Pesquisa contratos (ou logs) nas tabelas principais e no arquivo
+
+    Args:
+        tabela: carta_acordo, produtos_servicos, eventos, aditivos, contratos ou logs
+        codigo_demanda: filtra pela demanda (exceto aditivos e logs)
+        texto: trecho procurado nas colunas de COLUNAS_BUSCA
+        limite: máximo de linhas retornadas
+
+    Returns:
+        tuple: (nomes das colunas, linhas); a última coluna é `arquivado`
+    """
+    if tabela not in TABELAS_ARQUIVADAS:
+        raise ValueError(f"Tabela sem histórico: {tabela}")
+    condicoes, parametros = [], []
+    if codigo_demanda is not None and tabela in CONTRATOS_ARQUIVADOS:
+        condicoes.append("codigo_demanda = ?")
+        parametros.append(codigo_demanda)
+    if texto:
+        colunas = COLUNAS_BUSCA[tabela]
+        condicoes.append("(" + " OR ".join(f"{coluna} LIKE ?" for coluna in colunas) + ")")
+        parametros.extend([f"%{texto}%"] * len(colunas))
+    where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+    conn = abrir_historico(caminho)
+    try:
+        cursor = conn.execute(f"SELECT * FROM historico_{tabela}{where} ORDER BY id DESC LIMIT ?",
+                              parametros + [limite])
+        return [descricao[0] for descricao in cursor.description], cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def get_aditivos_historico(tipo_contrato, id_contrato, caminho=None):
+    """Aditivos de um contrato, estejam no banco principal ou no arquivo"""
+    conn = abrir_historico(caminho)
+    try:
+        return conn.execute(
+            "SELECT * FROM historico_aditivos WHERE tipo_contrato = ? AND id_contrato = ? ORDER BY id",
+            (tipo_contrato, id_contrato)).fetchall()
+    finally:
+        conn.close()
+
+
+def contar_arquivados(caminho=None):
+    """Quantidade de linhas arquivadas por tabela (vazio se não houver arquivo)"""
+    caminho = caminho or caminho_arquivo()
+    if not os.path.exists(caminho):
+        return {}
+    conn = sqlite3.connect(caminho)
+    try:
+        contagem = {}
+        for tabela in TABELAS_ARQUIVADAS:
+            try:
+                contagem[tabela] = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+            except sqlite3.OperationalError:
+                contagem[tabela] = 0
+        return contagem
+    finally:
+        conn.close()
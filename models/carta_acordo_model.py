@@ -1,5 +1,11 @@
 # models/carta_acordo_model.py
-from .db_manager import get_connection
+from .db_manager import get_connection, executar_escrita, atualizar_colunas
+
+COLUNAS_CARTA_ACORDO = (
+    'codigo_demanda', 'instituicao', 'instrumento', 'subprojeto', 'ta', 'pta', 'acao', 'resultado', 'meta',
+    'contrato', 'vigencia_inicial', 'vigencia_final', 'instituicao_2', 'cnpj', 'titulo_projeto', 'objetivo',
+    'valor_estimado', 'total_contrato', 'observacoes'
+)
 
 def create_carta_acordo(**kwargs):
     """
@@ -8,29 +14,25 @@ def create_carta_acordo(**kwargs):
     Returns:
         int: ID da carta acordo inserida
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO carta_acordo (
-            codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
-            contrato, vigencia_inicial, vigencia_final, instituicao_2, cnpj, titulo_projeto, objetivo,
-            valor_estimado, total_contrato, observacoes
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        kwargs['codigo_demanda'], kwargs['instituicao'], kwargs['instrumento'], kwargs['subprojeto'],
-        kwargs['ta'], kwargs['pta'], kwargs['acao'], kwargs['resultado'], kwargs['meta'], kwargs['contrato'],
-        kwargs['vigencia_inicial'], kwargs['vigencia_final'], kwargs['instituicao_2'], kwargs['cnpj'],
-        kwargs['titulo_projeto'], kwargs['objetivo'], kwargs['valor_estimado'], kwargs['total_contrato'],
-        kwargs['observacoes']
-    ))
-    
-    # Obter o ID da carta acordo inserida
-    carta_id = cursor.lastrowid
-    
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO carta_acordo (
+                codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
+                contrato, vigencia_inicial, vigencia_final, instituicao_2, cnpj, titulo_projeto, objetivo,
+                valor_estimado, total_contrato, observacoes
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            kwargs['codigo_demanda'], kwargs['instituicao'], kwargs['instrumento'], kwargs['subprojeto'],
+            kwargs['ta'], kwargs['pta'], kwargs['acao'], kwargs['resultado'], kwargs['meta'], kwargs['contrato'],
+            kwargs['vigencia_inicial'], kwargs['vigencia_final'], kwargs['instituicao_2'], kwargs['cnpj'],
+            kwargs['titulo_projeto'], kwargs['objetivo'], kwargs['valor_estimado'], kwargs['total_contrato'],
+            kwargs['observacoes']
+        ))
     
-    return carta_id
+        # Obter o ID da carta acordo inserida
+        return cursor.lastrowid
+    return executar_escrita(gravar)
 
 def get_all_cartas():
     conn = get_connection()
@@ -40,28 +42,28 @@ def get_all_cartas():
     conn.close()
     return rows
 
-def update_carta_acordo(id_carta, **kwargs):
+def get_cartas_by_demanda(codigo_demanda):
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE carta_acordo SET
-            codigo_demanda=?, instituicao=?, instrumento=?, subprojeto=?, ta=?, pta=?, acao=?, resultado=?, meta=?,
-            contrato=?, vigencia_inicial=?, vigencia_final=?, instituicao_2=?, cnpj=?, titulo_projeto=?, objetivo=?,
-            valor_estimado=?, total_contrato=?, observacoes=?
-        WHERE id=?
-    """, (
-        kwargs['codigo_demanda'], kwargs['instituicao'], kwargs['instrumento'], kwargs['subprojeto'],
-        kwargs['ta'], kwargs['pta'], kwargs['acao'], kwargs['resultado'], kwargs['meta'], kwargs['contrato'],
-        kwargs['vigencia_inicial'], kwargs['vigencia_final'], kwargs['instituicao_2'], kwargs['cnpj'],
-        kwargs['titulo_projeto'], kwargs['objetivo'], kwargs['valor_estimado'], kwargs['total_contrato'],
-        kwargs['observacoes'], id_carta
-    ))
-    conn.commit()
+    cursor.execute("SELECT * FROM carta_acordo WHERE codigo_demanda=?", (codigo_demanda,))
+    rows = cursor.fetchall()
     conn.close()
+    return rows
 
-def delete_carta_acordo(id_carta):
+def get_carta_acordo(id_carta):
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM carta_acordo WHERE id=?", (id_carta,))
-    conn.commit()
+    cursor.execute("SELECT * FROM carta_acordo WHERE id=?", (id_carta,))
+    row = cursor.fetchone()
     conn.close()
+    return row
+
+def update_carta_acordo(id_carta, versao_esperada=None, **kwargs):
+    """Grava apenas as colunas da carta acordo informadas que mudaram (ver atualizar_colunas)"""
+    return atualizar_colunas("carta_acordo", id_carta, kwargs, COLUNAS_CARTA_ACORDO, versao_esperada)
+
+def delete_carta_acordo(id_carta):
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM carta_acordo WHERE id=?", (id_carta,))
+    executar_escrita(gravar)
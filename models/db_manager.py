@@ -1,16 +1,369 @@
 # models/db_manager.py
 import sqlite3
 import os
+import threading
+from functools import lru_cache
+from utils.perfilador import fabrica_conexao
 
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'contrato.db')
 
+# Tabelas cujas alterações são contadas em contador_alteracoes (usado pelo cache de telas)
+TABELAS_MONITORADAS = [
+    'demanda', 'carta_acordo', 'produtos_servicos', 'eventos', 'aditivos',
+    'fornecedores', 'titulo_eventos', 'custeio'
+]
+
+# Tabelas de entidades com a coluna row_version (controle otimista de concorrência)
+TABELAS_VERSIONADAS = TABELAS_MONITORADAS
+
+# Conexão persistente usada apenas para leitura de PRAGMA data_version e contadores
+_conexao_monitor = None
+_caminho_monitor = None
+
+class ConexaoReutilizavel(sqlite3.Connection):
+    """Conexão mantida aberta entre chamadas (ver ativar_reuso_conexoes)
+
+    close() apenas devolve a conexão ao estado inicial: desfaz a transação
+    pendente, desanexa bancos e restaura row_factory e isolation_level, que
+    algumas funções alteram. encerrar() fecha de fato.
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+        self.row_factory = None
+        self.isolation_level = ""
+        for _, nome, _ in self.execute("PRAGMA database_list").fetchall():
+            if nome not in ("main", "temp"):
+                self.execute(f"DETACH DATABASE {nome}")
+
+    def encerrar(self):
+        super().close()
+
+# Com o reuso ativo, cada thread mantém a sua conexão (threading.local)
+_reuso_local = None
+_conexoes_reutilizadas = []
+_trava_reuso = threading.Lock()
+
+def ativar_reuso_conexoes():
+    """Faz get_connection devolver uma conexão persistente por thread
+
+    Usado por processos de longa duração (servidor_api.py), em que o custo de
+    abrir o arquivo e ler o esquema a cada chamada de controller se repete
+    milhares de vezes. Os controllers continuam chamando close() normalmente.
+    """
+    global _reuso_local
+    _reuso_local = threading.local()
+
+def desativar_reuso_conexoes():
+    """Fecha as conexões persistentes e volta a abrir uma conexão por chamada"""
+    global _reuso_local
+    _reuso_local = None
+    with _trava_reuso:
+        conexoes = list(_conexoes_reutilizadas)
+        _conexoes_reutilizadas.clear()
+    for conexao in conexoes:
+        conexao.encerrar()
+
+def _conexao_reutilizada(local):
+    conexao = getattr(local, "conexao", None)
+    if conexao is None or local.caminho != DB_PATH:
+        if conexao is not None:
+            with _trava_reuso:
+                _conexoes_reutilizadas.remove(conexao)
+            conexao.encerrar()
+        # Usada só pela sua thread; check_same_thread=False permite fechá-la ao desativar
+        conexao = _conectar(factory=ConexaoReutilizavel, check_same_thread=False)
+        local.conexao, local.caminho = conexao, DB_PATH
+        with _trava_reuso:
+            _conexoes_reutilizadas.append(conexao)
+    return conexao
+
+# Sessão de relatório em uso na thread (models/sessao_relatorio.py)
+_sessao_local = threading.local()
+
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    # Dentro de SessaoRelatorio.usar(), as leituras vão para o instantâneo da sessão
+    sessao = getattr(_sessao_local, "sessao", None)
+    if sessao is not None:
+        return sessao.conexao
+    return _abrir_conexao()
 
-def init_db():
+def _conectar(**opcoes):
+    conexao = sqlite3.connect(DB_PATH, **opcoes)
+    # As chaves estrangeiras do SQLite vêm desligadas e valem por conexão
+    conexao.execute("PRAGMA foreign_keys = ON")
+    return conexao
+
+def _abrir_conexao():
+    local = _reuso_local
+    if local is not None:
+        return _conexao_reutilizada(local)
+    # Com o perfil ativo (utils.perfilador), a conexão mede cada instrução
+    fabrica = fabrica_conexao()
+    if fabrica is not None:
+        return _conectar(factory=fabrica)
+    return _conectar()
+
+# Fila de escrita ativa (models/fila_escrita.py); None: cada gravação usa a sua conexão
+_fila_escrita = None
+
+def executar_escrita(tarefa):
+    """Executa tarefa(conn) em uma transação de escrita e retorna o seu resultado
+
+    Sem a fila de escrita, abre uma conexão, executa, confirma e fecha. Com a
+    fila ativa, a tarefa é executada pela thread escritora e pode ser
+    confirmada no mesmo commit de outras. A tarefa não deve chamar commit; em
+    caso de erro, o que ela gravou é desfeito e a exceção é propagada.
+    """
+    fila = _fila_escrita
+    if fila is not None:
+        return fila.executar(tarefa)
+    # Nunca no instantâneo de uma sessão de relatório: a gravação vai para o banco
+    conn = _abrir_conexao()
+    try:
+        resultado = tarefa(conn)
+        conn.commit()
+        return resultado
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def enviar_escrita(tarefa):
+    """Como executar_escrita, mas sem aguardar quando a fila está ativa
+
+    Para gravações cujo resultado não é usado (p.ex. log_action): com a fila
+    ativa, retorna um Future e o commit ocorre junto com as próximas gravações.
+    Sem a fila, grava na hora e retorna o resultado.
+    """
+    fila = _fila_escrita
+    if fila is not None and not fila.na_thread_escritora():
+        return fila.enviar(tarefa)
+    return executar_escrita(tarefa)
+
+def criar_contadores_alteracao(cursor):
+    """Cria a tabela contador_alteracoes e os gatilhos que a incrementam
+
+    Cada INSERT, UPDATE ou DELETE em uma tabela monitorada incrementa a versão
+    daquela tabela, permitindo saber de forma barata se os dados mudaram.
+
+    Args:
+        cursor: cursor de uma conexão aberta
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS contador_alteracoes (
+        tabela TEXT PRIMARY KEY,
+        versao INTEGER NOT NULL DEFAULT 0
+    );
+    """)
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    existentes = {linha[0] for linha in cursor.fetchall()}
+
+    for tabela in TABELAS_MONITORADAS:
+        if tabela not in existentes:
+            continue
+        for operacao in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_contador_{tabela}_{operacao.lower()}
+            AFTER {operacao} ON {tabela}
+            BEGIN
+                INSERT INTO contador_alteracoes (tabela, versao) VALUES ('{tabela}', 1)
+                ON CONFLICT(tabela) DO UPDATE SET versao = versao + 1;
+            END;
+            """)
+
+def _obter_conexao_monitor():
+    """Retorna a conexão persistente de monitoramento, reabrindo se o banco mudou"""
+    global _conexao_monitor, _caminho_monitor
+    if _conexao_monitor is None or _caminho_monitor != DB_PATH:
+        if _conexao_monitor is not None:
+            _conexao_monitor.close()
+        _conexao_monitor = sqlite3.connect(DB_PATH)
+        _caminho_monitor = DB_PATH
+    return _conexao_monitor
+
+def obter_versao_dados():
+    """Retorna o PRAGMA data_version da conexão de monitoramento
+
+    O valor muda sempre que outra conexão confirma uma transação no banco. Como
+    a aplicação grava sempre por conexões próprias, qualquer gravação altera o valor.
+
+    Returns:
+        int: versão atual dos dados
+    """
+    return _obter_conexao_monitor().execute("PRAGMA data_version").fetchone()[0]
+
+def obter_versoes_tabelas(tabelas):
+    """Retorna o contador de alterações de cada tabela informada
+
+    Args:
+        tabelas: nomes das tabelas
+
+    Returns:
+        dict: {tabela: versao}; tabelas sem alterações registradas têm versão 0
+    """
+    tabelas = list(tabelas)
+    versoes = {tabela: 0 for tabela in tabelas}
+    if not tabelas:
+        return versoes
+
+    conn = _obter_conexao_monitor()
+    marcadores = ','.join('?' for _ in tabelas)
+    try:
+        cursor = conn.execute(
+            f"SELECT tabela, versao FROM contador_alteracoes WHERE tabela IN ({marcadores})",
+            tabelas
+        )
+        versoes.update(dict(cursor.fetchall()))
+    except sqlite3.OperationalError:
+        # Banco ainda sem a tabela de contadores
+        pass
+    return versoes
+
+class ConflitoEdicao(Exception):
+    """O registro foi alterado por outra pessoa depois de carregado no formulário
+
+    Attributes:
+        tabela, id_registro: registro em conflito
+        versao_esperada: row_version carregada pelo formulário
+        versao_atual: row_version gravada no banco
+        diferencas: dict {coluna: (valor enviado, valor atual no banco)}
+    """
+
+    def __init__(self, tabela, id_registro, versao_esperada, versao_atual, diferencas):
+        self.tabela = tabela
+        self.id_registro = id_registro
+        self.versao_esperada = versao_esperada
+        self.versao_atual = versao_atual
+        self.diferencas = diferencas
+        super().__init__(
+            f"Registro {id_registro} de {tabela} alterado por outro usuário "
+            f"(versão carregada {versao_esperada}, atual {versao_atual})")
+
+    def descrever(self):
+        """Texto para o usuário com a diferença campo a campo"""
+        linhas = ["Este registro foi alterado por outro usuário depois de ser aberto.", "",
+                  "Campos em conflito (seu valor / valor atual):"]
+        for coluna, (enviado, atual) in self.diferencas.items():
+            linhas.append(f"- {coluna}: {enviado if enviado not in (None, '') else '(vazio)'} / "
+                          f"{atual if atual not in (None, '') else '(vazio)'}")
+        linhas += ["", "Reabra o registro para ver os dados atuais e refaça as alterações."]
+        return "\n".join(linhas)
+
+def atualizar_colunas(tabela, id_registro, valores, colunas_permitidas, versao_esperada=None):
+    """Atualiza apenas as colunas informadas cujo valor mudou
+
+    Os valores atuais são comparados no próprio SQLite (? IS NOT coluna), com a
+    afinidade da coluna, de modo que 1500 e '1500' contam como iguais em uma
+    coluna REAL. O UPDATE só lista as colunas diferentes, incrementa row_version
+    e não é executado quando nada mudou, poupando a escrita da página, o
+    crescimento do WAL e os gatilhos da tabela.
+
+    Com versao_esperada, a gravação é condicional (controle otimista): só ocorre
+    se row_version ainda for a versão carregada pelo formulário. Nenhum lock é
+    mantido enquanto o usuário edita. A leitura e o UPDATE formam uma tarefa de
+    executar_escrita; com a fila de escrita, rodam na mesma transação.
+
+    Args:
+        tabela: nome da tabela (com chave primária id e coluna row_version)
+        id_registro: id do registro
+        valores: dict {coluna: novo valor}; colunas ausentes não são alteradas
+        colunas_permitidas: colunas que podem ser atualizadas
+        versao_esperada: row_version carregada junto com o registro (opcional)
+
+    Returns:
+        list: colunas efetivamente gravadas (vazia se nada mudou ou o registro não existe)
+
+    Raises:
+        ConflitoEdicao: o registro mudou desde a versão esperada
+    """
+    invalidas = set(valores) - set(colunas_permitidas)
+    if invalidas:
+        raise ValueError(f"Colunas inválidas para {tabela}: {', '.join(sorted(invalidas))}")
+    if not valores:
+        return []
+
+    colunas = list(valores)
+    enviados = [valores[coluna] for coluna in colunas]
+
+    def gravar(conn):
+        cursor = conn.cursor()
+        comparacoes = ", ".join(f"? IS NOT {coluna}" for coluna in colunas)
+        cursor.execute(f"SELECT row_version, {', '.join(colunas)}, {comparacoes} FROM {tabela} WHERE id=?",
+                       enviados + [id_registro])
+        linha = cursor.fetchone()
+        if linha is None:
+            return []
+
+        versao_atual = linha[0]
+        atuais = linha[1:1 + len(colunas)]
+        diferentes = linha[1 + len(colunas):]
+        alteradas = [coluna for coluna, diferente in zip(colunas, diferentes) if diferente]
+        if not alteradas:
+            return []
+
+        def conflito(versao):
+            return ConflitoEdicao(tabela, id_registro, versao_esperada, versao, {
+                coluna: (valores[coluna], atual)
+                for coluna, atual, diferente in zip(colunas, atuais, diferentes) if diferente
+            })
+
+        if versao_esperada is not None and versao_atual != versao_esperada:
+            raise conflito(versao_atual)
+
+        atribuicoes = ", ".join(f"{coluna}=?" for coluna in alteradas)
+        cursor.execute(
+            f"UPDATE {tabela} SET {atribuicoes}, row_version = row_version + 1 WHERE id=? AND row_version=?",
+            [valores[coluna] for coluna in alteradas] + [id_registro, versao_atual])
+        if cursor.rowcount == 0:
+            # Outra conexão gravou entre a leitura e o UPDATE
+            cursor.execute(f"SELECT row_version FROM {tabela} WHERE id=?", (id_registro,))
+            linha = cursor.fetchone()
+            raise conflito(linha[0] if linha else None)
+        return alteradas
+
+    return executar_escrita(gravar)
+
+def obter_versao_registro(tabela, id_registro):
+    """Retorna a row_version atual de um registro, ou None se não existir"""
     conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        linha = conn.execute(f"SELECT row_version FROM {tabela} WHERE id=?", (id_registro,)).fetchone()
+        return linha[0] if linha else None
+    finally:
+        conn.close()
+
+@lru_cache(maxsize=None)
+def _indices_colunas(caminho, tabela):
+    conn = sqlite3.connect(caminho)
+    try:
+        return {coluna[1]: coluna[0] for coluna in conn.execute(f"PRAGMA table_info({tabela})")}
+    finally:
+        conn.close()
+
+def obter_coluna(tabela, linha, coluna):
+    """Retorna o valor de uma coluna em uma linha obtida com SELECT * da tabela
 
+    Evita depender da posição de colunas acrescentadas por migrações (como row_version).
+    """
+    indice = _indices_colunas(DB_PATH, tabela).get(coluna)
+    if indice is None or indice >= len(linha):
+        return None
+    return linha[indice]
+
+def _adicionar_colunas_ausentes(cursor, tabela, colunas):
+    """Adiciona à tabela as colunas (nome, tipo) que ainda não existem"""
+    cursor.execute(f"PRAGMA table_info({tabela})")
+    existentes = {coluna[1] for coluna in cursor.fetchall()}
+    for nome, tipo in colunas:
+        if nome not in existentes:
+            cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {nome} {tipo}")
+
+def _migracao_1_esquema_base(cursor):
+    """Esquema base: tabelas principais, tabelas auxiliares e usuário admin"""
     # Usuários (usuário inicial: admin/admin)
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS users (
@@ -64,10 +417,18 @@ def init_db():
         fornecedor TEXT, modalidade TEXT, objetivo TEXT,
         vigencia_inicial TEXT, vigencia_final TEXT,
         observacao TEXT, valor_estimado REAL, total_contrato REAL,
+        instituicao TEXT, instrumento TEXT, subprojeto TEXT, ta TEXT, pta TEXT, acao TEXT,
+        resultado TEXT, meta TEXT,
         FOREIGN KEY (codigo_demanda) REFERENCES demanda(codigo)
     );
     """)
 
+    # Bancos anteriores à migração de custeio dos produtos/serviços
+    _adicionar_colunas_ausentes(cursor, "produtos_servicos", [
+        (campo, "TEXT") for campo in
+        ("instituicao", "instrumento", "subprojeto", "ta", "pta", "acao", "resultado", "meta")
+    ])
+
     # Eventos - agora com campos de custeio incluídos
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS eventos (
@@ -98,16 +459,400 @@ def init_db():
     """)
 
 
-    # Adicione aqui criação de outras tabelas conforme o crescimento
+    # Títulos de eventos (antes criada por create_tables.py)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS titulo_eventos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        titulo TEXT NOT NULL,
+        cidade TEXT,
+        estado TEXT,
+        data_inicio TEXT,
+        data_fim TEXT
+    );
+    """)
+
+    # Fornecedores (antes criada por create_tables.py)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS fornecedores (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        razao_social TEXT NOT NULL,
+        cnpj TEXT,
+        observacao TEXT
+    );
+    """)
+
+    # Contratos (antes criada sob demanda por contrato_controller)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS contratos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo_contrato TEXT, -- ('carta_acordo', 'produtos_servicos', 'eventos')
+        id_referencia INTEGER, -- ID da carta acordo, produto/serviço ou evento
+        numero_contrato TEXT,
+        data_assinatura TEXT,
+        data_registro TEXT,
+        observacoes TEXT
+    );
+    """)
+
+    # Custeio (populada por create_custeio_table.py a partir da planilha)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS custeio (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        instituicao_parceira TEXT,
+        cod_projeto TEXT,
+        cod_ta TEXT,
+        resultado TEXT,
+        subprojeto TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_instituicao ON custeio(instituicao_parceira)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cod_projeto ON custeio(cod_projeto)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cod_ta ON custeio(cod_ta)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_resultado ON custeio(resultado)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_subprojeto ON custeio(subprojeto)")
+
+    # Contadores de alteração por tabela (cache de telas do dashboard)
+    criar_contadores_alteracao(cursor)
 
     # Usuário admin padrão (só insere se não existir)
     cursor.execute("SELECT * FROM users WHERE username = 'admin'")
     if not cursor.fetchone():
         cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", ('admin', 'admin'))  # Troque por hash
+
+def _migracao_2_indices_demanda(cursor):
+    """Índices da busca de demandas por prefixo (LIKE 'texto%' sem diferenciar maiúsculas)"""
+    for coluna in ("nup_sei", "oficio", "solicitante"):
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_demanda_{coluna} ON demanda({coluna} COLLATE NOCASE)"
+        )
+
+def _migracao_3_indices_contratos(cursor):
+    """Índices dos contratos por demanda e dos aditivos por contrato"""
+    for tabela in ("carta_acordo", "eventos", "produtos_servicos"):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_demanda ON {tabela}(codigo_demanda)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_aditivos_contrato ON aditivos(tipo_contrato, id_contrato, id)"
+    )
+
+def _possui_coluna(cursor, tabela, coluna):
+    cursor.execute(f"PRAGMA table_info({tabela})")
+    return any(linha[1] == coluna for linha in cursor.fetchall())
+
+def criar_gatilhos_versao(cursor):
+    """Cria os gatilhos que incrementam row_version em UPDATEs que não o fizeram
+
+    Gravações feitas por atualizar_colunas já incrementam a versão no próprio
+    UPDATE; o gatilho cobre as demais (por exemplo, UPDATEs completos antigos).
+    O preenchimento do uuid de um registro novo não conta como alteração.
+    """
+    for tabela in TABELAS_VERSIONADAS:
+        condicao = "NEW.row_version = OLD.row_version"
+        if _possui_coluna(cursor, tabela, "uuid"):
+            condicao += " AND NEW.uuid IS OLD.uuid"
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_versao_{tabela}
+        AFTER UPDATE ON {tabela}
+        WHEN {condicao}
+        BEGIN
+            UPDATE {tabela} SET row_version = OLD.row_version + 1 WHERE rowid = NEW.rowid;
+        END;
+        """)
+
+def _migracao_4_versao_registros(cursor):
+    """Coluna row_version nas tabelas de entidades para o controle otimista de concorrência"""
+    for tabela in TABELAS_VERSIONADAS:
+        _adicionar_colunas_ausentes(cursor, tabela, [("row_version", "INTEGER NOT NULL DEFAULT 0")])
+    criar_gatilhos_versao(cursor)
+
+def criar_log_alteracoes(cursor):
+    """Cria a tabela log_alteracoes e os gatilhos que a preenchem
+
+    Cada inclusão, edição ou exclusão em uma tabela monitorada gera uma linha
+    (seq, tabela, id_registro, operacao), permitindo que outras instâncias da
+    aplicação leiam apenas o que mudou desde a última verificação. Nos aditivos
+    também são gravados tipo_contrato e id_contrato e, a partir da migração 6,
+    o uuid do registro (necessário para exportar exclusões).
+
+    A edição só é registrada quando row_version muda: assim um UPDATE gera uma
+    única linha, seja ele feito por atualizar_colunas ou coberto pelo gatilho
+    trg_versao_<tabela>.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS log_alteracoes (
+        seq INTEGER PRIMARY KEY,
+        tabela TEXT NOT NULL,
+        id_registro INTEGER NOT NULL,
+        operacao TEXT NOT NULL,
+        tipo_contrato TEXT,
+        id_contrato INTEGER
+    );
+    """)
+
+    com_uuid = _possui_coluna(cursor, "log_alteracoes", "uuid")
+    for tabela in TABELAS_MONITORADAS:
+        for operacao, nome, registro, condicao in (
+            ('INSERT', 'inserir', 'NEW', ''),
+            ('UPDATE', 'atualizar', 'NEW', 'WHEN NEW.row_version IS NOT OLD.row_version'),
+            ('DELETE', 'excluir', 'OLD', ''),
+        ):
+            contrato = (f"{registro}.tipo_contrato, {registro}.id_contrato"
+                        if tabela == 'aditivos' else "NULL, NULL")
+            colunas_uuid, valor_uuid = (", uuid", f", {registro}.uuid") if com_uuid else ("", "")
+            cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_log_{tabela}_{operacao.lower()}
+            AFTER {operacao} ON {tabela}
+            {condicao}
+            BEGIN
+                INSERT INTO log_alteracoes (tabela, id_registro, operacao, tipo_contrato, id_contrato{colunas_uuid})
+                VALUES ('{tabela}', {registro}.rowid, '{nome}', {contrato}{valor_uuid});
+            END;
+            """)
+
+def obter_ultimo_seq_alteracoes():
+    """Retorna o maior seq de log_alteracoes (0 se vazio ou inexistente)"""
+    try:
+        return _obter_conexao_monitor().execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM log_alteracoes").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+def obter_alteracoes_desde(seq, limite=5000):
+    """Lê as alterações registradas depois de seq, em ordem
+
+    A consulta percorre apenas o fim da tabela pela chave primária, sem tocar
+    nas tabelas de dados.
+
+    Returns:
+        tuple: (menor seq ainda disponível, lista de (seq, tabela, id_registro,
+               operacao, tipo_contrato, id_contrato)). Se o menor seq for maior
+               que seq + 1, parte do histórico já foi podada.
+    """
+    conn = _obter_conexao_monitor()
+    try:
+        menor = conn.execute("SELECT MIN(seq) FROM log_alteracoes").fetchone()[0]
+        linhas = conn.execute(
+            "SELECT seq, tabela, id_registro, operacao, tipo_contrato, id_contrato "
+            "FROM log_alteracoes WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limite)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None, []
+    return menor, linhas
+
+def podar_log_alteracoes(manter=50000):
+    """Remove as alterações mais antigas, mantendo as últimas `manter`
+
+    Instâncias que ficaram mais atrás do que isso recarregam as telas inteiras.
+
+    Returns:
+        int: linhas removidas
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.execute(
+            "DELETE FROM log_alteracoes WHERE seq <= (SELECT MAX(seq) FROM log_alteracoes) - ?",
+            (manter,))
         conn.commit()
+        return cursor.rowcount
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+def _migracao_5_log_alteracoes(cursor):
+    """Registro das alterações para sincronizar instâncias abertas no mesmo banco"""
+    criar_log_alteracoes(cursor)
+
+def _migracao_6_identificadores_replicacao(cursor):
+    """Identificadores estáveis (uuid) e registro de exclusões para a replicação entre escritórios
+
+    Os ids locais diferem de um banco para outro; o uuid identifica o mesmo
+    registro em todos eles. Registros novos recebem o uuid por gatilho e as
+    exclusões ficam em registros_excluidos, impedindo que um pacote antigo
+    recrie o registro.
+    """
+    _adicionar_colunas_ausentes(cursor, "log_alteracoes", [("uuid", "TEXT")])
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS registros_excluidos (
+        uuid TEXT PRIMARY KEY,
+        tabela TEXT NOT NULL,
+        row_version INTEGER
+    );
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS replicacao_destinos (
+        destino TEXT PRIMARY KEY,
+        ultimo_seq INTEGER NOT NULL
+    );
+    """)
+
+    for tabela in TABELAS_MONITORADAS:
+        # O preenchimento inicial não deve contar como edição nem entrar no log
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_versao_{tabela}")
+        for operacao in ("insert", "update", "delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_log_{tabela}_{operacao}")
+
+        _adicionar_colunas_ausentes(cursor, tabela, [("uuid", "TEXT")])
+        cursor.execute(f"UPDATE {tabela} SET uuid = lower(hex(randomblob(16))) WHERE uuid IS NULL")
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{tabela}_uuid ON {tabela}(uuid)")
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_uuid_{tabela}
+        AFTER INSERT ON {tabela}
+        WHEN NEW.uuid IS NULL
+        BEGIN
+            UPDATE {tabela} SET uuid = lower(hex(randomblob(16))) WHERE rowid = NEW.rowid;
+        END;
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_excluido_{tabela}
+        AFTER DELETE ON {tabela}
+        WHEN OLD.uuid IS NOT NULL
+        BEGIN
+            INSERT OR REPLACE INTO registros_excluidos (uuid, tabela, row_version)
+            VALUES (OLD.uuid, '{tabela}', OLD.row_version);
+        END;
+        """)
+
+    criar_gatilhos_versao(cursor)
+    criar_log_alteracoes(cursor)
+
+def _migracao_7_indices_aplicados(cursor):
+    """Registro dos índices criados a partir das sugestões do assessor de índices
+
+    Os índices sugeridos (utils/assessor_indices.py) dependem da carga de cada
+    instalação e por isso não entram como migrações fixas; a tabela guarda
+    quais foram criados, quando e com qual benefício estimado, permitindo
+    listá-los e removê-los (models/indices_model.py).
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS indices_aplicados (
+        nome TEXT PRIMARY KEY,
+        tabela TEXT NOT NULL,
+        definicao TEXT NOT NULL,
+        beneficio_ms REAL,
+        aplicado_em TEXT NOT NULL
+    );
+    """)
+
+# Tabelas de contratos, referenciadas por aditivos e contratos por (tipo_contrato, id)
+TABELAS_CONTRATO = ('carta_acordo', 'eventos', 'produtos_servicos')
+
+# Ligações polimórficas: (tabela filha, coluna com o id do contrato)
+LIGACOES_CONTRATO = (('aditivos', 'id_contrato'), ('contratos', 'id_referencia'))
+
+def _contrato_existe(registro, coluna):
+    """Expressão SQL verdadeira quando o contrato referenciado pela linha existe"""
+    casos = " ".join(
+        f"WHEN '{tabela}' THEN EXISTS (SELECT 1 FROM {tabela} WHERE id = {registro}.{coluna})"
+        for tabela in TABELAS_CONTRATO
+    )
+    return f"(CASE {registro}.tipo_contrato {casos} ELSE 0 END)"
+
+def criar_gatilhos_integridade(cursor):
+    """Cria os gatilhos que fazem o papel de chave estrangeira nas ligações polimórficas
+
+    aditivos e contratos apontam para carta_acordo, eventos ou produtos_servicos
+    conforme tipo_contrato, o que uma FOREIGN KEY não expressa. Os gatilhos
+    recusam a inclusão ou edição que aponte para um contrato inexistente (id
+    NULL continua aceito, como nas referências ausentes da replicação) e, ao
+    excluir um contrato, excluem em cascata os seus aditivos e registros em
+    contratos, pelos índices (tipo_contrato, id).
+    """
+    for filha, coluna in LIGACOES_CONTRATO:
+        for operacao, momento in (("insert", "INSERT"), ("update", f"UPDATE OF tipo_contrato, {coluna}")):
+            cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_fk_{filha}_{operacao}
+            BEFORE {momento} ON {filha}
+            WHEN NEW.{coluna} IS NOT NULL AND NOT {_contrato_existe("NEW", coluna)}
+            BEGIN
+                SELECT RAISE(ABORT, 'FOREIGN KEY constraint failed');
+            END;
+            """)
+
+    for tabela in TABELAS_CONTRATO:
+        exclusoes = "\n".join(
+            f"DELETE FROM {filha} WHERE tipo_contrato = '{tabela}' AND {coluna} = OLD.id;"
+            for filha, coluna in LIGACOES_CONTRATO
+        )
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_cascata_{tabela}
+        AFTER DELETE ON {tabela}
+        BEGIN
+            {exclusoes}
+        END;
+        """)
+
+def _migracao_8_integridade_referencial(cursor):
+    """Integridade referencial: chaves estrangeiras ativas e exclusão em cascata dos aditivos
+
+    Com PRAGMA foreign_keys ligado em cada conexão (_conectar), a FOREIGN KEY
+    codigo_demanda -> demanda(codigo) já declarada nos contratos passa a valer:
+    excluir uma demanda com contratos é recusado, usando os índices
+    idx_<tabela>_demanda. Os aditivos e contratos órfãos deixados pelas
+    exclusões anteriores são removidos antes de criar os gatilhos.
+    """
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_contratos_referencia ON contratos(tipo_contrato, id_referencia)"
+    )
+    for filha, coluna in LIGACOES_CONTRATO:
+        cursor.execute(f"""
+        DELETE FROM {filha}
+        WHERE {coluna} IS NOT NULL AND NOT {_contrato_existe(filha, coluna)}
+        """)
+    criar_gatilhos_integridade(cursor)
+
+# Migrações do esquema, em ordem: (versão, função que recebe o cursor).
+# Adicione aqui novas migrações conforme o crescimento; a versão aplicada
+# fica gravada em PRAGMA user_version.
+MIGRACOES = [
+    (1, _migracao_1_esquema_base),
+    (2, _migracao_2_indices_demanda),
+    (3, _migracao_3_indices_contratos),
+    (4, _migracao_4_versao_registros),
+    (5, _migracao_5_log_alteracoes),
+    (6, _migracao_6_identificadores_replicacao),
+    (7, _migracao_7_indices_aplicados),
+    (8, _migracao_8_integridade_referencial),
+]
+
+VERSAO_SCHEMA = MIGRACOES[-1][0]
+
+def obter_versao_schema(conn):
+    """Retorna a versão do esquema gravada em PRAGMA user_version"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def init_db():
+    """Cria ou atualiza o esquema do banco
+
+    Quando o banco já está na versão atual, apenas PRAGMA user_version é lido.
+    Caso contrário, cada migração pendente é aplicada em sua própria transação.
+
+    Returns:
+        int: versão do esquema após a inicialização
+    """
+    conn = get_connection()
+    try:
+        versao = obter_versao_schema(conn)
+        if versao >= VERSAO_SCHEMA:
+            return versao
 
-    conn.commit()
-    conn.close()
+        cursor = conn.cursor()
+        for numero, migracao in MIGRACOES:
+            if numero <= versao:
+                continue
+            cursor.execute("BEGIN")
+            try:
+                migracao(cursor)
+                cursor.execute(f"PRAGMA user_version = {numero}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            versao = numero
+        _indices_colunas.cache_clear()
+        return versao
+    finally:
+        conn.close()
 
 if __name__ == '__main__':
     init_db()
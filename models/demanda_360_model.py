@@ -0,0 +1,139 @@
+# models/demanda_360_model.py
+"""Carga de uma demanda com todos os seus contratos e aditivos ("visão 360")
+
+Em vez de uma consulta por tipo de contrato e uma varredura de aditivos por
+contrato, cada lote de demandas é carregado com três consultas:
+
+1. as demandas (codigo IN (...));
+2. os contratos dos três tipos (UNION ALL com codigo_demanda IN (...));
+3. os aditivos desses contratos (JOIN), já com o valor acumulado calculado por
+   SUM() OVER (PARTITION BY contrato ORDER BY id).
+"""
+from .db_manager import get_connection
+
+# Quantidade de códigos por consulta IN (...), abaixo do limite de parâmetros do SQLite
+TAMANHO_LOTE = 500
+
+TIPOS_CONTRATO = ("carta_acordo", "eventos", "produtos_servicos")
+
+# Colunas comuns aos três tipos de contrato
+_SQL_CONTRATOS = """
+    SELECT 'carta_acordo' AS tipo, id, codigo_demanda, titulo_projeto AS descricao,
+           instituicao_2 AS contratado, contrato AS numero, vigencia_inicial, vigencia_final,
+           valor_estimado, total_contrato
+    FROM carta_acordo WHERE codigo_demanda IN ({marcadores})
+    UNION ALL
+    SELECT 'eventos', id, codigo_demanda, titulo_evento, fornecedor, NULL, NULL, NULL,
+           valor_estimado, total_contrato
+    FROM eventos WHERE codigo_demanda IN ({marcadores})
+    UNION ALL
+    SELECT 'produtos_servicos', id, codigo_demanda, objetivo, fornecedor, modalidade,
+           vigencia_inicial, vigencia_final, valor_estimado, total_contrato
+    FROM produtos_servicos WHERE codigo_demanda IN ({marcadores})
+"""
+
+_SQL_ADITIVOS = """
+    WITH contratos AS ({contratos})
+    SELECT a.tipo_contrato, a.id_contrato, a.id, a.tipo_aditivo, a.descricao,
+           a.valor_aditivo, a.nova_vigencia_final, a.data_registro,
+           SUM(COALESCE(a.valor_aditivo, 0)) OVER (
+               PARTITION BY a.tipo_contrato, a.id_contrato ORDER BY a.id
+           ) AS valor_acumulado
+    FROM aditivos a
+    JOIN contratos c ON c.tipo = a.tipo_contrato AND c.id = a.id_contrato
+    ORDER BY a.tipo_contrato, a.id_contrato, a.id
+"""
+
+_COLUNAS_DEMANDA = ("codigo", "data_entrada", "solicitante", "data_protocolo", "oficio", "nup_sei", "status")
+_COLUNAS_CONTRATO = ("tipo", "id", "codigo_demanda", "descricao", "contratado", "numero",
+                     "vigencia_inicial", "vigencia_final", "valor_estimado", "total_contrato")
+_COLUNAS_ADITIVO = ("id", "tipo_aditivo", "descricao", "valor_aditivo", "nova_vigencia_final",
+                    "data_registro", "valor_acumulado")
+
+
+def _valor(numero):
+    return float(numero) if numero else 0.0
+
+
+def _carregar_lote(cursor, codigos):
+    """Carrega um lote de demandas com três consultas"""
+    marcadores = ",".join("?" for _ in codigos)
+
+    cursor.execute(f"SELECT * FROM demanda WHERE codigo IN ({marcadores})", codigos)
+    resultado = {}
+    for linha in cursor.fetchall():
+        resultado[linha[0]] = {
+            "demanda": dict(zip(_COLUNAS_DEMANDA, linha)),
+            "contratos": {tipo: [] for tipo in TIPOS_CONTRATO},
+            "totais": {},
+        }
+    if not resultado:
+        return resultado
+
+    encontrados = list(resultado)
+    marcadores = ",".join("?" for _ in encontrados)
+    sql_contratos = _SQL_CONTRATOS.format(marcadores=marcadores)
+
+    contratos = {}
+    cursor.execute(sql_contratos, encontrados * 3)
+    for linha in cursor.fetchall():
+        contrato = dict(zip(_COLUNAS_CONTRATO, linha))
+        contrato["aditivos"] = []
+        contratos[(contrato["tipo"], contrato["id"])] = contrato
+        resultado[contrato["codigo_demanda"]]["contratos"][contrato["tipo"]].append(contrato)
+
+    if contratos:
+        cursor.execute(_SQL_ADITIVOS.format(contratos=sql_contratos), encontrados * 3)
+        for linha in cursor.fetchall():
+            contrato = contratos.get((linha[0], linha[1]))
+            if contrato is not None:
+                contrato["aditivos"].append(dict(zip(_COLUNAS_ADITIVO, linha[2:])))
+
+    for item in resultado.values():
+        totais = {"quantidade_contratos": 0, "quantidade_aditivos": 0,
+                  "valor_estimado": 0.0, "valor_aditivos": 0.0, "total_contrato": 0.0}
+        for lista in item["contratos"].values():
+            for contrato in lista:
+                aditivos = contrato["aditivos"]
+                contrato["valor_aditivos"] = aditivos[-1]["valor_acumulado"] if aditivos else 0.0
+                contrato["valor_com_aditivos"] = _valor(contrato["valor_estimado"]) + contrato["valor_aditivos"]
+                totais["quantidade_contratos"] += 1
+                totais["quantidade_aditivos"] += len(aditivos)
+                totais["valor_estimado"] += _valor(contrato["valor_estimado"])
+                totais["valor_aditivos"] += contrato["valor_aditivos"]
+                totais["total_contrato"] += _valor(contrato["total_contrato"])
+        item["totais"] = totais
+    return resultado
+
+
+def get_demandas_360(codigos):
+    """Carrega várias demandas com seus contratos e aditivos
+
+    Args:
+        codigos: códigos das demandas (qualquer quantidade; consultadas em lotes)
+
+    Returns:
+        dict: {codigo: {"demanda": {...},
+                        "contratos": {"carta_acordo": [...], "eventos": [...], "produtos_servicos": [...]},
+                        "totais": {...}}}
+              Cada contrato traz "aditivos" (em ordem, com valor_acumulado),
+              "valor_aditivos" e "valor_com_aditivos". Códigos inexistentes são omitidos.
+    """
+    codigos = list(dict.fromkeys(int(codigo) for codigo in codigos))
+    resultado = {}
+    if not codigos:
+        return resultado
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        for inicio in range(0, len(codigos), TAMANHO_LOTE):
+            resultado.update(_carregar_lote(cursor, codigos[inicio:inicio + TAMANHO_LOTE]))
+    finally:
+        conn.close()
+    return resultado
+
+
+def get_demanda_360(codigo):
+    """Carrega uma demanda com seus contratos e aditivos, ou None se não existir"""
+    return get_demandas_360([codigo]).get(int(codigo))
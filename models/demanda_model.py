@@ -1,15 +1,15 @@
 # models/demanda_model.py
-from .db_manager import get_connection
+from .db_manager import get_connection, executar_escrita
 
 def create_demanda(data_entrada, solicitante, data_protocolo, oficio, nup_sei, status):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO demanda (data_entrada, solicitante, data_protocolo, oficio, nup_sei, status)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (data_entrada, solicitante, data_protocolo, oficio, nup_sei, status))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO demanda (data_entrada, solicitante, data_protocolo, oficio, nup_sei, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (data_entrada, solicitante, data_protocolo, oficio, nup_sei, status))
+        return cursor.lastrowid
+    return executar_escrita(gravar)
 
 def get_all_demandas():
     conn = get_connection()
@@ -19,19 +19,83 @@ def get_all_demandas():
     conn.close()
     return rows
 
-def update_demanda(codigo, data_entrada, solicitante, data_protocolo, oficio, nup_sei, status):
+def get_demanda(codigo):
+    """Retorna a demanda pelo código (chave primária) ou None"""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE demanda SET data_entrada=?, solicitante=?, data_protocolo=?, oficio=?, nup_sei=?, status=?
-        WHERE codigo=?
-    """, (data_entrada, solicitante, data_protocolo, oficio, nup_sei, status, codigo))
-    conn.commit()
+    cursor.execute("SELECT * FROM demanda WHERE codigo=?", (codigo,))
+    row = cursor.fetchone()
     conn.close()
+    return row
+
+# Colunas de texto pesquisadas por prefixo (com índice COLLATE NOCASE)
+COLUNAS_BUSCA = ("nup_sei", "oficio", "solicitante")
+
+def _escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_demandas(termo, limite=50):
+    """Busca demandas pelo início do código, NUP/SEI, ofício ou solicitante
+
+    Cada critério usa um índice e é limitado separadamente, de modo que o custo
+    não depende da quantidade de demandas cadastradas. Quando um critério tem mais
+    correspondências que o limite, ficam as primeiras na ordem do índice.
+
+    Args:
+        termo: texto digitado (prefixo, sem diferenciar maiúsculas/minúsculas)
+        limite: quantidade máxima de demandas retornadas
+
+    Returns:
+        list: demandas encontradas, das mais recentes para as mais antigas
+    """
+    termo = (termo or "").strip()
+    if not termo:
+        return []
+
+    consultas = []
+    params = []
+
+    # Código: "12" encontra 12, 120-129, 1200-1299... (faixas na chave primária)
+    codigo_exato = None
+    if termo.isdigit() and len(termo) <= 10:
+        numero = codigo_exato = int(termo)
+        for casas in range(0, 11 - len(termo)):
+            inicio = numero * 10 ** casas
+            fim = (numero + 1) * 10 ** casas - 1
+            if inicio == 0 and casas:
+                continue
+            consultas.append("SELECT * FROM (SELECT * FROM demanda WHERE codigo BETWEEN ? AND ? "
+                             "ORDER BY codigo DESC LIMIT ?)")
+            params.extend([inicio, fim, limite])
+
+    padrao = _escapar_like(termo) + "%"
+    for coluna in COLUNAS_BUSCA:
+        consultas.append(f"SELECT * FROM (SELECT * FROM demanda WHERE {coluna} LIKE ? ESCAPE '\\' "
+                         f"LIMIT ?)")
+        params.extend([padrao, limite])
+
+    # A demanda com o código exato vem primeiro, seguida das mais recentes
+    sql = f"SELECT * FROM ({' UNION '.join(consultas)}) ORDER BY codigo = ? DESC, codigo DESC LIMIT ?"
+    params.extend([codigo_exato, limite])
 
-def delete_demanda(codigo):
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM demanda WHERE codigo=?", (codigo,))
-    conn.commit()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
     conn.close()
+    return rows
+
+def update_demanda(codigo, data_entrada, solicitante, data_protocolo, oficio, nup_sei, status):
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE demanda SET data_entrada=?, solicitante=?, data_protocolo=?, oficio=?, nup_sei=?, status=?
+            WHERE codigo=?
+        """, (data_entrada, solicitante, data_protocolo, oficio, nup_sei, status, codigo))
+    executar_escrita(gravar)
+
+def delete_demanda(codigo):
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM demanda WHERE codigo=?", (codigo,))
+    executar_escrita(gravar)
@@ -1,22 +1,26 @@
 # models/eventos_model.py
-from .db_manager import get_connection
+from .db_manager import get_connection, executar_escrita, atualizar_colunas
+
+COLUNAS_EVENTO = (
+    'codigo_demanda', 'instituicao', 'instrumento', 'subprojeto', 'ta', 'pta', 'acao', 'resultado', 'meta',
+    'titulo_evento', 'fornecedor', 'observacao', 'valor_estimado', 'total_contrato'
+)
 
 def create_evento(**kwargs):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO eventos (
-            codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
-            titulo_evento, fornecedor, observacao, valor_estimado, total_contrato
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        kwargs['codigo_demanda'], kwargs['instituicao'], kwargs['instrumento'], kwargs['subprojeto'],
-        kwargs['ta'], kwargs['pta'], kwargs['acao'], kwargs['resultado'], kwargs['meta'],
-        kwargs['titulo_evento'], kwargs['fornecedor'], kwargs['observacao'],
-        kwargs['valor_estimado'], kwargs['total_contrato']
-    ))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO eventos (
+                codigo_demanda, instituicao, instrumento, subprojeto, ta, pta, acao, resultado, meta,
+                titulo_evento, fornecedor, observacao, valor_estimado, total_contrato
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            kwargs['codigo_demanda'], kwargs['instituicao'], kwargs['instrumento'], kwargs['subprojeto'],
+            kwargs['ta'], kwargs['pta'], kwargs['acao'], kwargs['resultado'], kwargs['meta'],
+            kwargs['titulo_evento'], kwargs['fornecedor'], kwargs['observacao'],
+            kwargs['valor_estimado'], kwargs['total_contrato']
+        ))
+    executar_escrita(gravar)
 
 def get_all_eventos():
     conn = get_connection()
@@ -26,26 +30,20 @@ def get_all_eventos():
     conn.close()
     return rows
 
-def update_evento(id_evento, **kwargs):
+def get_evento(id_evento):
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE eventos SET
-            codigo_demanda=?, instituicao=?, instrumento=?, subprojeto=?, ta=?, pta=?, acao=?, resultado=?, meta=?,
-            titulo_evento=?, fornecedor=?, observacao=?, valor_estimado=?, total_contrato=?
-        WHERE id=?
-    """, (
-        kwargs['codigo_demanda'], kwargs['instituicao'], kwargs['instrumento'], kwargs['subprojeto'],
-        kwargs['ta'], kwargs['pta'], kwargs['acao'], kwargs['resultado'], kwargs['meta'],
-        kwargs['titulo_evento'], kwargs['fornecedor'], kwargs['observacao'],
-        kwargs['valor_estimado'], kwargs['total_contrato'], id_evento
-    ))
-    conn.commit()
+    cursor.execute("SELECT * FROM eventos WHERE id=?", (id_evento,))
+    row = cursor.fetchone()
     conn.close()
+    return row
+
+def update_evento(id_evento, versao_esperada=None, **kwargs):
+    """Grava apenas as colunas do evento informadas que mudaram (ver atualizar_colunas)"""
+    return atualizar_colunas("eventos", id_evento, kwargs, COLUNAS_EVENTO, versao_esperada)
 
 def delete_evento(id_evento):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM eventos WHERE id=?", (id_evento,))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM eventos WHERE id=?", (id_evento,))
+    executar_escrita(gravar)
@@ -0,0 +1,80 @@
+# models/extrato_model.py
+"""Carga dos contratos para os extratos, em consultas por conjunto
+
+Uma consulta por tipo de contrato traz todos os contratos já com a demanda
+vinculada (LEFT JOIN demanda) e os aditivos vêm de get_aditivo_history, uma
+consulta por lote de 500 contratos, em vez de abrir cada formulário.
+"""
+from .db_manager import get_connection
+from .aditivos_model import get_aditivo_history
+from .demanda_360_model import TIPOS_CONTRATO
+
+# Colunas de cada tipo no formato comum (descricao, contratado, numero, vigências);
+# None onde o tipo não tem a informação
+_COLUNAS_TIPO = {
+    "carta_acordo": ("titulo_projeto", "instituicao_2", "contrato", "vigencia_inicial", "vigencia_final"),
+    "eventos": ("titulo_evento", "fornecedor", None, None, None),
+    "produtos_servicos": ("objetivo", "fornecedor", "modalidade", "vigencia_inicial", "vigencia_final"),
+}
+
+_COLUNAS_CONTRATO = ("id", "codigo_demanda", "descricao", "contratado", "numero", "vigencia_inicial",
+                     "vigencia_final", "valor_estimado", "total_contrato", "instituicao")
+_COLUNAS_DEMANDA = ("solicitante", "status", "nup_sei", "oficio", "data_entrada")
+
+
+def _sql_contratos(tipo, filtro):
+    colunas = ", ".join(f"c.{coluna}" if coluna else "NULL" for coluna in _COLUNAS_TIPO[tipo])
+    return f"""
+        SELECT c.id, c.codigo_demanda, {colunas}, c.valor_estimado, c.total_contrato, c.instituicao,
+               d.codigo, {", ".join(f"d.{coluna}" for coluna in _COLUNAS_DEMANDA)}
+        FROM {tipo} c
+        LEFT JOIN demanda d ON d.codigo = c.codigo_demanda
+        {filtro}
+        ORDER BY c.id
+    """
+
+
+def get_contratos_extrato(tipos=None, codigo_demanda=None, ids=None):
+    """Contratos com a demanda vinculada e os aditivos, para a geração dos extratos
+
+    Args:
+        tipos: tipos de contrato (padrão: os três)
+        codigo_demanda: apenas os contratos desta demanda
+        ids: apenas estes ids (usado com um único tipo)
+
+    Returns:
+        list: dicts com tipo, as colunas de _COLUNAS_CONTRATO, "demanda" (dict
+              ou None se não houver demanda vinculada) e "aditivos" (em ordem de
+              cadastro, no formato de get_aditivo_history)
+    """
+    contratos = []
+    conn = get_connection()
+    try:
+        for tipo in tipos or TIPOS_CONTRATO:
+            if tipo not in _COLUNAS_TIPO:
+                raise ValueError(f"Tipo de contrato inválido: {tipo}")
+            condicoes, parametros = [], []
+            if codigo_demanda is not None:
+                condicoes.append("c.codigo_demanda = ?")
+                parametros.append(codigo_demanda)
+            if ids is not None:
+                ids = [int(id_contrato) for id_contrato in ids]
+                condicoes.append(f"c.id IN ({','.join('?' for _ in ids)})")
+                parametros.extend(ids)
+            filtro = "WHERE " + " AND ".join(condicoes) if condicoes else ""
+            for linha in conn.execute(_sql_contratos(tipo, filtro), parametros).fetchall():
+                contrato = dict(zip(_COLUNAS_CONTRATO, linha))
+                contrato["tipo"] = tipo
+                codigo = linha[len(_COLUNAS_CONTRATO)]
+                contrato["demanda"] = None if codigo is None else dict(
+                    zip(("codigo",) + _COLUNAS_DEMANDA, linha[len(_COLUNAS_CONTRATO):]))
+                contratos.append(contrato)
+    finally:
+        conn.close()
+
+    for tipo in tipos or TIPOS_CONTRATO:
+        do_tipo = [contrato for contrato in contratos if contrato["tipo"] == tipo]
+        historico = get_aditivo_history(tipo, [contrato["id"] for contrato in do_tipo])
+        for contrato in do_tipo:
+            contrato["aditivos"] = historico[contrato["id"]]
+    return contratos
@@ -0,0 +1,263 @@
+# models/fila_escrita.py
+"""Fila de escrita com uma única thread gravadora e commit em grupo
+
+Sem a fila, cada create_*/update_*/delete_* e cada log_action abre uma
+conexão e confirma a sua própria transação: um fsync por gravação e disputa
+pela trava de escrita quando várias threads (ou o serviço da API) gravam ao
+mesmo tempo.
+
+Com a fila ativa (ativar_fila_escrita), db_manager.executar_escrita envia a
+tarefa para a thread escritora, dona da única conexão de escrita. As tarefas
+que chegam dentro de uma janela de alguns milissegundos são executadas na
+mesma transação, cada uma em um SAVEPOINT próprio: o erro de uma tarefa
+desfaz só essa tarefa e é devolvido apenas a quem a enviou. Cada chamador
+recebe o seu resultado (p.ex. o lastrowid) por um Future.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from . import db_manager
+from utils.desempenho import resumir_tempos
+
+# Tempo que a thread escritora aguarda por mais tarefas antes de confirmar
+JANELA_MS = 2.0
+
+# Máximo de tarefas em uma transação
+MAXIMO_LOTE = 256
+
+# Quantidade de lotes considerados nas estatísticas de latência
+AMOSTRAS_METRICAS = 1000
+
+_PARAR = object()
+
+
+class FilaEscrita:
+    """Thread escritora que agrupa as tarefas de escrita em transações
+
+    Uma tarefa é uma função que recebe a conexão e executa as instruções,
+    sem chamar commit/rollback (a fila controla a transação).
+    """
+
+    def __init__(self, janela_ms=JANELA_MS, maximo_lote=MAXIMO_LOTE):
+        self.janela = janela_ms / 1000
+        self.maximo_lote = maximo_lote
+        self._fila = queue.Queue()
+        self._thread = None
+        self._conexao = None
+        self._caminho = None
+        self._trava = threading.Lock()
+        self._tarefas = 0
+        self._falhas = 0
+        self._lotes = 0
+        self._maior_lote = 0
+        self._commits_ms = deque(maxlen=AMOSTRAS_METRICAS)
+        self._lotes_ms = deque(maxlen=AMOSTRAS_METRICAS)
+        self._esperas_ms = deque(maxlen=AMOSTRAS_METRICAS)
+
+    def iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name="fila-escrita", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        """Conclui as tarefas já enviadas e encerra a thread escritora"""
+        if self._thread is not None:
+            self._fila.put(_PARAR)
+            self._thread.join()
+            self._thread = None
+
+    def na_thread_escritora(self):
+        return threading.current_thread() is self._thread
+
+    def enviar(self, tarefa):
+        """Enfileira a tarefa sem aguardar
+
+        Returns:
+            Future com o retorno da tarefa (ou a exceção que ela levantou)
+        """
+        futuro = Future()
+        self._fila.put((tarefa, futuro, time.perf_counter()))
+        return futuro
+
+    def executar(self, tarefa):
+        """Enfileira a tarefa e aguarda o commit; retorna o resultado da tarefa
+
+        Chamada de dentro de outra tarefa, executa na transação corrente.
+        """
+        if self.na_thread_escritora():
+            return tarefa(self._conexao)
+        return self.enviar(tarefa).result()
+
+    def _obter_conexao(self):
+        if self._conexao is None or self._caminho != db_manager.DB_PATH:
+            if self._conexao is not None:
+                self._conexao.close()
+            self._conexao = db_manager.get_connection()
+            self._caminho = db_manager.DB_PATH
+        # Transações controladas pela fila (BEGIN IMMEDIATE ... COMMIT)
+        self._conexao.isolation_level = None
+        return self._conexao
+
+    def _descartar_conexao(self):
+        conexao, self._conexao = self._conexao, None
+        if conexao is not None:
+            try:
+                conexao.close()
+            except Exception:
+                pass
+
+    def _desfazer(self, conn):
+        """Desfaz a transação do lote; se nem isso for possível, a conexão é descartada"""
+        try:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+        except Exception:
+            self._descartar_conexao()
+
+    def _executar(self):
+        while True:
+            item = self._fila.get()
+            if item is _PARAR:
+                break
+            lote = [item]
+            parar = False
+            limite = time.perf_counter() + self.janela
+            while len(lote) < self.maximo_lote:
+                restante = limite - time.perf_counter()
+                try:
+                    item = self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _PARAR:
+                    parar = True
+                    break
+                lote.append(item)
+            self._processar(lote)
+            if parar:
+                break
+        self._descartar_conexao()
+
+    def _processar(self, lote):
+        inicio = time.perf_counter()
+        pendentes = [(tarefa, futuro) for tarefa, futuro, enfileirada in lote
+                     if futuro.set_running_or_notify_cancel()]
+        with self._trava:
+            self._esperas_ms.extend((inicio - enfileirada) * 1000 for _, _, enfileirada in lote)
+        if not pendentes:
+            return
+
+        try:
+            conn = self._obter_conexao()
+            conn.execute("BEGIN IMMEDIATE")
+        except Exception as erro:
+            self._descartar_conexao()
+            for _, futuro in pendentes:
+                futuro.set_exception(erro)
+            self._registrar(len(pendentes), len(pendentes), inicio, inicio)
+            return
+
+        resultados = []
+        # Falha no controle da transação (SAVEPOINT, RELEASE, novo BEGIN): o lote inteiro falha
+        erro_lote, restantes = None, []
+        for indice, (tarefa, futuro) in enumerate(pendentes):
+            try:
+                conn.execute("SAVEPOINT tarefa")
+            except Exception as erro:
+                erro_lote, restantes = erro, pendentes[indice:]
+                break
+            try:
+                resultado = tarefa(conn)
+            except Exception as erro:
+                resultados.append((futuro, None, erro))
+                try:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK TO tarefa")
+                        conn.execute("RELEASE tarefa")
+                    else:
+                        # O SQLite desfez a transação inteira (p.ex. disco cheio): as
+                        # tarefas anteriores do lote também foram perdidas
+                        resultados = [(f, None, erro) for f, _, _ in resultados]
+                        conn.execute("BEGIN IMMEDIATE")
+                except Exception as erro_transacao:
+                    erro_lote, restantes = erro_transacao, pendentes[indice + 1:]
+                    break
+            else:
+                try:
+                    conn.execute("RELEASE tarefa")
+                except Exception as erro:
+                    erro_lote, restantes = erro, pendentes[indice:]
+                    break
+                resultados.append((futuro, resultado, None))
+
+        inicio_commit = time.perf_counter()
+        if erro_lote is not None:
+            resultados = [(futuro, None, erro or erro_lote) for futuro, _, erro in resultados]
+            resultados += [(futuro, None, erro_lote) for _, futuro in restantes]
+            self._desfazer(conn)
+        else:
+            try:
+                conn.execute("COMMIT")
+            except Exception as erro:
+                resultados = [(futuro, None, erro) for futuro, _, _ in resultados]
+                self._desfazer(conn)
+        falhas = sum(1 for _, _, erro in resultados if erro is not None)
+        self._registrar(len(resultados), falhas, inicio, inicio_commit)
+
+        for futuro, resultado, erro in resultados:
+            if erro is None:
+                futuro.set_result(resultado)
+            else:
+                futuro.set_exception(erro)
+
+    def _registrar(self, tarefas, falhas, inicio, inicio_commit):
+        fim = time.perf_counter()
+        with self._trava:
+            self._tarefas += tarefas
+            self._falhas += falhas
+            self._lotes += 1
+            self._maior_lote = max(self._maior_lote, tarefas)
+            self._commits_ms.append((fim - inicio_commit) * 1000)
+            self._lotes_ms.append((fim - inicio) * 1000)
+
+    def metricas(self):
+        """Profundidade da fila, tamanho dos lotes e latências (últimos lotes)
+
+        Returns:
+            dict: profundidade, tarefas, falhas, lotes, tarefas_por_lote, maior_lote,
+                  espera_fila, lote e commit (estatísticas de resumir_tempos, em ms)
+        """
+        with self._trava:
+            return {
+                "profundidade": self._fila.qsize(),
+                "tarefas": self._tarefas,
+                "falhas": self._falhas,
+                "lotes": self._lotes,
+                "tarefas_por_lote": round(self._tarefas / self._lotes, 2) if self._lotes else 0,
+                "maior_lote": self._maior_lote,
+                "espera_fila": resumir_tempos(list(self._esperas_ms)),
+                "lote": resumir_tempos(list(self._lotes_ms)),
+                "commit": resumir_tempos(list(self._commits_ms)),
+            }
+
+
+def ativar_fila_escrita(janela_ms=JANELA_MS, maximo_lote=MAXIMO_LOTE):
+    """Passa a enviar todas as gravações de executar_escrita para a thread escritora"""
+    if db_manager._fila_escrita is None:
+        db_manager._fila_escrita = FilaEscrita(janela_ms, maximo_lote).iniciar()
+    return db_manager._fila_escrita
+
+
+def desativar_fila_escrita():
+    """Conclui as gravações pendentes e volta a gravar por conexões próprias"""
+    fila, db_manager._fila_escrita = db_manager._fila_escrita, None
+    if fila is not None:
+        fila.parar()
+
+
+def fila_escrita_ativa():
+    """Retorna a FilaEscrita ativa ou None"""
+    return db_manager._fila_escrita
@@ -0,0 +1,71 @@
+# models/indices_model.py
+"""Índices criados a partir das sugestões do assessor de índices
+
+A criação fica registrada em indices_aplicados (migração 7): só os índices
+registrados ali podem ser removidos por remover_indice_aplicado, o que
+protege os índices das migrações.
+"""
+from datetime import datetime
+
+from .db_manager import get_connection, executar_escrita
+
+
+def aplicar_indices(sugestoes):
+    """Cria os índices sugeridos e os registra, tudo em uma transação
+
+    Args:
+        sugestoes: dicts com nome, tabela, definicao (CREATE INDEX ...) e,
+            opcionalmente, beneficio_ms (ver utils.assessor_indices.analisar)
+
+    Returns:
+        list: nomes dos índices criados
+    """
+    sugestoes = list(sugestoes)
+    for sugestao in sugestoes:
+        if not sugestao["definicao"].lstrip().upper().startswith("CREATE INDEX"):
+            raise ValueError(f"Definição inválida para {sugestao['nome']}: {sugestao['definicao']}")
+
+    def gravar(conn):
+        cursor = conn.cursor()
+        agora = datetime.now().isoformat(timespec="seconds")
+        for sugestao in sugestoes:
+            cursor.execute(sugestao["definicao"])
+            cursor.execute("""
+            INSERT OR REPLACE INTO indices_aplicados (nome, tabela, definicao, beneficio_ms, aplicado_em)
+            VALUES (?, ?, ?, ?, ?)
+            """, (sugestao["nome"], sugestao["tabela"], sugestao["definicao"],
+                  sugestao.get("beneficio_ms"), agora))
+        return [sugestao["nome"] for sugestao in sugestoes]
+    return executar_escrita(gravar)
+
+
+def get_indices_aplicados():
+    """Índices registrados, com a indicação de que ainda existem no banco
+
+    Returns:
+        list: tuplas (nome, tabela, definicao, beneficio_ms, aplicado_em, existe)
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT i.nome, i.tabela, i.definicao, i.beneficio_ms, i.aplicado_em,
+               EXISTS (SELECT 1 FROM sqlite_master m WHERE m.type = 'index' AND m.name = i.nome)
+        FROM indices_aplicados i
+        ORDER BY i.aplicado_em, i.nome
+        """)
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def remover_indice_aplicado(nome):
+    """Remove um índice criado pelo assessor (ValueError se não estiver registrado)"""
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM indices_aplicados WHERE nome = ?", (nome,))
+        if cursor.fetchone() is None:
+            raise ValueError(f"O índice {nome} não foi criado pelo assessor de índices")
+        cursor.execute(f'DROP INDEX IF EXISTS "{nome}"')
+        cursor.execute("DELETE FROM indices_aplicados WHERE nome = ?", (nome,))
+    executar_escrita(gravar)
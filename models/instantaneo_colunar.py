@@ -0,0 +1,560 @@
+# models/instantaneo_colunar.py
+"""Instantâneo colunar para agregações de relatórios e do dashboard
+
+Somas e contagens por instituição, fornecedor, tipo de aditivo etc. percorrem
+as tabelas linha a linha no SQLite a cada abertura de tela. Este módulo mantém
+uma cópia colunar das colunas numéricas e categóricas de eventos, carta_acordo,
+produtos_servicos, aditivos e custeio em arquivos .npy ao lado do banco:
+
+- cada coluna é um vetor NumPy aberto com mmap (carga quase instantânea: só as
+  páginas usadas são lidas do disco);
+- textos são codificados por dicionário (vetor de códigos int32 + lista de
+  valores, com o código 0 reservado para NULL);
+- datas dd/mm/aaaa viram inteiros aaaammdd (0 quando vazias ou inválidas).
+
+A atualização é incremental: lê em log_alteracoes os registros alterados desde
+o último seq incorporado e regrava apenas as tabelas afetadas, cada uma numa
+nova pasta de geração; o manifesto é trocado por último (os.replace), então
+leitores nunca veem uma tabela pela metade. Log podado, banco substituído ou
+migração nova provocam a reconstrução completa.
+
+NumPy é opcional: sem ele, disponivel() retorna False e agrupar_sql produz o
+mesmo resultado com GROUP BY no banco.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+from . import db_manager
+from .sessao_relatorio import SessaoRelatorio
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VERSAO_FORMATO = 1
+
+INTEIRO = "inteiro"
+REAL = "real"
+CATEGORIA = "categoria"
+DATA = "data"
+
+# Colunas exportadas por tabela (as ausentes em bancos antigos são ignoradas)
+COLUNAS_ANALITICAS = {
+    "eventos": {
+        "codigo_demanda": INTEIRO, "valor_estimado": REAL, "total_contrato": REAL,
+        "instituicao": CATEGORIA, "instrumento": CATEGORIA, "subprojeto": CATEGORIA, "ta": CATEGORIA,
+        "pta": CATEGORIA, "acao": CATEGORIA, "resultado": CATEGORIA, "meta": CATEGORIA,
+        "fornecedor": CATEGORIA,
+    },
+    "carta_acordo": {
+        "codigo_demanda": INTEIRO, "valor_estimado": REAL, "total_contrato": REAL,
+        "instituicao": CATEGORIA, "instrumento": CATEGORIA, "subprojeto": CATEGORIA, "ta": CATEGORIA,
+        "pta": CATEGORIA, "acao": CATEGORIA, "resultado": CATEGORIA, "meta": CATEGORIA,
+        "instituicao_2": CATEGORIA, "vigencia_inicial": DATA, "vigencia_final": DATA,
+    },
+    "produtos_servicos": {
+        "codigo_demanda": INTEIRO, "valor_estimado": REAL, "total_contrato": REAL,
+        "instituicao": CATEGORIA, "instrumento": CATEGORIA, "subprojeto": CATEGORIA, "ta": CATEGORIA,
+        "pta": CATEGORIA, "acao": CATEGORIA, "resultado": CATEGORIA, "meta": CATEGORIA,
+        "fornecedor": CATEGORIA, "modalidade": CATEGORIA, "vigencia_inicial": DATA, "vigencia_final": DATA,
+    },
+    "aditivos": {
+        "id_contrato": INTEIRO, "valor_aditivo": REAL, "tipo_contrato": CATEGORIA, "tipo_aditivo": CATEGORIA,
+        "nova_vigencia_final": DATA, "data_registro": DATA,
+    },
+    "custeio": {
+        "instituicao_parceira": CATEGORIA, "cod_projeto": CATEGORIA, "cod_ta": CATEGORIA,
+        "resultado": CATEGORIA, "subprojeto": CATEGORIA,
+    },
+}
+
+# Acima desta fração de linhas alteradas, a tabela é relida inteira
+FRACAO_RECONSTRUCAO = 0.25
+
+# Pastas de gerações antigas só são apagadas depois deste tempo (outro processo
+# pode ter acabado de gravar o manifesto que as referencia)
+IDADE_LIMPEZA_S = 60
+
+# Até este número de combinações de códigos, o agrupamento conta direto pela
+# chave (bincount); acima dele, as chaves distintas são ordenadas (np.unique)
+LIMITE_CONTAGEM_DIRETA = 1 << 22
+
+# Linhas lidas por vez do banco e ids por consulta IN (...)
+LOTE_LEITURA = 10000
+LOTE_IDS = 500
+
+
+def disponivel():
+    """Indica se o NumPy está instalado (sem ele não há instantâneo colunar)"""
+    return np is not None
+
+
+def pasta_padrao(caminho_banco=None):
+    """Pasta do instantâneo ao lado do banco: contrato.db -> contrato_analitico/"""
+    return os.path.splitext(os.path.abspath(caminho_banco or db_manager.DB_PATH))[0] + "_analitico"
+
+
+def data_numero(texto):
+    """'dd/mm/aaaa' -> aaaammdd (0 quando vazia ou fora do formato)"""
+    if isinstance(texto, str) and len(texto) == 10 and texto[2] == "/" and texto[5] == "/":
+        digitos = texto[6:] + texto[3:5] + texto[:2]
+        if digitos.isdigit():
+            return int(digitos)
+    return 0
+
+
+def _colunas_existentes(conn, tabela):
+    existentes = {linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")}
+    return {nome: tipo for nome, tipo in COLUNAS_ANALITICAS[tabela].items() if nome in existentes}
+
+
+def _ler_linhas(conn, tabela, colunas, ids=None):
+    """Lê id e as colunas pedidas (todas as linhas ou apenas os ids informados)"""
+    nomes = list(colunas)
+    valores = {nome: [] for nome in ["id"] + nomes}
+    sql = f"SELECT id, {', '.join(nomes)} FROM {tabela}"
+    if ids is None:
+        consultas = [(sql + " ORDER BY id", ())]
+    else:
+        ids = sorted(ids)
+        consultas = [(sql + f" WHERE id IN ({', '.join('?' * len(lote))})", lote)
+                     for lote in (ids[i:i + LOTE_IDS] for i in range(0, len(ids), LOTE_IDS))]
+    for consulta, parametros in consultas:
+        cursor = conn.execute(consulta, parametros)
+        while True:
+            bloco = cursor.fetchmany(LOTE_LEITURA)
+            if not bloco:
+                break
+            for indice, lista in enumerate(valores.values()):
+                lista.extend(linha[indice] for linha in bloco)
+    return valores
+
+
+def _marcador(conn, seq):
+    """Linha de log_alteracoes com o seq dado, para reconhecer o banco na próxima atualização
+
+    Um backup restaurado (ou outro banco no mesmo caminho) pode chegar ao mesmo
+    seq com alterações diferentes: a linha gravada nesse seq não coincide.
+    """
+    if not seq:
+        return None
+    linha = conn.execute("SELECT * FROM log_alteracoes WHERE seq = ?", (seq,)).fetchone()
+    return list(linha) if linha else None
+
+
+def _codificar(valores, colunas, dicionarios):
+    """Converte as listas lidas em vetores; os dicionários recebem os textos novos"""
+    vetores = {"id": np.array(valores["id"], dtype=np.int64)}
+    for nome, tipo in colunas.items():
+        lista = valores[nome]
+        if tipo == INTEIRO:
+            vetores[nome] = np.array([v if isinstance(v, int) else 0 for v in lista], dtype=np.int64)
+        elif tipo == REAL:
+            vetores[nome] = np.array([v if isinstance(v, (int, float)) else np.nan for v in lista],
+                                     dtype=np.float64)
+        elif tipo == DATA:
+            vetores[nome] = np.array([data_numero(v) for v in lista], dtype=np.int32)
+        else:
+            dicionario = dicionarios.setdefault(nome, [None])
+            codigos = {valor: codigo for codigo, valor in enumerate(dicionario)}
+            vetor = np.empty(len(lista), dtype=np.int32)
+            for posicao, valor in enumerate(lista):
+                if valor is not None and not isinstance(valor, str):
+                    valor = str(valor)
+                codigo = codigos.get(valor)
+                if codigo is None:
+                    codigo = codigos[valor] = len(dicionario)
+                    dicionario.append(valor)
+                vetor[posicao] = codigo
+            vetores[nome] = vetor
+    return vetores
+
+
+class TabelaColunar:
+    """Colunas de uma tabela no instantâneo, com agregações vetorizadas"""
+
+    def __init__(self, nome, pasta, tipos, linhas):
+        self.nome = nome
+        self.pasta = pasta
+        self.tipos = dict(tipos)
+        self.linhas = linhas
+        self._vetores = {}
+        self._dicionarios = {}
+
+    def coluna(self, nome):
+        """Vetor da coluna (códigos no caso das categóricas), aberto com mmap"""
+        vetor = self._vetores.get(nome)
+        if vetor is None:
+            caminho = os.path.join(self.pasta, f"{nome}.npy")
+            # mmap não aceita vetores vazios
+            vetor = np.load(caminho, mmap_mode="r" if self.linhas else None)
+            self._vetores[nome] = vetor
+        return vetor
+
+    def dicionario(self, nome):
+        """Valores de uma coluna categórica, na posição do seu código"""
+        dicionario = self._dicionarios.get(nome)
+        if dicionario is None:
+            with open(os.path.join(self.pasta, f"{nome}.json"), encoding="utf-8") as arquivo:
+                dicionario = self._dicionarios[nome] = json.load(arquivo)
+        return dicionario
+
+    def _tipo(self, nome):
+        if nome not in self.tipos:
+            raise ValueError(f"Coluna {nome} não está no instantâneo de {self.nome}")
+        return self.tipos[nome]
+
+    def mascara(self, filtros=None):
+        """Linhas que atendem aos filtros (mesma sintaxe de agrupar)"""
+        mascara = np.ones(self.linhas, dtype=bool)
+        for nome, condicao in (filtros or {}).items():
+            tipo = self._tipo(nome)
+            vetor = self.coluna(nome)
+            if tipo == CATEGORIA:
+                valores = condicao if isinstance(condicao, (list, set, tuple)) else [condicao]
+                posicoes = {valor: codigo for codigo, valor in enumerate(self.dicionario(nome))}
+                codigos = [posicoes[valor] for valor in valores if valor in posicoes]
+                mascara &= np.isin(vetor, codigos)
+            elif isinstance(condicao, tuple):
+                minimo, maximo = (data_numero(v) if tipo == DATA and isinstance(v, str) else v
+                                  for v in condicao)
+                if minimo is not None:
+                    mascara &= vetor >= minimo
+                if maximo is not None:
+                    mascara &= vetor <= maximo
+            else:
+                valor = data_numero(condicao) if tipo == DATA and isinstance(condicao, str) else condicao
+                mascara &= vetor == valor
+        return mascara
+
+    def agrupar(self, por, somar=(), filtros=None):
+        """Quantidade de linhas e somas por combinação das colunas categóricas em `por`
+
+        Args:
+            por: coluna categórica ou lista delas
+            somar: colunas numéricas a somar (NULL conta como zero)
+            filtros: {coluna: valor} ou {coluna: [valores]} nas categóricas;
+                     {coluna: valor} ou {coluna: (mínimo, máximo)} nas demais,
+                     com None para limite aberto e datas como 'dd/mm/aaaa'
+
+        Returns:
+            list: dicts com os valores de `por`, quantidade e soma_<coluna>,
+                  ordenados pelos valores de `por`
+        """
+        por = [por] if isinstance(por, str) else list(por)
+        for nome in por:
+            if self._tipo(nome) != CATEGORIA:
+                raise ValueError(f"Agrupamento apenas por colunas categóricas: {nome}")
+        for nome in somar:
+            if self._tipo(nome) not in (INTEIRO, REAL):
+                raise ValueError(f"Soma apenas de colunas numéricas: {nome}")
+
+        selecionadas = np.flatnonzero(self.mascara(filtros)) if filtros else None
+
+        def valores(nome):
+            vetor = self.coluna(nome)
+            return vetor if selecionadas is None else vetor[selecionadas]
+
+        # Uma chave inteira por combinação de códigos; bincount faz a soma por grupo
+        chave = np.zeros(self.linhas if selecionadas is None else len(selecionadas), dtype=np.int64)
+        tamanhos = [len(self.dicionario(nome)) for nome in por]
+        for nome, tamanho in zip(por, tamanhos):
+            chave = chave * tamanho + valores(nome)
+        combinacoes = int(np.prod(tamanhos))
+        if combinacoes <= LIMITE_CONTAGEM_DIRETA:
+            # Poucas combinações possíveis: contagem direta pela chave, sem ordenar
+            quantidades = np.bincount(chave, minlength=combinacoes)
+            grupos = np.flatnonzero(quantidades)
+            quantidades = quantidades[grupos]
+            indice, tamanho_indice = chave, combinacoes
+        else:
+            grupos, indice = np.unique(chave, return_inverse=True)
+            quantidades = np.bincount(indice, minlength=len(grupos))
+            tamanho_indice = len(grupos)
+        somas = {}
+        for nome in somar:
+            pesos = np.nan_to_num(valores(nome).astype(np.float64))
+            soma = np.bincount(indice, weights=pesos, minlength=tamanho_indice)
+            somas[nome] = soma[grupos] if combinacoes <= LIMITE_CONTAGEM_DIRETA else soma
+
+        resultado = []
+        for posicao, grupo in enumerate(grupos.tolist()):
+            linha = {}
+            for nome, tamanho in zip(reversed(por), reversed(tamanhos)):
+                grupo, codigo = divmod(grupo, tamanho)
+                linha[nome] = self.dicionario(nome)[codigo]
+            linha = {nome: linha[nome] for nome in por}
+            linha["quantidade"] = int(quantidades[posicao])
+            for nome in somar:
+                linha[f"soma_{nome}"] = float(somas[nome][posicao])
+            resultado.append(linha)
+        resultado.sort(key=lambda item: tuple((valor is not None, valor or "") for valor in
+                                              (item[nome] for nome in por)))
+        return resultado
+
+    def _carregar_tudo(self):
+        """Vetores copiados para a memória e dicionários (base de uma atualização)"""
+        vetores = {nome: np.array(self.coluna(nome)) for nome in ["id"] + list(self.tipos)}
+        dicionarios = {nome: list(self.dicionario(nome)) for nome, tipo in self.tipos.items() if tipo == CATEGORIA}
+        return vetores, dicionarios
+
+
+class InstantaneoColunar:
+    """Instantâneo gravado em disco (abrir) e sua atualização (atualizar)"""
+
+    def __init__(self, pasta=None):
+        self.pasta = pasta or pasta_padrao()
+        self.manifesto = None
+        self._tabelas = {}
+
+    @property
+    def ultimo_seq(self):
+        return self.manifesto["ultimo_seq"] if self.manifesto else None
+
+    def abrir(self):
+        """Lê o manifesto; retorna False se ainda não há instantâneo gravado"""
+        caminho = os.path.join(self.pasta, "manifesto.json")
+        try:
+            with open(caminho, encoding="utf-8") as arquivo:
+                manifesto = json.load(arquivo)
+        except (OSError, ValueError):
+            self.manifesto = None
+            return False
+        if manifesto.get("versao_formato") != VERSAO_FORMATO:
+            self.manifesto = None
+            return False
+        self.manifesto = manifesto
+        self._tabelas = {}
+        return True
+
+    def tabela(self, nome):
+        """TabelaColunar de uma das tabelas de COLUNAS_ANALITICAS"""
+        if self.manifesto is None:
+            raise RuntimeError("Instantâneo colunar não carregado")
+        tabela = self._tabelas.get(nome)
+        if tabela is None:
+            info = self.manifesto["tabelas"][nome]
+            tabela = TabelaColunar(nome, os.path.join(self.pasta, info["pasta"]), info["colunas"], info["linhas"])
+            self._tabelas[nome] = tabela
+        return tabela
+
+    def agrupar(self, tabela, por, somar=(), filtros=None):
+        """Atalho para tabela(tabela).agrupar(...)"""
+        return self.tabela(tabela).agrupar(por, somar, filtros)
+
+    def desatualizado(self):
+        """Indica se há alterações no banco ainda não incorporadas (leitura barata do último seq)"""
+        return self.manifesto is None or db_manager.obter_ultimo_seq_alteracoes() != self.ultimo_seq
+
+    def atualizar(self, completo=False):
+        """Incorpora as alterações registradas em log_alteracoes desde a última atualização
+
+        As leituras são feitas numa SessaoRelatorio: dados e seq vêm do mesmo
+        instantâneo do banco e quem estiver gravando não espera.
+
+        Args:
+            completo: relê todas as tabelas mesmo que o log permita a atualização incremental
+
+        Returns:
+            dict: modo ('nenhum', 'incremental' ou 'completo'), tabelas regravadas,
+                  alteracoes incorporadas, ultimo_seq e duracao_ms
+        """
+        inicio = time.perf_counter()
+        if not completo and self.manifesto is not None and not self.desatualizado():
+            return {"modo": "nenhum", "tabelas": [], "alteracoes": 0, "ultimo_seq": self.ultimo_seq,
+                    "duracao_ms": (time.perf_counter() - inicio) * 1000}
+
+        os.makedirs(self.pasta, exist_ok=True)
+        with SessaoRelatorio() as sessao:
+            conn = sessao.conexao
+            versao_schema = db_manager.obter_versao_schema(conn)
+            try:
+                menor_seq, ultimo_seq = conn.execute(
+                    "SELECT MIN(seq), COALESCE(MAX(seq), 0) FROM log_alteracoes").fetchone()
+            except Exception:
+                # Sem log não há como saber o que mudou
+                menor_seq, ultimo_seq = None, None
+
+            anterior = self.manifesto
+            incremental = (
+                not completo and anterior is not None and ultimo_seq is not None
+                and anterior.get("versao_schema") == versao_schema
+                and anterior["ultimo_seq"] is not None and anterior["ultimo_seq"] <= ultimo_seq
+                # Seqs seguintes ao último incorporado já podados: não há como reproduzir
+                and (menor_seq is None or menor_seq <= anterior["ultimo_seq"] + 1)
+                # Banco substituído: outro arquivo ou outro histórico até o último seq incorporado
+                and anterior.get("banco") == os.path.abspath(db_manager.DB_PATH)
+                and anterior.get("marcador") is not None
+                and _marcador(conn, anterior["ultimo_seq"]) == anterior["marcador"]
+            )
+
+            alterados = {}
+            if incremental:
+                for tabela, id_registro in conn.execute(
+                    "SELECT tabela, id_registro FROM log_alteracoes WHERE seq > ? AND seq <= ?",
+                    (anterior["ultimo_seq"], ultimo_seq),
+                ):
+                    if tabela in COLUNAS_ANALITICAS:
+                        alterados.setdefault(tabela, set()).add(id_registro)
+
+            tabelas_manifesto = {}
+            regravadas = []
+            for tabela in COLUNAS_ANALITICAS:
+                colunas = _colunas_existentes(conn, tabela)
+                info = anterior["tabelas"].get(tabela) if incremental else None
+                if info is not None and info["colunas"] != colunas:
+                    info = None
+                if info is not None and tabela not in alterados:
+                    tabelas_manifesto[tabela] = info
+                    continue
+
+                if info is not None and len(alterados[tabela]) <= max(info["linhas"], 1) * FRACAO_RECONSTRUCAO:
+                    vetores, dicionarios = self._mesclar(conn, tabela, colunas, alterados[tabela])
+                else:
+                    dicionarios = {}
+                    vetores = _codificar(_ler_linhas(conn, tabela, colunas), colunas, dicionarios)
+                tabelas_manifesto[tabela] = self._gravar_tabela(tabela, colunas, vetores, dicionarios)
+                regravadas.append(tabela)
+            marcador = _marcador(conn, ultimo_seq) if ultimo_seq is not None else None
+
+        manifesto = {
+            "versao_formato": VERSAO_FORMATO,
+            "banco": os.path.abspath(db_manager.DB_PATH),
+            "versao_schema": versao_schema,
+            "ultimo_seq": ultimo_seq,
+            "marcador": marcador,
+            "atualizado_em": datetime.now().isoformat(timespec="seconds"),
+            "tabelas": tabelas_manifesto,
+        }
+        temporario = os.path.join(self.pasta, f"manifesto.{uuid.uuid4().hex[:8]}.tmp")
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+        os.replace(temporario, os.path.join(self.pasta, "manifesto.json"))
+        self.manifesto = manifesto
+        self._tabelas = {}
+        self._limpar_geracoes()
+
+        return {
+            "modo": "incremental" if incremental else "completo",
+            "tabelas": regravadas,
+            "alteracoes": sum(len(ids) for ids in alterados.values()),
+            "ultimo_seq": ultimo_seq,
+            "duracao_ms": (time.perf_counter() - inicio) * 1000,
+        }
+
+    def _mesclar(self, conn, tabela, colunas, ids_alterados):
+        """Vetores atuais sem as linhas alteradas, mais o estado novo delas (excluídas somem)"""
+        vetores, dicionarios = self.tabela(tabela)._carregar_tudo()
+        novos = _codificar(_ler_linhas(conn, tabela, colunas, ids_alterados), colunas, dicionarios)
+        manter = ~np.isin(vetores["id"], np.fromiter(ids_alterados, dtype=np.int64))
+        ordem = np.argsort(np.concatenate([vetores["id"][manter], novos["id"]]), kind="stable")
+        mesclados = {nome: np.concatenate([vetor[manter], novos[nome]])[ordem] for nome, vetor in vetores.items()}
+        return mesclados, dicionarios
+
+    def _gravar_tabela(self, tabela, colunas, vetores, dicionarios):
+        nome_pasta = f"{tabela}.{uuid.uuid4().hex[:8]}"
+        pasta = os.path.join(self.pasta, nome_pasta)
+        os.makedirs(pasta)
+        for nome, vetor in vetores.items():
+            np.save(os.path.join(pasta, f"{nome}.npy"), vetor)
+        for nome, dicionario in dicionarios.items():
+            with open(os.path.join(pasta, f"{nome}.json"), "w", encoding="utf-8") as arquivo:
+                json.dump(dicionario, arquivo, ensure_ascii=False)
+        return {"pasta": nome_pasta, "linhas": int(len(vetores["id"])), "colunas": colunas}
+
+    def _limpar_geracoes(self):
+        """Apaga pastas de gerações que o manifesto não referencia mais"""
+        em_uso = {info["pasta"] for info in self.manifesto["tabelas"].values()}
+        limite = time.time() - IDADE_LIMPEZA_S
+        for nome in os.listdir(self.pasta):
+            caminho = os.path.join(self.pasta, nome)
+            if nome in em_uso or not os.path.isdir(caminho):
+                continue
+            try:
+                if os.path.getmtime(caminho) < limite:
+                    # No Windows falha enquanto outro processo mantém os vetores mapeados
+                    shutil.rmtree(caminho)
+            except OSError:
+                pass
+
+
+def _condicao_sql(nome, tipo, condicao, parametros):
+    expressao = nome
+    if tipo == DATA:
+        # Mesma conversão de data_numero: aaaammdd, ou 0 fora do formato dd/mm/aaaa
+        expressao = (f"(CASE WHEN {nome} GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]' "
+                     f"THEN CAST(substr({nome}, 7, 4) || substr({nome}, 4, 2) || substr({nome}, 1, 2) AS INTEGER) "
+                     f"ELSE 0 END)")
+    elif tipo == INTEIRO:
+        expressao = f"COALESCE({nome}, 0)"
+
+    if tipo == CATEGORIA:
+        valores = list(condicao) if isinstance(condicao, (list, set, tuple)) else [condicao]
+        partes = []
+        textos = [valor for valor in valores if valor is not None]
+        if textos:
+            partes.append(f"{nome} IN ({', '.join('?' * len(textos))})")
+            parametros.extend(textos)
+        if len(textos) < len(valores):
+            partes.append(f"{nome} IS NULL")
+        return "(" + " OR ".join(partes) + ")" if partes else "0"
+    if isinstance(condicao, tuple):
+        partes = []
+        for operador, limite in zip((">=", "<="), condicao):
+            if limite is not None:
+                partes.append(f"{expressao} {operador} ?")
+                parametros.append(data_numero(limite) if tipo == DATA and isinstance(limite, str) else limite)
+        return " AND ".join(partes) or "1"
+    parametros.append(data_numero(condicao) if tipo == DATA and isinstance(condicao, str) else condicao)
+    return f"{expressao} = ?"
+
+
+def agrupar_sql(tabela, por, somar=(), filtros=None):
+    """Mesmo resultado de TabelaColunar.agrupar, calculado com GROUP BY no banco
+
+    Usado quando o NumPy não está instalado ou o instantâneo não pode ser gravado.
+    """
+    tipos = COLUNAS_ANALITICAS[tabela]
+    por = [por] if isinstance(por, str) else list(por)
+    for nome in list(por) + list(somar) + list(filtros or {}):
+        if nome not in tipos:
+            raise ValueError(f"Coluna {nome} não está no instantâneo de {tabela}")
+    for nome in por:
+        if tipos[nome] != CATEGORIA:
+            raise ValueError(f"Agrupamento apenas por colunas categóricas: {nome}")
+    for nome in somar:
+        if tipos[nome] not in (INTEIRO, REAL):
+            raise ValueError(f"Soma apenas de colunas numéricas: {nome}")
+
+    parametros = []
+    condicoes = [_condicao_sql(nome, tipos[nome], condicao, parametros) for nome, condicao in (filtros or {}).items()]
+    colunas = ", ".join(por)
+    somas = "".join(f", TOTAL({nome})" for nome in somar)
+    sql = f"SELECT {colunas}, COUNT(*){somas} FROM {tabela}"
+    if condicoes:
+        sql += " WHERE " + " AND ".join(condicoes)
+    sql += f" GROUP BY {colunas}"
+
+    conn = db_manager.get_connection()
+    try:
+        linhas = conn.execute(sql, parametros).fetchall()
+    finally:
+        conn.close()
+
+    resultado = []
+    for linha in linhas:
+        # Como no instantâneo, valores não textuais das categóricas viram texto
+        item = {nome: linha[posicao] if linha[posicao] is None or isinstance(linha[posicao], str)
+                else str(linha[posicao]) for posicao, nome in enumerate(por)}
+        item["quantidade"] = linha[len(por)]
+        for posicao, nome in enumerate(somar, start=len(por) + 1):
+            item[f"soma_{nome}"] = float(linha[posicao])
+        resultado.append(item)
+    resultado.sort(key=lambda item: tuple((valor is not None, valor or "") for valor in
+                                          (item[nome] for nome in por)))
+    return resultado
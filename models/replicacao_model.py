@@ -0,0 +1,355 @@
+# models/replicacao_model.py
+"""Replicação entre escritórios por pacotes de alterações
+
+Cada escritório mantém o seu contrato.db. Em vez de trocar o arquivo inteiro,
+exporta-se um pacote com as alterações feitas desde a última exportação para
+aquele destino, lidas de log_alteracoes. O pacote é um JSON compactado com
+gzip contendo o estado atual de cada registro alterado (ou a sua exclusão),
+identificado pelo uuid. Referências entre tabelas (codigo_demanda, id_contrato)
+também viajam como uuid, pois os ids locais diferem entre os bancos.
+
+A importação é idempotente e determinística:
+
+- um registro só é sobrescrito se o recebido tiver row_version maior, ou a
+  mesma versão e um resumo (hash) do conteúdo maior; assim os dois escritórios
+  escolhem o mesmo vencedor, em qualquer ordem de importação;
+- exclusões prevalecem sobre edições e ficam em registros_excluidos, para que
+  um pacote antigo não recrie o registro;
+- reaplicar o mesmo pacote não altera nada.
+"""
+import gzip
+import hashlib
+import json
+import platform
+import sqlite3
+from datetime import datetime
+
+from .db_manager import get_connection, obter_versao_schema
+
+FORMATO = "sisproj-alteracoes"
+VERSAO_FORMATO = 1
+
+# Tabelas replicadas, com as tabelas referenciadas antes das que as referenciam
+TABELAS_REPLICADAS = ("demanda", "fornecedores", "titulo_eventos", "custeio",
+                      "carta_acordo", "eventos", "produtos_servicos", "aditivos")
+
+# Colunas que guardam o id local de outra tabela
+REFERENCIAS = {
+    "carta_acordo": {"codigo_demanda": "demanda"},
+    "eventos": {"codigo_demanda": "demanda"},
+    "produtos_servicos": {"codigo_demanda": "demanda"},
+}
+# Em aditivos, a tabela referenciada por id_contrato é a indicada em tipo_contrato
+
+# Colunas locais que não viajam no pacote
+_COLUNAS_CONTROLE = ("uuid", "row_version")
+
+# Quantidade de ids por consulta IN (...)
+TAMANHO_LOTE = 500
+
+
+class HistoricoIndisponivel(Exception):
+    """As alterações pedidas já foram podadas de log_alteracoes; use uma exportação completa"""
+
+
+def _esquema(cursor, tabela):
+    """Retorna (coluna da chave primária, colunas de dados) da tabela"""
+    cursor.execute(f"PRAGMA table_info({tabela})")
+    chave, colunas = "rowid", []
+    for _, nome, _, _, _, pk in cursor.fetchall():
+        if pk:
+            chave = nome
+        elif nome not in _COLUNAS_CONTROLE:
+            colunas.append(nome)
+    return chave, colunas
+
+
+def _resumo(dados):
+    texto = json.dumps(dados, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+class _Tradutor:
+    """Converte ids locais em uuid e vice-versa, com cache por tabela"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.chaves = {}
+        self.uuids = {}
+        self.ids = {}
+
+    def chave(self, tabela):
+        if tabela not in self.chaves:
+            self.chaves[tabela] = _esquema(self.cursor, tabela)[0]
+        return self.chaves[tabela]
+
+    def uuid(self, tabela, id_local):
+        if id_local is None or tabela not in TABELAS_REPLICADAS:
+            return None
+        chave = (tabela, id_local)
+        if chave not in self.uuids:
+            self.cursor.execute(f"SELECT uuid FROM {tabela} WHERE {self.chave(tabela)} = ?", (id_local,))
+            linha = self.cursor.fetchone()
+            self.uuids[chave] = linha[0] if linha else None
+        return self.uuids[chave]
+
+    def id_local(self, tabela, uuid):
+        if uuid is None or tabela not in TABELAS_REPLICADAS:
+            return None
+        chave = (tabela, uuid)
+        if chave not in self.ids:
+            self.cursor.execute(f"SELECT {self.chave(tabela)} FROM {tabela} WHERE uuid = ?", (uuid,))
+            linha = self.cursor.fetchone()
+            self.ids[chave] = linha[0] if linha else None
+        return self.ids[chave]
+
+
+def _dados_exportados(tradutor, tabela, colunas, registro):
+    """Valores de dados de um registro, com as referências trocadas por uuid"""
+    dados = dict(zip(colunas, registro))
+    for coluna, referenciada in REFERENCIAS.get(tabela, {}).items():
+        if coluna in dados:
+            dados[coluna] = tradutor.uuid(referenciada, dados[coluna])
+    if tabela == "aditivos" and "id_contrato" in dados:
+        dados["id_contrato"] = tradutor.uuid(dados.get("tipo_contrato"), dados["id_contrato"])
+    return dados
+
+
+def _dados_importados(tradutor, tabela, dados):
+    """Troca os uuid das referências pelos ids locais
+
+    Returns:
+        tuple: (dados, quantidade de referências não encontradas neste banco)
+    """
+    dados = dict(dados)
+    ausentes = 0
+    referencias = dict(REFERENCIAS.get(tabela, {}))
+    if tabela == "aditivos":
+        referencias["id_contrato"] = dados.get("tipo_contrato")
+    for coluna, referenciada in referencias.items():
+        if dados.get(coluna) is None:
+            continue
+        dados[coluna] = tradutor.id_local(referenciada, dados[coluna])
+        if dados[coluna] is None:
+            ausentes += 1
+    return dados, ausentes
+
+
+def _ler_registros(cursor, tabela, chave, colunas, ids):
+    """Lê os registros atuais (uuid, row_version, colunas...) dos ids informados, em lotes"""
+    ids = list(ids)
+    for inicio in range(0, len(ids), TAMANHO_LOTE):
+        lote = ids[inicio:inicio + TAMANHO_LOTE]
+        marcadores = ",".join("?" for _ in lote)
+        cursor.execute(
+            f"SELECT uuid, row_version, {', '.join(colunas)} FROM {tabela} WHERE {chave} IN ({marcadores})",
+            lote)
+        yield from cursor.fetchall()
+
+
+def exportar_alteracoes(caminho, desde_seq=None, completo=False, destino=None):
+    """Grava em `caminho` um pacote com as alterações posteriores a `desde_seq`
+
+    Args:
+        caminho: arquivo de saída (JSON compactado com gzip)
+        desde_seq: último seq de log_alteracoes já enviado ao destino (None: o
+            salvo para `destino` ou, sem destino, desde o início do log)
+        completo: exporta todos os registros (carga inicial de um escritório
+            ou quando o histórico já foi podado)
+        destino: nome do destino; se informado e desde_seq for None, parte do
+            último seq exportado para ele, que é atualizado ao final
+
+    Returns:
+        dict: resumo com seq_inicial, seq_final, registros, exclusoes e bytes
+
+    Raises:
+        HistoricoIndisponivel: desde_seq é anterior ao início do log
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        # Leitura consistente do log e dos registros
+        cursor.execute("BEGIN")
+        if destino is not None and desde_seq is None:
+            cursor.execute("SELECT ultimo_seq FROM replicacao_destinos WHERE destino = ?", (destino,))
+            linha = cursor.fetchone()
+            desde_seq = linha[0] if linha else 0
+            completo = completo or linha is None
+        desde_seq = desde_seq or 0
+
+        cursor.execute("SELECT COALESCE(MIN(seq), 0), COALESCE(MAX(seq), 0) FROM log_alteracoes")
+        menor_seq, seq_final = cursor.fetchone()
+        seq_final = max(seq_final, desde_seq)
+
+        alterados = {tabela: set() for tabela in TABELAS_REPLICADAS}
+        exclusoes = []
+        if completo:
+            cursor.execute("SELECT uuid, tabela, row_version FROM registros_excluidos")
+            exclusoes = [[tabela, uuid, versao, None] for uuid, tabela, versao in cursor.fetchall()]
+        else:
+            if menor_seq > desde_seq + 1:
+                raise HistoricoIndisponivel(
+                    f"O log começa no seq {menor_seq}; as alterações após {desde_seq} não estão mais disponíveis.")
+            cursor.execute(
+                "SELECT tabela, id_registro, operacao, uuid FROM log_alteracoes WHERE seq > ? AND seq <= ? "
+                "ORDER BY seq", (desde_seq, seq_final))
+            excluidos = {}
+            for tabela, id_registro, operacao, uuid in cursor.fetchall():
+                if tabela not in alterados:
+                    continue
+                if operacao == "excluir":
+                    alterados[tabela].discard(id_registro)
+                    if uuid is not None:
+                        excluidos[uuid] = tabela
+                else:
+                    alterados[tabela].add(id_registro)
+            if excluidos:
+                marcadores = ",".join("?" for _ in excluidos)
+                cursor.execute(
+                    f"SELECT uuid, tabela, row_version FROM registros_excluidos WHERE uuid IN ({marcadores})",
+                    list(excluidos))
+                exclusoes = [[tabela, uuid, versao, None] for uuid, tabela, versao in cursor.fetchall()]
+
+        tradutor = _Tradutor(cursor)
+        registros = []
+        for tabela in TABELAS_REPLICADAS:
+            chave, colunas = _esquema(cursor, tabela)
+            if completo:
+                cursor.execute(f"SELECT uuid, row_version, {', '.join(colunas)} FROM {tabela}")
+                linhas = cursor.fetchall()
+            else:
+                linhas = list(_ler_registros(cursor, tabela, chave, colunas, sorted(alterados[tabela])))
+            for uuid, versao, *valores in linhas:
+                registros.append([tabela, uuid, versao, _dados_exportados(tradutor, tabela, colunas, valores)])
+
+        pacote = {
+            "formato": FORMATO,
+            "versao": VERSAO_FORMATO,
+            "origem": platform.node(),
+            "versao_schema": obter_versao_schema(conn),
+            "gerado_em": datetime.now().isoformat(timespec="seconds"),
+            "completo": bool(completo),
+            "seq_inicial": desde_seq,
+            "seq_final": seq_final,
+            # Cada alteração: [tabela, uuid, row_version, dados]; dados None indica exclusão
+            "alteracoes": registros + exclusoes,
+        }
+        # Encerra a leitura antes de gravar o arquivo e a posição do destino
+        conn.commit()
+        conteudo = gzip.compress(
+            json.dumps(pacote, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(conteudo)
+
+        if destino is not None:
+            cursor.execute(
+                "INSERT INTO replicacao_destinos (destino, ultimo_seq) VALUES (?, ?) "
+                "ON CONFLICT(destino) DO UPDATE SET ultimo_seq = excluded.ultimo_seq",
+                (destino, seq_final))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {"seq_inicial": desde_seq, "seq_final": seq_final, "registros": len(registros),
+            "exclusoes": len(exclusoes), "bytes": len(conteudo), "completo": bool(completo)}
+
+
+def ler_pacote(caminho):
+    """Lê e valida um pacote gerado por exportar_alteracoes"""
+    with open(caminho, "rb") as arquivo:
+        pacote = json.loads(gzip.decompress(arquivo.read()).decode("utf-8"))
+    if pacote.get("formato") != FORMATO or pacote.get("versao", 0) > VERSAO_FORMATO:
+        raise ValueError(f"{caminho} não é um pacote de alterações compatível.")
+    return pacote
+
+
+def aplicar_alteracoes(caminho):
+    """Aplica um pacote de alterações ao banco atual, em uma única transação
+
+    Returns:
+        dict: contagem de registros inseridos, atualizados, excluidos,
+              ignorados (o local prevaleceu ou já estava igual) e
+              referencias_ausentes (referências gravadas como NULL)
+    """
+    pacote = ler_pacote(caminho)
+    ordem = {tabela: indice for indice, tabela in enumerate(TABELAS_REPLICADAS)}
+    alteracoes = [item for item in pacote["alteracoes"] if item[0] in ordem]
+    # Inclusões e edições das tabelas referenciadas primeiro; exclusões por último, começando
+    # pelas tabelas que referenciam (a chave estrangeira recusa excluir uma demanda com contratos)
+    alteracoes.sort(key=lambda item: (item[3] is None, ordem[item[0]] if item[3] is not None else -ordem[item[0]]))
+
+    resultado = {"inseridos": 0, "atualizados": 0, "excluidos": 0, "ignorados": 0, "referencias_ausentes": 0}
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        tradutor = _Tradutor(cursor)
+        esquemas = {tabela: _esquema(cursor, tabela) for tabela in TABELAS_REPLICADAS}
+
+        for tabela, uuid, versao, dados in alteracoes:
+            chave, colunas = esquemas[tabela]
+
+            if dados is None:
+                try:
+                    cursor.execute(f"DELETE FROM {tabela} WHERE uuid = ?", (uuid,))
+                except sqlite3.IntegrityError:
+                    # Demanda com contratos incluídos neste banco: mantida, como as demais divergências
+                    resultado["ignorados"] += 1
+                    continue
+                if cursor.rowcount:
+                    resultado["excluidos"] += 1
+                else:
+                    resultado["ignorados"] += 1
+                # Registra a exclusão mesmo sem o registro local (o gatilho só cobre o DELETE efetivo)
+                cursor.execute("INSERT OR IGNORE INTO registros_excluidos (uuid, tabela, row_version) "
+                               "VALUES (?, ?, ?)", (uuid, tabela, versao))
+                tradutor.ids.pop((tabela, uuid), None)
+                continue
+
+            cursor.execute("SELECT 1 FROM registros_excluidos WHERE uuid = ?", (uuid,))
+            if cursor.fetchone():
+                resultado["ignorados"] += 1
+                continue
+
+            cursor.execute(f"SELECT {chave}, row_version, {', '.join(colunas)} FROM {tabela} WHERE uuid = ?",
+                           (uuid,))
+            atual = cursor.fetchone()
+            if atual is not None:
+                dados_atuais = _dados_exportados(tradutor, tabela, colunas, atual[2:])
+                recebido = (versao, _resumo(dados))
+                local = (atual[1], _resumo(dados_atuais))
+                if recebido <= local:
+                    resultado["ignorados"] += 1
+                    continue
+
+            valores, ausentes = _dados_importados(tradutor, tabela, dados)
+            resultado["referencias_ausentes"] += ausentes
+            valores = {coluna: valor for coluna, valor in valores.items() if coluna in colunas}
+
+            if atual is None:
+                nomes = list(valores) + ["uuid", "row_version"]
+                cursor.execute(
+                    f"INSERT INTO {tabela} ({', '.join(nomes)}) VALUES ({', '.join('?' for _ in nomes)})",
+                    list(valores.values()) + [uuid, versao])
+                tradutor.ids[(tabela, uuid)] = cursor.lastrowid
+                resultado["inseridos"] += 1
+            else:
+                # Empate de versões decidido pelo resumo: grava versao + 1 explicitamente (com a
+                # mesma versão o gatilho trg_versao_<tabela> incrementaria por conta própria)
+                versao_gravada = versao + 1 if versao == atual[1] else versao
+                atribuicoes = ", ".join(f"{coluna} = ?" for coluna in valores)
+                cursor.execute(
+                    f"UPDATE {tabela} SET {atribuicoes}, row_version = ? WHERE {chave} = ?",
+                    list(valores.values()) + [versao_gravada, atual[0]])
+                resultado["atualizados"] += 1
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return resultado
@@ -0,0 +1,184 @@
+# models/sessao_relatorio.py
+"""Sessões de relatório sobre um instantâneo (snapshot) do banco
+
+Relatórios e exportações fazem leituras longas nas mesmas tabelas em que os
+formulários gravam. No journal padrão do SQLite (rollback), uma leitura em
+andamento segura a trava compartilhada e o commit de quem grava espera por
+ela (e falha com "database is locked" após o tempo limite). Além disso, cada
+consulta de um relatório pode ver um estado diferente do banco.
+
+SessaoRelatorio lê tudo de um instantâneo fixo:
+
+- banco em WAL: uma conexão própria com uma transação de leitura aberta; os
+  escritores continuam gravando no WAL sem esperar;
+- demais modos: uma cópia em memória feita com a API de backup do SQLite; o
+  banco fica travado para escrita apenas durante a cópia (milissegundos).
+
+Dentro de `with sessao.usar():`, get_connection na thread corrente devolve a
+conexão do instantâneo, de modo que as funções de leitura dos models e
+controllers funcionam sem alteração. As gravações (executar_escrita) continuam
+indo para o banco; gravar diretamente no instantâneo é negado.
+
+Em WAL, o checkpoint não avança além de um instantâneo aberto: a sessão deve
+ficar aberta apenas enquanto o relatório estiver em uso (ou ser renovada).
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from . import db_manager
+from utils.perfilador import fabrica_conexao
+
+MODO_WAL = "wal"
+MODO_COPIA = "copia"
+
+# Gravações negadas no banco principal do instantâneo (o esquema temp continua livre)
+_GRAVACOES = (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE)
+
+
+def _autorizar(acao, argumento1, argumento2, banco, origem):
+    if acao in _GRAVACOES and banco == "main":
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+class _ConexaoInstantaneo:
+    """Comportamento da conexão do instantâneo, combinado com a classe de conexão em uso
+
+    As funções dos models fecham a conexão e podem chamar commit ao terminar;
+    aqui isso não encerra a transação de leitura nem a cópia.
+    """
+
+    def close(self):
+        # Conexão instrumentada pelo perfilador: registra as instruções pendentes
+        finalizar = getattr(self, "_finalizar_cursores", None)
+        if finalizar is not None:
+            finalizar()
+            self._cursores.clear()
+        self.row_factory = None
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def encerrar(self):
+        super().close()
+
+
+_classes = {}
+
+
+def _classe_conexao():
+    """Classe da conexão do instantâneo (instrumentada quando o perfil está ativo)"""
+    base = fabrica_conexao() or sqlite3.Connection
+    if base not in _classes:
+        _classes[base] = type("ConexaoInstantaneo", (_ConexaoInstantaneo, base), {})
+    return _classes[base]
+
+
+def modo_journal(caminho=None):
+    """journal_mode do banco (delete, truncate, persist, wal...)"""
+    conn = sqlite3.connect(caminho or db_manager.DB_PATH)
+    try:
+        return conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+    finally:
+        conn.close()
+
+
+class SessaoRelatorio:
+    """Instantâneo do banco para a execução de relatórios
+
+    Exemplo:
+        with SessaoRelatorio() as sessao, sessao.usar():
+            dados = obter_demandas_360(codigos)
+        print(sessao.descricao_idade())
+    """
+
+    def __init__(self, modo=None):
+        """
+        Args:
+            modo: MODO_WAL ou MODO_COPIA; padrão é WAL quando o banco está em WAL
+        """
+        self.modo = modo or (MODO_WAL if modo_journal() == "wal" else MODO_COPIA)
+        self.conexao = None
+        self.criada_em = None
+        self.duracao_ms = 0.0
+        self._instante = None
+        self.abrir()
+
+    def abrir(self):
+        """Fixa um novo instantâneo (o anterior, se houver, é descartado)"""
+        self.fechar()
+        inicio = time.perf_counter()
+        classe = _classe_conexao()
+        if self.modo == MODO_WAL:
+            conexao = sqlite3.connect(db_manager.DB_PATH, factory=classe, isolation_level=None,
+                                      check_same_thread=False)
+            # A transação de leitura começa na primeira leitura e fixa o instantâneo
+            sqlite3.Connection.execute(conexao, "BEGIN")
+            sqlite3.Connection.execute(conexao, "SELECT COUNT(*) FROM sqlite_master").fetchone()
+        else:
+            origem = sqlite3.connect(db_manager.DB_PATH)
+            conexao = sqlite3.connect(":memory:", factory=classe, check_same_thread=False)
+            try:
+                # Uma única etapa: a trava de leitura dura só a cópia das páginas
+                origem.backup(conexao)
+            except Exception:
+                conexao.encerrar()
+                raise
+            finally:
+                origem.close()
+        conexao.set_authorizer(_autorizar)
+        self.conexao = conexao
+        self.criada_em = datetime.now()
+        self._instante = time.monotonic()
+        self.duracao_ms = (time.perf_counter() - inicio) * 1000
+        return self
+
+    def renovar(self):
+        """Troca o instantâneo pelo estado atual do banco"""
+        return self.abrir()
+
+    def fechar(self):
+        """Encerra a transação de leitura ou descarta a cópia"""
+        if self.conexao is not None:
+            self.conexao.encerrar()
+            self.conexao = None
+
+    def idade_segundos(self):
+        """Segundos desde que o instantâneo foi fixado"""
+        return time.monotonic() - self._instante if self._instante is not None else 0.0
+
+    def descricao_idade(self):
+        """Texto para o usuário, como 'Dados de 14:32:05 (há 3 min)'"""
+        if self.criada_em is None:
+            return "Sem dados carregados"
+        idade = int(self.idade_segundos())
+        if idade < 60:
+            ha = "agora" if idade < 5 else f"há {idade} s"
+        elif idade < 3600:
+            ha = f"há {idade // 60} min"
+        else:
+            ha = f"há {idade // 3600} h {idade % 3600 // 60:02d} min"
+        return f"Dados de {self.criada_em.strftime('%H:%M:%S')} ({ha})"
+
+    @contextmanager
+    def usar(self):
+        """Durante o bloco, as leituras da thread corrente vão para o instantâneo"""
+        if self.conexao is None:
+            raise RuntimeError("Sessão de relatório fechada")
+        anterior = getattr(db_manager._sessao_local, "sessao", None)
+        db_manager._sessao_local.sessao = self
+        try:
+            yield self
+        finally:
+            db_manager._sessao_local.sessao = anterior
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
@@ -0,0 +1,70 @@
+"""
+Replicação entre escritórios por pacotes de alterações (models/replicacao_model.py).
+
+Cada escritório exporta apenas o que mudou desde o último envio para um destino
+e importa os pacotes recebidos dos demais. O tamanho do pacote e o tempo de
+consolidação dependem da quantidade de alterações, não do tamanho do banco.
+
+Uso:
+    python replicar_escritorios.py exportar --destino sede [--saida pacote.json.gz]
+                                            [--desde SEQ] [--completo] [--banco contrato.db]
+    python replicar_escritorios.py importar pacote1.json.gz [pacote2.json.gz ...] [--banco contrato.db]
+
+Sem --desde, a exportação parte do último seq enviado ao destino; a primeira
+exportação para um destino é completa.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import models.db_manager as db_manager
+from models.replicacao_model import exportar_alteracoes, aplicar_alteracoes, HistoricoIndisponivel
+
+
+def exportar(args):
+    saida = args.saida or f"alteracoes_{args.destino}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json.gz"
+    try:
+        resumo = exportar_alteracoes(saida, desde_seq=args.desde, completo=args.completo, destino=args.destino)
+    except HistoricoIndisponivel as e:
+        print(f"{e}\nUse --completo para exportar todos os registros.")
+        return 1
+    tipo = "completo" if resumo["completo"] else f"seq {resumo['seq_inicial']} a {resumo['seq_final']}"
+    print(f"Pacote {saida} ({tipo}): {resumo['registros']} registros, {resumo['exclusoes']} exclusões, "
+          f"{resumo['bytes'] / 1024:.1f} KB")
+    return 0
+
+
+def importar(args):
+    for caminho in args.pacotes:
+        resultado = aplicar_alteracoes(caminho)
+        print(f"{caminho}: " + ", ".join(f"{chave} {valor}" for chave, valor in resultado.items()))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replicação entre escritórios por pacotes de alterações")
+    parser.add_argument("--banco", help="banco SQLite (padrão: contrato.db)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    parser_exportar = comandos.add_parser("exportar", help="gera o pacote de alterações para um destino")
+    parser_exportar.add_argument("--destino", required=True, help="nome do escritório de destino")
+    parser_exportar.add_argument("--saida", help="arquivo do pacote (padrão: alteracoes_<destino>_<data>.json.gz)")
+    parser_exportar.add_argument("--desde", type=int, help="seq a partir do qual exportar")
+    parser_exportar.add_argument("--completo", action="store_true", help="exporta todos os registros")
+
+    parser_importar = comandos.add_parser("importar", help="aplica pacotes recebidos")
+    parser_importar.add_argument("pacotes", nargs="+")
+
+    args = parser.parse_args()
+    if args.banco:
+        if not os.path.exists(args.banco):
+            print(f"Banco não encontrado: {args.banco}")
+            return 1
+        db_manager.DB_PATH = args.banco
+    db_manager.init_db()
+    return exportar(args) if args.comando == "exportar" else importar(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Serviço local com a API HTTP/JSON dos controllers (utils/servico_api.py).
+
+Um único processo é dono das conexões com o banco e atende vários desktops:
+as gravações passam pela fila de escrita (commit em grupo), as leituras ficam
+em cache até a próxima gravação nas tabelas envolvidas. O app Tk usa o serviço quando a
+variável SISPROJ_SERVIDOR aponta para ele (p.ex. SISPROJ_SERVIDOR=servidor:8765).
+
+Uso:
+    python servidor_api.py [--host 127.0.0.1] [--porta 8765] [--leitores 4] [--escritores 4]
+                           [--banco contrato.db]
+
+Para atender outras máquinas da rede, use --host 0.0.0.0.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+import models.db_manager as db_manager
+from utils.servico_api import ServicoApi, PORTA_PADRAO
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local com a API HTTP/JSON dos controllers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--leitores", type=int, default=4, help="threads de leitura")
+    parser.add_argument("--escritores", type=int, default=4,
+                        help="threads de gravação (1 serializa os controllers de gravação)")
+    parser.add_argument("--banco", help="banco SQLite (padrão: contrato.db)")
+    args = parser.parse_args()
+
+    if args.banco:
+        if not os.path.exists(args.banco):
+            print(f"Banco não encontrado: {args.banco}")
+            return 1
+        db_manager.DB_PATH = args.banco
+    db_manager.init_db()
+    db_manager.podar_log_alteracoes()
+
+    servico = ServicoApi(args.host, args.porta, leitores=args.leitores, escritores=args.escritores)
+    try:
+        asyncio.run(servico.executar(
+            ao_iniciar=lambda host, porta: print(f"Servindo {db_manager.DB_PATH} em http://{host}:{porta}")))
+    except KeyboardInterrupt:
+        print("Serviço encerrado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Assessor de índices (utils/assessor_indices.py).
+
+Analisa a carga de SQL registrada pelo perfilador (perfil exportado pela tela
+de diagnóstico ou pelo benchmark_controllers.py --perfil), pelo log de
+consultas lentas ou capturada na hora (--capturar, que executa as operações do
+benchmark de controllers com o perfil ativo sobre uma cópia do banco). Propõe
+índices compostos e de cobertura com o benefício estimado numa cópia
+temporária do banco. Os índices escolhidos são criados com "aplicar" e ficam
+registrados em indices_aplicados.
+
+Uso:
+    python sugerir_indices.py analisar --perfil perfil.json [--saida sugestoes.json]
+    python sugerir_indices.py analisar --lentas consultas_lentas.jsonl
+    python sugerir_indices.py analisar --capturar
+    python sugerir_indices.py aplicar sugestoes.json [--nomes idx_a,idx_b] [--minimo-ms 100]
+    python sugerir_indices.py listar
+    python sugerir_indices.py remover idx_a
+
+Opção global: --banco contrato.db
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+import models.db_manager as db_manager
+from models.indices_model import aplicar_indices, get_indices_aplicados, remover_indice_aplicado
+from utils.assessor_indices import analisar as analisar_carga, carga_do_perfil, carregar_carga, recomendadas, relatorio
+
+
+def capturar_carga(banco):
+    """Executa as operações do benchmark de controllers com o perfil ativo e retorna a carga"""
+    from benchmark_controllers import operacoes, _amostras
+    from utils.perfilador import ativar_perfil, desativar_perfil, limpar_perfil, obter_perfil
+
+    pasta = tempfile.mkdtemp(prefix="sisproj_captura_")
+    caminho_anterior = db_manager.DB_PATH
+    try:
+        copia = os.path.join(pasta, "captura.db")
+        shutil.copyfile(banco, copia)
+        db_manager.DB_PATH = copia
+        conn = sqlite3.connect(copia)
+        amostras = _amostras(conn)
+        conn.close()
+
+        ativar_perfil()
+        limpar_perfil()
+        lista, ciclos, ciclo_aditivo = operacoes(amostras)
+        for nome, funcao in lista:
+            funcao()
+        for tipo_contrato, id_contrato in ciclos:
+            ciclo_aditivo(tipo_contrato, id_contrato)
+        carga = carga_do_perfil(obter_perfil())
+        desativar_perfil()
+        return carga
+    finally:
+        db_manager.DB_PATH = caminho_anterior
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def analisar(args):
+    if args.capturar:
+        print("Capturando a carga das operações do benchmark de controllers...")
+        carga = capturar_carga(db_manager.DB_PATH)
+    else:
+        carga = carregar_carga(args.perfil or args.lentas)
+    print(f"{len(carga)} instruções distintas na carga")
+
+    resultado = analisar_carga(db_manager.DB_PATH, carga, medir_tempos=not args.sem_medicao, progresso=print)
+    print()
+    print(relatorio(resultado))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultado gravado em {args.saida}")
+    return 0
+
+
+def aplicar(args):
+    with open(args.sugestoes, encoding="utf-8") as arquivo:
+        sugestoes = json.load(arquivo)["sugestoes"]
+    if args.nomes:
+        nomes = {nome.strip() for nome in args.nomes.split(",")}
+        escolhidas = [s for s in sugestoes if s["nome"] in nomes]
+        ausentes = nomes - {s["nome"] for s in escolhidas}
+        if ausentes:
+            print(f"Sugestões não encontradas: {', '.join(sorted(ausentes))}")
+            return 1
+    else:
+        escolhidas = recomendadas(sugestoes, args.minimo_ms)
+    if not escolhidas:
+        print("Nenhum índice a aplicar")
+        return 0
+    for nome in aplicar_indices(escolhidas):
+        print(f"  criado {nome}")
+    return 0
+
+
+def listar(args):
+    indices = get_indices_aplicados()
+    for nome, tabela, definicao, beneficio_ms, aplicado_em, existe in indices:
+        situacao = "" if existe else "  (não existe mais no banco)"
+        beneficio = "sem medição" if beneficio_ms is None else f"{beneficio_ms:.1f} ms"
+        print(f"{aplicado_em}  {nome} ({tabela}), benefício {beneficio}{situacao}")
+        print(f"    {definicao}")
+    if not indices:
+        print("Nenhum índice aplicado pelo assessor")
+    return 0
+
+
+def remover(args):
+    try:
+        remover_indice_aplicado(args.nome)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"Índice {args.nome} removido")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assessor de índices guiado pela carga de SQL")
+    parser.add_argument("--banco", help="banco SQLite (padrão: contrato.db)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    parser_analisar = comandos.add_parser("analisar", help="analisa a carga e sugere índices")
+    origem = parser_analisar.add_mutually_exclusive_group(required=True)
+    origem.add_argument("--perfil", help="perfil exportado (JSON do perfilador ou do benchmark --perfil)")
+    origem.add_argument("--lentas", help="log de consultas lentas (um JSON por linha)")
+    origem.add_argument("--capturar", action="store_true",
+                        help="captura a carga executando as operações do benchmark de controllers")
+    parser_analisar.add_argument("--sem-medicao", action="store_true",
+                                 help="apenas replaneja, sem cronometrar as consultas")
+    parser_analisar.add_argument("--saida", help="JSON com as instruções analisadas e as sugestões")
+
+    parser_aplicar = comandos.add_parser("aplicar", help="cria os índices sugeridos")
+    parser_aplicar.add_argument("sugestoes", help="JSON gerado por analisar --saida")
+    parser_aplicar.add_argument("--nomes", help="índices escolhidos, separados por vírgula")
+    parser_aplicar.add_argument("--minimo-ms", type=float, default=0.0,
+                                help="sem --nomes: benefício mínimo medido para aplicar")
+
+    comandos.add_parser("listar", help="índices criados pelo assessor")
+
+    parser_remover = comandos.add_parser("remover", help="remove um índice criado pelo assessor")
+    parser_remover.add_argument("nome")
+
+    args = parser.parse_args()
+    if args.banco:
+        if not os.path.exists(args.banco):
+            print(f"Banco não encontrado: {args.banco}")
+            return 1
+        db_manager.DB_PATH = args.banco
+    db_manager.init_db()
+    return {"analisar": analisar, "aplicar": aplicar, "listar": listar, "remover": remover}[args.comando](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
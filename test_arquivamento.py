@@ -0,0 +1,44 @@
+import sqlite3
+
+import models.db_manager as db_manager
+from gerar_dados_sinteticos import gerar_banco
+from models.arquivo_model import arquivar_contratos_encerrados, CONTRATOS_ARQUIVADOS
+
+
+def test_arquivamento_com_chaves_estrangeiras(tmp_path, monkeypatch):
+    """
+    Arquivamento em um banco na versão atual do esquema (chaves estrangeiras ligadas
+    e exclusão em cascata): nenhum contrato, aditivo ou registro em contratos se perde.
+    """
+    banco = str(tmp_path / "sintetico.db")
+    gerar_banco(banco, 5000, progresso=None)
+    monkeypatch.setattr(db_manager, "DB_PATH", banco)
+    assert db_manager.init_db() >= 8
+
+    conn = db_manager.get_connection()
+    try:
+        ids = [linha[0] for linha in conn.execute("SELECT id FROM carta_acordo ORDER BY id")]
+        conn.executemany(
+            "INSERT INTO contratos (tipo_contrato, id_referencia, numero_contrato) VALUES ('carta_acordo', ?, ?)",
+            [(id_carta, f"CT-{id_carta}") for id_carta in ids])
+        conn.commit()
+        antes = {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+                 for tabela in CONTRATOS_ARQUIVADOS + ("aditivos", "contratos")}
+    finally:
+        conn.close()
+
+    resumo = arquivar_contratos_encerrados(anos=1, tamanho_lote=50)
+    assert sum(resumo[tabela] for tabela in CONTRATOS_ARQUIVADOS) > 0
+    assert resumo["contratos"] > 0
+
+    conn = db_manager.get_connection()
+    arquivo = sqlite3.connect(str(tmp_path / "sintetico_arquivo.db"))
+    try:
+        for tabela, quantidade in antes.items():
+            principal = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+            arquivada = arquivo.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+            assert principal + arquivada == quantidade, tabela
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    finally:
+        arquivo.close()
+        conn.close()
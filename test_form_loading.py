@@ -49,6 +49,9 @@ def test_form_loading():
         )
         form.pack(fill=tk.BOTH, expand=True)
         
+        # The custeio tab is built lazily; selecting it triggers its construction
+        form.notebook.select(1)
+        
         # Add a button to print the current values of the custeio fields
         def print_custeio_values():
             print("\nCurrent values in the custeio form:")
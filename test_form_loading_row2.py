@@ -46,6 +46,9 @@ def test_form_loading_row2():
             produto=produto
         )
         
+        # The custeio tab is built lazily; selecting it triggers its construction
+        form.notebook.select(1)
+        
         # Process Tkinter events to ensure the form is fully initialized
         root.update()
         
@@ -0,0 +1,519 @@
+# utils/assessor_indices.py
+"""Assessor de índices guiado pela carga real de SQL
+
+A carga são as instruções distintas executadas pelo app, com o número de
+execuções e o tempo total. Ela vem do perfilador (utils/perfilador.py, que mede
+cada instrução pela conexão instrumentada e pelo set_trace_callback), exportado
+pela tela de diagnóstico ou por benchmark_controllers.py --perfil, ou do log de
+consultas lentas (SISPROJ_CONSULTAS_LENTAS).
+
+Para cada instrução, o EXPLAIN QUERY PLAN aponta:
+- varreduras completas (SCAN sem índice);
+- índices automáticos, que o SQLite monta a cada execução;
+- ordenações em B-tree temporária.
+
+Das cláusulas WHERE/ON/ORDER BY/GROUP BY saem os índices candidatos: colunas
+comparadas por igualdade, seguidas das colunas de ordenação ou de uma
+comparação por intervalo. Quando a instrução lê poucas colunas da tabela,
+também é proposta a variante que cobre todas elas (covering index).
+
+Cada candidato é criado numa cópia temporária do banco. Ali, as instruções da
+tabela são planejadas e cronometradas de novo, com os parâmetros registrados
+pelo perfilador, quando houver. O benefício estimado é a redução de tempo
+multiplicada pelo número de execuções na carga. O custo aparece como o tamanho
+do índice e o número de gravações na tabela, que passam a mantê-lo.
+
+Os índices escolhidos são criados por models/indices_model.aplicar_indices.
+"""
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+
+
+# Instruções cujo plano é analisado
+_PLANEJAVEIS = re.compile(r"(?is)^\s*(SELECT|WITH|UPDATE|DELETE)\b")
+_GRAVACAO = re.compile(r"(?is)^\s*(?:INSERT|REPLACE|UPDATE|DELETE)\b.*?\b(?:INTO|UPDATE|FROM)\s+(\w+)")
+
+_VARREDURA = re.compile(r"^SCAN (\w+)$")
+_INDICE_AUTOMATICO = re.compile(r"^SEARCH (\w+) USING AUTOMATIC (?:COVERING )?INDEX")
+_ORDENACAO_TEMPORARIA = re.compile(r"USE TEMP B-TREE FOR (?:.*\b)?(ORDER BY|GROUP BY|DISTINCT)")
+
+_PALAVRAS_RESERVADAS = {
+    "WHERE", "JOIN", "LEFT", "RIGHT", "INNER", "OUTER", "CROSS", "NATURAL", "ON", "USING", "GROUP",
+    "ORDER", "LIMIT", "UNION", "EXCEPT", "INTERSECT", "HAVING", "SET", "VALUES", "AS", "INDEXED", "NOT",
+}
+
+# Operadores que permitem usar um índice: igualdade e intervalo
+_IGUALDADE = {"=", "==", "IN", "IS"}
+_INTERVALO = {">", ">=", "<", "<=", "BETWEEN", "LIKE", "GLOB"}
+_REFERENCIA = re.compile(
+    r"(?:\b(\w+)\.)?\b(\w+)\s*(?:NOT\s+)?(==|=|>=|<=|>|<|\bIN\b|\bIS\b|\bBETWEEN\b|\bLIKE\b|\bGLOB\b)", re.I)
+_IGUALDADE_INVERTIDA = re.compile(r"=\s*(?:\b(\w+)\.)?\b(\w+)\b(?!\s*\()")
+
+# Máximo de colunas de um índice de cobertura
+MAXIMO_COLUNAS_COBERTURA = 6
+
+# Repetições na medição de cada instrução (vale a menor)
+REPETICOES = 3
+
+# Instruções mais lentas que isso (ms) são medidas uma única vez
+LIMITE_REPETICAO_MS = 1000
+
+
+def carga_do_perfil(perfil):
+    """Converte o perfil (obter_perfil / exportar_perfil) na lista de instruções da carga"""
+    carga = []
+    for sql, dados in perfil.get("instrucoes", {}).items():
+        carga.append({
+            "sql": dados.get("sql_completo", sql),
+            "chamadas": dados.get("chamadas", 1),
+            "total_ms": dados.get("total_ms", 0.0),
+            "parametros": dados.get("exemplo_parametros"),
+            "expandido": None,
+        })
+    return carga
+
+
+def carregar_carga(caminho):
+    """Lê a carga de um perfil exportado, de um JSON do benchmark ou do log de consultas lentas
+
+    Returns:
+        list: dicts com sql, chamadas, total_ms, parametros e expandido
+    """
+    with open(caminho, encoding="utf-8") as arquivo:
+        texto = arquivo.read()
+    try:
+        dados = json.loads(texto)
+    except json.JSONDecodeError:
+        dados = None
+
+    if isinstance(dados, dict):
+        return carga_do_perfil(dados.get("perfil", dados))
+
+    # Log de consultas lentas: um JSON por linha, agrupado pela instrução normalizada
+    por_sql = {}
+    for linha in texto.splitlines():
+        if not linha.strip():
+            continue
+        registro = json.loads(linha)
+        item = por_sql.setdefault(registro["sql"], {
+            "sql": registro.get("sql_completo", registro["sql"]), "chamadas": 0, "total_ms": 0.0, "parametros": None, "expandido": None})
+        item["chamadas"] += 1
+        item["total_ms"] += registro.get("duracao_ms", 0.0)
+        expandido = registro.get("sql_expandido")
+        if item["expandido"] is None and expandido and expandido.split()[:1] == item["sql"].split()[:1]:
+            item["expandido"] = expandido
+    return list(por_sql.values())
+
+
+def _quantidade_parametros(conn, sql):
+    try:
+        conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+        return 0
+    except sqlite3.ProgrammingError as e:
+        encontrado = re.search(r"uses (\d+)", str(e))
+        if encontrado:
+            return int(encontrado.group(1))
+        raise
+
+
+def preparar_execucao(conn, item):
+    """Texto e parâmetros para planejar/medir a instrução
+
+    Returns:
+        tuple: (sql, parametros, exatos); exatos=False indica parâmetros fictícios,
+               que servem para o plano mas não para medir o tempo
+    """
+    if item.get("expandido"):
+        return item["expandido"], (), True
+    parametros = item.get("parametros")
+    if parametros is not None:
+        return item["sql"], parametros, True
+    quantidade = _quantidade_parametros(conn, item["sql"])
+    # "1" serve a comparações de texto, números (afinidade) e LIKE por prefixo
+    return item["sql"], ("1",) * quantidade, quantidade == 0
+
+
+def planejar(conn, sql, parametros=()):
+    """Linhas de detalhe do EXPLAIN QUERY PLAN da instrução"""
+    return [linha[-1] for linha in conn.execute("EXPLAIN QUERY PLAN " + sql, parametros).fetchall()]
+
+
+def _aliases(sql, tabelas):
+    """{alias ou nome: tabela} das tabelas citadas em FROM/JOIN"""
+    aliases = {}
+    for _, tabela, alias in re.findall(r"(?i)\b(FROM|JOIN|,|UPDATE)\s*(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql):
+        if tabela not in tabelas:
+            continue
+        aliases[tabela] = tabela
+        if alias and alias.upper() not in _PALAVRAS_RESERVADAS:
+            aliases[alias] = tabela
+    return aliases
+
+
+def problemas_do_plano(plano, aliases):
+    """Varreduras, índices automáticos e ordenações temporárias do plano
+
+    Returns:
+        list: dicts com tipo, tabela (None para ordenações) e detalhe
+    """
+    problemas = []
+    for detalhe in plano:
+        encontrado = _VARREDURA.match(detalhe)
+        if encontrado and encontrado.group(1) in aliases:
+            problemas.append({"tipo": "varredura", "tabela": aliases[encontrado.group(1)], "detalhe": detalhe})
+            continue
+        encontrado = _INDICE_AUTOMATICO.match(detalhe)
+        if encontrado and encontrado.group(1) in aliases:
+            problemas.append({"tipo": "indice_automatico", "tabela": aliases[encontrado.group(1)],
+                              "detalhe": detalhe})
+            continue
+        if _ORDENACAO_TEMPORARIA.search(detalhe):
+            problemas.append({"tipo": "ordenacao_temporaria", "tabela": None, "detalhe": detalhe})
+    return problemas
+
+
+class Esquema:
+    """Colunas e índices existentes de cada tabela do banco"""
+
+    def __init__(self, conn):
+        self.colunas = {}
+        self.rowid = {}
+        self.indices = {}
+        tabelas = [linha[0] for linha in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        for tabela in tabelas:
+            info = conn.execute(f"PRAGMA table_info({tabela})").fetchall()
+            self.colunas[tabela] = [linha[1] for linha in info]
+            chaves = [linha for linha in info if linha[5]]
+            self.rowid[tabela] = (chaves[0][1] if len(chaves) == 1 and chaves[0][2].upper() == "INTEGER"
+                                  else None)
+            self.indices[tabela] = [
+                [coluna[2] for coluna in conn.execute(f'PRAGMA index_info("{indice[1]}")').fetchall()]
+                for indice in conn.execute(f"PRAGMA index_list({tabela})").fetchall()
+            ]
+        self.nomes_indices = {linha[0] for linha in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def _trecho(sql, inicio, fins):
+    """Texto entre a palavra-chave `inicio` e a primeira das palavras `fins` (ou o fim)"""
+    encontrado = re.search(rf"(?is)\b{inicio}\b(.*)", sql)
+    if not encontrado:
+        return ""
+    texto = encontrado.group(1)
+    corte = re.search(rf"(?is)\b(?:{'|'.join(fins)})\b", texto)
+    return texto[:corte.start()] if corte else texto
+
+
+def _da_tabela(qualificador, coluna, tabela, aliases, esquema):
+    if coluna not in esquema.colunas[tabela]:
+        return False
+    if qualificador:
+        return aliases.get(qualificador) == tabela
+    outras = {t for t in aliases.values() if t != tabela}
+    return not any(coluna in esquema.colunas[t] for t in outras)
+
+
+def _lista_colunas(trecho, tabela, aliases, esquema):
+    """Colunas de uma lista ORDER BY/GROUP BY, ou None se algum item não for coluna da tabela"""
+    colunas = []
+    for item in trecho.split(","):
+        encontrado = re.fullmatch(r"(?is)\s*(?:(\w+)\.)?(\w+)(?:\s+COLLATE\s+\w+)?(?:\s+(?:ASC|DESC))?\s*", item)
+        if not encontrado or not _da_tabela(encontrado.group(1), encontrado.group(2), tabela, aliases, esquema):
+            return None
+        colunas.append(encontrado.group(2))
+    return colunas
+
+
+def _referencias(sql, tabela, aliases, esquema):
+    """Colunas da tabela comparadas por igualdade e por intervalo (e as comparadas com LIKE)"""
+    condicoes = _trecho(sql, "FROM", ["GROUP", "ORDER", "LIMIT", "HAVING"]) or sql
+    igualdade, intervalo, com_like = [], [], set()
+    for qualificador, coluna, operador in _REFERENCIA.findall(condicoes):
+        if not _da_tabela(qualificador, coluna, tabela, aliases, esquema):
+            continue
+        operador = operador.upper()
+        if operador in _IGUALDADE and coluna not in igualdade:
+            igualdade.append(coluna)
+        elif operador in _INTERVALO and coluna not in intervalo:
+            intervalo.append(coluna)
+            if operador == "LIKE":
+                com_like.add(coluna)
+    # Junções escritas com a coluna da tabela à direita (ON d.codigo = c.codigo_demanda)
+    for qualificador, coluna in _IGUALDADE_INVERTIDA.findall(condicoes):
+        if _da_tabela(qualificador, coluna, tabela, aliases, esquema) and coluna not in igualdade:
+            igualdade.append(coluna)
+    return igualdade, [c for c in intervalo if c not in igualdade], com_like
+
+
+def _colunas_lidas(sql, tabela, aliases, esquema):
+    """Colunas da tabela citadas na instrução, ou None se ela lê todas (SELECT *)"""
+    apelidos = [alias for alias, t in aliases.items() if t == tabela]
+    if re.search(r"(?is)\bSELECT\s+(?:DISTINCT\s+)?\*", sql) or any(
+            re.search(rf"\b{re.escape(alias)}\.\*", sql) for alias in apelidos):
+        return None
+    lidas = []
+    for qualificador, coluna in re.findall(r"(?:\b(\w+)\.)?\b(\w+)\b", sql):
+        if _da_tabela(qualificador, coluna, tabela, aliases, esquema) and coluna not in lidas:
+            lidas.append(coluna)
+    return lidas
+
+
+def _definicao(nome, tabela, colunas, com_like):
+    partes = [f"{coluna} COLLATE NOCASE" if coluna in com_like else coluna for coluna in colunas]
+    return f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela}({', '.join(partes)})"
+
+
+def _nomear(candidato, esquema):
+    """Dá nome e definição ao candidato, sem repetir nomes de índices existentes"""
+    sufixo = "_cobertura" if candidato["cobertura"] else ""
+    nome = f"idx_{candidato['tabela']}_{'_'.join(candidato['colunas'])}"[:60] + sufixo
+    base, numero = nome, 2
+    while nome in esquema.nomes_indices:
+        nome, numero = f"{base}_{numero}", numero + 1
+    esquema.nomes_indices.add(nome)
+    candidato["nome"] = nome
+    candidato["definicao"] = _definicao(nome, candidato["tabela"], candidato["colunas"], candidato["com_like"])
+
+
+def candidatos_para(sql, tabela, aliases, esquema, ordenacao=False):
+    """Índices candidatos para a tabela na instrução
+
+    Returns:
+        list: dicts com tabela, colunas, com_like (colunas com COLLATE NOCASE) e cobertura
+
+    Args:
+        ordenacao: True quando o problema é só a ordenação temporária
+    """
+    igualdade, intervalo, com_like = _referencias(sql, tabela, aliases, esquema)
+    rowid = esquema.rowid[tabela]
+    igualdade = [c for c in igualdade if c != rowid]
+
+    ordem = _lista_colunas(_trecho(sql, "ORDER BY", ["LIMIT"]), tabela, aliases, esquema) \
+        if re.search(r"(?i)\bORDER\s+BY\b", sql) else None
+    grupo = _lista_colunas(_trecho(sql, "GROUP BY", ["HAVING", "ORDER", "LIMIT"]), tabela, aliases, esquema) \
+        if re.search(r"(?i)\bGROUP\s+BY\b", sql) else None
+
+    colunas = list(igualdade)
+    for lista in (grupo, ordem):
+        if lista:
+            # O rowid já é a última coluna implícita de todo índice
+            colunas += [c for c in lista if c not in colunas and not (c == rowid and c == lista[-1])]
+            break
+    else:
+        if intervalo and not ordenacao:
+            colunas.append(intervalo[0])
+    if not colunas:
+        return []
+    # LIKE por prefixo só usa índice na última posição, com COLLATE NOCASE
+    com_like = {c for c in com_like if c == colunas[-1]}
+
+    if any(existente[:len(colunas)] == colunas for existente in esquema.indices[tabela]):
+        return []
+
+    candidatos = [{"tabela": tabela, "colunas": colunas, "com_like": com_like, "cobertura": False}]
+    lidas = _colunas_lidas(sql, tabela, aliases, esquema)
+    extras = [c for c in (lidas or []) if c not in colunas and c != rowid]
+    if lidas is not None and extras and len(colunas) + len(extras) <= MAXIMO_COLUNAS_COBERTURA:
+        candidatos.append({"tabela": tabela, "colunas": colunas + extras, "com_like": com_like, "cobertura": True})
+    return candidatos
+
+
+def medir(conn, sql, parametros):
+    """Menor tempo (ms) de execução de uma consulta, lendo todas as linhas"""
+    melhor = None
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        conn.execute(sql, parametros).fetchall()
+        duracao = (time.perf_counter() - inicio) * 1000
+        melhor = duracao if melhor is None else min(melhor, duracao)
+        if duracao > LIMITE_REPETICAO_MS:
+            break
+    return melhor
+
+
+def _copiar_banco(banco, pasta):
+    """Cópia consistente (backup do SQLite, inclusive com WAL) usada como rascunho"""
+    copia = os.path.join(pasta, "rascunho.db")
+    origem = sqlite3.connect(banco)
+    destino = sqlite3.connect(copia)
+    try:
+        origem.backup(destino)
+    finally:
+        origem.close()
+        destino.close()
+    return copia
+
+
+def _bytes_usados(conn):
+    """Tamanho ocupado no banco, sem as páginas livres (reaproveitadas pelos índices criados)"""
+    paginas = conn.execute("PRAGMA page_count").fetchone()[0] - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return paginas * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def analisar(banco, carga, medir_tempos=True, progresso=None):
+    """Analisa a carga e estima o benefício de cada índice candidato
+
+    A análise é feita numa cópia temporária: o banco informado não é alterado.
+
+    Args:
+        banco: caminho do banco SQLite
+        carga: instruções (ver carregar_carga / carga_do_perfil)
+        medir_tempos: False apenas replaneja, sem executar as consultas
+        progresso: função chamada com mensagens de andamento
+
+    Returns:
+        dict: instrucoes (planos e problemas de cada instrução analisada) e
+              sugestoes (candidatos, do maior benefício para o menor)
+    """
+    avisar = progresso or (lambda mensagem: None)
+    pasta = tempfile.mkdtemp(prefix="sisproj_indices_")
+    try:
+        conn = sqlite3.connect(_copiar_banco(banco, pasta))
+        try:
+            return _analisar(conn, carga, medir_tempos, avisar)
+        finally:
+            conn.close()
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def _analisar(conn, carga, medir_tempos, avisar):
+    esquema = Esquema(conn)
+    gravacoes = {}
+    for item in carga:
+        encontrado = _GRAVACAO.match(item["sql"])
+        if encontrado and encontrado.group(1) in esquema.colunas:
+            gravacoes[encontrado.group(1)] = gravacoes.get(encontrado.group(1), 0) + item["chamadas"]
+
+    instrucoes = []
+    for item in sorted(carga, key=lambda i: i["total_ms"], reverse=True):
+        if not _PLANEJAVEIS.match(item["sql"]) or "sqlite_" in item["sql"]:
+            continue
+        try:
+            sql, parametros, exatos = preparar_execucao(conn, item)
+            plano = planejar(conn, sql, parametros)
+        except sqlite3.Error as e:
+            avisar(f"Instrução ignorada ({e}): {item['sql'][:80]}")
+            continue
+        aliases = _aliases(sql, esquema.colunas)
+        leitura = re.match(r"(?is)\s*(SELECT|WITH)\b", sql) is not None
+        instrucoes.append({
+            "sql": item["sql"], "chamadas": item["chamadas"], "total_ms": item["total_ms"],
+            "execucao": (sql, parametros), "aliases": aliases, "plano": plano,
+            "problemas": problemas_do_plano(plano, aliases),
+            "tempo_ms": medir(conn, sql, parametros) if medir_tempos and exatos and leitura else None,
+        })
+
+    candidatos = {}
+    for instrucao in instrucoes:
+        for problema in instrucao["problemas"]:
+            tabelas = [problema["tabela"]] if problema["tabela"] else sorted(set(instrucao["aliases"].values()))
+            for tabela in tabelas:
+                for candidato in candidatos_para(instrucao["execucao"][0], tabela, instrucao["aliases"], esquema,
+                                                 ordenacao=problema["tabela"] is None):
+                    chave = (tabela, tuple(candidato["colunas"]), frozenset(candidato["com_like"]))
+                    if chave not in candidatos:
+                        _nomear(candidato, esquema)
+                        candidatos[chave] = dict(candidato, motivos=set())
+                    candidatos[chave]["motivos"].add(problema["tipo"])
+
+    sugestoes = []
+    for numero, candidato in enumerate(candidatos.values(), 1):
+        avisar(f"[{numero}/{len(candidatos)}] {candidato['definicao']}")
+        sugestoes.append(_avaliar(conn, candidato, instrucoes, gravacoes.get(candidato["tabela"], 0)))
+    sugestoes.sort(key=lambda s: (s["melhora_plano"], s["beneficio_ms"] or 0), reverse=True)
+
+    return {
+        "instrucoes": [
+            {chave: valor for chave, valor in instrucao.items() if chave not in ("execucao", "aliases")}
+            for instrucao in instrucoes
+        ],
+        "sugestoes": sugestoes,
+    }
+
+
+def _avaliar(conn, candidato, instrucoes, gravacoes):
+    """Cria o candidato no rascunho, replaneja e mede as instruções da tabela, e o remove"""
+    afetadas = [i for i in instrucoes if candidato["tabela"] in i["aliases"].values()]
+    tamanho_antes = _bytes_usados(conn)
+    conn.execute(candidato["definicao"])
+    try:
+        tamanho = _bytes_usados(conn) - tamanho_antes
+        resultados, beneficio, melhora = [], None, 0
+        for instrucao in afetadas:
+            sql, parametros = instrucao["execucao"]
+            plano = planejar(conn, sql, parametros)
+            if plano == instrucao["plano"]:
+                continue
+            problemas = problemas_do_plano(plano, instrucao["aliases"])
+            tempo = None
+            if instrucao["tempo_ms"] is not None:
+                tempo = medir(conn, sql, parametros)
+                ganho = (instrucao["tempo_ms"] - tempo) * instrucao["chamadas"]
+                beneficio = ganho if beneficio is None else beneficio + ganho
+            if len(problemas) < len(instrucao["problemas"]):
+                melhora += instrucao["chamadas"]
+            resultados.append({
+                "sql": instrucao["sql"], "chamadas": instrucao["chamadas"],
+                "plano_antes": instrucao["plano"], "plano_depois": plano,
+                "tempo_antes_ms": instrucao["tempo_ms"], "tempo_depois_ms": tempo,
+            })
+    finally:
+        conn.execute(f"DROP INDEX {candidato['nome']}")
+
+    return {
+        "nome": candidato["nome"],
+        "tabela": candidato["tabela"],
+        "colunas": candidato["colunas"],
+        "definicao": candidato["definicao"],
+        "motivos": sorted(candidato["motivos"]),
+        "melhora_plano": melhora,
+        "beneficio_ms": None if beneficio is None else round(beneficio, 3),
+        "tamanho_kb": round(tamanho / 1024, 1),
+        "gravacoes_afetadas": gravacoes,
+        "instrucoes": resultados,
+    }
+
+
+def _prefixo(menor, maior):
+    """Indica se o índice `maior` atende às mesmas buscas que `menor` (mesmas primeiras colunas)"""
+    return (menor is not maior and menor["tabela"] == maior["tabela"]
+            and maior["colunas"][:len(menor["colunas"])] == menor["colunas"]
+            and "COLLATE" not in menor["definicao"] + maior["definicao"])
+
+
+def recomendadas(sugestoes, beneficio_minimo_ms=0.0):
+    """Sugestões que melhoram o plano sem piorar o tempo medido
+
+    Um candidato cujas colunas são o início de outro recomendado é descartado:
+    o índice maior atende às mesmas buscas.
+    """
+    escolhidas = [s for s in sugestoes if s["melhora_plano"]
+                  and (s["beneficio_ms"] is None or s["beneficio_ms"] > beneficio_minimo_ms)]
+    return [s for s in escolhidas if not any(_prefixo(s, outra) for outra in escolhidas)]
+
+
+def relatorio(resultado, limite=20):
+    """Retorna em texto os problemas encontrados e as sugestões"""
+    linhas = ["[Instruções com varredura, índice automático ou ordenação temporária]"]
+    for instrucao in resultado["instrucoes"]:
+        if instrucao["problemas"]:
+            tipos = ", ".join(sorted({p["tipo"] for p in instrucao["problemas"]}))
+            linhas.append(f"  {instrucao['chamadas']:>6}x {instrucao['total_ms']:>10.1f} ms  {tipos}")
+            linhas.append(f"          {instrucao['sql'][:150]}")
+    linhas.append("")
+    linhas.append("[Índices sugeridos]")
+    for sugestao in resultado["sugestoes"][:limite]:
+        beneficio = "sem medição" if sugestao["beneficio_ms"] is None else f"{sugestao['beneficio_ms']:.1f} ms"
+        linhas.append(f"  {sugestao['nome']}: benefício {beneficio}, {sugestao['melhora_plano']} execuções com "
+                      f"plano melhor, {sugestao['tamanho_kb']:.0f} KB, {sugestao['gravacoes_afetadas']} gravações")
+        linhas.append(f"          {sugestao['definicao']}")
+    if not resultado["sugestoes"]:
+        linhas.append("  nenhuma")
+    return "\n".join(linhas)
@@ -0,0 +1,87 @@
+# utils/barramento.py
+"""Barramento de eventos de alteração dentro do processo
+
+Os controllers publicam um EventoAlteracao a cada inclusão, edição ou exclusão
+e as telas abertas assinam as entidades que exibem, atualizando apenas as
+linhas afetadas em vez de recarregar a tabela inteira.
+
+As notificações são síncronas, na thread de quem publica.
+"""
+import threading
+import traceback
+from collections import namedtuple
+
+INSERIR = "inserir"
+ATUALIZAR = "atualizar"
+EXCLUIR = "excluir"
+
+# Alterações que não podem ser reproduzidas uma a uma: a tela deve recarregar tudo
+RECARREGAR = "recarregar"
+
+# Assinantes de TODAS recebem os eventos de qualquer entidade
+TODAS = "*"
+
+EventoAlteracao = namedtuple("EventoAlteracao", "entidade id_registro operacao campos contexto")
+EventoAlteracao.__doc__ = """Alteração de um registro
+
+    entidade: tabela alterada (eventos, carta_acordo, produtos_servicos, aditivos...)
+    id_registro: id do registro alterado
+    operacao: INSERIR, ATUALIZAR, EXCLUIR ou RECARREGAR (id_registro None)
+    campos: colunas alteradas (vazio quando não se aplica)
+    contexto: dados adicionais, p.ex. {"tipo_contrato": ..., "id_contrato": ...} nos aditivos
+              e {"remoto": True} nas alterações feitas por outra instância
+"""
+
+_assinantes = {}
+_trava = threading.Lock()
+
+
+def assinar(entidade, callback):
+    """Registra o callback para os eventos da entidade
+
+    Returns:
+        função sem argumentos que cancela a assinatura
+    """
+    with _trava:
+        _assinantes.setdefault(entidade, []).append(callback)
+    return lambda: cancelar_assinatura(entidade, callback)
+
+
+def cancelar_assinatura(entidade, callback):
+    """Remove o callback da entidade (sem efeito se não estiver assinado)"""
+    with _trava:
+        lista = _assinantes.get(entidade)
+        if lista and callback in lista:
+            lista.remove(callback)
+            if not lista:
+                del _assinantes[entidade]
+
+
+def assinar_enquanto_existir(widget, entidade, callback):
+    """Assina a entidade e cancela a assinatura quando o widget for destruído"""
+    cancelar = assinar(entidade, callback)
+
+    def ao_destruir(event):
+        if event.widget is widget:
+            cancelar()
+
+    widget.bind("<Destroy>", ao_destruir, add="+")
+    return cancelar
+
+
+def publicar(entidade, id_registro, operacao, campos=(), **contexto):
+    """Notifica os assinantes da entidade (e de TODAS) sobre uma alteração
+
+    Erros de um assinante são impressos e não interrompem os demais nem a
+    operação que publicou o evento.
+    """
+    evento = EventoAlteracao(entidade, id_registro, operacao, tuple(campos), contexto)
+    with _trava:
+        callbacks = list(_assinantes.get(entidade, ())) + list(_assinantes.get(TODAS, ()))
+    for callback in callbacks:
+        try:
+            callback(evento)
+        except Exception:
+            print(f"Erro ao notificar alteração de {entidade} {id_registro}:")
+            traceback.print_exc()
+    return evento
@@ -0,0 +1,152 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+from models.db_manager import obter_versao_dados, obter_versoes_tabelas
+from utils.perfilador import trecho, perfil_ativo
+
+
+class CacheTelas:
+    """Cache LRU de telas construídas dentro de um frame de conteúdo
+
+    Em vez de destruir e reconstruir a tela a cada navegação, cada tela fica em
+    um frame próprio que é apenas ocultado (pack_forget) e exibido novamente.
+    Ao reexibir, os dados só são recarregados se alguma das tabelas das quais a
+    tela depende foi alterada desde o último carregamento.
+    """
+
+    def __init__(self, container, limite=4):
+        """
+        Args:
+            container: frame onde as telas são exibidas
+            limite: quantidade máxima de telas mantidas vivas
+        """
+        self.container = container
+        self.limite = max(1, limite)
+        self.telas = OrderedDict()
+        self.chave_atual = None
+
+    def mostrar(self, chave, construtor, tabelas=(), atualizar=None):
+        """Exibe a tela identificada pela chave, construindo-a se necessário
+
+        Args:
+            chave: identificador da tela
+            construtor: função que recebe o frame da tela e retorna o objeto da tela
+            tabelas: tabelas das quais os dados da tela dependem
+            atualizar: função que recebe o objeto da tela e recarrega seus dados
+
+        Returns:
+            objeto retornado pelo construtor
+        """
+        self.ocultar()
+
+        entrada = self.telas.get(chave)
+        if entrada is None:
+            frame = ttk.Frame(self.container)
+            frame.pack(fill=tk.BOTH, expand=True)
+
+            # Versões capturadas antes da construção: alterações feitas durante
+            # a carga inicial provocam uma atualização na próxima exibição
+            data_version, versoes = self._capturar_versoes(tabelas)
+            entrada = {
+                "frame": frame,
+                "tela": None,
+                "tabelas": tuple(tabelas),
+                "atualizar": atualizar,
+                "data_version": data_version,
+                "versoes": versoes
+            }
+            self.telas[chave] = entrada
+            self.chave_atual = chave
+
+            try:
+                with trecho(f"tela.{chave}.construir"):
+                    entrada["tela"] = construtor(frame)
+                    if perfil_ativo():
+                        # Inclui o cálculo de layout do Tk na medição
+                        frame.update_idletasks()
+            except Exception:
+                self.remover(chave)
+                raise
+
+            self._liberar_excedentes()
+        else:
+            self.telas.move_to_end(chave)
+            entrada["frame"].pack(fill=tk.BOTH, expand=True)
+            self.chave_atual = chave
+            self._atualizar_se_necessario(entrada)
+
+        return entrada["tela"]
+
+    def ocultar(self):
+        """Oculta a tela exibida no momento, sem destruí-la"""
+        if self.chave_atual in self.telas:
+            self.telas[self.chave_atual]["frame"].pack_forget()
+        self.chave_atual = None
+
+    def remover(self, chave):
+        """Destrói a tela identificada pela chave e a retira do cache"""
+        entrada = self.telas.pop(chave, None)
+        if entrada is None:
+            return
+        if self.chave_atual == chave:
+            self.chave_atual = None
+        entrada["frame"].destroy()
+
+    def invalidar(self, chave=None):
+        """Força o recarregamento dos dados na próxima exibição
+
+        Args:
+            chave: tela a invalidar; se None, invalida todas
+        """
+        chaves = [chave] if chave is not None else list(self.telas)
+        for item in chaves:
+            if item in self.telas:
+                self.telas[item]["data_version"] = None
+                self.telas[item]["versoes"] = None
+
+    def limpar(self):
+        """Destrói todas as telas do cache"""
+        for chave in list(self.telas):
+            self.remover(chave)
+
+    def _capturar_versoes(self, tabelas):
+        """Retorna o data_version atual e os contadores das tabelas"""
+        try:
+            return obter_versao_dados(), obter_versoes_tabelas(tabelas)
+        except Exception as e:
+            print(f"Erro ao obter versões das tabelas: {e}")
+            return None, None
+
+    def _atualizar_se_necessario(self, entrada):
+        """Recarrega os dados da tela se as tabelas dependentes mudaram"""
+        if not entrada["tabelas"] or entrada["atualizar"] is None:
+            return
+
+        try:
+            data_version = obter_versao_dados()
+        except Exception as e:
+            print(f"Erro ao obter versão dos dados: {e}")
+            data_version = None
+
+        # Nenhuma transação confirmada desde o último carregamento
+        if data_version is not None and data_version == entrada["data_version"]:
+            return
+
+        _, versoes = self._capturar_versoes(entrada["tabelas"])
+        entrada["data_version"] = data_version
+
+        if versoes is not None and versoes == entrada["versoes"]:
+            return
+
+        entrada["versoes"] = versoes
+        with trecho(f"tela.{self.chave_atual}.atualizar"):
+            entrada["atualizar"](entrada["tela"])
+
+    def _liberar_excedentes(self):
+        """Destrói as telas menos usadas recentemente acima do limite"""
+        while len(self.telas) > self.limite:
+            chave_antiga = next(iter(self.telas))
+            if chave_antiga == self.chave_atual:
+                self.telas.move_to_end(chave_antiga)
+                continue
+            self.remover(chave_antiga)
@@ -0,0 +1,207 @@
+# utils/cliente_api.py
+"""Cliente do serviço local (utils/servico_api.py)
+
+ClienteApi faz as chamadas HTTP/JSON; ativar_cliente() coloca o app Tk em
+modo cliente, trocando as funções dos controllers por chamadas ao servidor.
+Deve ser chamada antes de importar as telas, que importam as funções dos
+controllers pelo nome (main.py faz isso quando SISPROJ_SERVIDOR está definida).
+
+As alterações feitas pelo servidor durante uma gravação voltam na resposta e
+são publicadas no barramento local, como se a gravação fosse local.
+"""
+import functools
+import gzip
+import http.client
+import importlib
+import json
+import threading
+from urllib.parse import urlsplit
+
+import models.db_manager as db_manager
+from utils.barramento import publicar
+from utils.servico_api import FUNCOES, FUNCOES_BANCO, METODOS_CUSTEIO, PORTA_PADRAO, codificar, decodificar
+from utils.session import Session
+
+
+class ErroServico(Exception):
+    """Erro devolvido pelo servidor (ou falha de comunicação com ele)"""
+
+    def __init__(self, tipo, mensagem):
+        self.tipo = tipo
+        super().__init__(f"{tipo}: {mensagem}")
+
+
+def _erro(descricao):
+    """Recria no cliente a exceção descrita pelo servidor"""
+    if descricao.get("tipo") == "ConflitoEdicao" and "dados" in descricao:
+        dados = descricao["dados"]
+        diferencas = {coluna: tuple(valores) for coluna, valores in dados["diferencas"].items()}
+        return db_manager.ConflitoEdicao(dados["tabela"], dados["id_registro"], dados["versao_esperada"],
+                                         dados["versao_atual"], diferencas)
+    return ErroServico(descricao.get("tipo", "Erro"), descricao.get("mensagem", ""))
+
+
+class ClienteApi:
+    """Chamadas ao servidor, com uma conexão HTTP persistente por thread"""
+
+    def __init__(self, url, tempo_limite=30):
+        partes = urlsplit(url if "://" in url else f"http://{url}")
+        self.host = partes.hostname or "127.0.0.1"
+        self.porta = partes.port or PORTA_PADRAO
+        self.tempo_limite = tempo_limite
+        self.token = None
+        self._local = threading.local()
+
+    def _conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = http.client.HTTPConnection(self.host, self.porta, timeout=self.tempo_limite)
+            self._local.conexao = conexao
+        return conexao
+
+    def _requisitar(self, metodo, caminho, dados=None):
+        corpo = None if dados is None else json.dumps(codificar(dados), ensure_ascii=False).encode("utf-8")
+        cabecalhos = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+        if self.token:
+            cabecalhos["Authorization"] = f"Bearer {self.token}"
+
+        # Uma conexão keep-alive pode ter sido fechada pelo servidor: tenta de novo uma vez
+        for tentativa in (1, 2):
+            conexao = self._conexao()
+            try:
+                conexao.request(metodo, caminho, body=corpo, headers=cabecalhos)
+                resposta = conexao.getresponse()
+                conteudo = resposta.read()
+                break
+            except (http.client.HTTPException, ConnectionError) as erro:
+                conexao.close()
+                self._local.conexao = None
+                if tentativa == 2:
+                    raise ErroServico("SemConexao", f"{self.host}:{self.porta} ({erro})") from erro
+            except OSError as erro:
+                conexao.close()
+                self._local.conexao = None
+                raise ErroServico("SemConexao", f"{self.host}:{self.porta} ({erro})") from erro
+
+        if resposta.getheader("Content-Encoding") == "gzip":
+            conteudo = gzip.decompress(conteudo)
+        return resposta.status, decodificar(conteudo)
+
+    def _resultado(self, resposta):
+        if "erro" in resposta:
+            raise _erro(resposta["erro"])
+        for entidade, id_registro, operacao, campos, contexto in resposta.get("eventos", ()):
+            publicar(entidade, id_registro, operacao, campos, **contexto)
+        return resposta.get("resultado")
+
+    def login(self, usuario, senha):
+        """Autentica no servidor; retorna o usuário (como authenticate) ou None"""
+        status, resposta = self._requisitar("POST", "/api/login", {"usuario": usuario, "senha": senha})
+        if status != 200:
+            return None
+        self.token = resposta["token"]
+        return resposta["usuario"]
+
+    def chamar(self, funcao, *args, **kwargs):
+        """Executa uma função do servidor (p.ex. "eventos.listar_eventos")"""
+        status, resposta = self._requisitar("POST", "/api/chamar",
+                                            {"funcao": funcao, "args": list(args), "kwargs": kwargs})
+        return self._resultado(resposta)
+
+    def lote(self, chamadas):
+        """Executa várias chamadas em uma única requisição
+
+        Args:
+            chamadas: sequência de (funcao, args, kwargs)
+
+        Returns:
+            list: resultado de cada chamada, ou a exceção correspondente em caso de erro
+        """
+        status, resposta = self._requisitar("POST", "/api/lote", {"chamadas": [
+            {"funcao": funcao, "args": list(args), "kwargs": dict(kwargs)} for funcao, args, kwargs in chamadas]})
+        if "erro" in resposta:
+            raise _erro(resposta["erro"])
+        resultados = []
+        for item in resposta["respostas"]:
+            try:
+                resultados.append(self._resultado(item))
+            except Exception as erro:
+                resultados.append(erro)
+        return resultados
+
+    def saude(self):
+        return self._requisitar("GET", "/api/saude")[1]
+
+
+def _funcao_remota(cliente, nome, original):
+    @functools.wraps(original)
+    def remota(*args, **kwargs):
+        # Sessões de relatório não viajam: no servidor cada chamada lê de um instantâneo próprio
+        kwargs.pop("sessao", None)
+        return cliente.chamar(nome, *args, **kwargs)
+    return remota
+
+
+class _SessaoRelatorioRemota:
+    """Sessão de relatório em modo cliente (ver SessaoRelatorio)
+
+    O instantâneo fica no servidor, um por chamada: o resumo e cada exportação
+    refletem o banco no momento em que foram pedidos.
+    """
+
+    def renovar(self):
+        pass
+
+    def fechar(self):
+        pass
+
+    def descricao_idade(self):
+        return "Dados lidos do servidor a cada consulta"
+
+
+def _metodo_remoto(cliente, nome):
+    def metodo(self, *args, **kwargs):
+        return cliente.chamar(nome, *args, **kwargs)
+    return metodo
+
+
+def _classe_custeio(cliente):
+    """CusteioController cujos métodos chamam a instância do servidor"""
+    metodos = {nome: _metodo_remoto(cliente, f"custeio.{nome}") for nome in METODOS_CUSTEIO}
+    return type("CusteioController", (), metodos)
+
+
+def _login_remoto(cliente):
+    def login(username, password, on_success, on_failure):
+        from tkinter import messagebox
+        user = cliente.login(username, password)
+        if user:
+            Session.login(user)
+            on_success()
+        else:
+            messagebox.showerror("Erro de Login", "Usuário ou senha incorretos.")
+            on_failure()
+    return login
+
+
+def ativar_cliente(url, tempo_limite=30):
+    """Modo cliente: os controllers passam a chamar o servidor em `url`
+
+    Returns:
+        ClienteApi usado pelas funções substituídas
+    """
+    cliente = ClienteApi(url, tempo_limite)
+    for grupo, (leituras, gravacoes) in FUNCOES.items():
+        modulo = importlib.import_module(f"controllers.{grupo}_controller")
+        for nome in leituras + gravacoes:
+            setattr(modulo, nome, _funcao_remota(cliente, f"{grupo}.{nome}", getattr(modulo, nome)))
+    for nome in FUNCOES_BANCO:
+        setattr(db_manager, nome, _funcao_remota(cliente, f"banco.{nome}", getattr(db_manager, nome)))
+
+    custeio_controller = importlib.import_module("controllers.custeio_controller")
+    custeio_controller.CusteioController = _classe_custeio(cliente)
+    auth_controller = importlib.import_module("controllers.auth_controller")
+    auth_controller.login = _login_remoto(cliente)
+    relatorio_controller = importlib.import_module("controllers.relatorio_controller")
+    relatorio_controller.abrir_sessao_relatorio = _SessaoRelatorioRemota
+    return cliente
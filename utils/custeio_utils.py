@@ -1,19 +1,32 @@
 import sqlite3
 from typing import List, Dict, Any, Optional, Tuple
 
+from models import db_manager
+from models.db_manager import get_connection
+
+# Levels of the custeio hierarchy, from the top
+HIERARCHY = ['instituicao_parceira', 'cod_projeto', 'cod_ta', 'resultado', 'subprojeto']
+
 class CusteioManager:
     """
     Utility class to manage hierarchical selection and filtering for the custeio table.
     The hierarchy follows: instituicao_parceira -> cod_projeto -> cod_ta -> resultado -> subprojeto
     """
     
-    def __init__(self, db_path: str = 'contrato.db'):
-        """Initialize the CusteioManager with the database path."""
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the CusteioManager with the database path.
+
+        When db_path is None, the application database (models.db_manager.DB_PATH)
+        is used, so the manager follows the same database as the other models.
+        """
         self.db_path = db_path
+        # Row count per combination of the five levels: (cache key, list of (values, count))
+        self._combinations = None
     
     def _get_connection(self) -> Tuple[sqlite3.Connection, sqlite3.Cursor]:
         """Create and return a connection to the database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path) if self.db_path else get_connection()
         conn.row_factory = sqlite3.Row  # This enables column access by name
         cursor = conn.cursor()
         return conn, cursor
@@ -62,10 +75,9 @@ class CusteioManager:
         Returns:
             Dictionary with field names as keys and lists of distinct values as values
         """
-        fields = ['instituicao_parceira', 'cod_projeto', 'cod_ta', 'resultado', 'subprojeto']
         result = {}
         
-        for field in fields:
+        for field in HIERARCHY:
             result[field] = self.get_distinct_values(field)
         
         return result
@@ -111,6 +123,113 @@ class CusteioManager:
         finally:
             conn.close()
     
+    def get_combinations(self) -> List[Tuple[Tuple[Optional[str], ...], int]]:
+        """
+        Get the row count of each combination of the five hierarchy levels.
+
+        A single grouped query over the whole table; the result is kept in memory
+        and reused until the custeio change counter moves (any insert, update or
+        delete, from this or another instance).
+
+        Returns:
+            List of (values of the five levels, row count)
+        """
+        key = None
+        if self.db_path is None:
+            key = (db_manager.DB_PATH, db_manager.obter_versoes_tabelas(['custeio'])['custeio'])
+            if self._combinations is not None and self._combinations[0] == key:
+                return self._combinations[1]
+
+        conn, cursor = self._get_connection()
+        try:
+            fields = ", ".join(HIERARCHY)
+            cursor.execute(f"SELECT {fields}, COUNT(*) FROM custeio GROUP BY {fields}")
+            combinations = [(tuple(row[:-1]), row[-1]) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+        if key is not None:
+            self._combinations = (key, combinations)
+        return combinations
+
+    def get_facets(self, filters: Optional[Dict[str, str]] = None) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Get the options and row counts of all five hierarchy levels at once.
+
+        Each level is narrowed by the selections of the levels above it (the same
+        cascade as get_distinct_values with the previous selections), so a single
+        call replaces the five queries of the cascade.
+
+        Args:
+            filters: Dictionary of field-value pairs with the current selections
+
+        Returns:
+            Dictionary with field names as keys and lists of (value, row count),
+            ordered by value, as values
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v}
+        counts = {field: {} for field in HIERARCHY}
+        for values, count in self.get_combinations():
+            for index, field in enumerate(HIERARCHY):
+                value = values[index]
+                if value is not None and value != '':
+                    counts[field][value] = counts[field].get(value, 0) + count
+                # Lower levels only see the rows that match this level's selection
+                if field in filters and value != filters[field]:
+                    break
+        return {field: sorted(counts[field].items()) for field in HIERARCHY}
+
+    def count_by_selection(self, filters: Dict[str, str]) -> int:
+        """
+        Count the rows matching the selections, from the in-memory combinations.
+
+        Args:
+            filters: Dictionary of field-value pairs to filter by
+
+        Returns:
+            Number of matching rows
+        """
+        selected = [(HIERARCHY.index(k), v) for k, v in filters.items() if v]
+        return sum(count for values, count in self.get_combinations()
+                   if all(values[index] == value for index, value in selected))
+
+    def filter_by_selection_page(self, filters: Dict[str, str], offset: int = 0,
+                                 limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get one page of the filtered data, ordered by id.
+
+        Args:
+            filters: Dictionary of field-value pairs to filter by
+            offset: Number of matching rows to skip
+            limit: Maximum number of rows returned
+
+        Returns:
+            List of dictionaries containing the rows of the page
+        """
+        conn, cursor = self._get_connection()
+
+        try:
+            query = "SELECT * FROM custeio"
+            params = []
+
+            filter_conditions = []
+            for key, value in filters.items():
+                if value:  # Only add non-empty filters
+                    filter_conditions.append(f"{key} = ?")
+                    params.append(value)
+            if filter_conditions:
+                query += " WHERE " + " AND ".join(filter_conditions)
+
+            query += " ORDER BY id LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+            cursor.execute(query, params)
+
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        finally:
+            conn.close()
+
     def get_next_level_options(self, current_level: str, filters: Dict[str, str]) -> List[str]:
         """
         Get options for the next level in the hierarchy based on current selections.
@@ -122,19 +241,17 @@ class CusteioManager:
         Returns:
             List of options for the next level
         """
-        hierarchy = ['instituicao_parceira', 'cod_projeto', 'cod_ta', 'resultado', 'subprojeto']
-        
         # Find the current level index
         try:
-            current_index = hierarchy.index(current_level)
+            current_index = HIERARCHY.index(current_level)
         except ValueError:
             return []
         
         # Check if there's a next level
-        if current_index >= len(hierarchy) - 1:
+        if current_index >= len(HIERARCHY) - 1:
             return []
         
-        next_level = hierarchy[current_index + 1]
+        next_level = HIERARCHY[current_index + 1]
         return self.get_distinct_values(next_level, filters)
 
 
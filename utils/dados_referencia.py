@@ -0,0 +1,98 @@
+# utils/dados_referencia.py
+from models.db_manager import obter_versoes_tabelas
+from controllers.fornecedores_controller import listar_fornecedores
+from controllers.titulo_eventos_controller import listar_titulos_eventos
+from controllers.demanda_controller import obter_demanda
+from utils.custeio_utils import CusteioManager
+
+# Cache compartilhado entre os formulários: {chave: (versao_da_tabela, dados)}
+_cache = {}
+
+
+def _obter(chave, tabela, carregar):
+    """Retorna os dados do cache ou os carrega se a tabela mudou
+
+    Args:
+        chave: identificador da entrada no cache
+        tabela: tabela de origem, cujo contador de alterações valida o cache
+        carregar: função que carrega os dados do banco
+
+    Returns:
+        dados carregados (listas são devolvidas como cópia rasa, para que o
+        chamador possa alterá-las)
+    """
+    try:
+        versao = obter_versoes_tabelas([tabela])[tabela]
+    except Exception:
+        versao = None
+
+    item = _cache.get(chave)
+    if item is not None and versao is not None and item[0] == versao:
+        dados = item[1]
+    else:
+        dados = carregar()
+        _cache[chave] = (versao, dados)
+    return list(dados) if isinstance(dados, list) else dados
+
+
+def invalidar_dados_referencia(tabela=None):
+    """Descarta os dados em cache de uma tabela (ou de todas)
+
+    Args:
+        tabela: nome da tabela de origem; se None, limpa todo o cache
+    """
+    if tabela is None:
+        _cache.clear()
+        return
+    for chave in [c for c in _cache if c[0] == tabela]:
+        del _cache[chave]
+
+
+def obter_nomes_fornecedores():
+    """Retorna a razão social de todos os fornecedores cadastrados"""
+    return _obter(
+        ("fornecedores",), "fornecedores",
+        lambda: [fornecedor[1] for fornecedor in listar_fornecedores()]
+    )
+
+
+def obter_titulos_eventos():
+    """Retorna o título de todos os eventos cadastrados em titulo_eventos"""
+    return _obter(
+        ("titulo_eventos",), "titulo_eventos",
+        lambda: [titulo[1] for titulo in listar_titulos_eventos()]
+    )
+
+
+def obter_valores_custeio(campo, filtros=None):
+    """Retorna os valores distintos de um campo de custeio para os filtros informados
+
+    Args:
+        campo: coluna da tabela custeio
+        filtros: dicionário {coluna: valor} aplicado à consulta
+
+    Returns:
+        list: valores distintos ordenados
+    """
+    filtros = filtros or {}
+    chave = ("custeio", campo, tuple(sorted(filtros.items())))
+    return _obter(
+        chave, "custeio",
+        lambda: CusteioManager().get_distinct_values(campo, filtros)
+    )
+
+
+def obter_demanda_cache(codigo):
+    """Retorna a demanda pelo código, reaproveitando a leitura enquanto a tabela não mudar
+
+    Args:
+        codigo: código da demanda (inteiro ou texto)
+
+    Returns:
+        tuple: linha da demanda ou None se não existir
+    """
+    try:
+        codigo = int(codigo)
+    except (TypeError, ValueError):
+        return None
+    return _obter(("demanda", codigo), "demanda", lambda: obter_demanda(codigo))
@@ -0,0 +1,84 @@
+# utils/desempenho.py
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def resumir_tempos(tempos_ms):
+    """Resume uma lista de tempos (ms) em estatísticas para relatórios e JSON
+
+    Args:
+        tempos_ms: durações medidas, em milissegundos
+
+    Returns:
+        dict: repeticoes, media_ms, mediana_ms, min_ms, max_ms, p95_ms e p99_ms
+    """
+    if not tempos_ms:
+        return {"repeticoes": 0}
+    ordenados = sorted(tempos_ms)
+    return {
+        "repeticoes": len(ordenados),
+        "media_ms": round(statistics.fmean(ordenados), 3),
+        "mediana_ms": round(statistics.median(ordenados), 3),
+        "min_ms": round(ordenados[0], 3),
+        "max_ms": round(ordenados[-1], 3),
+        "p95_ms": round(_percentil(ordenados, 0.95), 3),
+        "p99_ms": round(_percentil(ordenados, 0.99), 3),
+    }
+
+
+def _percentil(ordenados, fracao):
+    """Valor da lista ordenada na posição do percentil (sem interpolação)"""
+    return ordenados[min(len(ordenados) - 1, int(round(fracao * (len(ordenados) - 1))))]
+
+
+class Cronometro:
+    """Registra a duração de fases nomeadas, como as etapas da inicialização
+
+    Exemplo:
+        cronometro = Cronometro("Inicialização")
+        with cronometro.fase("init_db"):
+            init_db()
+        print(cronometro.relatorio())
+    """
+
+    def __init__(self, nome, inicio=None):
+        """
+        Args:
+            nome: título usado no relatório
+            inicio: instante inicial (time.perf_counter()); padrão é agora
+        """
+        self.nome = nome
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.fases = []
+
+    @contextmanager
+    def fase(self, nome):
+        """Mede a duração do bloco e a registra com o nome informado"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nome, inicio)
+
+    def registrar(self, nome, inicio):
+        """Registra uma fase que começou em `inicio` e termina agora"""
+        self.fases.append((nome, (time.perf_counter() - inicio) * 1000))
+
+    def total_ms(self):
+        """Tempo decorrido desde o início do cronômetro, em milissegundos"""
+        return (time.perf_counter() - self.inicio) * 1000
+
+    def relatorio(self):
+        """Retorna o relatório das fases em texto"""
+        linhas = [f"[{self.nome}]"]
+        for nome, duracao in self.fases:
+            linhas.append(f"  {nome:<30} {duracao:8.1f} ms")
+        linhas.append(f"  {'total':<30} {self.total_ms():8.1f} ms")
+        return "\n".join(linhas)
+
+    def exibir_se_habilitado(self):
+        """Imprime o relatório quando a variável SISPROJ_TEMPOS está definida"""
+        if os.environ.get("SISPROJ_TEMPOS"):
+            print(self.relatorio())
@@ -1,9 +1,10 @@
 # utils/logger.py
-from models.db_manager import get_connection
+from models.db_manager import enviar_escrita
 
 def log_action(usuario, acao):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO logs (usuario, acao) VALUES (?, ?)", (usuario, acao))
-    conn.commit()
-    conn.close()
+    def gravar(conn):
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO logs (usuario, acao) VALUES (?, ?)", (usuario, acao))
+    # Com a fila de escrita ativa, o registro entra no commit da próxima gravação
+    # e quem chamou não espera
+    enviar_escrita(gravar)
@@ -0,0 +1,510 @@
+# utils/perfil_planilha.py
+"""Perfil de planilhas de origem (XLSX/CSV) lidas em fluxo, com memória constante
+
+As planilhas recebidas para importação (listagem de custeio, cargas de
+contratos) eram abertas inteiras com pandas.read_excel só para conferir tipos
+e nulos. Aqui as linhas são lidas uma a uma (openpyxl em modo somente leitura
+ou csv.reader) e, numa única passada, cada coluna acumula:
+
+- tipo inferido (inteiro, decimal, data, booleano ou texto) e a contagem de
+  cada tipo encontrado;
+- quantidade e taxa de valores vazios;
+- quantidade de valores distintos (exata até 1024; acima disso, estimativa
+  HyperLogLog com 16 KB por coluna e erro típico de 1%);
+- mínimo e máximo (números, datas ou textos) e maior comprimento;
+- alguns exemplos de valores.
+
+O uso de memória não depende da quantidade de linhas. perfilar() devolve um
+dict pronto para JSON; comparar_com_tabela() acrescenta as divergências em
+relação ao esquema da tabela de destino, que os scripts de importação usam
+para recusar o arquivo antes de gravar.
+
+O openpyxl é necessário apenas para arquivos .xlsx.
+"""
+import csv
+import math
+import os
+import re
+import time
+import unicodedata
+from datetime import date, datetime
+
+INTEIRO = "inteiro"
+DECIMAL = "decimal"
+DATA = "data"
+BOOLEANO = "booleano"
+TEXTO = "texto"
+
+# Exemplos guardados por coluna
+MAXIMO_EXEMPLOS = 5
+
+# Textos já classificados guardados por coluna: colunas categóricas repetem
+# poucos valores e deixam de passar pelas expressões regulares; o limite
+# mantém a memória constante nas colunas de valores únicos
+MAXIMO_CLASSIFICADOS = 4096
+
+# Bytes lidos do CSV para detectar o delimitador
+AMOSTRA_CSV = 64 * 1024
+
+_INTEIRO = re.compile(r"[+-]?\d+")
+# 1.234,56 / 1234,56 / 1234.56 / R$ 1.234,56
+_DECIMAL_BR = re.compile(r"(?:R\$\s*)?[+-]?\d{1,3}(?:\.\d{3})*,\d+|[+-]?\d+,\d+")
+_DECIMAL = re.compile(r"[+-]?\d*\.\d+")
+_DATA_BR = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+_DATA_ISO = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?")
+_INICIO_NUMERO_DATA = set("0123456789+-.R")
+_BOOLEANOS = {"sim", "não", "nao", "true", "false", "verdadeiro", "falso"}
+
+
+class HyperLogLog:
+    """Estimativa da quantidade de valores distintos em memória fixa (2^precisao bytes)
+
+    Até `limite_exato` valores distintos a contagem é exata (conjunto dos
+    hashes); acima disso vale a estimativa dos registros.
+    """
+
+    def __init__(self, precisao=14, limite_exato=1024):
+        self.precisao = precisao
+        self.registros = bytearray(1 << precisao)
+        self.limite_exato = limite_exato
+        self._exatos = set()
+
+    def adicionar(self, texto):
+        # hash() do Python (SipHash) é estável dentro do processo, o que basta
+        # para uma estimativa feita numa única passada
+        self.adicionar_hash(hash(texto) & 0xFFFFFFFFFFFFFFFF)
+
+    def adicionar_hash(self, valor):
+        if self._exatos is not None:
+            self._exatos.add(valor)
+            if len(self._exatos) > self.limite_exato:
+                self._exatos = None
+        bits_resto = 64 - self.precisao
+        indice = valor >> bits_resto
+        resto = valor & ((1 << bits_resto) - 1)
+        # Posição do primeiro bit 1 nos bits restantes
+        posicao = bits_resto - resto.bit_length() + 1
+        if posicao > self.registros[indice]:
+            self.registros[indice] = posicao
+
+    def estimar(self):
+        if self._exatos is not None:
+            return len(self._exatos)
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / sum(2.0 ** -registro for registro in self.registros)
+        zeros = self.registros.count(0)
+        if estimativa <= 2.5 * m and zeros:
+            # Poucos valores: contagem linear, praticamente exata
+            estimativa = m * math.log(m / zeros)
+        return int(round(estimativa))
+
+
+def normalizar_coluna(nome):
+    """Nome de coluna da planilha no padrão das tabelas: 'DIM_PROJETO.Cód. TA' -> 'cod_ta'"""
+    nome = str(nome or "").strip()
+    # Prefixos como DIM_PROJETO. (exportações do sistema de origem)
+    if re.fullmatch(r"[A-Za-z_]+\.[A-Za-z_].*", nome):
+        nome = nome.split(".", 1)[1]
+    nome = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode("ascii").lower()
+    return re.sub(r"[^a-z0-9]+", "_", nome).strip("_")
+
+
+def _data_valida(ano, mes, dia):
+    try:
+        return date(int(ano), int(mes), int(dia)).isoformat()
+    except ValueError:
+        return None
+
+
+def classificar(valor):
+    """Tipo e valor comparável de uma célula, ou (None, None) quando vazia
+
+    Números vêm como float, datas como texto ISO (aaaa-mm-dd) e textos sem os
+    espaços das pontas.
+    """
+    if valor is None:
+        return None, None
+    if isinstance(valor, bool):
+        return BOOLEANO, int(valor)
+    if isinstance(valor, int):
+        return INTEIRO, float(valor)
+    if isinstance(valor, float):
+        if math.isnan(valor):
+            return None, None
+        return (INTEIRO if valor.is_integer() else DECIMAL), valor
+    if isinstance(valor, datetime):
+        return DATA, valor.date().isoformat() if valor.time() == datetime.min.time() else valor.isoformat(" ")
+    if isinstance(valor, date):
+        return DATA, valor.isoformat()
+
+    texto = str(valor).strip()
+    if not texto:
+        return None, None
+    if texto[0] not in _INICIO_NUMERO_DATA:
+        return (BOOLEANO, texto.lower()) if texto.lower() in _BOOLEANOS else (TEXTO, texto)
+    # Códigos com zero à esquerda (00123) são texto, não número
+    if _INTEIRO.fullmatch(texto) and not (len(texto.lstrip("+-")) > 1 and texto.lstrip("+-")[0] == "0"):
+        return INTEIRO, float(texto)
+    if _DECIMAL_BR.fullmatch(texto):
+        numero = texto.replace("R$", "").replace(" ", "").replace(".", "").replace(",", ".")
+        return DECIMAL, float(numero)
+    if _DECIMAL.fullmatch(texto):
+        return DECIMAL, float(texto)
+    correspondencia = _DATA_BR.fullmatch(texto)
+    if correspondencia:
+        iso = _data_valida(correspondencia.group(3), correspondencia.group(2), correspondencia.group(1))
+        if iso:
+            return DATA, iso
+    correspondencia = _DATA_ISO.fullmatch(texto)
+    if correspondencia:
+        iso = _data_valida(*correspondencia.groups())
+        if iso:
+            return DATA, texto if len(texto) > 10 else iso
+    if texto.lower() in _BOOLEANOS:
+        return BOOLEANO, texto.lower()
+    return TEXTO, texto
+
+
+class PerfilColuna:
+    """Estatísticas de uma coluna acumuladas valor a valor"""
+
+    def __init__(self, nome, posicao):
+        self.nome = nome
+        self.posicao = posicao
+        self.vazios = 0
+        self.tipos = {}
+        self.distintos = HyperLogLog()
+        self.minimos = {}
+        self.maximos = {}
+        self.comprimento_maximo = 0
+        self.exemplos = []
+        self._classificados = {}
+
+    def adicionar(self, valor):
+        classificado = self._classificados.get(valor) if isinstance(valor, str) else None
+        if classificado is None:
+            tipo, comparavel = classificar(valor)
+            if tipo is None:
+                self.vazios += 1
+                return
+            # Forma textual usada na contagem de distintos: 7 e "7" são o mesmo valor
+            if isinstance(valor, str):
+                texto = valor.strip()
+            elif tipo == INTEIRO:
+                texto = str(int(comparavel))
+            elif tipo == DATA:
+                texto = comparavel
+            else:
+                texto = str(valor)
+            classificado = (tipo, comparavel, texto, hash(texto) & 0xFFFFFFFFFFFFFFFF)
+            if isinstance(valor, str) and len(self._classificados) < MAXIMO_CLASSIFICADOS:
+                self._classificados[valor] = classificado
+        tipo, comparavel, texto, valor_hash = classificado
+        self.tipos[tipo] = self.tipos.get(tipo, 0) + 1
+        self.distintos.adicionar_hash(valor_hash)
+        if len(texto) > self.comprimento_maximo:
+            self.comprimento_maximo = len(texto)
+
+        # Números (inteiros e decimais) são comparados entre si
+        grupo = DECIMAL if tipo in (INTEIRO, DECIMAL) else tipo
+        if grupo != BOOLEANO:
+            if grupo not in self.minimos or comparavel < self.minimos[grupo]:
+                self.minimos[grupo] = comparavel
+            if grupo not in self.maximos or comparavel > self.maximos[grupo]:
+                self.maximos[grupo] = comparavel
+        if len(self.exemplos) < MAXIMO_EXEMPLOS and texto not in self.exemplos:
+            self.exemplos.append(texto)
+
+    def tipo_inferido(self):
+        """Tipo que acomoda todos os valores preenchidos ('vazio' se não houver nenhum)"""
+        tipos = set(self.tipos)
+        if not tipos:
+            return "vazio"
+        if tipos <= {INTEIRO}:
+            return INTEIRO
+        if tipos <= {INTEIRO, DECIMAL}:
+            return DECIMAL
+        if len(tipos) == 1:
+            return tipos.pop()
+        return TEXTO
+
+    def como_dict(self, linhas):
+        tipo = self.tipo_inferido()
+        grupo = DECIMAL if tipo in (INTEIRO, DECIMAL) else tipo
+        minimo, maximo = self.minimos.get(grupo), self.maximos.get(grupo)
+        if tipo == TEXTO and len(self.tipos) > 1:
+            # Valores de tipos mistos: mínimo e máximo como texto não fazem sentido
+            minimo = maximo = None
+        if tipo == INTEIRO:
+            minimo, maximo = int(minimo), int(maximo)
+        preenchidos = linhas - self.vazios
+        return {
+            "nome": self.nome,
+            "nome_normalizado": normalizar_coluna(self.nome),
+            "posicao": self.posicao,
+            "tipo_inferido": tipo,
+            "tipos": dict(sorted(self.tipos.items())),
+            "preenchidos": preenchidos,
+            "vazios": self.vazios,
+            "taxa_vazios": round(self.vazios / linhas, 4) if linhas else 0.0,
+            "distintos_estimados": min(self.distintos.estimar(), preenchidos),
+            "minimo": minimo,
+            "maximo": maximo,
+            "comprimento_maximo": self.comprimento_maximo,
+            "exemplos": self.exemplos,
+        }
+
+
+def _detectar_csv(caminho):
+    """Codificação e dialeto do CSV a partir do início do arquivo"""
+    with open(caminho, "rb") as arquivo:
+        amostra = arquivo.read(AMOSTRA_CSV)
+    codificacao = "utf-8-sig"
+    try:
+        texto = amostra.decode(codificacao)
+    except UnicodeDecodeError as e:
+        if e.start < len(amostra) - 4:
+            # Planilhas exportadas pelo Excel em português costumam vir em cp1252
+            codificacao = "cp1252"
+        texto = amostra.decode(codificacao, errors="ignore")
+    try:
+        dialeto = csv.Sniffer().sniff(texto, delimiters=";,\t|")
+    except csv.Error:
+        delimitador = ";" if texto.count(";") > texto.count(",") else ","
+        dialeto = type("DialetoPlanilha", (csv.excel,), {"delimiter": delimitador})
+    return codificacao, dialeto
+
+
+def ler_linhas(caminho, aba=None):
+    """Gera as linhas do arquivo (tuplas de valores), sem carregá-lo inteiro
+
+    Args:
+        caminho: arquivo .xlsx/.xlsm ou .csv/.txt
+        aba: nome da aba nos arquivos do Excel (padrão: a primeira)
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in (".xlsx", ".xlsm"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RuntimeError("O openpyxl é necessário para ler arquivos do Excel (pip install openpyxl)")
+        # read_only lê a planilha em fluxo, sem montar todas as células na memória
+        pasta = load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            planilha = pasta[aba] if aba else pasta.worksheets[0]
+            for linha in planilha.iter_rows(values_only=True):
+                yield linha
+        finally:
+            pasta.close()
+    elif extensao in (".csv", ".txt"):
+        codificacao, dialeto = _detectar_csv(caminho)
+        with open(caminho, newline="", encoding=codificacao, errors="replace") as arquivo:
+            for linha in csv.reader(arquivo, dialeto):
+                yield tuple(linha)
+    else:
+        raise ValueError(f"Formato não suportado: {extensao} (use .xlsx ou .csv)")
+
+
+def _vazia(linha):
+    return all(valor is None or (isinstance(valor, str) and not valor.strip()) for valor in linha)
+
+
+def ler_registros(caminho, colunas, aba=None, mapeamento=None):
+    """Gera, para cada linha não vazia, os valores das colunas pedidas, na ordem pedida
+
+    As colunas da planilha são associadas pelo nome normalizado (ou pelo
+    mapeamento); colunas ausentes resultam em None.
+
+    Args:
+        caminho: arquivo .xlsx ou .csv
+        colunas: nomes das colunas de destino
+        aba: aba do Excel (padrão: a primeira)
+        mapeamento: {nome na planilha: coluna de destino}
+    """
+    mapeamento = mapeamento or {}
+    posicoes = None
+    for linha in ler_linhas(caminho, aba):
+        if _vazia(linha):
+            continue
+        if posicoes is None:
+            destino = {}
+            for posicao, nome in enumerate(linha):
+                nome = str(nome).strip() if nome is not None else ""
+                destino.setdefault(mapeamento.get(nome, normalizar_coluna(nome)), posicao)
+            posicoes = [destino.get(coluna) for coluna in colunas]
+            continue
+        yield tuple(linha[posicao] if posicao is not None and posicao < len(linha) else None
+                    for posicao in posicoes)
+
+
+def perfilar(caminho, aba=None, progresso=None, intervalo_progresso=100000):
+    """Perfil das colunas do arquivo em uma única passada
+
+    A primeira linha não vazia é o cabeçalho.
+
+    Args:
+        caminho: arquivo .xlsx ou .csv
+        aba: aba do Excel (padrão: a primeira)
+        progresso: função chamada com a quantidade de linhas lidas a cada intervalo_progresso
+
+    Returns:
+        dict: arquivo, aba, linhas, linhas_vazias, linhas_com_colunas_extras,
+              colunas (lista de PerfilColuna.como_dict) e duracao_s
+    """
+    inicio = time.perf_counter()
+    colunas = None
+    linhas = linhas_vazias = linhas_extras = 0
+    for linha in ler_linhas(caminho, aba):
+        if _vazia(linha):
+            linhas_vazias += colunas is not None
+            continue
+        if colunas is None:
+            colunas = [PerfilColuna(str(nome).strip() if nome is not None else f"coluna_{posicao + 1}", posicao)
+                       for posicao, nome in enumerate(linha)]
+            continue
+        linhas += 1
+        quantidade = len(colunas)
+        if len(linha) > quantidade and not _vazia(linha[quantidade:]):
+            linhas_extras += 1
+        for posicao, coluna in enumerate(colunas):
+            coluna.adicionar(linha[posicao] if posicao < len(linha) else None)
+        if progresso and linhas % intervalo_progresso == 0:
+            progresso(linhas)
+
+    return {
+        "arquivo": os.path.abspath(caminho),
+        "aba": aba,
+        "linhas": linhas,
+        "linhas_vazias": linhas_vazias,
+        "linhas_com_colunas_extras": linhas_extras,
+        "colunas": [coluna.como_dict(linhas) for coluna in colunas or []],
+        "duracao_s": round(time.perf_counter() - inicio, 3),
+    }
+
+
+def _afinidade(tipo_declarado):
+    """Afinidade de tipo do SQLite para o tipo declarado da coluna"""
+    tipo = (tipo_declarado or "").upper()
+    if "INT" in tipo:
+        return "INTEGER"
+    if any(parte in tipo for parte in ("CHAR", "CLOB", "TEXT")):
+        return "TEXT"
+    if any(parte in tipo for parte in ("REAL", "FLOA", "DOUB")):
+        return "REAL"
+    return "NUMERIC" if tipo else "BLOB"
+
+
+# Tipos inferidos aceitos sem perda por afinidade da coluna de destino
+_COMPATIVEIS = {
+    "INTEGER": {INTEIRO, "vazio"},
+    "REAL": {INTEIRO, DECIMAL, "vazio"},
+    "NUMERIC": {INTEIRO, DECIMAL, DATA, BOOLEANO, TEXTO, "vazio"},
+    "TEXT": {INTEIRO, DECIMAL, DATA, BOOLEANO, TEXTO, "vazio"},
+    "BLOB": {INTEIRO, DECIMAL, DATA, BOOLEANO, TEXTO, "vazio"},
+}
+
+
+def comparar_com_tabela(perfil, conn, tabela, mapeamento=None):
+    """Acrescenta ao perfil as divergências em relação ao esquema da tabela de destino
+
+    As colunas da planilha são associadas às da tabela pelo nome normalizado
+    (ou pelo mapeamento informado). Gravidade "erro" indica que a importação
+    falharia ou perderia dados; "aviso", que vale conferir.
+
+    Args:
+        perfil: resultado de perfilar (alterado e devolvido)
+        conn: conexão com o banco de destino
+        tabela: tabela de destino
+        mapeamento: {nome na planilha: coluna da tabela}, para nomes que não batem
+
+    Returns:
+        dict: o perfil, com tabela_destino e divergencias
+    """
+    esquema = conn.execute(f"PRAGMA table_info({tabela})").fetchall()
+    if not esquema:
+        raise ValueError(f"Tabela {tabela} não existe no banco")
+    # (cid, name, type, notnull, dflt_value, pk)
+    destino = {linha[1]: linha for linha in esquema}
+    mapeamento = mapeamento or {}
+
+    divergencias = []
+
+    def divergencia(coluna, tipo, gravidade, mensagem):
+        divergencias.append({"coluna": coluna, "tipo": tipo, "gravidade": gravidade, "mensagem": mensagem})
+
+    associadas = {}
+    for coluna in perfil["colunas"]:
+        nome_destino = mapeamento.get(coluna["nome"], coluna["nome_normalizado"])
+        coluna["coluna_destino"] = nome_destino if nome_destino in destino else None
+        if coluna["coluna_destino"] is None:
+            divergencia(coluna["nome"], "extra_na_planilha", "aviso",
+                        f"Coluna '{coluna['nome']}' não existe em {tabela} e será ignorada")
+            continue
+        if nome_destino in associadas:
+            divergencia(coluna["nome"], "coluna_duplicada", "erro",
+                        f"'{coluna['nome']}' e '{associadas[nome_destino]}' correspondem a {tabela}.{nome_destino}")
+            continue
+        associadas[nome_destino] = coluna["nome"]
+
+        _, _, tipo_declarado, not_null, _, pk = destino[nome_destino]
+        afinidade = _afinidade(tipo_declarado)
+        if coluna["tipo_inferido"] not in _COMPATIVEIS[afinidade]:
+            incompativeis = {tipo: quantidade for tipo, quantidade in coluna["tipos"].items()
+                             if tipo not in _COMPATIVEIS[afinidade]}
+            divergencia(coluna["nome"], "tipo_incompativel", "erro",
+                        f"{tabela}.{nome_destino} é {tipo_declarado or 'sem tipo'}, mas a planilha tem "
+                        + ", ".join(f"{quantidade} valor(es) {tipo}" for tipo, quantidade in incompativeis.items()))
+        elif afinidade == "TEXT" and coluna["tipo_inferido"] in (INTEIRO, DECIMAL):
+            divergencia(coluna["nome"], "numero_em_texto", "aviso",
+                        f"{tabela}.{nome_destino} é texto e a planilha tem apenas números "
+                        f"(zeros à esquerda e casas decimais podem ter se perdido na origem)")
+        if afinidade == "TEXT" and coluna["tipo_inferido"] == DATA:
+            divergencia(coluna["nome"], "formato_data", "aviso",
+                        f"Datas em {tabela}.{nome_destino} são gravadas como dd/mm/aaaa pela aplicação; "
+                        f"converta antes de importar")
+        if (not_null or pk) and coluna["vazios"] and not (pk and afinidade == "INTEGER"):
+            divergencia(coluna["nome"], "vazios_em_obrigatoria", "erro",
+                        f"{coluna['vazios']} linha(s) sem valor para {tabela}.{nome_destino}, que é obrigatória")
+
+    for nome, (_, _, tipo_declarado, not_null, padrao, pk) in destino.items():
+        if nome in associadas:
+            continue
+        if not_null and padrao is None and not pk:
+            divergencia(nome, "ausente_na_planilha", "erro",
+                        f"{tabela}.{nome} é obrigatória, não tem valor padrão e não está na planilha")
+        elif not pk and padrao is None and nome not in ("uuid", "row_version"):
+            divergencia(nome, "ausente_na_planilha", "aviso",
+                        f"{tabela}.{nome} não está na planilha e ficará vazia")
+
+    perfil["tabela_destino"] = tabela
+    perfil["divergencias"] = divergencias
+    return perfil
+
+
+def possui_erros(perfil):
+    """Indica se alguma divergência do perfil impede a importação"""
+    return any(item["gravidade"] == "erro" for item in perfil.get("divergencias", []))
+
+
+def resumo(perfil):
+    """Texto do perfil para o terminal"""
+    linhas = [f"{perfil['arquivo']}: {perfil['linhas']} linhas, {len(perfil['colunas'])} colunas "
+              f"({perfil['duracao_s']:.1f} s)"]
+    if perfil["linhas_com_colunas_extras"]:
+        linhas.append(f"  {perfil['linhas_com_colunas_extras']} linha(s) com mais valores que o cabeçalho")
+    linhas.append("")
+    linhas.append(f"  {'coluna':<32} {'tipo':<9} {'vazios':>8} {'distintos':>10}  mínimo .. máximo")
+    for coluna in perfil["colunas"]:
+        faixa = ""
+        if coluna["minimo"] is not None:
+            faixa = f"{coluna['minimo']} .. {coluna['maximo']}"
+        linhas.append(f"  {coluna['nome'][:32]:<32} {coluna['tipo_inferido']:<9} "
+                      f"{coluna['taxa_vazios']:>8.1%} {coluna['distintos_estimados']:>10}  {faixa}")
+    if "divergencias" in perfil:
+        linhas.append("")
+        if not perfil["divergencias"]:
+            linhas.append(f"Compatível com a tabela {perfil['tabela_destino']}")
+        for item in perfil["divergencias"]:
+            linhas.append(f"  [{item['gravidade']}] {item['mensagem']}")
+    return "\n".join(linhas)
@@ -0,0 +1,525 @@
+# utils/perfilador.py
+"""Perfil das chamadas de controllers/models e log de consultas lentas
+
+Desativado por padrão (sem custo algum). Quando ativado, com SISPROJ_PERFIL ou
+pela tela de diagnóstico, as funções públicas dos pacotes controllers e models
+são envolvidas por `perfilar`. Cada chamada registra:
+
+- o tempo total;
+- o tempo gasto no SQLite (soma das instruções executadas durante a chamada);
+- as linhas retornadas e os textos SQL executados.
+
+A diferença entre o tempo total e o tempo em SQL é o pós-processamento em
+Python. Os trechos de tela (construção e recarga pelo cache de telas) são medidos
+com `trecho`, permitindo separar SQLite, Python e renderização do Tk.
+
+As instruções são medidas por uma conexão instrumentada (get_connection usa
+ConexaoPerfilada enquanto o perfil está ativo). O set_trace_callback informa
+cada instrução que o SQLite de fato executa (inclusive BEGIN implícitos e gatilhos) já
+com os parâmetros substituídos. Instruções acima do limite vão para o log de
+consultas lentas, junto com o EXPLAIN QUERY PLAN.
+"""
+import functools
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Limites superiores (ms) das faixas dos histogramas; a última faixa é "acima de 1000"
+FAIXAS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Pacotes instrumentados automaticamente ao ativar o perfil
+PACOTES_INSTRUMENTADOS = ("controllers", "models")
+
+# Quantidade de consultas lentas mantidas em memória
+MAXIMO_CONSULTAS_LENTAS = 200
+
+_ativo = False
+_limite_lento_ms = float(os.environ.get("SISPROJ_LIMITE_LENTA_MS", 50))
+_arquivo_lentas = os.environ.get("SISPROJ_CONSULTAS_LENTAS")
+_trava = threading.RLock()
+_local = threading.local()
+
+# {nome: Estatistica} das chamadas e das instruções SQL (texto normalizado)
+_chamadas = {}
+_instrucoes = {}
+_consultas_lentas = deque(maxlen=MAXIMO_CONSULTAS_LENTAS)
+
+
+class Estatistica:
+    """Acumula contagem, tempos e histograma de um item medido"""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.chamadas = 0
+        self.total_ms = 0.0
+        self.sql_ms = 0.0
+        self.maximo_ms = 0.0
+        self.linhas = 0
+        self.instrucoes = 0
+        self.histograma = [0] * (len(FAIXAS_MS) + 1)
+        self.exemplos_sql = []
+        # Texto completo e parâmetros de uma execução da instrução (usados pelo assessor de índices)
+        self.sql_completo = None
+        self.exemplo_parametros = None
+
+    def adicionar(self, duracao_ms, linhas=0, sql_ms=0.0, instrucoes=0, textos_sql=()):
+        self.chamadas += 1
+        self.total_ms += duracao_ms
+        self.sql_ms += sql_ms
+        self.maximo_ms = max(self.maximo_ms, duracao_ms)
+        self.linhas += linhas
+        self.instrucoes += instrucoes
+        self.histograma[_faixa(duracao_ms)] += 1
+        for texto in textos_sql:
+            if len(self.exemplos_sql) >= 5:
+                break
+            if texto not in self.exemplos_sql:
+                self.exemplos_sql.append(texto)
+
+    @property
+    def media_ms(self):
+        return self.total_ms / self.chamadas if self.chamadas else 0.0
+
+    def como_dict(self):
+        dados = {
+            "chamadas": self.chamadas,
+            "total_ms": round(self.total_ms, 3),
+            "media_ms": round(self.media_ms, 3),
+            "maximo_ms": round(self.maximo_ms, 3),
+            "sql_ms": round(self.sql_ms, 3),
+            "python_ms": round(max(0.0, self.total_ms - self.sql_ms), 3),
+            "linhas": self.linhas,
+            "instrucoes": self.instrucoes,
+            "histograma": dict(zip(rotulos_faixas(), self.histograma)),
+            "sql": list(self.exemplos_sql),
+        }
+        if self.sql_completo is not None:
+            dados["sql_completo"] = self.sql_completo
+        if self.exemplo_parametros is not None:
+            dados["exemplo_parametros"] = self.exemplo_parametros
+        return dados
+
+
+def _faixa(duracao_ms):
+    for indice, limite in enumerate(FAIXAS_MS):
+        if duracao_ms <= limite:
+            return indice
+    return len(FAIXAS_MS)
+
+
+def rotulos_faixas():
+    """Rótulos das faixas do histograma, como '<=5ms' e '>1000ms'"""
+    return [f"<={limite}ms" for limite in FAIXAS_MS] + [f">{FAIXAS_MS[-1]}ms"]
+
+
+def normalizar_sql(sql):
+    """Remove espaços redundantes para agrupar instruções iguais"""
+    return re.sub(r"\s+", " ", sql).strip()[:300]
+
+
+def perfil_ativo():
+    """Indica se o perfil está coletando dados"""
+    return _ativo
+
+
+def _pilha():
+    if not hasattr(_local, "pilha"):
+        _local.pilha = []
+    return _local.pilha
+
+
+def _contar_linhas(resultado):
+    if resultado is None:
+        return 0
+    if isinstance(resultado, list):
+        return len(resultado)
+    return 1
+
+
+@contextmanager
+def trecho(nome):
+    """Mede um bloco de código como uma chamada nomeada
+
+    O tempo em SQL das instruções executadas dentro do bloco (inclusive em
+    chamadas aninhadas) é somado ao do bloco. Quando o perfil está desativado,
+    apenas executa o bloco.
+
+    Exemplo:
+        with trecho("tela.eventos"):
+            EventosView(frame)
+    """
+    if not _ativo:
+        yield None
+        return
+
+    contexto = {"sql_ms": 0.0, "instrucoes": 0, "textos": [], "linhas": 0}
+    pilha = _pilha()
+    pilha.append(contexto)
+    inicio = time.perf_counter()
+    try:
+        yield contexto
+    finally:
+        duracao = (time.perf_counter() - inicio) * 1000
+        pilha.pop()
+        with _trava:
+            estatistica = _chamadas.get(nome)
+            if estatistica is None:
+                estatistica = _chamadas[nome] = Estatistica(nome)
+            estatistica.adicionar(duracao, contexto["linhas"], contexto["sql_ms"],
+                                  contexto["instrucoes"], contexto["textos"])
+
+
+def perfilar(funcao=None, nome=None):
+    """Decorador que mede cada chamada da função com `trecho`
+
+    Pode ser usado como @perfilar ou @perfilar(nome="...").
+    """
+    if funcao is None:
+        return lambda f: perfilar(f, nome)
+
+    rotulo = nome or f"{funcao.__module__}.{funcao.__qualname__}"
+
+    @functools.wraps(funcao)
+    def envolvida(*args, **kwargs):
+        if not _ativo:
+            return funcao(*args, **kwargs)
+        with trecho(rotulo) as contexto:
+            resultado = funcao(*args, **kwargs)
+            contexto["linhas"] = _contar_linhas(resultado)
+            return resultado
+
+    envolvida.__perfilada__ = True
+    return envolvida
+
+
+def registrar_instrucao(sql, duracao_ms, linhas, conexao=None, parametros=None, sql_expandido=None):
+    """Registra uma instrução SQL executada e, se lenta, grava seu plano"""
+    completo = re.sub(r"\s+", " ", sql).strip()
+    # Texto truncado: chave de agrupamento e exibição; o plano usa a instrução completa
+    texto = completo[:300]
+    with _trava:
+        estatistica = _instrucoes.get(texto)
+        if estatistica is None:
+            estatistica = _instrucoes[texto] = Estatistica(texto)
+        estatistica.adicionar(duracao_ms, linhas)
+        if estatistica.chamadas == 1 and len(completo) > 300:
+            estatistica.sql_completo = completo
+        if estatistica.exemplo_parametros is None and parametros:
+            estatistica.exemplo_parametros = _parametros_serializaveis(parametros)
+
+    for contexto in _pilha():
+        contexto["sql_ms"] += duracao_ms
+        if len(contexto["textos"]) < 5 and texto not in contexto["textos"]:
+            contexto["textos"].append(texto)
+
+    if duracao_ms >= _limite_lento_ms:
+        _registrar_consulta_lenta(texto, completo, duracao_ms, linhas, conexao, parametros, sql_expandido)
+
+
+def _parametros_serializaveis(parametros):
+    """Cópia dos parâmetros que pode ir para o JSON do perfil (None se houver blobs ou objetos)"""
+    simples = (str, int, float, type(None))
+    if isinstance(parametros, dict):
+        return dict(parametros) if all(isinstance(v, simples) for v in parametros.values()) else None
+    try:
+        valores = list(parametros)
+    except TypeError:
+        return None
+    return valores if all(isinstance(v, simples) for v in valores) else None
+
+
+def _registrar_consulta_lenta(texto, completo, duracao_ms, linhas, conexao, parametros, sql_expandido):
+    plano = []
+    if conexao is not None and re.match(r"(?i)\s*(SELECT|WITH|UPDATE|DELETE|INSERT|REPLACE)\b", completo):
+        try:
+            cursor = sqlite3.Connection.execute(conexao, "EXPLAIN QUERY PLAN " + completo, parametros or ())
+            plano = [linha[-1] for linha in cursor.fetchall()]
+        except sqlite3.Error as e:
+            plano = [f"(plano indisponível: {e})"]
+
+    pilha = _pilha()
+    registro = {
+        "data_hora": datetime.now().isoformat(timespec="seconds"),
+        "duracao_ms": round(duracao_ms, 3),
+        "linhas": linhas,
+        "sql": texto,
+        "sql_expandido": sql_expandido,
+        "plano": plano,
+        "thread": threading.current_thread().name,
+        "aninhamento": len(pilha),
+    }
+    if completo != texto:
+        registro["sql_completo"] = completo
+    with _trava:
+        _consultas_lentas.append(registro)
+
+    if _arquivo_lentas:
+        try:
+            with open(_arquivo_lentas, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Erro ao gravar log de consultas lentas: {e}")
+
+
+class CursorPerfilado(sqlite3.Cursor):
+    """Cursor que mede o tempo de execução e de leitura de cada instrução"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pendente = None
+
+    def _finalizar(self):
+        if self._pendente is not None:
+            sql, parametros, duracao, linhas, expandido = self._pendente
+            self._pendente = None
+            registrar_instrucao(sql, duracao, linhas, self.connection, parametros, expandido)
+
+    def _executar(self, metodo, sql, parametros):
+        self._finalizar()
+        inicio = time.perf_counter()
+        resultado = metodo(self, sql, parametros)
+        duracao = (time.perf_counter() - inicio) * 1000
+        linhas = self.rowcount if self.rowcount > 0 else 0
+        self._pendente = [sql, parametros if metodo is sqlite3.Cursor.execute else None, duracao, linhas,
+                          getattr(self.connection, "ultima_instrucao", None)]
+        return resultado
+
+    def execute(self, sql, parametros=()):
+        return self._executar(sqlite3.Cursor.execute, sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self._executar(sqlite3.Cursor.executemany, sql, parametros)
+
+    def _ler(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(self, *args)
+        if self._pendente is not None:
+            self._pendente[2] += (time.perf_counter() - inicio) * 1000
+            if isinstance(resultado, list):
+                self._pendente[3] += len(resultado)
+            elif resultado is not None:
+                self._pendente[3] += 1
+        return resultado
+
+    def fetchone(self):
+        return self._ler(sqlite3.Cursor.fetchone)
+
+    def fetchall(self):
+        resultado = self._ler(sqlite3.Cursor.fetchall)
+        self._finalizar()
+        return resultado
+
+    def fetchmany(self, *args):
+        return self._ler(sqlite3.Cursor.fetchmany, *args)
+
+    def close(self):
+        self._finalizar()
+        super().close()
+
+
+class ConexaoPerfilada(sqlite3.Connection):
+    """Conexão cujos cursores são CursorPerfilado
+
+    O set_trace_callback conta as instruções efetivamente executadas pelo SQLite
+    (inclusive BEGIN implícitos e programas de gatilhos) e guarda a última delas com os
+    parâmetros substituídos, usada no log de consultas lentas.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursores = []
+        self.ultima_instrucao = None
+        self.set_trace_callback(self._rastrear)
+
+    def _rastrear(self, sql):
+        if sql.startswith("EXPLAIN QUERY PLAN"):
+            return
+        self.ultima_instrucao = sql
+        for contexto in _pilha():
+            contexto["instrucoes"] += 1
+
+    def cursor(self, factory=CursorPerfilado):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, CursorPerfilado):
+            self._cursores.append(cursor)
+        return cursor
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+    def _finalizar_cursores(self):
+        for cursor in self._cursores:
+            cursor._finalizar()
+
+    def commit(self):
+        self._finalizar_cursores()
+        inicio = time.perf_counter()
+        super().commit()
+        registrar_instrucao("COMMIT", (time.perf_counter() - inicio) * 1000, 0)
+
+    def close(self):
+        self._finalizar_cursores()
+        self._cursores.clear()
+        super().close()
+
+
+def fabrica_conexao():
+    """Classe de conexão a usar em sqlite3.connect (None quando desativado)"""
+    return ConexaoPerfilada if _ativo else None
+
+
+def instrumentar_pacotes(pacotes=PACOTES_INSTRUMENTADOS):
+    """Envolve com `perfilar` as funções públicas dos módulos dos pacotes
+
+    Os módulos são importados se necessário. Além do próprio módulo, as
+    referências já importadas por outros módulos (from x import f) também são
+    substituídas, para que as chamadas entre camadas sejam medidas.
+    """
+    for pacote in pacotes:
+        modulo_pacote = importlib.import_module(pacote)
+        for info in pkgutil.iter_modules(modulo_pacote.__path__):
+            try:
+                importlib.import_module(f"{pacote}.{info.name}")
+            except Exception as e:
+                print(f"Perfil: não foi possível importar {pacote}.{info.name}: {e}")
+
+    substituicoes = {}
+    for nome_modulo, modulo in list(sys.modules.items()):
+        if not nome_modulo.startswith(tuple(p + "." for p in pacotes)) or modulo is None:
+            continue
+        for nome, valor in list(vars(modulo).items()):
+            if (nome.startswith("_") or not inspect.isfunction(valor)
+                    or valor.__module__ != nome_modulo or getattr(valor, "__perfilada__", False)):
+                continue
+            substituicoes[id(valor)] = perfilar(valor)
+
+    if not substituicoes:
+        return
+    for modulo in list(sys.modules.values()):
+        if modulo is None or not _modulo_do_projeto(modulo):
+            continue
+        for nome, valor in list(vars(modulo).items()):
+            if id(valor) in substituicoes and inspect.isfunction(valor):
+                setattr(modulo, nome, substituicoes[id(valor)])
+
+
+def _modulo_do_projeto(modulo):
+    nome = getattr(modulo, "__name__", "")
+    return nome.split(".")[0] in ("controllers", "models", "views", "utils") or nome == "__main__"
+
+
+def ativar_perfil(limite_lento_ms=None, arquivo_lentas=None):
+    """Ativa a coleta do perfil e instrumenta controllers e models
+
+    Args:
+        limite_lento_ms: duração mínima (ms) para uma instrução entrar no log de lentas
+        arquivo_lentas: arquivo (JSON por linha) onde as consultas lentas também são gravadas
+    """
+    global _ativo, _limite_lento_ms, _arquivo_lentas
+    if limite_lento_ms is not None:
+        _limite_lento_ms = float(limite_lento_ms)
+    if arquivo_lentas is not None:
+        _arquivo_lentas = arquivo_lentas
+    if not _ativo:
+        instrumentar_pacotes()
+        _ativo = True
+
+
+def desativar_perfil():
+    """Interrompe a coleta (as funções instrumentadas passam a chamar direto a original)"""
+    global _ativo
+    _ativo = False
+
+
+def limite_lento_ms():
+    """Duração mínima, em ms, para uma instrução ser registrada como lenta"""
+    return _limite_lento_ms
+
+
+def limpar_perfil():
+    """Descarta as estatísticas e o log de consultas lentas coletados"""
+    with _trava:
+        _chamadas.clear()
+        _instrucoes.clear()
+        _consultas_lentas.clear()
+
+
+def obter_perfil():
+    """Retorna as estatísticas coletadas
+
+    Returns:
+        dict: chamadas e instrucoes ({nome: estatísticas}, do maior tempo total
+              para o menor) e consultas_lentas (mais recentes por último)
+    """
+    with _trava:
+        def ordenar(itens):
+            return {nome: item.como_dict() for nome, item in
+                    sorted(itens.items(), key=lambda par: par[1].total_ms, reverse=True)}
+        return {
+            "ativo": _ativo,
+            "limite_lento_ms": _limite_lento_ms,
+            "chamadas": ordenar(_chamadas),
+            "instrucoes": ordenar(_instrucoes),
+            "consultas_lentas": list(_consultas_lentas),
+        }
+
+
+def exportar_perfil(caminho):
+    """Grava o perfil coletado em JSON"""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(obter_perfil(), arquivo, ensure_ascii=False, indent=2)
+
+
+def relatorio_perfil(limite=20):
+    """Retorna em texto as chamadas e instruções mais custosas"""
+    perfil = obter_perfil()
+    linhas = ["[Perfil - chamadas]",
+              f"  {'nome':<55} {'qtd':>6} {'total':>10} {'média':>9} {'sql':>10} {'linhas':>8}"]
+    for nome, dados in list(perfil["chamadas"].items())[:limite]:
+        linhas.append(f"  {nome[:55]:<55} {dados['chamadas']:>6} {dados['total_ms']:>8.1f}ms "
+                      f"{dados['media_ms']:>7.2f}ms {dados['sql_ms']:>8.1f}ms {dados['linhas']:>8}")
+    linhas.append("[Perfil - instruções SQL]")
+    for texto, dados in list(perfil["instrucoes"].items())[:limite]:
+        linhas.append(f"  {dados['chamadas']:>6}x {dados['total_ms']:>9.1f}ms  {texto[:90]}")
+    if perfil["consultas_lentas"]:
+        linhas.append(f"[Consultas lentas (>= {perfil['limite_lento_ms']:.0f} ms)]")
+        for registro in perfil["consultas_lentas"][-limite:]:
+            linhas.append(f"  {registro['duracao_ms']:>9.1f}ms  {registro['sql'][:90]}")
+            linhas.extend(f"      {passo}" for passo in registro["plano"])
+    return "\n".join(linhas)
+
+
+def ativar_pelo_ambiente():
+    """Ativa o perfil quando SISPROJ_PERFIL está definida
+
+    Com SISPROJ_PERFIL=arquivo.json o perfil é gravado nesse arquivo ao sair;
+    com qualquer outro valor, o relatório em texto é impresso ao sair.
+    """
+    destino = os.environ.get("SISPROJ_PERFIL")
+    if not destino:
+        return False
+
+    import atexit
+    ativar_perfil()
+
+    def ao_sair():
+        if destino.endswith(".json"):
+            exportar_perfil(destino)
+        else:
+            print(relatorio_perfil())
+
+    atexit.register(ao_sair)
+    return True
@@ -0,0 +1,476 @@
+# utils/servico_api.py
+"""Serviço local que expõe os controllers por uma API HTTP/JSON (asyncio)
+
+Em vez de cada desktop abrir o mesmo contrato.db e disputar as travas do
+arquivo, um único processo (servidor_api.py) é dono das conexões e atende os
+clientes (utils/cliente_api.py, ou o próprio app Tk em modo cliente).
+
+- Conexões: cada thread de leitura mantém a sua conexão aberta
+  (db_manager.ativar_reuso_conexoes). As gravações dos controllers rodam em
+  algumas threads, mas as instruções vão todas para a fila de escrita
+  (models/fila_escrita.py), dona da única conexão de escrita, que confirma
+  juntas as gravações de clientes diferentes (commit em grupo). O servidor
+  nunca disputa a trava de escrita consigo mesmo.
+- Cache das leituras: o resultado de cada chamada de leitura fica guardado com
+  o PRAGMA data_version e os contadores de alteração das tabelas de que
+  depende. Enquanto nada for gravado, a resposta sai do cache sem tocar no
+  banco; leituras idênticas simultâneas aguardam a mesma execução.
+- Lotes: POST /api/lote executa várias chamadas em uma ida e volta.
+- As alterações publicadas no barramento durante uma gravação voltam na
+  resposta, para o cliente atualizar as próprias telas na hora.
+
+Endpoints:
+    GET  /api/saude                       estado e métricas
+    GET  /api/funcoes                     funções disponíveis
+    POST /api/login   {"usuario", "senha"}  -> {"usuario", "token"}
+    POST /api/chamar  {"funcao", "args", "kwargs"}
+    POST /api/lote    {"chamadas": [{"funcao", "args", "kwargs"}, ...]}
+
+As chamadas exigem o cabeçalho "Authorization: Bearer <token>" do login.
+"""
+import asyncio
+import gzip
+import importlib
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import models.db_manager as db_manager
+from models.fila_escrita import ativar_fila_escrita, desativar_fila_escrita, fila_escrita_ativa
+from models.user_model import authenticate
+from utils.barramento import assinar, TODAS
+from utils.logger import log_action
+from utils.session import Session
+
+PORTA_PADRAO = 8765
+
+# Funções expostas por controller: (leituras, gravações)
+FUNCOES = {
+    "demanda": (("listar_demandas", "obter_demanda", "buscar_demandas", "obter_demanda_360",
+                 "obter_demandas_360"),
+                ("adicionar_demanda", "editar_demanda", "excluir_demanda")),
+    "carta_acordo": (("listar_cartas_acordo", "obter_carta_acordo", "obter_cartas_por_demanda"),
+                     ("adicionar_carta_acordo", "editar_carta_acordo", "excluir_carta_acordo")),
+    "eventos": (("listar_eventos", "obter_evento", "obter_eventos_por_demanda", "obter_valor_total_contrato"),
+                ("adicionar_evento", "editar_evento", "atualizar_valor_total_contrato", "excluir_evento")),
+    "produtos_servicos": (("listar_produtos_servicos", "obter_produto_servico", "obter_produtos_por_demanda"),
+                          ("adicionar_produto_servico", "editar_produto_servico", "excluir_produto_servico")),
+    "aditivos": (("listar_aditivos", "obter_aditivo", "obter_aditivos_por_contrato", "historico_aditivos",
+                  "eh_ultimo_aditivo"),
+                 ("adicionar_aditivo", "editar_aditivo", "excluir_aditivo")),
+    "fornecedores": (("listar_fornecedores", "buscar_fornecedor_por_nome"),
+                     ("adicionar_fornecedor", "editar_fornecedor", "excluir_fornecedor")),
+    "titulo_eventos": (("listar_titulos_eventos", "buscar_titulo_evento_por_nome"),
+                       ("adicionar_titulo_evento", "editar_titulo_evento", "excluir_titulo_evento")),
+    "contrato": (("listar_contratos", "obter_contrato_por_referencia", "versao_do_registro", "obter_versao_atual"),
+                 ("adicionar_contrato", "editar_contrato", "excluir_contrato")),
+    "dashboard": (("obter_resumo_dashboard",), ()),
+    "arquivo": (("pesquisar_historico", "listar_aditivos_historico", "obter_totais_arquivados"),
+                ("arquivar_contratos",)),
+    # Leituras dos relatórios; as exportações gravam o CSV no cliente com as linhas do servidor
+    "relatorio": (("obter_resumo_por_status", "obter_linhas_contratos", "obter_linhas_aditivos",
+                   "agrupar_totais"),
+                  ("registrar_exportacao",)),
+}
+
+# Métodos de CusteioController (classe), atendidos por uma instância única
+METODOS_CUSTEIO = ("get_institutions", "get_projects", "get_tas", "get_results", "get_subprojects",
+                   "filter_custeio", "get_hierarchical_data", "get_facets", "count_custeio",
+                   "filter_custeio_page")
+
+# Funções de db_manager usadas pelo cache de telas e pelo monitor de alterações.
+# Executadas na thread do laço de eventos (a conexão de monitoramento não é
+# compartilhada entre threads) e nunca guardadas em cache.
+FUNCOES_BANCO = ("obter_versao_dados", "obter_versoes_tabelas", "obter_ultimo_seq_alteracoes",
+                 "obter_alteracoes_desde")
+
+# Tabelas das quais as leituras de cada controller dependem (None: sem cache)
+DEPENDENCIAS = {
+    "demanda": tuple(db_manager.TABELAS_MONITORADAS),
+    "carta_acordo": ("carta_acordo",),
+    "eventos": ("eventos",),
+    "produtos_servicos": ("produtos_servicos",),
+    # historico_aditivos traz valor_estimado e o total atualizado dos contratos
+    "aditivos": ("aditivos", "carta_acordo", "eventos", "produtos_servicos"),
+    "fornecedores": ("fornecedores",),
+    "titulo_eventos": ("titulo_eventos",),
+    # A tabela contratos não tem contador de alterações (não está em TABELAS_MONITORADAS)
+    "contrato": None,
+    "dashboard": ("carta_acordo", "eventos", "produtos_servicos"),
+    "custeio": ("custeio",),
+    # O banco de arquivo não tem contadores de alteração
+    "arquivo": None,
+    "relatorio": tuple(db_manager.TABELAS_MONITORADAS),
+}
+
+LIMITE_CACHE = 256
+LIMITE_CORPO = 16 * 1024 * 1024
+# Respostas maiores que isso são compactadas quando o cliente aceita gzip
+LIMITE_COMPRESSAO = 64 * 1024
+
+
+class ErroChamada(Exception):
+    """Chamada inválida (função desconhecida, argumentos malformados)"""
+
+
+def codificar(valor):
+    """Prepara o resultado de um controller para JSON preservando tuplas
+
+    Linhas do SQLite são tuplas e as telas dependem disso (comparações,
+    chaves de dicionário); listas de tuplas viram {"__linhas__": [...]},
+    tuplas isoladas {"__tupla__": [...]} e dicionários com chaves não
+    textuais {"__dict__": [[chave, valor], ...]}. Ver decodificar().
+    """
+    if isinstance(valor, tuple):
+        return {"__tupla__": [codificar(item) for item in valor]}
+    if isinstance(valor, list):
+        if valor and all(type(item) is tuple for item in valor):
+            return {"__linhas__": [[codificar(campo) for campo in item] for item in valor]}
+        return [codificar(item) for item in valor]
+    if isinstance(valor, dict):
+        if all(isinstance(chave, str) for chave in valor):
+            return {chave: codificar(item) for chave, item in valor.items()}
+        return {"__dict__": [[codificar(chave), codificar(item)] for chave, item in valor.items()]}
+    if isinstance(valor, bytes):
+        return valor.decode("utf-8", "replace")
+    return valor
+
+
+def _chave_hashavel(valor):
+    return tuple(valor) if isinstance(valor, list) else valor
+
+
+def _decodificar_objeto(objeto):
+    if len(objeto) == 1:
+        if "__tupla__" in objeto:
+            return tuple(objeto["__tupla__"])
+        if "__linhas__" in objeto:
+            return [tuple(linha) for linha in objeto["__linhas__"]]
+        if "__dict__" in objeto:
+            return {_chave_hashavel(chave): valor for chave, valor in objeto["__dict__"]}
+    return objeto
+
+
+def decodificar(texto):
+    """Inverso de codificar() aplicado a um JSON recebido"""
+    return json.loads(texto, object_hook=_decodificar_objeto)
+
+
+def _descrever_erro(erro):
+    descricao = {"tipo": type(erro).__name__, "mensagem": str(erro)}
+    if isinstance(erro, db_manager.ConflitoEdicao):
+        descricao["dados"] = {
+            "tabela": erro.tabela,
+            "id_registro": erro.id_registro,
+            "versao_esperada": erro.versao_esperada,
+            "versao_atual": erro.versao_atual,
+            "diferencas": codificar(erro.diferencas),
+        }
+    return descricao
+
+
+class _Metricas:
+    """Contadores do serviço, expostos em /api/saude"""
+
+    def __init__(self):
+        self.inicio = time.time()
+        self.chamadas = {}
+        self.cache_acertos = 0
+        self.cache_falhas = 0
+        self.leituras_agrupadas = 0
+        self.erros = 0
+
+    def registrar(self, funcao, duracao_ms):
+        quantidade, total = self.chamadas.get(funcao, (0, 0.0))
+        self.chamadas[funcao] = (quantidade + 1, total + duracao_ms)
+
+    def como_dict(self):
+        return {
+            "ativo_ha_s": round(time.time() - self.inicio),
+            "cache_acertos": self.cache_acertos,
+            "cache_falhas": self.cache_falhas,
+            "leituras_agrupadas": self.leituras_agrupadas,
+            "erros": self.erros,
+            "chamadas": {funcao: {"quantidade": quantidade, "media_ms": round(total / quantidade, 2)}
+                         for funcao, (quantidade, total) in sorted(self.chamadas.items())},
+        }
+
+
+class ServicoApi:
+    """Servidor HTTP/JSON assíncrono sobre os controllers
+
+    Uso:
+        servico = ServicoApi(porta=8765)
+        asyncio.run(servico.executar())
+    """
+
+    def __init__(self, host="127.0.0.1", porta=PORTA_PADRAO, leitores=4, escritores=4):
+        """
+        Args:
+            leitores: threads de leitura (uma conexão cada)
+            escritores: threads que executam os controllers de gravação. Com 1, as
+                gravações são totalmente serializadas; com mais, gravações de clientes
+                diferentes chegam juntas à fila de escrita e dividem o commit, mas as
+                sequências leitura+gravação de um controller (p.ex. somar um aditivo
+                ao total do contrato) deixam de ser atômicas entre clientes, como
+                já ocorre com vários desktops abrindo o mesmo banco
+        """
+        self.host = host
+        self.porta = porta
+        self.leitores = ThreadPoolExecutor(max_workers=leitores, thread_name_prefix="api-leitura")
+        self.escritor = ThreadPoolExecutor(max_workers=escritores, thread_name_prefix="api-escrita")
+        self.funcoes = self._registrar_funcoes()
+        self.sessoes = {}
+        self.cache = OrderedDict()
+        self.em_andamento = {}
+        self.metricas = _Metricas()
+        self._captura = threading.local()
+        self._servidor = None
+
+    def _registrar_funcoes(self):
+        """{nome público: (função, gravação, grupo)}"""
+        funcoes = {}
+        for grupo, (leituras, gravacoes) in FUNCOES.items():
+            modulo = importlib.import_module(f"controllers.{grupo}_controller")
+            for nome in leituras:
+                funcoes[f"{grupo}.{nome}"] = (getattr(modulo, nome), False, grupo)
+            for nome in gravacoes:
+                funcoes[f"{grupo}.{nome}"] = (getattr(modulo, nome), True, grupo)
+
+        from controllers.custeio_controller import CusteioController
+        custeio = CusteioController()
+        for nome in METODOS_CUSTEIO:
+            funcoes[f"custeio.{nome}"] = (getattr(custeio, nome), False, "custeio")
+        for nome in FUNCOES_BANCO:
+            funcoes[f"banco.{nome}"] = (getattr(db_manager, nome), False, "banco")
+        return funcoes
+
+    # Execução das chamadas
+
+    def _gravar(self, funcao, usuario, args, kwargs):
+        """Executa uma gravação na thread de escrita, capturando os eventos publicados"""
+        Session.login_thread(usuario)
+        eventos = self._captura.eventos = []
+        try:
+            resultado = funcao(*args, **kwargs)
+        finally:
+            self._captura.eventos = None
+        return resultado, [list(evento) for evento in eventos]
+
+    def _ao_publicar(self, evento):
+        eventos = getattr(self._captura, "eventos", None)
+        if eventos is not None:
+            eventos.append(evento)
+
+    def _chave_cache(self, nome, args, kwargs):
+        return json.dumps([nome, args, kwargs], sort_keys=True, ensure_ascii=False)
+
+    def _versao_cache(self, grupo):
+        dependencias = DEPENDENCIAS.get(grupo)
+        return db_manager.obter_versao_dados(), db_manager.obter_versoes_tabelas(dependencias)
+
+    async def _ler(self, nome, funcao, grupo, args, kwargs):
+        """Leitura com cache validado pelas versões e agrupamento de chamadas idênticas"""
+        if DEPENDENCIAS.get(grupo) is None:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.leitores, lambda: codificar(funcao(*args, **kwargs)))
+
+        chave = self._chave_cache(nome, args, kwargs)
+        entrada = self.cache.get(chave)
+        data_version = db_manager.obter_versao_dados()
+        if entrada is not None:
+            if entrada[0] == data_version:
+                self.cache.move_to_end(chave)
+                self.metricas.cache_acertos += 1
+                return entrada[2]
+            # Algo foi gravado: o resultado vale se as tabelas da função não mudaram
+            if entrada[1] == db_manager.obter_versoes_tabelas(DEPENDENCIAS[grupo]):
+                self.cache[chave] = (data_version,) + entrada[1:]
+                self.cache.move_to_end(chave)
+                self.metricas.cache_acertos += 1
+                return entrada[2]
+
+        pendente = self.em_andamento.get(chave)
+        if pendente is not None:
+            self.metricas.leituras_agrupadas += 1
+            return await asyncio.shield(pendente)
+
+        self.metricas.cache_falhas += 1
+        # Versões lidas antes da consulta: uma gravação concorrente invalida o resultado
+        versao = self._versao_cache(grupo)
+        futuro = asyncio.get_running_loop().run_in_executor(
+            self.leitores, lambda: codificar(funcao(*args, **kwargs)))
+        self.em_andamento[chave] = futuro
+        try:
+            resultado = await futuro
+        finally:
+            del self.em_andamento[chave]
+        self.cache[chave] = versao + (resultado,)
+        if len(self.cache) > LIMITE_CACHE:
+            self.cache.popitem(last=False)
+        return resultado
+
+    async def chamar(self, chamada, usuario):
+        """Executa uma chamada {"funcao", "args", "kwargs"} e retorna o dict de resposta"""
+        inicio = time.perf_counter()
+        try:
+            nome = chamada.get("funcao")
+            if nome not in self.funcoes:
+                raise ErroChamada(f"Função desconhecida: {nome}")
+            args = chamada.get("args") or []
+            kwargs = chamada.get("kwargs") or {}
+            if not isinstance(args, list) or not isinstance(kwargs, dict):
+                raise ErroChamada("args deve ser uma lista e kwargs um objeto")
+            funcao, gravacao, grupo = self.funcoes[nome]
+
+            if gravacao:
+                resultado, eventos = await asyncio.get_running_loop().run_in_executor(
+                    self.escritor, self._gravar, funcao, usuario, args, kwargs)
+                resposta = {"resultado": codificar(resultado), "eventos": codificar(eventos)}
+            elif grupo == "banco":
+                resposta = {"resultado": codificar(funcao(*args, **kwargs))}
+            else:
+                resposta = {"resultado": await self._ler(nome, funcao, grupo, args, kwargs)}
+            self.metricas.registrar(nome, (time.perf_counter() - inicio) * 1000)
+            return resposta
+        except Exception as erro:
+            self.metricas.erros += 1
+            return {"erro": _descrever_erro(erro)}
+
+    async def chamar_lote(self, chamadas, usuario):
+        """Executa as chamadas em ordem; leituras consecutivas rodam em paralelo"""
+        respostas = []
+        leituras = []
+        for chamada in chamadas:
+            funcao = self.funcoes.get(chamada.get("funcao") if isinstance(chamada, dict) else None)
+            if funcao is not None and not funcao[1]:
+                leituras.append(chamada)
+                continue
+            if leituras:
+                respostas += await asyncio.gather(*(self.chamar(c, usuario) for c in leituras))
+                leituras = []
+            if not isinstance(chamada, dict):
+                respostas.append({"erro": {"tipo": "ErroChamada", "mensagem": "Chamada inválida"}})
+                continue
+            respostas.append(await self.chamar(chamada, usuario))
+        if leituras:
+            respostas += await asyncio.gather(*(self.chamar(c, usuario) for c in leituras))
+        return respostas
+
+    async def login(self, usuario, senha):
+        loop = asyncio.get_running_loop()
+        user = await loop.run_in_executor(self.leitores, authenticate, usuario, senha)
+        if not user:
+            return None
+        await loop.run_in_executor(self.escritor, log_action, usuario, "Login realizado (serviço)")
+        token = secrets.token_hex(16)
+        self.sessoes[token] = user
+        return {"usuario": codificar(user), "token": token}
+
+    # HTTP
+
+    async def _rotear(self, metodo, caminho, cabecalhos, corpo):
+        rota = urlsplit(caminho).path.rstrip("/")
+        if metodo == "GET" and rota == "/api/saude":
+            fila = fila_escrita_ativa()
+            return 200, {"ok": True, "banco": db_manager.DB_PATH, "metricas": self.metricas.como_dict(),
+                         "fila_escrita": fila.metricas() if fila else None}
+        if metodo == "GET" and rota == "/api/funcoes":
+            return 200, {"funcoes": {nome: ("gravacao" if gravacao else "leitura")
+                                     for nome, (_, gravacao, _) in sorted(self.funcoes.items())}}
+        if metodo != "POST":
+            return 404, {"erro": {"tipo": "NaoEncontrado", "mensagem": f"{metodo} {rota}"}}
+
+        try:
+            dados = decodificar(corpo or b"{}")
+        except ValueError:
+            return 400, {"erro": {"tipo": "ErroChamada", "mensagem": "JSON inválido"}}
+
+        if rota == "/api/login":
+            resposta = await self.login(dados.get("usuario"), dados.get("senha"))
+            if resposta is None:
+                return 401, {"erro": {"tipo": "LoginInvalido", "mensagem": "Usuário ou senha incorretos."}}
+            return 200, resposta
+
+        token = cabecalhos.get("authorization", "").removeprefix("Bearer ").strip()
+        usuario = self.sessoes.get(token)
+        if usuario is None:
+            return 401, {"erro": {"tipo": "NaoAutenticado", "mensagem": "Faça login em /api/login"}}
+        if rota == "/api/chamar":
+            return 200, await self.chamar(dados, usuario)
+        if rota == "/api/lote":
+            chamadas = dados.get("chamadas")
+            if not isinstance(chamadas, list):
+                return 400, {"erro": {"tipo": "ErroChamada", "mensagem": "chamadas deve ser uma lista"}}
+            return 200, {"respostas": await self.chamar_lote(chamadas, usuario)}
+        return 404, {"erro": {"tipo": "NaoEncontrado", "mensagem": f"{metodo} {rota}"}}
+
+    async def _atender(self, leitor, escritor):
+        """Atende uma conexão HTTP/1.1 (com keep-alive) até o cliente encerrar"""
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                metodo, caminho, versao = linha.decode("latin-1").split()
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = linha.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                tamanho = int(cabecalhos.get("content-length") or 0)
+                if tamanho > LIMITE_CORPO:
+                    status, resposta = 413, {"erro": {"tipo": "CorpoGrande", "mensagem": "Requisição grande demais"}}
+                    manter = False
+                else:
+                    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+                    status, resposta = await self._rotear(metodo, caminho, cabecalhos, corpo)
+                    manter = versao == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close"
+
+                dados = json.dumps(resposta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                extras = ""
+                if len(dados) > LIMITE_COMPRESSAO and "gzip" in cabecalhos.get("accept-encoding", ""):
+                    dados = gzip.compress(dados, compresslevel=5)
+                    extras = "Content-Encoding: gzip\r\n"
+                escritor.write(
+                    (f"HTTP/1.1 {status} {'OK' if status == 200 else 'Erro'}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(dados)}\r\n{extras}"
+                     f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n").encode("latin-1") + dados)
+                await escritor.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def executar(self, ao_iniciar=None):
+        """Inicia o servidor e atende até ser cancelado
+
+        Args:
+            ao_iniciar: função chamada com (host, porta) quando o servidor estiver ouvindo
+        """
+        db_manager.ativar_reuso_conexoes()
+        ativar_fila_escrita()
+        cancelar = assinar(TODAS, self._ao_publicar)
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        if ao_iniciar:
+            ao_iniciar(self.host, self.porta)
+        try:
+            async with self._servidor:
+                await self._servidor.serve_forever()
+        finally:
+            cancelar()
+            self.leitores.shutdown(wait=True)
+            self.escritor.shutdown(wait=True)
+            desativar_fila_escrita()
+            db_manager.desativar_reuso_conexoes()
@@ -1,7 +1,10 @@
 # utils/session.py
+import threading
 
 class Session:
     current_user = None
+    # Usuário por thread, para o serviço da API (várias threads gravando por usuários diferentes)
+    _local = threading.local()
 
     @classmethod
     def login(cls, user):
@@ -11,6 +14,12 @@ class Session:
     def logout(cls):
         cls.current_user = None
 
+    @classmethod
+    def login_thread(cls, user):
+        """Define o usuário apenas da thread atual (None volta a usar o da sessão)"""
+        cls._local.user = user
+
     @classmethod
     def get_user(cls):
-        return cls.current_user
+        user = getattr(cls._local, "user", None)
+        return user if user is not None else cls.current_user
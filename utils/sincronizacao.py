@@ -0,0 +1,104 @@
+# utils/sincronizacao.py
+"""Sincronização com alterações feitas por outras instâncias no mesmo banco
+
+O MonitorAlteracoes verifica periodicamente o PRAGMA data_version (uma leitura
+sem acesso a disco) e, somente quando outra conexão gravou algo, lê as linhas
+novas de log_alteracoes e as publica no barramento como se fossem alterações
+locais. As telas abertas atualizam apenas os registros afetados.
+
+As próprias gravações da instância também aparecem no log; como os assinantes
+apenas releem o registro alterado, recebê-las de novo não tem efeito visível.
+"""
+from models.db_manager import obter_versao_dados, obter_ultimo_seq_alteracoes, obter_alteracoes_desde
+from utils.barramento import publicar, RECARREGAR
+
+# Intervalo padrão entre verificações
+INTERVALO_MS = 2000
+
+# Máximo de alterações lidas por verificação
+LIMITE_LEITURA = 5000
+
+# Entidades com telas que acompanham o barramento
+ENTIDADES_RECARREGAVEIS = ("demanda", "carta_acordo", "eventos", "produtos_servicos", "aditivos")
+
+
+class MonitorAlteracoes:
+    """Publica no barramento as alterações gravadas por outras instâncias"""
+
+    def __init__(self, widget, intervalo_ms=INTERVALO_MS):
+        """
+        Args:
+            widget: widget Tk usado para agendar as verificações (after)
+            intervalo_ms: intervalo entre verificações
+        """
+        self.widget = widget
+        self.intervalo_ms = intervalo_ms
+        self.agendamento = None
+        self.data_version = None
+        self.ultimo_seq = None
+
+    def iniciar(self):
+        """Começa a acompanhar o banco a partir do estado atual"""
+        self.data_version = obter_versao_dados()
+        self.ultimo_seq = obter_ultimo_seq_alteracoes()
+        self._agendar()
+        return self
+
+    def parar(self):
+        """Interrompe as verificações"""
+        if self.agendamento is not None:
+            try:
+                self.widget.after_cancel(self.agendamento)
+            except Exception:
+                pass
+            self.agendamento = None
+
+    def _agendar(self):
+        self.agendamento = self.widget.after(self.intervalo_ms, self._executar)
+
+    def _executar(self):
+        try:
+            self.verificar()
+        except Exception as e:
+            print(f"Erro ao verificar alterações de outras instâncias: {e}")
+        self._agendar()
+
+    def verificar(self):
+        """Publica as alterações gravadas desde a última verificação
+
+        Returns:
+            int: quantidade de eventos publicados
+        """
+        data_version = obter_versao_dados()
+        if data_version == self.data_version:
+            return 0
+        self.data_version = data_version
+
+        menor, linhas = obter_alteracoes_desde(self.ultimo_seq, LIMITE_LEITURA)
+        if menor is not None and menor > self.ultimo_seq + 1 and self.ultimo_seq:
+            # Parte do histórico foi podada: não dá para reproduzir as alterações
+            for entidade in ENTIDADES_RECARREGAVEIS:
+                publicar(entidade, None, RECARREGAR, remoto=True)
+            self.ultimo_seq = obter_ultimo_seq_alteracoes()
+            return len(ENTIDADES_RECARREGAVEIS)
+        if not linhas:
+            return 0
+        self.ultimo_seq = linhas[-1][0]
+
+        # Várias alterações do mesmo registro resultam em um único evento
+        pendentes = {}
+        for _, tabela, id_registro, operacao, tipo_contrato, id_contrato in linhas:
+            chave = (tabela, id_registro)
+            pendentes.pop(chave, None)
+            pendentes[chave] = (operacao, tipo_contrato, id_contrato)
+
+        for (tabela, id_registro), (operacao, tipo_contrato, id_contrato) in pendentes.items():
+            contexto = {"remoto": True}
+            if tipo_contrato is not None:
+                contexto.update(tipo_contrato=tipo_contrato, id_contrato=id_contrato)
+            publicar(tabela, id_registro, operacao, **contexto)
+
+        # Leitura limitada: se ainda houver alterações, continua na próxima verificação
+        if len(linhas) >= LIMITE_LEITURA:
+            self.data_version = None
+        return len(pendentes)
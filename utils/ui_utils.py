@@ -187,6 +187,7 @@ class FormularioBase(ttk.Frame):
         self.titulo = titulo
         self.largura = largura
         self.campos = {}
+        self.estado_inicial = None
         self.criar_cabecalho()
         
     def criar_cabecalho(self):
@@ -294,6 +295,32 @@ class FormularioBase(ttk.Frame):
         
         return valores
     
+    def marcar_estado_inicial(self):
+        """Guarda os valores atuais como referência para detectar alterações
+        
+        Deve ser chamado depois de preencher o formulário com o registro carregado.
+        """
+        self.estado_inicial = self.obter_valores()
+    
+    def campos_alterados(self):
+        """Retorna os nomes dos campos cujo valor difere do estado inicial
+        
+        Sem estado inicial marcado, todos os campos são considerados alterados.
+        """
+        if self.estado_inicial is None:
+            return set(self.campos)
+        return {nome for nome, valor in self.obter_valores().items()
+                if self.estado_inicial.get(nome) != valor}
+    
+    def obter_alteracoes(self):
+        """Retorna um dicionário apenas com os campos alterados e seus valores atuais"""
+        alterados = self.campos_alterados()
+        return {nome: valor for nome, valor in self.obter_valores().items() if nome in alterados}
+    
+    def possui_alteracoes(self):
+        """Indica se algum campo foi alterado desde o estado inicial"""
+        return bool(self.campos_alterados())
+    
     def validar(self):
         """Valida se todos os campos obrigatórios foram preenchidos"""
         for nome, info in self.campos.items():
@@ -324,6 +351,23 @@ class FormularioBase(ttk.Frame):
             else:
                 widget.delete(0, tk.END)
 
+def marcar_formularios_carregados(*formularios):
+    """Marca o estado inicial dos formulários já criados que ainda não foram marcados
+    
+    Usado como callback de AbasPreguicosas.ao_construir nas telas de edição: cada
+    formulário passa a ter como referência os valores do registro carregado.
+    """
+    for formulario in formularios:
+        if formulario is not None and formulario.estado_inicial is None:
+            formulario.marcar_estado_inicial()
+
+def campos_alterados(*formularios):
+    """Retorna a união dos campos alterados dos formulários informados"""
+    alterados = set()
+    for formulario in formularios:
+        alterados |= formulario.campos_alterados()
+    return alterados
+
 class TabelaBase(ttk.Frame):
     """Classe base para tabelas padronizadas"""
     
@@ -376,12 +420,13 @@ class TabelaBase(ttk.Frame):
         self.tree.tag_configure('odd', background=Cores.BACKGROUND_CLARO)
         self.tree.tag_configure('even', background=Cores.BACKGROUND)
     
-    def adicionar_linha(self, valores, id=None):
+    def adicionar_linha(self, valores, id=None, indice=tk.END):
         """Adiciona uma linha à tabela
         
         Args:
             valores: dicionário de valores para as colunas
             id: identificador da linha (opcional)
+            indice: posição da nova linha (padrão: no fim da tabela)
         """
         valores_lista = [valores.get(col, "") for col in self.colunas]
         
@@ -389,7 +434,7 @@ class TabelaBase(ttk.Frame):
         row_count = len(self.tree.get_children())
         tag = 'even' if row_count % 2 == 0 else 'odd'
         
-        return self.tree.insert("", tk.END, values=valores_lista, iid=id, tags=(tag,))
+        return self.tree.insert("", indice, values=valores_lista, iid=id, tags=(tag,))
     
     def atualizar_linha(self, id, valores):
         """Atualiza uma linha existente
@@ -409,6 +454,36 @@ class TabelaBase(ttk.Frame):
         """
         self.tree.delete(id)
     
+    def existe_linha(self, id):
+        """Indica se a tabela possui uma linha com o identificador informado"""
+        return self.tree.exists(id)
+    
+    def sincronizar_linhas(self, linhas):
+        """Deixa a tabela igual à lista informada alterando apenas o necessário
+        
+        Linhas ausentes da lista são removidas, as novas são inseridas na
+        posição correspondente e as existentes só são redesenhadas se algum
+        valor mudou.
+        
+        Args:
+            linhas: lista ordenada de tuplas (id, dicionário de valores)
+        """
+        ids = {str(id) for id, _ in linhas}
+        obsoletas = [item for item in self.tree.get_children() if item not in ids]
+        if obsoletas:
+            self.tree.delete(*obsoletas)
+        
+        for indice, (id, valores) in enumerate(linhas):
+            id = str(id)
+            valores_lista = [str(valores.get(col, "")) for col in self.colunas]
+            if not self.tree.exists(id):
+                self.adicionar_linha(valores, id, indice)
+                continue
+            if [str(valor) for valor in self.tree.item(id, "values")] != valores_lista:
+                self.tree.item(id, values=valores_lista)
+            if self.tree.index(id) != indice:
+                self.tree.move(id, "", indice)
+    
     def limpar(self):
         """Remove todas as linhas da tabela"""
         for item in self.tree.get_children():
@@ -429,6 +504,141 @@ class TabelaBase(ttk.Frame):
             return dict(zip(self.colunas, valores))
         return None
 
+class AbasPreguicosas:
+    """Constrói as abas de um ttk.Notebook apenas quando exibidas pela primeira vez
+
+    A primeira aba adicionada é construída imediatamente; as demais são
+    construídas no primeiro <<NotebookTabChanged>> que as exibir ou quando
+    construir_todas() for chamado (por exemplo, antes de salvar).
+    """
+
+    # Permite desativar a construção sob demanda (usado no benchmark de formulários)
+    construcao_preguicosa = True
+
+    def __init__(self, notebook):
+        self.notebook = notebook
+        self.construtores = {}
+        self.construidas = set()
+        self.callbacks = []
+        self.notebook.bind("<<NotebookTabChanged>>", self._ao_trocar_aba, add="+")
+
+    def adicionar(self, texto, construtor):
+        """Adiciona uma aba cujo conteúdo será criado pelo construtor
+
+        Args:
+            texto: título da aba
+            construtor: função que recebe o frame da aba e cria o seu conteúdo
+
+        Returns:
+            ttk.Frame: frame da aba
+        """
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=texto)
+        self.construtores[str(frame)] = construtor
+
+        if not self.construcao_preguicosa or len(self.construtores) == 1:
+            self.construir(frame)
+        return frame
+
+    def construir(self, frame):
+        """Constrói a aba informada, se ainda não tiver sido construída"""
+        chave = str(frame)
+        if chave in self.construidas or chave not in self.construtores:
+            return
+        self.construidas.add(chave)
+        frame = self.notebook.nametowidget(chave)
+        self.construtores[chave](frame)
+        for callback in self.callbacks:
+            callback(frame)
+
+    def construir_todas(self):
+        """Constrói todas as abas ainda pendentes, na ordem em que foram adicionadas"""
+        for chave in list(self.construtores):
+            self.construir(chave)
+
+    def construida(self, frame):
+        """Indica se a aba informada já foi construída"""
+        return str(frame) in self.construidas
+
+    def ao_construir(self, callback):
+        """Registra uma função chamada com o frame de cada aba construída a partir de agora"""
+        self.callbacks.append(callback)
+
+    def _ao_trocar_aba(self, event=None):
+        """Constrói a aba selecionada no primeiro acesso"""
+        try:
+            selecionada = self.notebook.select()
+        except tk.TclError:
+            return
+        if selecionada:
+            self.construir(selecionada)
+
+
+class ComboboxBusca(ttk.Combobox):
+    """Combobox que sugere itens consultando o banco conforme o usuário digita
+
+    A consulta só é feita após uma pausa na digitação, e a função de busca deve
+    ser limitada (LIMIT), de modo que o custo não cresce com o tamanho da tabela.
+    """
+
+    def __init__(self, master, buscar, formatar, atraso_ms=250, minimo=1, limite=20, **kwargs):
+        """
+        Args:
+            master: widget pai
+            buscar: função (termo, limite) que retorna os registros encontrados
+            formatar: função que converte um registro no texto exibido
+            atraso_ms: pausa na digitação antes de consultar
+            minimo: quantidade mínima de caracteres para consultar
+            limite: quantidade máxima de sugestões
+        """
+        super().__init__(master, **kwargs)
+        self.buscar = buscar
+        self.formatar = formatar
+        self.atraso_ms = atraso_ms
+        self.minimo = minimo
+        self.limite = limite
+        self.registros = []
+        self.registro_selecionado = None
+        self._agendamento = None
+
+        self.bind("<KeyRelease>", self._ao_digitar)
+        self.bind("<<ComboboxSelected>>", self._ao_selecionar)
+
+    def _ao_digitar(self, event=None):
+        if event is not None and event.keysym in ("Return", "Up", "Down", "Escape", "Tab"):
+            return
+        self.registro_selecionado = None
+        if self._agendamento is not None:
+            self.after_cancel(self._agendamento)
+        self._agendamento = self.after(self.atraso_ms, self.atualizar_sugestoes)
+
+    def atualizar_sugestoes(self):
+        """Consulta os registros que correspondem ao texto digitado"""
+        self._agendamento = None
+        termo = self.get().strip()
+        if len(termo) < self.minimo:
+            self.registros = []
+        else:
+            self.registros = self.buscar(termo, self.limite)
+        self["values"] = [self.formatar(registro) for registro in self.registros]
+
+    def _ao_selecionar(self, event=None):
+        indice = self.current()
+        if 0 <= indice < len(self.registros):
+            self.registro_selecionado = self.registros[indice]
+
+    def obter_registro(self):
+        """Retorna o registro escolhido na lista de sugestões ou None"""
+        return self.registro_selecionado
+
+    def limpar(self):
+        """Apaga o texto, as sugestões e a seleção"""
+        self.delete(0, tk.END)
+        self["values"] = []
+        self.registros = []
+        self.registro_selecionado = None
+
+
 class Menu:
     """Classe para criar menu de navegação lateral"""
     
@@ -0,0 +1,195 @@
+# utils/validator.py
+"""Formatação e validação de valores em BRL, datas, CNPJ e NUP/SEI
+
+Concentra as máscaras usadas pelos formulários (antes repetidas em cada view)
+e as conversões de moeda usadas nas listagens. As expressões regulares são
+compiladas uma única vez e a troca de separadores do padrão americano para o
+brasileiro é feita com str.translate em uma só passada, no lugar da cadeia
+.replace(",", "X").replace(".", ",").replace("X", ".").
+
+Para listagens, formatar_coluna_brl e converter_coluna_brl processam a
+coluna inteira de um resultado de uma vez.
+"""
+import re
+import tkinter as tk
+from functools import lru_cache
+
+_NAO_DIGITOS = re.compile(r"\D")
+_NAO_NUMERICOS_DECIMAL = re.compile(r"[^\d.]")
+
+# Troca "," por "." e "." por "," (1,234.56 -> 1.234,56) em uma passada
+_SEPARADORES_BRL = str.maketrans(",.", ".,")
+# Remove "R$", espaços e pontos de milhar e troca a vírgula decimal por ponto
+_LIMPEZA_BRL = str.maketrans({"R": None, "$": None, " ": None, "\xa0": None, ".": None, ",": "."})
+
+VALOR_ZERO_BRL = "R$ 0,00"
+
+
+@lru_cache(maxsize=8192)
+def _formatar_numero_brl(valor):
+    return f"R$ {valor:,.2f}".translate(_SEPARADORES_BRL)
+
+
+def formatar_brl(valor):
+    """Formata um número como moeda brasileira (R$ 1.234,56)
+
+    Valores vazios ou não numéricos resultam em "R$ 0,00". Os resultados mais
+    recentes ficam em cache, pois as listagens repetem muitos valores.
+    """
+    if valor is None or valor == "":
+        return VALOR_ZERO_BRL
+    try:
+        return _formatar_numero_brl(float(valor))
+    except (TypeError, ValueError):
+        return VALOR_ZERO_BRL
+
+
+def converter_brl(texto):
+    """Converte um valor em moeda brasileira (R$ 1.234,56) para float (1234.56)
+
+    Números são devolvidos como float; textos inválidos ou vazios resultam em 0.0.
+    """
+    if not texto:
+        return 0.0
+    if isinstance(texto, (int, float)):
+        return float(texto)
+    numero = str(texto).translate(_LIMPEZA_BRL)
+    try:
+        return float(numero)
+    except ValueError:
+        try:
+            return float(_NAO_NUMERICOS_DECIMAL.sub("", numero))
+        except ValueError:
+            return 0.0
+
+
+def formatar_coluna_brl(valores):
+    """Formata uma coluna inteira de valores como moeda brasileira
+
+    Args:
+        valores: sequência de números (ou None) de um resultado de consulta
+
+    Returns:
+        list: textos no formato R$ 1.234,56, na mesma ordem
+    """
+    formatar = _formatar_numero_brl
+    resultado = []
+    adicionar = resultado.append
+    for valor in valores:
+        if valor is None or valor == "":
+            adicionar(VALOR_ZERO_BRL)
+            continue
+        try:
+            adicionar(formatar(float(valor)))
+        except (TypeError, ValueError):
+            adicionar(VALOR_ZERO_BRL)
+    return resultado
+
+
+def converter_coluna_brl(textos):
+    """Converte uma coluna inteira de textos em moeda brasileira para float"""
+    return [converter_brl(texto) for texto in textos]
+
+
+def mascarar_data(texto):
+    """Aplica a máscara DD/MM/AAAA aos dígitos digitados"""
+    digitos = _NAO_DIGITOS.sub("", texto)[:8]
+    if len(digitos) > 4:
+        return f"{digitos[:2]}/{digitos[2:4]}/{digitos[4:]}"
+    if len(digitos) > 2:
+        return f"{digitos[:2]}/{digitos[2:]}"
+    return digitos
+
+
+def data_valida(texto):
+    """Validação básica de uma data completa DD/MM/AAAA"""
+    if len(texto) != 10:
+        return False
+    try:
+        dia, mes, ano = map(int, texto.split("/"))
+    except ValueError:
+        return False
+    return 1 <= dia <= 31 and 1 <= mes <= 12 and 1000 <= ano <= 9999
+
+
+def mascarar_nup_sei(texto):
+    """Aplica a máscara 00000.000000/0000-00 do NUP/SEI"""
+    digitos = _NAO_DIGITOS.sub("", texto)[:17]
+    if len(digitos) > 13:
+        return f"{digitos[:5]}.{digitos[5:11]}/{digitos[11:15]}-{digitos[15:]}"
+    if len(digitos) > 11:
+        return f"{digitos[:5]}.{digitos[5:11]}/{digitos[11:]}"
+    if len(digitos) > 5:
+        return f"{digitos[:5]}.{digitos[5:]}"
+    return digitos
+
+
+def mascarar_cnpj(texto):
+    """Aplica a máscara 00.000.000/0000-00 do CNPJ"""
+    digitos = _NAO_DIGITOS.sub("", texto)[:14]
+    if len(digitos) > 12:
+        return f"{digitos[:2]}.{digitos[2:5]}.{digitos[5:8]}/{digitos[8:12]}-{digitos[12:]}"
+    if len(digitos) > 8:
+        return f"{digitos[:2]}.{digitos[2:5]}.{digitos[5:8]}/{digitos[8:]}"
+    if len(digitos) > 5:
+        return f"{digitos[:2]}.{digitos[2:5]}.{digitos[5:]}"
+    if len(digitos) > 2:
+        return f"{digitos[:2]}.{digitos[2:]}"
+    return digitos
+
+
+def mascarar_valor_brl(texto):
+    """Interpreta os dígitos digitados como centavos e formata em moeda brasileira"""
+    digitos = _NAO_DIGITOS.sub("", texto)
+    return _formatar_numero_brl(int(digitos) / 100 if digitos else 0.0)
+
+
+class FormatadorCampos:
+    """Formatação dos campos de entrada dos formulários
+
+    Os métodos recebem o widget (ttk.Entry) e são usados em binds de teclado.
+    O conteúdo só é reescrito quando a máscara muda o texto, preservando a
+    posição do cursor nas teclas que não alteram o valor (setas, Tab etc.).
+    """
+
+    @staticmethod
+    def _atualizar(entry, texto):
+        if entry.get() != texto:
+            entry.delete(0, tk.END)
+            entry.insert(0, texto)
+
+    @staticmethod
+    def formatar_data(entry, event=None):
+        """Formata o campo para data no padrão brasileiro (DD/MM/AAAA)"""
+        texto = mascarar_data(entry.get())
+        FormatadorCampos._atualizar(entry, texto)
+
+        # Valida a data completa
+        if len(texto) == 10:
+            entry.config(foreground="black" if data_valida(texto) else "red")
+        return True
+
+    @staticmethod
+    def formatar_nup_sei(entry, event=None):
+        """Formata o campo NUP/SEI no padrão 00000.000000/0000-00"""
+        FormatadorCampos._atualizar(entry, mascarar_nup_sei(entry.get()))
+        return True
+
+    @staticmethod
+    def formatar_cnpj(entry, event=None):
+        """Formata o campo CNPJ no padrão 00.000.000/0000-00"""
+        FormatadorCampos._atualizar(entry, mascarar_cnpj(entry.get()))
+        return True
+
+    @staticmethod
+    def formatar_valor_brl(entry, event=None):
+        """Formata o campo para valor monetário no padrão brasileiro (R$ 0.000,00)"""
+        FormatadorCampos._atualizar(entry, mascarar_valor_brl(entry.get()))
+        return True
+
+    @staticmethod
+    def validar_numerico(event):
+        """Permite apenas entrada de caracteres numéricos"""
+        if event.char.isdigit() or event.keysym in ('BackSpace', 'Delete', 'Left', 'Right'):
+            return True
+        return False
@@ -1,129 +1,14 @@
 import tkinter as tk
 from tkinter import ttk
-import re
 import datetime
-from controllers.carta_acordo_controller import adicionar_carta_acordo, listar_cartas_acordo, editar_carta_acordo, excluir_carta_acordo, obter_cartas_por_demanda
-from controllers.demanda_controller import adicionar_demanda, listar_demandas, editar_demanda
-from controllers.aditivos_controller import adicionar_aditivo, listar_aditivos, obter_aditivos_por_contrato, editar_aditivo, excluir_aditivo
-from utils.ui_utils import FormularioBase, criar_botao, TabelaBase, mostrar_mensagem, Estilos
-from utils.custeio_utils import CusteioManager
-
-class FormatadorCampos:
-    """Classe para formatar campos de entrada"""
-    
-    @staticmethod
-    def formatar_data(entry, event=None):
-        """Formata o campo para data no padrão brasileiro (DD/MM/AAAA)"""
-        texto = entry.get().replace("/", "")
-        # Remove caracteres não numéricos
-        texto = re.sub(r'[^\d]', '', texto)
-        
-        # Limita a 8 dígitos
-        if len(texto) > 8:
-            texto = texto[:8]
-            
-        # Formata conforme a quantidade de dígitos
-        if len(texto) > 4:
-            texto = f"{texto[:2]}/{texto[2:4]}/{texto[4:]}"
-        elif len(texto) > 2:
-            texto = f"{texto[:2]}/{texto[2:]}"
-            
-        # Atualiza o campo
-        entry.delete(0, tk.END)
-        entry.insert(0, texto)
-        
-        # Valida a data
-        if len(texto) == 10:  # Formato completo DD/MM/AAAA
-            try:
-                dia, mes, ano = map(int, texto.split('/'))
-                # Validação básica
-                if not (1 <= dia <= 31 and 1 <= mes <= 12 and 1000 <= ano <= 9999):
-                    entry.config(foreground="red")
-                else:
-                    entry.config(foreground="black")
-            except:
-                entry.config(foreground="red")
-        
-        return True
-    
-    @staticmethod
-    def formatar_nup_sei(entry, event=None):
-        """Formata o campo NUP/SEI no padrão 00000.000000/0000-00"""
-        texto = entry.get().replace(".", "").replace("/", "").replace("-", "")
-        # Remove caracteres não numéricos
-        texto = re.sub(r'[^\d]', '', texto)
-        
-        # Limita a 17 dígitos
-        if len(texto) > 17:
-            texto = texto[:17]
-            
-        # Formata conforme a quantidade de dígitos
-        if len(texto) > 13:
-            texto = f"{texto[:5]}.{texto[5:11]}/{texto[11:15]}-{texto[15:]}"
-        elif len(texto) > 11:
-            texto = f"{texto[:5]}.{texto[5:11]}/{texto[11:]}"
-        elif len(texto) > 5:
-            texto = f"{texto[:5]}.{texto[5:]}"
-            
-        # Atualiza o campo
-        entry.delete(0, tk.END)
-        entry.insert(0, texto)
-        return True
-    
-    @staticmethod
-    def formatar_cnpj(entry, event=None):
-        """Formata o campo CNPJ no padrão 00.000.000/0000-00"""
-        texto = entry.get().replace(".", "").replace("/", "").replace("-", "")
-        # Remove caracteres não numéricos
-        texto = re.sub(r'[^\d]', '', texto)
-        
-        # Limita a 14 dígitos
-        if len(texto) > 14:
-            texto = texto[:14]
-            
-        # Formata conforme a quantidade de dígitos
-        if len(texto) > 12:
-            texto = f"{texto[:2]}.{texto[2:5]}.{texto[5:8]}/{texto[8:12]}-{texto[12:]}"
-        elif len(texto) > 8:
-            texto = f"{texto[:2]}.{texto[2:5]}.{texto[5:8]}/{texto[8:]}"
-        elif len(texto) > 5:
-            texto = f"{texto[:2]}.{texto[2:5]}.{texto[5:]}"
-        elif len(texto) > 2:
-            texto = f"{texto[:2]}.{texto[2:]}"
-            
-        # Atualiza o campo
-        entry.delete(0, tk.END)
-        entry.insert(0, texto)
-        return True
-    
-    @staticmethod
-    def formatar_valor_brl(entry, event=None):
-        """Formata o campo para valor monetário no padrão brasileiro (R$ 0.000,00)"""
-        texto = entry.get().replace("R$", "").replace(".", "").replace(",", "").strip()
-        # Remove caracteres não numéricos
-        texto = re.sub(r'[^\d]', '', texto)
-        
-        if not texto:
-            texto = "0"
-            
-        # Converte para float (centavos)
-        valor = float(texto) / 100
-        
-        # Formata como moeda brasileira
-        texto_formatado = f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            
-        # Atualiza o campo
-        entry.delete(0, tk.END)
-        entry.insert(0, texto_formatado)
-        return True
-    
-    @staticmethod
-    def validar_numerico(event):
-        """Permite apenas entrada de caracteres numéricos"""
-        if event.char.isdigit() or event.keysym in ('BackSpace', 'Delete', 'Left', 'Right'):
-            return True
-        return False
-
+from controllers.carta_acordo_controller import adicionar_carta_acordo, listar_cartas_acordo, editar_carta_acordo, excluir_carta_acordo, obter_cartas_por_demanda, obter_carta_acordo
+from controllers.demanda_controller import adicionar_demanda, editar_demanda
+from controllers.contrato_controller import versao_do_registro, obter_versao_atual, ConflitoEdicao
+from controllers.aditivos_controller import adicionar_aditivo, obter_aditivo, historico_aditivos, editar_aditivo, excluir_aditivo
+from utils.validator import FormatadorCampos, formatar_brl, formatar_coluna_brl, converter_brl
+from utils.ui_utils import FormularioBase, criar_botao, TabelaBase, mostrar_mensagem, Estilos, AbasPreguicosas, marcar_formularios_carregados, campos_alterados
+from utils.barramento import assinar_enquanto_existir, EXCLUIR, RECARREGAR
+from utils.dados_referencia import obter_valores_custeio, obter_demanda_cache
 
 class CartaAcordoForm(FormularioBase):
     """Formulário para cadastro e edição de cartas de acordo"""
@@ -142,6 +27,8 @@ class CartaAcordoForm(FormularioBase):
         self.callback_cancelar = callback_cancelar
         self.carta = carta
         self.id_carta = carta[0] if carta else None
+        # Versão carregada, usada para detectar edição simultânea ao salvar
+        self.versao_registro = versao_do_registro("carta_acordo", carta) if carta else None
         self.modo_edicao = carta is not None
         
         # Frame principal para organizar o layout
@@ -162,9 +49,28 @@ class CartaAcordoForm(FormularioBase):
         self.btn_salvar = criar_botao(self.frame_botoes, "Salvar", self.salvar, "Primario", 15)
         self.btn_salvar.pack(side=tk.RIGHT)
         
-        # Aba de demanda (primeira aba)
-        self.tab_demanda = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_demanda, text="Demanda")
+        # Configurar estilo especial para a aba de aditivos (cor diferente)
+        style = ttk.Style()
+        style.map("TNotebook.Tab", background=[("selected", "#f0e68c")])
+        
+        # Abas construídas sob demanda: apenas a primeira é montada agora,
+        # as demais no primeiro acesso ou antes de salvar
+        self.abas = AbasPreguicosas(self.notebook)
+        # No modo de edição, cada formulário guarda os valores carregados assim que sua aba
+        # é construída, para que só os campos alterados sejam gravados
+        if self.modo_edicao:
+            self.abas.ao_construir(lambda aba: marcar_formularios_carregados(
+                getattr(self, "form_demanda", None), getattr(self, "form_custeio", None),
+                getattr(self, "form_contrato", None)))
+        self.abas.adicionar("Demanda", self.construir_aba_demanda)
+        self.abas.adicionar("Custeio", self.construir_aba_custeio)
+        self.abas.adicionar("Contrato", self.construir_aba_contrato)
+        self.abas.adicionar("Aditivos", self.construir_aba_aditivos)
+    
+    def construir_aba_demanda(self, aba):
+        """Cria os campos da aba de demanda"""
+        self.tab_demanda = aba
+        carta = self.carta
         
         # Configurar campos na aba de demanda
         self.form_demanda = FormularioBase(self.tab_demanda, "")
@@ -235,14 +141,9 @@ class CartaAcordoForm(FormularioBase):
         else:
             # Para edição, buscamos os dados da demanda pelo código
             codigo_demanda = carta[1]
-            demanda_encontrada = None
             
-            # Buscar a demanda pelo código
-            demandas = listar_demandas()
-            for d in demandas:
-                if d[0] == codigo_demanda:
-                    demanda_encontrada = d
-                    break
+            # Buscar a demanda pelo código (consulta pela chave, com cache)
+            demanda_encontrada = obter_demanda_cache(codigo_demanda)
             
             # Para edição, mostramos o código da demanda
             self.form_demanda.adicionar_campo("codigo_demanda", "Código da Demanda", 
@@ -345,10 +246,11 @@ class CartaAcordoForm(FormularioBase):
                     status_widget.set("Novo")
             else:
                 status_widget.set("Novo")
-        
-        # Aba de custeio (segunda aba)
-        self.tab_custeio = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_custeio, text="Custeio")
+    
+    def construir_aba_custeio(self, aba):
+        """Cria os campos da aba de custeio"""
+        self.tab_custeio = aba
+        carta = self.carta
         
         # Configurar campos na aba de custeio
         self.form_custeio = FormularioBase(self.tab_custeio, "")
@@ -438,12 +340,9 @@ class CartaAcordoForm(FormularioBase):
             
             # Garantir que o subprojeto seja carregado corretamente
             if carta[4]:  # subprojeto
-                # Criar instância do CusteioManager
-                custeio_manager = CusteioManager()
-                
                 # Carregar subprojetos para a instituição selecionada
                 filtros = {'instituicao_parceira': carta[2]}
-                subprojetos = custeio_manager.get_distinct_values('subprojeto', filtros)
+                subprojetos = obter_valores_custeio('subprojeto', filtros)
                 
                 # Garantir que temos pelo menos uma opção
                 if not subprojetos:
@@ -457,10 +356,11 @@ class CartaAcordoForm(FormularioBase):
                 subprojeto_widget = self.form_custeio.campos["subprojeto"]["widget"]
                 subprojeto_widget["values"] = subprojetos
                 subprojeto_widget.set(carta[4])
-        
-        # Aba de contrato (terceira aba)
-        self.tab_contrato = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_contrato, text="Contrato")
+    
+    def construir_aba_contrato(self, aba):
+        """Cria os campos da aba de contrato"""
+        self.tab_contrato = aba
+        carta = self.carta
         
         self.form_contrato = FormularioBase(self.tab_contrato, "")
         self.form_contrato.pack(fill=tk.BOTH, expand=True)
@@ -508,14 +408,10 @@ class CartaAcordoForm(FormularioBase):
                                           padrao=carta[16] if carta else "", required=True)
         self.form_contrato.adicionar_campo("observacoes", "Observações", tipo="texto_longo", 
                                           padrao=carta[19] if carta else "")
-        
-        # Configurar estilo especial para a aba de aditivos (cor diferente)
-        style = ttk.Style()
-        style.map("TNotebook.Tab", background=[("selected", "#f0e68c")])
-        
-        # Aba de aditivos (quarta aba)
-        self.tab_aditivos = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_aditivos, text="Aditivos")
+    
+    def construir_aba_aditivos(self, aba):
+        """Cria a tabela da aba de aditivos"""
+        self.tab_aditivos = aba
         
         # Frame para a tabela de aditivos
         self.frame_tabela_aditivos = ttk.Frame(self.tab_aditivos)
@@ -563,12 +459,15 @@ class CartaAcordoForm(FormularioBase):
             criar_botao(frame_acoes_aditivos, "Editar", self.editar_aditivo, "Secundario", 15).pack(side=tk.LEFT, padx=(0, 5))
             criar_botao(frame_acoes_aditivos, "Excluir", self.excluir_aditivo, "Perigo", 15).pack(side=tk.LEFT)
             
-            # Carregar aditivos existentes
+            # Carregar aditivos existentes; alterações feitas em qualquer tela chegam pelo barramento
             self.carregar_aditivos()
+            assinar_enquanto_existir(self.tabela_aditivos, "aditivos", self.ao_alterar_aditivo)
         
-        # Os botões já foram criados no início do método
     def salvar(self):
         """Salva os dados do formulário"""
+        # Abas ainda não exibidas precisam existir para validação e leitura dos valores
+        self.abas.construir_todas()
+        
         # Validar todos os formulários
         formularios = [self.form_demanda, self.form_custeio, self.form_contrato]
             
@@ -589,7 +488,7 @@ class CartaAcordoForm(FormularioBase):
                 codigo_demanda = int(valores_demanda["codigo_demanda"])
                 
                 # Verificar se temos os campos necessários para atualizar a demanda
-                if all(campo in valores_demanda for campo in ["data_entrada", "solicitante", "data_protocolo", "oficio", "nup_sei"]):
+                if self.form_demanda.possui_alteracoes() and all(campo in valores_demanda for campo in ["data_entrada", "solicitante", "data_protocolo", "oficio", "nup_sei"]):
                     # Se tiver o campo status, incluir na atualização
                     if "status" in valores_demanda:
                         editar_demanda(
@@ -603,12 +502,8 @@ class CartaAcordoForm(FormularioBase):
                         )
                     else:
                         # Buscar o status atual da demanda
-                        demandas = listar_demandas()
-                        status_atual = "Novo"
-                        for d in demandas:
-                            if d[0] == codigo_demanda and len(d) > 6:
-                                status_atual = d[6]
-                                break
+                        demanda_atual = obter_demanda_cache(codigo_demanda)
+                        status_atual = demanda_atual[6] if demanda_atual and demanda_atual[6] else "Novo"
                                 
                         editar_demanda(
                             codigo_demanda,
@@ -643,14 +538,18 @@ class CartaAcordoForm(FormularioBase):
                     'observacoes': valores_contrato["observacoes"]
                 }
                 
-                editar_carta_acordo(self.id_carta, **valores)
+                # Gravar apenas os campos alterados desde o carregamento do registro
+                alterados = campos_alterados(self.form_custeio, self.form_contrato)
+                valores = {campo: valor for campo, valor in valores.items() if campo in alterados}
+                
+                editar_carta_acordo(self.id_carta, versao_esperada=self.versao_registro, **valores)
                 mostrar_mensagem("Sucesso", "Carta de Acordo atualizada com sucesso!", tipo="sucesso")
             else:
                 # Cadastrar nova demanda
                 valores_demanda = self.form_demanda.obter_valores()
                 
                 # Criar a demanda
-                adicionar_demanda(
+                codigo_demanda = adicionar_demanda(
                     valores_demanda["data_entrada"],
                     valores_demanda["solicitante"],
                     valores_demanda["data_protocolo"],
@@ -659,10 +558,6 @@ class CartaAcordoForm(FormularioBase):
                     valores_demanda["status"]
                 )
                 
-                # Obter o código da nova demanda (última demanda inserida)
-                demandas = listar_demandas()
-                codigo_demanda = demandas[-1][0] if demandas else 1
-                
                 # Obter valores da carta
                 valores_custeio = self.form_custeio.obter_valores()
                 valores_contrato = self.form_contrato.obter_valores()
@@ -696,6 +591,8 @@ class CartaAcordoForm(FormularioBase):
                 mostrar_mensagem("Sucesso", "Demanda e Carta de Acordo cadastradas com sucesso!", tipo="sucesso")
             
             self.callback_salvar()
+        except ConflitoEdicao as conflito:
+            mostrar_mensagem("Conflito de Edição", conflito.descrever(), tipo="aviso")
         except Exception as e:
             mostrar_mensagem("Erro", f"Erro ao salvar: {str(e)}", tipo="erro")
         
@@ -722,14 +619,11 @@ class CartaAcordoForm(FormularioBase):
         resultado_widget.set("")
         meta_widget.set("")
         
-        # Criar instância do CusteioManager
-        custeio_manager = CusteioManager()
-        
         # Configurar os campos com base na instituição
         if instituicao == "OPAS":
             # Carregar projetos para OPAS
             filtros = {'instituicao_parceira': 'OPAS'}
-            projetos = custeio_manager.get_distinct_values('cod_projeto', filtros)
+            projetos = obter_valores_custeio('cod_projeto', filtros)
             
             # Garantir que temos pelo menos uma opção
             if not projetos:
@@ -765,7 +659,7 @@ class CartaAcordoForm(FormularioBase):
         elif instituicao == "FIOCRUZ":
             # Carregar projetos para FIOCRUZ
             filtros = {'instituicao_parceira': 'FIOCRUZ'}
-            projetos = custeio_manager.get_distinct_values('cod_projeto', filtros)
+            projetos = obter_valores_custeio('cod_projeto', filtros)
             
             # Garantir que temos pelo menos uma opção
             if not projetos:
@@ -774,7 +668,7 @@ class CartaAcordoForm(FormularioBase):
             instrumento_widget["values"] = projetos
             
             # Carregar subprojetos para FIOCRUZ
-            subprojetos = custeio_manager.get_distinct_values('subprojeto', filtros)
+            subprojetos = obter_valores_custeio('subprojeto', filtros)
             
             # Garantir que temos pelo menos uma opção
             if not subprojetos:
@@ -814,15 +708,12 @@ class CartaAcordoForm(FormularioBase):
             ta_widget["values"] = [""]
             return
         
-        # Criar instância do CusteioManager
-        custeio_manager = CusteioManager()
-        
         # Carregar TAs para o instrumento selecionado
         filtros = {
             'instituicao_parceira': instituicao,
             'cod_projeto': instrumento
         }
-        tas = custeio_manager.get_distinct_values('cod_ta', filtros)
+        tas = obter_valores_custeio('cod_ta', filtros)
         
         # Garantir que temos pelo menos uma opção
         if not tas:
@@ -851,16 +742,13 @@ class CartaAcordoForm(FormularioBase):
             resultado_widget["values"] = [""]
             return
         
-        # Criar instância do CusteioManager
-        custeio_manager = CusteioManager()
-        
         # Carregar Resultados para o TA selecionado
         filtros = {
             'instituicao_parceira': instituicao,
             'cod_projeto': instrumento,
             'cod_ta': ta
         }
-        resultados = custeio_manager.get_distinct_values('resultado', filtros)
+        resultados = obter_valores_custeio('resultado', filtros)
         
         # Garantir que temos pelo menos uma opção
         if not resultados:
@@ -870,80 +758,51 @@ class CartaAcordoForm(FormularioBase):
     
     def converter_valor_brl_para_float(self, valor_str):
         """Converte um valor em formato de moeda brasileira (R$ 1.234,56) para float (1234.56)"""
-        if not valor_str:
-            return 0.0
-            
-        # Se for um número, retorna diretamente
-        if isinstance(valor_str, (int, float)):
-            return float(valor_str)
-            
-        # Remove o símbolo de moeda e espaços
-        valor_str = str(valor_str).replace("R$", "").strip()
-        
-        # Remove pontos de milhar e substitui vírgula por ponto
-        valor_str = valor_str.replace(".", "").replace(",", ".")
-        
-        # Remove caracteres não numéricos, exceto ponto decimal
-        valor_str = re.sub(r'[^\d.]', '', valor_str)
-        
-        try:
-            return float(valor_str)
-        except ValueError:
-            return 0.0
-    
+        return converter_brl(valor_str)
+
     def cancelar(self):
         """Cancela a operação e fecha o formulário"""
         self.callback_cancelar()
         
+    def atualizar_versao_registro(self):
+        """Relê a versão do registro após alterações feitas pela própria tela (aditivos)"""
+        self.versao_registro = obter_versao_atual("carta_acordo", self.id_carta)
+    
     def carregar_aditivos(self):
         """Carrega os aditivos do contrato na tabela"""
         if not hasattr(self, 'tabela_aditivos') or not self.id_carta:
             return
             
-        self.tabela_aditivos.limpar()
-        
-        # Obter aditivos do contrato
-        aditivos = obter_aditivos_por_contrato(self.id_carta)
-        
-        # Obter o valor base do contrato (valor estimado)
-        valor_base = 0
-        cartas = listar_cartas_acordo()
-        for carta in cartas:
-            if carta[0] == self.id_carta:
-                valor_base = float(carta[17]) if carta[17] else 0
-                break
-        
-        # Valor acumulado para calcular o valor total atualizado
-        valor_acumulado = valor_base
+        # Histórico do contrato já ordenado, com o valor total acumulado calculado no banco
+        aditivos = historico_aditivos("carta_acordo", [self.id_carta])[self.id_carta]
         
+        linhas = []
         for aditivo in aditivos:
-            # Extrair dados do aditivo
-            id_aditivo = aditivo[0]
-            tipo_aditivo = aditivo[3]  # Ofício
-            descricao = aditivo[4]  # Pode conter data de entrada ou outras informações
-            valor_aditivo = float(aditivo[5]) if aditivo[5] else 0
-            nova_vigencia_final = aditivo[6]
-            data_registro = aditivo[7]  # Pode ser usado como data de protocolo
-            
-            # Atualizar valor acumulado
-            valor_acumulado += valor_aditivo
-            
-            # Criar um dicionário com os valores do aditivo
+            # tipo_aditivo guarda o ofício, descricao a data de entrada e data_registro a de protocolo
             valores = {
-                "id": id_aditivo,
-                "oficio": tipo_aditivo,
-                "data_entrada": descricao,
-                "data_protocolo": data_registro,
-                "valor_aditivo": valor_aditivo,
-                "nova_vigencia_final": nova_vigencia_final,
-                "valor_total_atualizado": valor_acumulado
+                "id": aditivo["id"],
+                "oficio": aditivo["tipo_aditivo"],
+                "data_entrada": aditivo["descricao"],
+                "data_protocolo": aditivo["data_registro"],
+                "valor_aditivo": aditivo["valor_aditivo"] or 0,
+                "nova_vigencia_final": aditivo["nova_vigencia_final"],
+                "valor_total_atualizado": aditivo["valor_total_atualizado"]
             }
             
             # Formatar valores monetários
-            valores["valor_aditivo"] = f"R$ {valores['valor_aditivo']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            valores["valor_total_atualizado"] = f"R$ {valores['valor_total_atualizado']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            valores["valor_aditivo"] = formatar_brl(valores['valor_aditivo'])
+            valores["valor_total_atualizado"] = formatar_brl(valores['valor_total_atualizado'])
             
-            self.tabela_aditivos.adicionar_linha(valores, str(id_aditivo))
+            linhas.append((aditivo["id"], valores))
+        
+        # Só as linhas que mudaram são redesenhadas
+        self.tabela_aditivos.sincronizar_linhas(linhas)
+    
+    def ao_alterar_aditivo(self, evento):
+        """Atualiza a tabela quando um aditivo desta carta é incluído, editado ou excluído"""
+        if evento.operacao == RECARREGAR or (evento.contexto.get("tipo_contrato") == "carta_acordo"
+                and str(evento.contexto.get("id_contrato")) == str(self.id_carta)):
+            self.carregar_aditivos()
     
     def adicionar_aditivo(self):
         """Abre o formulário para adicionar um novo aditivo"""
@@ -1033,7 +892,7 @@ class CartaAcordoForm(FormularioBase):
         
         # Mostrar o valor total atual (somente leitura)
         form_aditivo.adicionar_campo("valor_total_atual", "Valor Total Atual do Contrato", tipo="numero", 
-                                    padrao=f"R$ {valor_total_atual:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                                    padrao=formatar_brl(valor_total_atual))
         valor_total_atual_widget = form_aditivo.campos["valor_total_atual"]["widget"]
         valor_total_atual_widget.configure(state="readonly")
         
@@ -1072,15 +931,13 @@ class CartaAcordoForm(FormularioBase):
                 
                 # Adicionar o aditivo
                 adicionar_aditivo(**dados_aditivo)
+                self.atualizar_versao_registro()
                 
                 mostrar_mensagem("Sucesso", "Aditivo adicionado com sucesso!", tipo="sucesso")
                 
                 # Fechar o diálogo
                 dialog.destroy()
                 
-                # Recarregar os aditivos na tabela
-                self.carregar_aditivos()
-                
             except Exception as e:
                 mostrar_mensagem("Erro", f"Erro ao salvar aditivo: {str(e)}", tipo="erro")
         
@@ -1103,12 +960,7 @@ class CartaAcordoForm(FormularioBase):
             return
             
         # Buscar o aditivo selecionado
-        aditivos = listar_aditivos()
-        aditivo_selecionado = None
-        for aditivo in aditivos:
-            if str(aditivo[0]) == id_selecao:
-                aditivo_selecionado = aditivo
-                break
+        aditivo_selecionado = obter_aditivo(id_selecao)
                 
         if not aditivo_selecionado:
             mostrar_mensagem("Erro", "Aditivo não encontrado.", tipo="erro")
@@ -1186,7 +1038,7 @@ class CartaAcordoForm(FormularioBase):
         nova_vigencia_widget.bind("<KeyPress>", FormatadorCampos.validar_numerico)
         
         # Formatar valor do aditivo para exibição
-        valor_aditivo_formatado = f"R$ {float(valor_aditivo):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if valor_aditivo else "R$ 0,00"
+        valor_aditivo_formatado = formatar_brl(float(valor_aditivo)) if valor_aditivo else "R$ 0,00"
         
         form_aditivo.adicionar_campo("valor_aditivo", "Valor do Aditivo", tipo="numero", 
                                     padrao=valor_aditivo_formatado, required=True)
@@ -1204,7 +1056,7 @@ class CartaAcordoForm(FormularioBase):
         
         # Mostrar o valor total atual (somente leitura)
         form_aditivo.adicionar_campo("valor_total_atual", "Valor Total Atual do Contrato", tipo="numero", 
-                                    padrao=f"R$ {valor_total_atual:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                                    padrao=formatar_brl(valor_total_atual))
         valor_total_atual_widget = form_aditivo.campos["valor_total_atual"]["widget"]
         valor_total_atual_widget.configure(state="readonly")
         
@@ -1249,15 +1101,13 @@ class CartaAcordoForm(FormularioBase):
                 
                 # Atualizar o aditivo
                 editar_aditivo(id_aditivo, **dados_aditivo)
+                self.atualizar_versao_registro()
                 
                 mostrar_mensagem("Sucesso", "Aditivo atualizado com sucesso!", tipo="sucesso")
                 
                 # Fechar o diálogo
                 dialog.destroy()
                 
-                # Recarregar os aditivos na tabela
-                self.carregar_aditivos()
-                
             except Exception as e:
                 mostrar_mensagem("Erro", f"Erro ao atualizar aditivo: {str(e)}", tipo="erro")
         
@@ -1281,8 +1131,8 @@ class CartaAcordoForm(FormularioBase):
         if mostrar_mensagem("Confirmação", "Deseja realmente excluir este aditivo?", tipo="pergunta"):
             try:
                 excluir_aditivo(id_selecao)
+                self.atualizar_versao_registro()
                 mostrar_mensagem("Sucesso", "Aditivo excluído com sucesso!", tipo="sucesso")
-                self.carregar_aditivos()
             except Exception as e:
                 mostrar_mensagem("Erro", f"Erro ao excluir aditivo: {str(e)}", tipo="erro")
 
@@ -1316,11 +1166,9 @@ class CartaAcordoView:
         
         titulo = "Gestão de Cartas de Acordo"
         if codigo_demanda:
-            demandas = listar_demandas()
-            for d in demandas:
-                if d[0] == int(codigo_demanda):
-                    titulo += f" - Demanda {codigo_demanda} ({d[2]})"
-                    break
+            demanda = obter_demanda_cache(codigo_demanda)
+            if demanda:
+                titulo += f" - Demanda {codigo_demanda} ({demanda[2]})"
                     
         ttk.Label(frame_cabecalho, text=titulo, style="Titulo.TLabel").pack(side=tk.LEFT)
         criar_botao(frame_cabecalho, "Nova Carta", self.adicionar, "Primario", 15).pack(side=tk.RIGHT)
@@ -1369,47 +1217,74 @@ class CartaAcordoView:
         # Formulário (inicialmente oculto)
         self.frame_formulario = ttk.Frame(self.master)
         
-        # Carrega os dados
+        # Carrega os dados e passa a acompanhar as alterações das cartas
         self.carregar_dados()
+        assinar_enquanto_existir(self.frame, "carta_acordo", self.ao_alterar_carta)
         
     def carregar_dados(self, filtro=None):
         """Carrega os dados das cartas na tabela"""
         self.tabela.limpar()
+        self.filtro = filtro
         
         if self.codigo_demanda:
             cartas = obter_cartas_por_demanda(self.codigo_demanda)
         else:
             cartas = listar_cartas_acordo()
         
-        for carta in cartas:
+        # Formata a coluna de valores de uma vez
+        valores_formatados = formatar_coluna_brl(carta[17] for carta in cartas)
+        
+        for carta, valor_formatado in zip(cartas, valores_formatados):
             # Se tiver filtro, verifica se carta contém o texto do filtro em algum campo
-            if filtro:
-                texto_filtro = filtro.lower()
-                texto_carta = ' '.join(str(campo).lower() for campo in carta)
-                if texto_filtro not in texto_carta:
-                    continue
-                    
-            # Criar um dicionário com os valores da carta
-            # Garantir que estamos mapeando corretamente os valores para as colunas
-            valores = {
-                "id": carta[0],
-                "codigo_demanda": carta[1],
-                "instituicao": carta[2],
-                "titulo_projeto": carta[15],
-                "vigencia_inicial": carta[11],
-                "vigencia_final": carta[12],
-                "valor_estimado": carta[17]
-            }
-            
-            # Formatar valor monetário
-            if "valor_estimado" in valores:
-                try:
-                    valores["valor_estimado"] = f"R$ {float(valores['valor_estimado']):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                except ValueError:
-                    # Mantém o valor original se não for possível converter para float
-                    valores["valor_estimado"] = f"R$ {valores['valor_estimado']}"
+            if not self._atende_filtro(carta):
+                continue
                 
-            self.tabela.adicionar_linha(valores, str(carta[0]))
+            self.tabela.adicionar_linha(self._valores_linha(carta, valor_formatado), str(carta[0]))
+    
+    @staticmethod
+    def _valores_linha(carta, valor_formatado):
+        """Valores exibidos na tabela para uma carta"""
+        # Garantir que estamos mapeando corretamente os valores para as colunas
+        return {
+            "id": carta[0],
+            "codigo_demanda": carta[1],
+            "instituicao": carta[2],
+            "titulo_projeto": carta[15],
+            "vigencia_inicial": carta[11],
+            "vigencia_final": carta[12],
+            "valor_estimado": valor_formatado
+        }
+    
+    def _atende_filtro(self, carta):
+        """Indica se a carta pertence à listagem atual (demanda e texto de pesquisa)"""
+        if self.codigo_demanda and str(carta[1]) != str(self.codigo_demanda):
+            return False
+        if self.filtro:
+            texto_carta = ' '.join(str(campo).lower() for campo in carta)
+            return self.filtro.lower() in texto_carta
+        return True
+    
+    def ao_alterar_carta(self, alteracao):
+        """Atualiza apenas a linha da carta alterada (alteração local ou de outra instância)"""
+        if alteracao.operacao == RECARREGAR:
+            self.carregar_dados(self.filtro)
+            return
+        
+        id_linha = str(alteracao.id_registro)
+        existe = self.tabela.existe_linha(id_linha)
+        carta = None if alteracao.operacao == EXCLUIR else obter_carta_acordo(alteracao.id_registro)
+        
+        if carta is None or not self._atende_filtro(carta):
+            if existe:
+                self.tabela.remover_linha(id_linha)
+            return
+        
+        valores = self._valores_linha(carta, formatar_brl(carta[17]))
+        if existe:
+            self.tabela.atualizar_linha(id_linha, valores)
+        else:
+            # A listagem segue a ordem de cadastro: novas cartas vão para o fim
+            self.tabela.adicionar_linha(valores, id_linha)
     
     def pesquisar(self):
         """Filtra as cartas conforme o texto de pesquisa"""
@@ -1485,7 +1360,11 @@ class CartaAcordoView:
                     # para garantir que todos os widgets estejam completamente criados
                     def desabilitar_campos():
                         # Primeiro, desabilita todos os campos normais
-                        for form in [self.formulario.form_demanda, self.formulario.form_custeio, self.formulario.form_contrato]:
+                        for nome_form in ("form_demanda", "form_custeio", "form_contrato"):
+                            # Abas ainda não construídas são desabilitadas quando forem exibidas
+                            form = getattr(self.formulario, nome_form, None)
+                            if form is None:
+                                continue
                             for campo_nome, campo_info in form.campos.items():
                                 try:
                                     widget = campo_info["widget"]
@@ -1521,6 +1400,9 @@ class CartaAcordoView:
                     
                     # Executa a função após um pequeno delay
                     self.formulario.after(100, desabilitar_campos)
+                    
+                    # Abas construídas depois (sob demanda) também ficam somente leitura
+                    self.formulario.abas.ao_construir(lambda aba: self.formulario.after(100, desabilitar_campos))
                 break
     
     def excluir(self):
@@ -1530,15 +1412,16 @@ class CartaAcordoView:
             mostrar_mensagem("Atenção", "Selecione uma carta para excluir.", tipo="aviso")
             return
             
-        if mostrar_mensagem("Confirmação", "Deseja realmente excluir esta carta de acordo?", tipo="pergunta"):
+        if mostrar_mensagem("Confirmação", "Deseja realmente excluir esta carta de acordo?\nOs aditivos do contrato também serão excluídos.", tipo="pergunta"):
             excluir_carta_acordo(id_selecao)
             mostrar_mensagem("Sucesso", "Carta de acordo excluída com sucesso!", tipo="sucesso")
-            self.carregar_dados()
     
     def salvar_formulario(self):
-        """Callback quando o formulário é salvo"""
+        """Callback quando o formulário é salvo
+        
+        A linha da carta salva já foi atualizada por ao_alterar_carta.
+        """
         self.cancelar_formulario()
-        self.carregar_dados()
     
     def cancelar_formulario(self):
         """Fecha o formulário e volta para a listagem"""
@@ -8,6 +8,7 @@ from typing import Dict, List, Any, Optional, Callable
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from controllers.custeio_controller import CusteioController
+from utils.custeio_utils import HIERARCHY
 from utils.ui_utils import Estilos, Cores, criar_botao
 
 
@@ -17,6 +18,9 @@ class CusteioView:
     Provides a UI for hierarchical selection and filtering of custeio data.
     """
     
+    # Rows shown per page of results
+    PAGE_SIZE = 100
+    
     def __init__(self, root=None):
         """
         Initialize the CusteioView.
@@ -26,6 +30,13 @@ class CusteioView:
         """
         self.controller = CusteioController()
         
+        # Option label shown in each combobox -> value in the database
+        self.facet_values = {field: {} for field in HIERARCHY}
+        # Filters of the results shown and the current page
+        self.current_filters = None
+        self.page = 0
+        self.total_rows = 0
+        
         # Create a new window if root is not provided
         if root is None:
             self.root = tk.Tk()
@@ -73,6 +84,15 @@ class CusteioView:
         buttons_frame = ttk.Frame(self.main_frame)
         buttons_frame.pack(fill=tk.X, pady=10)
         
+        # Pagination
+        self.previous_button = ttk.Button(buttons_frame, text="◀ Anterior", command=self.previous_page,
+                                          state=tk.DISABLED)
+        self.previous_button.pack(side=tk.LEFT, padx=5)
+        self.page_label = ttk.Label(buttons_frame, text="")
+        self.page_label.pack(side=tk.LEFT, padx=5)
+        self.next_button = ttk.Button(buttons_frame, text="Próxima ▶", command=self.next_page, state=tk.DISABLED)
+        self.next_button.pack(side=tk.LEFT, padx=5)
+        
         # Apply filter button
         apply_button = ttk.Button(buttons_frame, text="Aplicar Filtros", command=self.apply_filters)
         apply_button.pack(side=tk.RIGHT, padx=5)
@@ -125,6 +145,13 @@ class CusteioView:
         self.subproject_var = tk.StringVar()
         self.subproject_combo = ttk.Combobox(grid_frame, textvariable=self.subproject_var, state="readonly", width=30)
         self.subproject_combo.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        # Variable and combobox of each level, in hierarchy order
+        self.levels = list(zip(HIERARCHY,
+                               (self.institution_var, self.project_var, self.ta_var, self.result_var,
+                                self.subproject_var),
+                               (self.institution_combo, self.project_combo, self.ta_combo, self.result_combo,
+                                self.subproject_combo)))
     
     def create_results_treeview(self, parent):
         """
@@ -168,110 +195,78 @@ class CusteioView:
         self.tree.pack(fill=tk.BOTH, expand=True)
     
     def load_initial_data(self):
-        """Load the initial data for the comboboxes."""
-        # Load institutions
-        institutions = self.controller.get_institutions()
-        self.institution_combo["values"] = [""] + institutions
-        
-        # Load projects
-        projects = self.controller.get_projects()
-        self.project_combo["values"] = [""] + projects
-        
-        # Load TAs
-        tas = self.controller.get_tas()
-        self.ta_combo["values"] = [""] + tas
-        
-        # Load results
-        results = self.controller.get_results()
-        self.result_combo["values"] = [""] + results
-        
-        # Load subprojects
-        subprojects = self.controller.get_subprojects()
-        self.subproject_combo["values"] = [""] + subprojects
+        """Load the options of all comboboxes, keeping the current selections when still available."""
+        self.update_facets()
+    
+    def get_selection(self) -> Dict[str, str]:
+        """Get the selected value of each level ('' when nothing is selected)."""
+        return {field: self.facet_values[field].get(var.get(), "") for field, var, _ in self.levels}
+    
+    def update_facets(self):
+        """Refresh the options and row counts of the five levels with a single facet call."""
+        for _ in range(2):
+            facets = self.controller.get_facets(self.get_selection())
+            stale = False
+            for field, var, combo in self.levels:
+                labels = {f"{value} ({count})": value for value, count in facets[field]}
+                selected = self.facet_values[field].get(var.get(), "")
+                self.facet_values[field] = labels
+                combo["values"] = [""] + list(labels)
+                if not selected:
+                    continue
+                label = next((label for label, value in labels.items() if value == selected), None)
+                if label is None or stale:
+                    # The selection no longer exists (data changed): clear it and the levels below
+                    var.set("")
+                    stale = True
+                else:
+                    var.set(label)
+            if not stale:
+                break
+    
+    def _on_level_selected(self, field):
+        """Clear the levels below the one selected and refresh all options."""
+        index = HIERARCHY.index(field)
+        for _, var, _ in self.levels[index + 1:]:
+            var.set("")
+        self.update_facets()
     
     def on_institution_selected(self, event=None):
         """Handle institution selection event."""
-        institution = self.institution_var.get()
-        
-        # Update projects
-        projects = self.controller.get_projects(institution if institution else None)
-        self.project_combo["values"] = [""] + projects
-        self.project_var.set("")
-        
-        # Update TAs
-        self.on_project_selected()
+        self._on_level_selected("instituicao_parceira")
     
     def on_project_selected(self, event=None):
         """Handle project selection event."""
-        institution = self.institution_var.get()
-        project = self.project_var.get()
-        
-        # Update TAs
-        tas = self.controller.get_tas(
-            institution if institution else None,
-            project if project else None
-        )
-        self.ta_combo["values"] = [""] + tas
-        self.ta_var.set("")
-        
-        # Update results
-        self.on_ta_selected()
+        self._on_level_selected("cod_projeto")
     
     def on_ta_selected(self, event=None):
         """Handle TA selection event."""
-        institution = self.institution_var.get()
-        project = self.project_var.get()
-        ta = self.ta_var.get()
-        
-        # Update results
-        results = self.controller.get_results(
-            institution if institution else None,
-            project if project else None,
-            ta if ta else None
-        )
-        self.result_combo["values"] = [""] + results
-        self.result_var.set("")
-        
-        # Update subprojects
-        self.on_result_selected()
+        self._on_level_selected("cod_ta")
     
     def on_result_selected(self, event=None):
         """Handle result selection event."""
-        institution = self.institution_var.get()
-        project = self.project_var.get()
-        ta = self.ta_var.get()
-        result = self.result_var.get()
-        
-        # Update subprojects
-        subprojects = self.controller.get_subprojects(
-            institution if institution else None,
-            project if project else None,
-            ta if ta else None,
-            result if result else None
-        )
-        self.subproject_combo["values"] = [""] + subprojects
-        self.subproject_var.set("")
+        self._on_level_selected("resultado")
     
     def apply_filters(self):
-        """Apply the selected filters and update the results."""
-        # Get the selected values
-        filters = {
-            "instituicao_parceira": self.institution_var.get(),
-            "cod_projeto": self.project_var.get(),
-            "cod_ta": self.ta_var.get(),
-            "resultado": self.result_var.get(),
-            "subprojeto": self.subproject_var.get()
-        }
+        """Apply the selected filters and show the first page of results."""
+        self.current_filters = self.get_selection()
+        self.page = 0
+        self.total_rows = self.controller.count_custeio(self.current_filters)
+        self.show_page()
         
-        # Filter the data
-        filtered_data = self.controller.filter_custeio(filters)
-        
-        # Clear the treeview
+        # Show a message if no records were found
+        if not self.total_rows:
+            messagebox.showinfo("Informação", "Nenhum registro encontrado com os filtros selecionados.")
+    
+    def show_page(self):
+        """Fill the treeview with the current page of results."""
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        # Populate the treeview with the filtered data
-        for record in filtered_data:
+        records = []
+        if self.current_filters is not None and self.total_rows:
+            records = self.controller.filter_custeio_page(self.current_filters, self.page, self.PAGE_SIZE)
+        for record in records:
             self.tree.insert("", tk.END, values=(
                 record["id"],
                 record["instituicao_parceira"],
@@ -280,25 +275,44 @@ class CusteioView:
                 record["resultado"],
                 record["subprojeto"]
             ))
-        
-        # Show a message if no records were found
-        if not filtered_data:
-            messagebox.showinfo("Informação", "Nenhum registro encontrado com os filtros selecionados.")
+        self.update_pagination()
+    
+    def update_pagination(self):
+        """Update the page label and the state of the navigation buttons."""
+        if self.current_filters is None:
+            self.page_label.config(text="")
+            pages = 0
+        else:
+            pages = max(1, -(-self.total_rows // self.PAGE_SIZE))
+            self.page_label.config(text=f"Página {self.page + 1} de {pages} ({self.total_rows} registros)")
+        self.previous_button.config(state=tk.NORMAL if self.page > 0 else tk.DISABLED)
+        self.next_button.config(state=tk.NORMAL if self.page + 1 < pages else tk.DISABLED)
+    
+    def previous_page(self):
+        """Show the previous page of results."""
+        if self.page > 0:
+            self.page -= 1
+            self.show_page()
+    
+    def next_page(self):
+        """Show the next page of results."""
+        if (self.page + 1) * self.PAGE_SIZE < self.total_rows:
+            self.page += 1
+            self.show_page()
     
     def clear_filters(self):
         """Clear all filters."""
-        self.institution_var.set("")
-        self.project_var.set("")
-        self.ta_var.set("")
-        self.result_var.set("")
-        self.subproject_var.set("")
+        for _, var, _ in self.levels:
+            var.set("")
         
         # Reset combobox values
         self.load_initial_data()
         
         # Clear the treeview
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.current_filters = None
+        self.total_rows = 0
+        self.page = 0
+        self.show_page()
     
     def run(self):
         """Run the application."""
@@ -1,18 +1,20 @@
 # views/dashboard_view.py
 import tkinter as tk
 from tkinter import ttk
+from utils.validator import formatar_brl
 from utils.ui_utils import Estilos, TabelaBase, Menu, mostrar_mensagem, criar_botao
-from controllers.carta_acordo_controller import listar_cartas_acordo
-from controllers.eventos_controller import listar_eventos
-from controllers.produtos_servicos_controller import listar_produtos_servicos
-from views.carta_acordo_view import CartaAcordoView
-from views.eventos_view import EventosView
-from views.produtos_servicos_view import ProdutosServicosView
-from views.custeio_view import CusteioView
+from utils.cache_telas import CacheTelas
+from controllers.dashboard_controller import obter_resumo_dashboard
+
+# Os módulos das telas (formulários extensos) são importados apenas na
+# primeira navegação, para não atrasar a abertura do dashboard
 
 class DashboardView:
     """Dashboard principal do sistema"""
     
+    # Quantidade máxima de telas mantidas em memória pelo cache
+    LIMITE_TELAS = 4
+    
     def __init__(self, master):
         self.master = master
         self.master.title("Dashboard - SISPROJ - PESSOA JURÍDICA")
@@ -32,6 +34,12 @@ class DashboardView:
         self.frame_conteudo = ttk.Frame(self.frame, style='CardBorda.TFrame')
         self.frame_conteudo.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        # Cache das telas já construídas (ocultadas em vez de destruídas)
+        self.cache_telas = CacheTelas(self.frame_conteudo, self.LIMITE_TELAS)
+        
+        # Atalho oculto para a janela de diagnóstico de desempenho
+        self.master.bind_all("<Control-Shift-KeyPress-D>", self.mostrar_diagnostico)
+        
         # Mostrar dashboard inicial
         self.mostrar_dashboard()
     
@@ -59,32 +67,45 @@ class DashboardView:
         self.menu.criar_botao_menu(frame_sair, 'Sair', self.sair, '🚪', 'Secundario')
     
     def limpar_conteudo(self):
-        """Limpa o frame de conteúdo"""
-        for widget in self.frame_conteudo.winfo_children():
-            widget.destroy()
+        """Oculta a tela exibida no frame de conteúdo (ela permanece no cache)"""
+        self.cache_telas.ocultar()
     
     def mostrar_dashboard(self):
         """Exibe o dashboard com resumo e estatísticas"""
-        self.limpar_conteudo()
+        self.cache_telas.mostrar(
+            "dashboard", self.criar_dashboard,
+            tabelas=("carta_acordo", "eventos", "produtos_servicos"),
+            atualizar=self.atualizar_dashboard
+        )
+    
+    def atualizar_dashboard(self, master):
+        """Recarrega os dados do dashboard já construído"""
+        self.carregar_dados_dashboard()
+    
+    def criar_dashboard(self, master):
+        """Cria o conteúdo do dashboard dentro do frame informado
         
+        Os widgets são criados vazios e os dados são carregados depois da
+        primeira pintura da janela (after_idle).
+        """
         # Frame de título
-        frame_titulo = ttk.Frame(self.frame_conteudo)
+        frame_titulo = ttk.Frame(master)
         frame_titulo.pack(fill=tk.X, pady=(0, 20))
         
         ttk.Label(frame_titulo, text="Dashboard", style="Titulo.TLabel").pack(anchor=tk.W)
         ttk.Separator(frame_titulo).pack(fill=tk.X, pady=(5, 0))
         
         # Frame com cards de resumo
-        frame_resumo = ttk.Frame(self.frame_conteudo)
+        frame_resumo = ttk.Frame(master)
         frame_resumo.pack(fill=tk.X, pady=(0, 20))
         
-        # Cria cards com estatísticas
-        self.criar_card_estatistica(frame_resumo, "Cartas de Acordo", len(listar_cartas_acordo()), "#388E3C")
-        self.criar_card_estatistica(frame_resumo, "Eventos", len(listar_eventos()), "#F57C00")
-        self.criar_card_estatistica(frame_resumo, "Produtos/Serviços", len(listar_produtos_servicos()), "#D32F2F")
+        # Cria cards com estatísticas (valores preenchidos após a primeira pintura)
+        self.card_cartas = self.criar_card_estatistica(frame_resumo, "Cartas de Acordo", "…", "#388E3C")
+        self.card_eventos = self.criar_card_estatistica(frame_resumo, "Eventos", "…", "#F57C00")
+        self.card_produtos = self.criar_card_estatistica(frame_resumo, "Produtos/Serviços", "…", "#D32F2F")
         
         # Frame com tabelas de atividade recente
-        frame_atividade = ttk.Frame(self.frame_conteudo)
+        frame_atividade = ttk.Frame(master)
         frame_atividade.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
         # Dividir em duas colunas
@@ -95,13 +116,69 @@ class DashboardView:
         frame_col2.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
         
         # Eventos recentes
-        self.criar_tabela_eventos_recentes(frame_col1)
+        self.tabela_eventos_recentes = self.criar_tabela_eventos_recentes(frame_col1)
         
         # Contratos recentes
-        self.criar_tabela_contratos_recentes(frame_col2)
+        self.tabela_contratos_recentes = self.criar_tabela_contratos_recentes(frame_col2)
+        
+        # Carrega os dados somente depois que a janela for desenhada
+        master.after_idle(self.carregar_dados_dashboard)
+        
+        return master
+    
+    def carregar_dados_dashboard(self):
+        """Preenche os cards e as tabelas de atividade recente"""
+        try:
+            resumo = obter_resumo_dashboard()
+        except Exception as e:
+            print(f"Erro ao carregar dados do dashboard: {e}")
+            return
+        
+        try:
+            self.card_cartas.configure(text=str(resumo["total_cartas"]))
+            self.card_eventos.configure(text=str(resumo["total_eventos"]))
+            self.card_produtos.configure(text=str(resumo["total_produtos"]))
+            
+            self.tabela_eventos_recentes.limpar()
+            for evento in resumo["eventos_recentes"]:
+                try:
+                    valor_estimado = float(evento[3]) if evento[3] else 0.0
+                    valor_formatado = formatar_brl(valor_estimado)
+                except (ValueError, TypeError):
+                    valor_formatado = "R$ 0,00"
+                
+                valores = {
+                    "id": evento[0],
+                    "titulo_evento": evento[1],
+                    "fornecedor": evento[2],
+                    "valor_estimado": valor_formatado
+                }
+                self.tabela_eventos_recentes.adicionar_linha(valores)
+            
+            self.tabela_contratos_recentes.limpar()
+            for carta in resumo["cartas_recentes"]:
+                try:
+                    total_formatado = formatar_brl(float(carta[3]))
+                except (ValueError, TypeError):
+                    total_formatado = "R$ 0,00"
+                
+                valores = {
+                    "id": carta[0],
+                    "instituicao": carta[1],
+                    "titulo_projeto": carta[2],
+                    "total_contrato": total_formatado
+                }
+                self.tabela_contratos_recentes.adicionar_linha(valores)
+        except tk.TclError:
+            # O dashboard foi destruído antes do carregamento terminar
+            pass
     
     def criar_card_estatistica(self, master, titulo, valor, cor):
-        """Cria um card com estatística"""
+        """Cria um card com estatística
+        
+        Returns:
+            ttk.Label: rótulo do valor, para atualização posterior
+        """
         frame = ttk.Frame(master, style='CardBorda.TFrame')
         frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
         
@@ -111,10 +188,12 @@ class DashboardView:
         
         # Conteúdo do card
         ttk.Label(frame, text=titulo, font=('Segoe UI', 12)).pack(pady=(15, 5))
-        ttk.Label(frame, text=str(valor), font=('Segoe UI', 24, 'bold')).pack(pady=(5, 15))
+        rotulo_valor = ttk.Label(frame, text=str(valor), font=('Segoe UI', 24, 'bold'))
+        rotulo_valor.pack(pady=(5, 15))
+        return rotulo_valor
     
     def criar_tabela_eventos_recentes(self, master):
-        """Cria tabela com eventos recentes"""
+        """Cria tabela (vazia) para os eventos recentes"""
         frame = ttk.Frame(master)
         frame.pack(fill=tk.BOTH, expand=True)
         
@@ -132,29 +211,12 @@ class DashboardView:
         tabela = TabelaBase(frame, colunas, titulos)
         tabela.pack(fill=tk.BOTH, expand=True)
         
-        # Carregar dados (limitado aos 5 mais recentes)
-        eventos = listar_eventos()
-        for i, evento in enumerate(eventos[:5] if len(eventos) >= 5 else eventos):
-            # Nova estrutura após remoção do objetivo: titulo_evento(10), fornecedor(11), valor_estimado(13)
-            try:
-                valor_estimado = float(evento[13]) if evento[13] else 0.0  # Atualizado de [14] para [13]
-                valor_formatado = f"R$ {valor_estimado:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            except (ValueError, TypeError, IndexError):
-                valor_formatado = "R$ 0,00"
-                
-            valores = {
-                "id": evento[0],
-                "titulo_evento": evento[10],  
-                "fornecedor": evento[11],     
-                "valor_estimado": valor_formatado
-            }
-            tabela.adicionar_linha(valores)
-            
         # Botão para ver todos
         criar_botao(frame, "Ver Todos", self.mostrar_eventos, "Secundario").pack(anchor=tk.E, pady=(5, 0))
+        return tabela
     
     def criar_tabela_contratos_recentes(self, master):
-        """Cria tabela com contratos recentes"""
+        """Cria tabela (vazia) para os contratos recentes"""
         frame = ttk.Frame(master)
         frame.pack(fill=tk.BOTH, expand=True)
         
@@ -172,34 +234,39 @@ class DashboardView:
         tabela = TabelaBase(frame, colunas, titulos)
         tabela.pack(fill=tk.BOTH, expand=True)
         
-        # Carregar dados (limitado aos 5 mais recentes)
-        cartas = listar_cartas_acordo()
-        for i, carta in enumerate(cartas[:5] if len(cartas) >= 5 else cartas):
-            valores = {
-                "id": carta[0],
-                "instituicao": carta[2],
-                "titulo_projeto": carta[15],
-                "total_contrato": f"R$ {float(carta[18]):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            }
-            tabela.adicionar_linha(valores)
-        
         # Botão para ver todas
         criar_botao(frame, "Ver Todos", self.mostrar_cartas_acordo, "Secundario").pack(anchor=tk.E, pady=(5, 0))
+        return tabela
     
     def mostrar_cartas_acordo(self):
         """Abre a tela de gestão de cartas de acordo"""
-        self.limpar_conteudo()
-        CartaAcordoView(self.frame_conteudo)
+        from views.carta_acordo_view import CartaAcordoView
+        self.cache_telas.mostrar(
+            "cartas_acordo", CartaAcordoView,
+            # Sem tabelas dependentes: as linhas são mantidas em dia pelo barramento,
+            # inclusive com as alterações de outras instâncias (utils.sincronizacao)
+            atualizar=lambda tela: tela.pesquisar()
+        )
     
     def mostrar_eventos(self):
         """Abre a tela de gestão de eventos"""
-        self.limpar_conteudo()
-        EventosView(self.frame_conteudo)
+        from views.eventos_view import EventosView
+        self.cache_telas.mostrar(
+            "eventos", EventosView,
+            # Sem tabelas dependentes: as linhas são mantidas em dia pelo barramento,
+            # inclusive com as alterações de outras instâncias (utils.sincronizacao)
+            atualizar=lambda tela: tela.pesquisar()
+        )
     
     def mostrar_produtos_servicos(self):
         """Abre a tela de gestão de produtos e serviços"""
-        self.limpar_conteudo()
-        ProdutosServicosView(self.frame_conteudo)
+        from views.produtos_servicos_view import ProdutosServicosView
+        self.cache_telas.mostrar(
+            "produtos_servicos", ProdutosServicosView,
+            # Sem tabelas dependentes: as linhas são mantidas em dia pelo barramento,
+            # inclusive com as alterações de outras instâncias (utils.sincronizacao)
+            atualizar=lambda tela: tela.pesquisar()
+        )
     
     def mostrar_aditivos(self):
         """Abre a tela de gestão de aditivos"""
@@ -209,14 +276,24 @@ class DashboardView:
     
     def mostrar_custeio(self):
         """Abre a tela de gestão de custeio"""
-        self.limpar_conteudo()
-        CusteioView(self.frame_conteudo)
+        from views.custeio_view import CusteioView
+        self.cache_telas.mostrar(
+            "custeio", CusteioView,
+            tabelas=("custeio",),
+            atualizar=lambda tela: tela.load_initial_data()
+        )
     
     def mostrar_relatorios(self):
         """Abre a tela de relatórios"""
-        self.limpar_conteudo()
-        mostrar_mensagem("Em desenvolvimento", "Esta funcionalidade será implementada em breve.", tipo="info")
-        self.mostrar_dashboard()
+        from views.relatorios_view import RelatoriosView
+        # Sem atualização automática: a tela mostra um instantâneo com a idade
+        # dos dados, renovado pelo botão "Atualizar dados"
+        self.cache_telas.mostrar("relatorios", RelatoriosView)
+    
+    def mostrar_diagnostico(self, event=None):
+        """Abre a janela de diagnóstico de desempenho (perfil e consultas lentas)"""
+        from views.diagnostico_view import DiagnosticoView
+        DiagnosticoView(self.master)
     
     def sair(self):
         """Fecha a aplicação"""
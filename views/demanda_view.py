@@ -1,8 +1,9 @@
 # views/demanda_view.py
 import tkinter as tk
 from tkinter import ttk
-from controllers.demanda_controller import adicionar_demanda, listar_demandas, editar_demanda, excluir_demanda
-from utils.ui_utils import FormularioBase, criar_botao, TabelaBase, mostrar_mensagem, Estilos
+from controllers.demanda_controller import (adicionar_demanda, listar_demandas, editar_demanda, excluir_demanda,
+                                           obter_demanda, buscar_demandas)
+from utils.ui_utils import FormularioBase, criar_botao, TabelaBase, mostrar_mensagem, Estilos, ComboboxBusca
 
 class DemandaForm(FormularioBase):
     """Formulário para cadastro e edição de demandas"""
@@ -81,9 +82,29 @@ class DemandaForm(FormularioBase):
         self.callback_cancelar()
 
 
+class SeletorDemanda(ComboboxBusca):
+    """Campo de busca de demandas por código, NUP/SEI, ofício ou solicitante"""
+    
+    def __init__(self, master, **kwargs):
+        super().__init__(master, buscar_demandas, self.formatar_demanda, **kwargs)
+    
+    @staticmethod
+    def formatar_demanda(demanda):
+        """Texto exibido na lista de sugestões"""
+        return f"{demanda[0]} - {demanda[2] or ''} - {demanda[4] or ''} - {demanda[5] or ''}"
+    
+    def obter_codigo(self):
+        """Código da demanda escolhida nas sugestões ou None"""
+        demanda = self.obter_registro()
+        return demanda[0] if demanda else None
+
+
 class DemandaView:
     """Tela principal de listagem e gestão de demandas"""
     
+    # Quantidade máxima de demandas exibidas no resultado de uma pesquisa
+    LIMITE_PESQUISA = 200
+    
     def __init__(self, master):
         self.master = master
         
@@ -110,9 +131,10 @@ class DemandaView:
         frame_pesquisa.pack(fill=tk.X, pady=(0, 10))
         
         ttk.Label(frame_pesquisa, text="Pesquisar:").pack(side=tk.LEFT, padx=(0, 5))
-        self.pesquisa_entry = ttk.Entry(frame_pesquisa, width=40)
+        self.pesquisa_entry = SeletorDemanda(frame_pesquisa, width=40)
         self.pesquisa_entry.pack(side=tk.LEFT, padx=(0, 5))
         self.pesquisa_entry.bind("<Return>", lambda e: self.pesquisar())
+        self.pesquisa_entry.bind("<<ComboboxSelected>>", lambda e: self.pesquisar(), add="+")
         
         criar_botao(frame_pesquisa, "Buscar", self.pesquisar, "Primario", 12).pack(side=tk.LEFT)
         criar_botao(frame_pesquisa, "Limpar", self.limpar_pesquisa, "Primario", 12).pack(side=tk.LEFT, padx=(5, 0))
@@ -145,22 +167,30 @@ class DemandaView:
         # Carrega os dados
         self.carregar_dados()
         
-    def carregar_dados(self, filtro=None):
-        """Carrega os dados das demandas na tabela"""
+    def carregar_dados(self, filtro=None, demandas=None):
+        """Carrega os dados das demandas na tabela
+        
+        Args:
+            filtro: início do código, NUP/SEI, ofício ou solicitante (busca indexada)
+            demandas: demandas a exibir, quando já conhecidas
+        """
         self.tabela.limpar()
         
-        for demanda in listar_demandas():
-            # Se tiver filtro, verifica se demanda contém o texto do filtro em algum campo
-            if filtro:
-                texto_filtro = filtro.lower()
-                texto_demanda = ' '.join(str(campo).lower() for campo in demanda)
-                if texto_filtro not in texto_demanda:
-                    continue
-                    
+        if demandas is None:
+            demandas = buscar_demandas(filtro, self.LIMITE_PESQUISA) if filtro else listar_demandas()
+        
+        for demanda in demandas:
             self.tabela.adicionar_linha(dict(zip(self.tabela.colunas, demanda)), str(demanda[0]))
     
     def pesquisar(self):
         """Filtra as demandas conforme o texto de pesquisa"""
+        codigo = self.pesquisa_entry.obter_codigo()
+        if codigo is not None:
+            # Demanda escolhida na lista de sugestões
+            demanda = obter_demanda(codigo)
+            self.carregar_dados(demandas=[demanda] if demanda else [])
+            return
+        
         texto = self.pesquisa_entry.get().strip()
         if texto:
             self.carregar_dados(texto)
@@ -169,7 +199,7 @@ class DemandaView:
     
     def limpar_pesquisa(self):
         """Limpa o campo de pesquisa e recarrega todos os dados"""
-        self.pesquisa_entry.delete(0, tk.END)
+        self.pesquisa_entry.limpar()
         self.carregar_dados()
     
     def adicionar(self):
@@ -194,21 +224,20 @@ class DemandaView:
             return
             
         # Busca a demanda selecionada
-        for demanda in listar_demandas():
-            if str(demanda[0]) == id_selecao:
-                # Oculta o frame principal
-                self.frame.pack_forget()
-                
-                # Cria e exibe o formulário de edição
-                self.formulario = DemandaForm(
-                    self.frame_formulario, 
-                    callback_salvar=self.salvar_formulario, 
-                    callback_cancelar=self.cancelar_formulario,
-                    demanda=demanda
-                )
-                self.formulario.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-                self.frame_formulario.pack(fill=tk.BOTH, expand=True)
-                break
+        demanda = obter_demanda(id_selecao)
+        if demanda:
+            # Oculta o frame principal
+            self.frame.pack_forget()
+            
+            # Cria e exibe o formulário de edição
+            self.formulario = DemandaForm(
+                self.frame_formulario, 
+                callback_salvar=self.salvar_formulario, 
+                callback_cancelar=self.cancelar_formulario,
+                demanda=demanda
+            )
+            self.formulario.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+            self.frame_formulario.pack(fill=tk.BOTH, expand=True)
     
     def excluir(self):
         """Exclui a demanda selecionada"""
@@ -218,7 +247,11 @@ class DemandaView:
             return
             
         if mostrar_mensagem("Confirmação", "Deseja realmente excluir esta demanda?", tipo="pergunta"):
-            excluir_demanda(id_selecao)
+            try:
+                excluir_demanda(id_selecao)
+            except ValueError as ve:
+                mostrar_mensagem("Erro", str(ve), tipo="erro")
+                return
             mostrar_mensagem("Sucesso", "Demanda excluída com sucesso!", tipo="sucesso")
             self.carregar_dados()
     
@@ -0,0 +1,142 @@
+# views/diagnostico_view.py
+import tkinter as tk
+from tkinter import ttk, filedialog
+from utils.ui_utils import Estilos, TabelaBase, criar_botao, mostrar_mensagem
+from utils import perfilador
+from models.fila_escrita import fila_escrita_ativa
+
+
+class DiagnosticoView(tk.Toplevel):
+    """Janela de diagnóstico de desempenho (atalho oculto Ctrl+Shift+D no dashboard)
+
+    Mostra as chamadas de controllers/models e as instruções SQL mais custosas,
+    com histograma de tempos, e o log de consultas lentas com o plano de execução.
+    """
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Diagnóstico de Desempenho")
+        self.geometry("1100x650")
+        Estilos.configurar()
+
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        # Barra de ações
+        frame_acoes = ttk.Frame(frame)
+        frame_acoes.pack(fill=tk.X, pady=(0, 10))
+        self.label_estado = ttk.Label(frame_acoes)
+        self.label_estado.pack(side=tk.LEFT)
+        criar_botao(frame_acoes, "Exportar JSON", self.exportar, "Secundario", 15).pack(side=tk.RIGHT, padx=5)
+        criar_botao(frame_acoes, "Limpar", self.limpar, "Secundario", 12).pack(side=tk.RIGHT, padx=5)
+        criar_botao(frame_acoes, "Atualizar", self.atualizar, "Primario", 12).pack(side=tk.RIGHT, padx=5)
+        self.botao_ativar = criar_botao(frame_acoes, "", self.alternar_perfil, "Primario", 18)
+        self.botao_ativar.pack(side=tk.RIGHT, padx=5)
+
+        self.notebook = ttk.Notebook(frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+
+        colunas = ["nome", "chamadas", "total_ms", "media_ms", "maximo_ms", "sql_ms", "python_ms",
+                   "linhas", "histograma"]
+        titulos = {"nome": "Nome", "chamadas": "Qtd", "total_ms": "Total (ms)", "media_ms": "Média (ms)",
+                   "maximo_ms": "Máx. (ms)", "sql_ms": "SQL (ms)", "python_ms": "Python (ms)",
+                   "linhas": "Linhas", "histograma": "Histograma"}
+
+        aba_chamadas = ttk.Frame(self.notebook)
+        self.notebook.add(aba_chamadas, text="Chamadas")
+        self.tabela_chamadas = TabelaBase(aba_chamadas, colunas, titulos)
+        self.tabela_chamadas.pack(fill=tk.BOTH, expand=True)
+        self.tabela_chamadas.tree.column("nome", width=360)
+        self.tabela_chamadas.tree.column("histograma", width=260)
+
+        aba_sql = ttk.Frame(self.notebook)
+        self.notebook.add(aba_sql, text="Instruções SQL")
+        self.tabela_sql = TabelaBase(aba_sql, ["nome", "chamadas", "total_ms", "media_ms", "maximo_ms",
+                                              "linhas", "histograma"], titulos)
+        self.tabela_sql.pack(fill=tk.BOTH, expand=True)
+        self.tabela_sql.tree.column("nome", width=480)
+        self.tabela_sql.tree.column("histograma", width=260)
+
+        aba_lentas = ttk.Frame(self.notebook)
+        self.notebook.add(aba_lentas, text="Consultas lentas")
+        self.tabela_lentas = TabelaBase(aba_lentas, ["data_hora", "duracao_ms", "linhas", "sql"],
+                                        {"data_hora": "Data/Hora", "duracao_ms": "Duração (ms)",
+                                         "linhas": "Linhas", "sql": "SQL"})
+        self.tabela_lentas.pack(fill=tk.BOTH, expand=True)
+        self.tabela_lentas.tree.column("sql", width=650)
+        self.tabela_lentas.tree.bind("<<TreeviewSelect>>", self.mostrar_plano)
+        self.texto_plano = tk.Text(aba_lentas, height=8, wrap=tk.WORD)
+        self.texto_plano.pack(fill=tk.X, pady=(5, 0))
+
+        self.bind("<F5>", lambda e: self.atualizar())
+        self.atualizar()
+
+    @staticmethod
+    def _histograma_texto(histograma):
+        """Resume o histograma mostrando apenas as faixas com ocorrências"""
+        return " ".join(f"{faixa}:{quantidade}" for faixa, quantidade in histograma.items() if quantidade)
+
+    def atualizar(self):
+        """Recarrega as tabelas com o perfil coletado até agora"""
+        perfil = perfilador.obter_perfil()
+        estado = "ativo" if perfil["ativo"] else "desativado"
+        texto = f"Perfil {estado} - consultas lentas a partir de {perfil['limite_lento_ms']:.0f} ms"
+        fila = fila_escrita_ativa()
+        if fila is not None:
+            metricas = fila.metricas()
+            texto += (f" | Fila de escrita: {metricas['profundidade']} pendentes, {metricas['tarefas']} gravações"
+                      f" em {metricas['lotes']} commits, commit p95 {metricas['commit'].get('p95_ms', 0):.1f} ms")
+        self.label_estado.config(text=texto)
+        self.botao_ativar.config(text="Desativar perfil" if perfil["ativo"] else "Ativar perfil")
+
+        self.tabela_chamadas.limpar()
+        for nome, dados in perfil["chamadas"].items():
+            self.tabela_chamadas.adicionar_linha(
+                dict(dados, nome=nome, histograma=self._histograma_texto(dados["histograma"])))
+
+        self.tabela_sql.limpar()
+        for texto, dados in perfil["instrucoes"].items():
+            self.tabela_sql.adicionar_linha(
+                dict(dados, nome=texto, histograma=self._histograma_texto(dados["histograma"])))
+
+        self.consultas_lentas = list(reversed(perfil["consultas_lentas"]))
+        self.tabela_lentas.limpar()
+        for indice, registro in enumerate(self.consultas_lentas):
+            self.tabela_lentas.adicionar_linha(registro, id=str(indice))
+        self.texto_plano.delete("1.0", tk.END)
+
+    def mostrar_plano(self, event=None):
+        """Exibe o SQL completo e o plano da consulta lenta selecionada"""
+        selecao = self.tabela_lentas.obter_selecao()
+        if selecao is None:
+            return
+        registro = self.consultas_lentas[int(selecao)]
+        self.texto_plano.delete("1.0", tk.END)
+        self.texto_plano.insert(tk.END, (registro.get("sql_expandido") or registro["sql"]) + "\n\n")
+        self.texto_plano.insert(tk.END, "\n".join(registro["plano"]) or "(sem plano)")
+
+    def alternar_perfil(self):
+        """Ativa ou desativa a coleta do perfil"""
+        if perfilador.perfil_ativo():
+            perfilador.desativar_perfil()
+        else:
+            perfilador.ativar_perfil()
+        self.atualizar()
+
+    def limpar(self):
+        """Descarta as estatísticas coletadas"""
+        perfilador.limpar_perfil()
+        self.atualizar()
+
+    def exportar(self):
+        """Grava o perfil em um arquivo JSON escolhido pelo usuário"""
+        caminho = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".json", filetypes=[("JSON", "*.json")],
+            initialfile="perfil_sisproj.json")
+        if not caminho:
+            return
+        try:
+            perfilador.exportar_perfil(caminho)
+            mostrar_mensagem("Sucesso", f"Perfil exportado para {caminho}", tipo="sucesso")
+        except OSError as e:
+            mostrar_mensagem("Erro", f"Erro ao exportar perfil: {e}", tipo="erro")
@@ -1,131 +1,18 @@
 import tkinter as tk
 from tkinter import ttk
-import re
 import datetime
-from controllers.eventos_controller import adicionar_evento, listar_eventos, editar_evento, excluir_evento, obter_eventos_por_demanda, obter_valor_total_contrato
-from controllers.demanda_controller import adicionar_demanda, listar_demandas, editar_demanda
+from controllers.eventos_controller import adicionar_evento, listar_eventos, obter_evento, editar_evento, excluir_evento, obter_eventos_por_demanda, obter_valor_total_contrato
+from controllers.demanda_controller import adicionar_demanda, editar_demanda
 from controllers.contrato_controller import adicionar_contrato
-from controllers.aditivos_controller import adicionar_aditivo, listar_aditivos, obter_aditivos_por_contrato, editar_aditivo as editar_aditivo_controller, excluir_aditivo
-from controllers.titulo_eventos_controller import adicionar_titulo_evento, listar_titulos_eventos, buscar_titulo_evento_por_nome
-from controllers.fornecedores_controller import adicionar_fornecedor, listar_fornecedores, buscar_fornecedor_por_nome
-from utils.ui_utils import FormularioBase, criar_botao, TabelaBase, mostrar_mensagem, Estilos, Cores
-from utils.custeio_utils import CusteioManager
-
-class FormatadorCampos:
-    """Classe para formatar campos de entrada"""
-    
-    @staticmethod
-    def formatar_data(entry, event=None):
-        """Formata o campo para data no padrão brasileiro (DD/MM/AAAA)"""
-        texto = entry.get().replace("/", "")
-        # Remove caracteres não numéricos
-        texto = re.sub(r'[^\d]', '', texto)
-        
-        # Limita a 8 dígitos
-        if len(texto) > 8:
-            texto = texto[:8]
-            
-        # Formata conforme a quantidade de dígitos
-        if len(texto) > 4:
-            texto = f"{texto[:2]}/{texto[2:4]}/{texto[4:]}"
-        elif len(texto) > 2:
-            texto = f"{texto[:2]}/{texto[2:]}"
-            
-        # Atualiza o campo
-        entry.delete(0, tk.END)
-        entry.insert(0, texto)
-        
-        # Valida a data
-        if len(texto) == 10:  # Formato completo DD/MM/AAAA
-            try:
-                dia, mes, ano = map(int, texto.split('/'))
-                # Validação básica
-                if not (1 <= dia <= 31 and 1 <= mes <= 12 and 1000 <= ano <= 9999):
-                    entry.config(foreground="red")
-                else:
-                    entry.config(foreground="black")
-            except:
-                entry.config(foreground="red")
-        
-        return True
-    
-    @staticmethod
-    def formatar_nup_sei(entry, event=None):
-        """Formata o campo NUP/SEI no padrão 00000.000000/0000-00"""
-        texto = entry.get().replace(".", "").replace("/", "").replace("-", "")
-        # Remove caracteres não numéricos
-        texto = re.sub(r'[^\d]', '', texto)
-        
-        # Limita a 17 dígitos
-        if len(texto) > 17:
-            texto = texto[:17]
-            
-        # Formata conforme a quantidade de dígitos
-        if len(texto) > 13:
-            texto = f"{texto[:5]}.{texto[5:11]}/{texto[11:15]}-{texto[15:]}"
-        elif len(texto) > 11:
-            texto = f"{texto[:5]}.{texto[5:11]}/{texto[11:]}"
-        elif len(texto) > 5:
-            texto = f"{texto[:5]}.{texto[5:]}"
-            
-        # Atualiza o campo
-        entry.delete(0, tk.END)
-        entry.insert(0, texto)
-        return True
-    
-    @staticmethod
-    def formatar_cnpj(entry, event=None):
-        """Formata o campo CNPJ no padrão 00.000.000/0000-00"""
-        texto = entry.get().replace(".", "").replace("/", "").replace("-", "")
-        # Remove caracteres não numéricos
-        texto = re.sub(r'[^\d]', '', texto)
-        
-        # Limita a 14 dígitos
-        if len(texto) > 14:
-            texto = texto[:14]
-            
-        # Formata conforme a quantidade de dígitos
-        if len(texto) > 12:
-            texto = f"{texto[:2]}.{texto[2:5]}.{texto[5:8]}/{texto[8:12]}-{texto[12:]}"
-        elif len(texto) > 8:
-            texto = f"{texto[:2]}.{texto[2:5]}.{texto[5:8]}/{texto[8:]}"
-        elif len(texto) > 5:
-            texto = f"{texto[:2]}.{texto[2:5]}.{texto[5:]}"
-        elif len(texto) > 2:
-            texto = f"{texto[:2]}.{texto[2:]}"
-            
-        # Atualiza o campo
-        entry.delete(0, tk.END)
-        entry.insert(0, texto)
-        return True
-    
-    @staticmethod
-    def formatar_valor_brl(entry, event=None):
-        """Formata o campo para valor monetário no padrão brasileiro (R$ 0.000,00)"""
-        texto = entry.get().replace("R$", "").replace(".", "").replace(",", "").strip()
-        # Remove caracteres não numéricos
-        texto = re.sub(r'[^\d]', '', texto)
-        
-        if not texto:
-            texto = "0"
-            
-        # Converte para float (centavos)
-        valor = float(texto) / 100
-        
-        # Formata como moeda brasileira
-        texto_formatado = f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            
-        # Atualiza o campo
-        entry.delete(0, tk.END)
-        entry.insert(0, texto_formatado)
-        return True
-    
-    @staticmethod
-    def validar_numerico(event):
-        """Permite apenas entrada de caracteres numéricos"""
-        if event.char.isdigit() or event.keysym in ('BackSpace', 'Delete', 'Left', 'Right'):
-            return True
-        return False
+from controllers.contrato_controller import versao_do_registro, obter_versao_atual, ConflitoEdicao
+from controllers.aditivos_controller import adicionar_aditivo, obter_aditivo, historico_aditivos, eh_ultimo_aditivo, editar_aditivo as editar_aditivo_controller, excluir_aditivo
+from controllers.titulo_eventos_controller import adicionar_titulo_evento, buscar_titulo_evento_por_nome
+from controllers.fornecedores_controller import adicionar_fornecedor, buscar_fornecedor_por_nome
+from utils.validator import FormatadorCampos, formatar_brl, formatar_coluna_brl, converter_brl
+from utils.ui_utils import FormularioBase, criar_botao, TabelaBase, mostrar_mensagem, Estilos, Cores, AbasPreguicosas, marcar_formularios_carregados, campos_alterados
+from utils.barramento import assinar_enquanto_existir, EXCLUIR, RECARREGAR
+from utils.dados_referencia import (obter_valores_custeio, obter_nomes_fornecedores, obter_titulos_eventos,
+                                    obter_demanda_cache)
 
 class EventoForm(FormularioBase):
     """Formulário para cadastro e edição de eventos"""
@@ -145,6 +32,8 @@ class EventoForm(FormularioBase):
         self.evento = evento
         self.id_evento = evento[0] if evento else None
         self.modo_edicao = evento is not None
+        # Versão carregada, usada para detectar edição simultânea ao salvar
+        self.versao_registro = versao_do_registro("eventos", evento) if evento else None
         
         # Frame principal para organizar o layout
         self.frame_principal = ttk.Frame(self)
@@ -164,9 +53,28 @@ class EventoForm(FormularioBase):
         self.btn_salvar = criar_botao(self.frame_botoes, "Salvar", self.salvar, "Primario", 15)
         self.btn_salvar.pack(side=tk.RIGHT)
         
-        # Aba de demanda (primeira aba)
-        self.tab_demanda = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_demanda, text="Demanda")
+        # Configurar estilo especial para a aba de aditivos (cor diferente)
+        style = ttk.Style()
+        style.map("TNotebook.Tab", background=[("selected", "#f0e68c")])
+        
+        # Abas construídas sob demanda: apenas a primeira é montada agora,
+        # as demais no primeiro acesso ou antes de salvar
+        self.abas = AbasPreguicosas(self.notebook)
+        # No modo de edição, cada formulário guarda os valores carregados assim que sua aba
+        # é construída, para que só os campos alterados sejam gravados
+        if self.modo_edicao:
+            self.abas.ao_construir(lambda aba: marcar_formularios_carregados(
+                getattr(self, "form_demanda", None), getattr(self, "form_custeio", None),
+                getattr(self, "form_contrato", None)))
+        self.abas.adicionar("Demanda", self.construir_aba_demanda)
+        self.abas.adicionar("Custeio", self.construir_aba_custeio)
+        self.abas.adicionar("Contrato", self.construir_aba_contrato)
+        self.abas.adicionar("Aditivos", self.construir_aba_aditivos)
+    
+    def construir_aba_demanda(self, aba):
+        """Cria os campos da aba de demanda"""
+        self.tab_demanda = aba
+        evento = self.evento
         
         # Configurar campos na aba de demanda
         self.form_demanda = FormularioBase(self.tab_demanda, "")
@@ -238,14 +146,9 @@ class EventoForm(FormularioBase):
         else:
             # Para edição, buscamos os dados da demanda pelo código
             codigo_demanda = evento[1]
-            demanda_encontrada = None
             
-            # Buscar a demanda pelo código
-            demandas = listar_demandas()
-            for d in demandas:
-                if d[0] == codigo_demanda:
-                    demanda_encontrada = d
-                    break
+            # Buscar a demanda pelo código (consulta pela chave, com cache)
+            demanda_encontrada = obter_demanda_cache(codigo_demanda)
             
             # Para edição, mostramos o código da demanda
             self.form_demanda.adicionar_campo("codigo_demanda", "Código da Demanda", 
@@ -348,10 +251,11 @@ class EventoForm(FormularioBase):
                     status_widget.set("Novo")
             else:
                 status_widget.set("Novo")
-        
-        # Aba de custeio (segunda aba)
-        self.tab_custeio = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_custeio, text="Custeio")
+    
+    def construir_aba_custeio(self, aba):
+        """Cria os campos da aba de custeio"""
+        self.tab_custeio = aba
+        evento = self.evento
         
         # Configurar campos na aba de custeio
         self.form_custeio = FormularioBase(self.tab_custeio, "")
@@ -418,10 +322,11 @@ class EventoForm(FormularioBase):
         if self.modo_edicao and evento:
             # Aguardar um momento para que os campos sejam inicializados
             self.after(100, lambda: self.definir_valores_custeio_edicao(evento))
-        
-        # Aba de contrato (terceira aba - juntando informações básicas, financeiro e contrato)
-        self.tab_contrato = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_contrato, text="Contrato")
+    
+    def construir_aba_contrato(self, aba):
+        """Cria os campos da aba de contrato"""
+        self.tab_contrato = aba
+        evento = self.evento
         
         self.form_contrato = FormularioBase(self.tab_contrato, "")
         self.form_contrato.pack(fill=tk.BOTH, expand=True)
@@ -525,14 +430,13 @@ class EventoForm(FormularioBase):
         # Adicionar campos de observações no final
         self.form_contrato.adicionar_campo("observacao", "Observações", tipo="texto_longo", 
                                       padrao=evento[12] if evento else "")
+    
+    def construir_aba_aditivos(self, aba):
+        """Cria a tabela da aba de aditivos"""
+        self.tab_aditivos = aba
         
-        # Configurar estilo especial para a aba de aditivos (cor diferente)
-        style = ttk.Style()
-        style.map("TNotebook.Tab", background=[("selected", "#f0e68c")])
-        
-        # Aba de aditivos (quarta aba)
-        self.tab_aditivos = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_aditivos, text="Aditivos")
+        # Os aditivos atualizam o total exibido na aba de contrato, que precisa existir
+        self.abas.construir_todas()
         
         # Frame para a tabela de aditivos
         self.frame_tabela_aditivos = ttk.Frame(self.tab_aditivos)
@@ -576,11 +480,15 @@ class EventoForm(FormularioBase):
             criar_botao(frame_acoes_aditivos, "Editar", self.editar_aditivo, "Secundario", 15).pack(side=tk.LEFT, padx=(0, 5))
             criar_botao(frame_acoes_aditivos, "Excluir", self.excluir_aditivo, "Perigo", 15).pack(side=tk.LEFT)
             
-            # Carregar aditivos existentes
+            # Carregar aditivos existentes; alterações feitas em qualquer tela chegam pelo barramento
             self.carregar_aditivos()
-        
+            assinar_enquanto_existir(self.tabela_aditivos, "aditivos", self.ao_alterar_aditivo)
+    
     def salvar(self):
         """Salva os dados do formulário"""
+        # Abas ainda não exibidas precisam existir para validação e leitura dos valores
+        self.abas.construir_todas()
+        
         # Validar todos os formulários
         formularios = [self.form_contrato, self.form_custeio]
         
@@ -606,7 +514,7 @@ class EventoForm(FormularioBase):
                     codigo_demanda = int(valores_demanda["codigo_demanda"])
                     
                     # Verificar se temos os campos necessários para atualizar a demanda
-                    if all(campo in valores_demanda for campo in ["data_entrada", "solicitante", "data_protocolo", "oficio", "nup_sei", "status"]):
+                    if self.form_demanda.possui_alteracoes() and all(campo in valores_demanda for campo in ["data_entrada", "solicitante", "data_protocolo", "oficio", "nup_sei", "status"]):
                         editar_demanda(
                             codigo_demanda,
                             valores_demanda["data_entrada"],
@@ -663,14 +571,18 @@ class EventoForm(FormularioBase):
                     'total_contrato': self.converter_valor_brl_para_float(valores_contrato["total_contrato"])
                 }
                 
-                editar_evento(self.id_evento, **valores)
+                # Gravar apenas os campos alterados desde o carregamento do registro
+                alterados = campos_alterados(self.form_custeio, self.form_contrato)
+                valores = {campo: valor for campo, valor in valores.items() if campo in alterados}
+                
+                editar_evento(self.id_evento, versao_esperada=self.versao_registro, **valores)
                 mostrar_mensagem("Sucesso", "Evento atualizado com sucesso!", tipo="sucesso")
             else:
                 # Cadastrar nova demanda
                 valores_demanda = self.form_demanda.obter_valores()
                 
                 # Criar a demanda
-                adicionar_demanda(
+                codigo_demanda = adicionar_demanda(
                     valores_demanda["data_entrada"],
                     valores_demanda["solicitante"],
                     valores_demanda["data_protocolo"],
@@ -679,10 +591,6 @@ class EventoForm(FormularioBase):
                     valores_demanda["status"]
                 )
                 
-                # Obter o código da nova demanda (última demanda inserida)
-                demandas = listar_demandas()
-                codigo_demanda = demandas[-1][0] if demandas else 1
-                
                 # Obter valores do evento
                 valores_contrato = self.form_contrato.obter_valores()
                 valores_custeio = self.form_custeio.obter_valores()
@@ -746,6 +654,8 @@ class EventoForm(FormularioBase):
                 mostrar_mensagem("Sucesso", "Demanda, Evento e Contrato cadastrados com sucesso!", tipo="sucesso")
                 
             self.callback_salvar()
+        except ConflitoEdicao as conflito:
+            mostrar_mensagem("Conflito de Edição", conflito.descrever(), tipo="aviso")
         except Exception as e:
             mostrar_mensagem("Erro", f"Erro ao salvar: {str(e)}", tipo="erro")
         
@@ -786,14 +696,11 @@ class EventoForm(FormularioBase):
             resultado_widget.set("")
             meta_widget.set("")
         
-        # Criar instância do CusteioManager
-        custeio_manager = CusteioManager()
-        
         # Configurar os campos com base na instituição
         if instituicao == "OPAS":
             # Carregar projetos para OPAS
             filtros = {'instituicao_parceira': 'OPAS'}
-            projetos = custeio_manager.get_distinct_values('cod_projeto', filtros)
+            projetos = obter_valores_custeio('cod_projeto', filtros)
             
             # Garantir que temos pelo menos uma opção
             if not projetos:
@@ -829,7 +736,7 @@ class EventoForm(FormularioBase):
         elif instituicao == "FIOCRUZ":
             # Carregar projetos para FIOCRUZ
             filtros = {'instituicao_parceira': 'FIOCRUZ'}
-            projetos = custeio_manager.get_distinct_values('cod_projeto', filtros)
+            projetos = obter_valores_custeio('cod_projeto', filtros)
             
             # Garantir que temos pelo menos uma opção
             if not projetos:
@@ -838,7 +745,7 @@ class EventoForm(FormularioBase):
             instrumento_widget["values"] = projetos
             
             # Carregar subprojetos para FIOCRUZ
-            subprojetos = custeio_manager.get_distinct_values('subprojeto', filtros)
+            subprojetos = obter_valores_custeio('subprojeto', filtros)
             
             # Garantir que temos pelo menos uma opção
             if not subprojetos:
@@ -883,15 +790,12 @@ class EventoForm(FormularioBase):
             ta_widget["values"] = [""]
             return
         
-        # Criar instância do CusteioManager
-        custeio_manager = CusteioManager()
-        
         # Carregar TAs para o instrumento selecionado
         filtros = {
             'instituicao_parceira': instituicao,
             'cod_projeto': instrumento
         }
-        tas = custeio_manager.get_distinct_values('cod_ta', filtros)
+        tas = obter_valores_custeio('cod_ta', filtros)
         
         # Garantir que temos pelo menos uma opção
         if not tas:
@@ -920,16 +824,13 @@ class EventoForm(FormularioBase):
             resultado_widget["values"] = [""]
             return
         
-        # Criar instância do CusteioManager
-        custeio_manager = CusteioManager()
-        
         # Carregar Resultados para o TA selecionado
         filtros = {
             'instituicao_parceira': instituicao,
             'cod_projeto': instrumento,
             'cod_ta': ta
         }
-        resultados = custeio_manager.get_distinct_values('resultado', filtros)
+        resultados = obter_valores_custeio('resultado', filtros)
         
         # Garantir que temos pelo menos uma opção
         if not resultados:
@@ -939,92 +840,42 @@ class EventoForm(FormularioBase):
     
     def converter_valor_brl_para_float(self, valor_str):
         """Converte um valor em formato de moeda brasileira (R$ 1.234,56) para float (1234.56)"""
-        if not valor_str:
-            return 0.0
-            
-        # Se for um número, retorna diretamente
-        if isinstance(valor_str, (int, float)):
-            return float(valor_str)
-            
-        # Remove o símbolo de moeda e espaços
-        valor_str = str(valor_str).replace("R$", "").strip()
-        
-        # Remove pontos de milhar e substitui vírgula por ponto
-        valor_str = valor_str.replace(".", "").replace(",", ".")
-        
-        # Remove caracteres não numéricos, exceto ponto decimal
-        valor_str = re.sub(r'[^\d.]', '', valor_str)
-        
-        try:
-            return float(valor_str)
-        except ValueError:
-            return 0.0
+        return converter_brl(valor_str)
+
+    def atualizar_versao_registro(self):
+        """Relê a versão do registro após alterações feitas pela própria tela (aditivos)"""
+        self.versao_registro = obter_versao_atual("eventos", self.id_evento)
     
     def carregar_aditivos(self):
         """Carrega os aditivos do contrato na tabela"""
         if not hasattr(self, 'tabela_aditivos') or not self.id_evento:
             return
             
-        self.tabela_aditivos.limpar()
-        
-        # Obter aditivos do contrato (passando o tipo correto para eventos)
-        aditivos = obter_aditivos_por_contrato(self.id_evento, "eventos")
-        
-        # Debug: imprimir quantidade de aditivos encontrados
-        print(f"Debug: Encontrados {len(aditivos)} aditivos para evento {self.id_evento}")
-        
-        # Obter o valor base do contrato usando a nova função
-        valor_base = obter_valor_total_contrato(self.id_evento)
-        
-        # Buscar o valor estimado original (antes dos aditivos)
-        eventos = listar_eventos()
-        valor_estimado_original = 0
-        for evento in eventos:
-            if evento[0] == self.id_evento:
-                valor_estimado_original = float(evento[13]) if evento[13] else 0
-                break
-        
-        print(f"Debug: Valor estimado original do evento: R$ {valor_estimado_original}")
-        print(f"Debug: Valor base atual do evento: R$ {valor_base}")
+        # Histórico do evento já ordenado, com o valor total acumulado calculado no banco
+        aditivos = historico_aditivos("eventos", [self.id_evento])[self.id_evento]
         
-        # Valor acumulado para calcular o valor total atualizado progressivamente
-        valor_acumulado = valor_estimado_original
-        
-        # Ordenar aditivos por ID para garantir ordem cronológica
-        aditivos_ordenados = sorted(aditivos, key=lambda x: x[0])
-        
-        for i, aditivo in enumerate(aditivos_ordenados):
-            # Extrair dados do aditivo
-            id_aditivo = aditivo[0]
-            valor_aditivo = float(aditivo[5]) if aditivo[5] else 0
-            
-            print(f"Debug: Processando aditivo {id_aditivo} com valor R$ {valor_aditivo}")
-            
-            # Atualizar valor acumulado
-            valor_acumulado += valor_aditivo
-            
-            # Criar um dicionário com os valores do aditivo
+        linhas = []
+        for aditivo in aditivos:
             valores = {
-                "id": id_aditivo,
-                "valor_aditivo": valor_aditivo,
-                "valor_total_atualizado": valor_acumulado
+                "id": aditivo["id"],
+                "valor_aditivo": aditivo["valor_aditivo"] or 0,
+                "valor_total_atualizado": aditivo["valor_total_atualizado"]
             }
             
             # Formatar valores monetários
-            valores["valor_aditivo"] = f"R$ {valores['valor_aditivo']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            valores["valor_total_atualizado"] = f"R$ {valores['valor_total_atualizado']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            valores["valor_aditivo"] = formatar_brl(valores['valor_aditivo'])
+            valores["valor_total_atualizado"] = formatar_brl(valores['valor_total_atualizado'])
             
-            self.tabela_aditivos.adicionar_linha(valores, str(id_aditivo))
-        
-        print(f"Debug: Carregamento de aditivos concluído. Total de linhas na tabela: {len(aditivos_ordenados)}")
+            linhas.append((aditivo["id"], valores))
         
-        # Verificar se há aditivos e destacar o último (que pode ser editado/excluído)
-        if aditivos_ordenados:
-            ultimo_aditivo_id = str(aditivos_ordenados[-1][0])
-            print(f"Debug: Último aditivo (editável/excluível): {ultimo_aditivo_id}")
-            
-            # Aqui poderia adicionar lógica para destacar visualmente o último aditivo
-            # Por exemplo, mudando a cor da linha na tabela
+        # Só as linhas que mudaram são redesenhadas
+        self.tabela_aditivos.sincronizar_linhas(linhas)
+    
+    def ao_alterar_aditivo(self, evento):
+        """Atualiza a tabela quando um aditivo deste evento é incluído, editado ou excluído"""
+        if evento.operacao == RECARREGAR or (evento.contexto.get("tipo_contrato") == "eventos"
+                and str(evento.contexto.get("id_contrato")) == str(self.id_evento)):
+            self.carregar_aditivos()
     
     def adicionar_aditivo(self):
         """Abre o formulário para adicionar um novo aditivo"""
@@ -1052,7 +903,7 @@ class EventoForm(FormularioBase):
         
         # Campo: valor total atual (somente leitura) - mostrar antes do valor do aditivo para contexto
         form_aditivo.adicionar_campo("valor_total_atual", "Valor Total Atual do Contrato", tipo="numero", 
-                                    padrao=f"R$ {valor_total_atual:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                                    padrao=formatar_brl(valor_total_atual))
         valor_total_atual_widget = form_aditivo.campos["valor_total_atual"]["widget"]
         valor_total_atual_widget.configure(state="readonly")
         
@@ -1065,7 +916,7 @@ class EventoForm(FormularioBase):
         
         # Campo calculado: novo valor total (será atualizado dinamicamente)
         form_aditivo.adicionar_campo("novo_valor_total", "Novo Valor Total do Contrato", tipo="numero", 
-                                    padrao=f"R$ {valor_total_atual:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                                    padrao=formatar_brl(valor_total_atual))
         novo_valor_total_widget = form_aditivo.campos["novo_valor_total"]["widget"]
         novo_valor_total_widget.configure(state="readonly")
         
@@ -1077,7 +928,7 @@ class EventoForm(FormularioBase):
                 novo_total = valor_total_atual + valor_aditivo
                 
                 # Formatar e atualizar o campo
-                novo_total_formatado = f"R$ {novo_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+                novo_total_formatado = formatar_brl(novo_total)
                 novo_valor_total_widget.configure(state="normal")
                 novo_valor_total_widget.delete(0, tk.END)
                 novo_valor_total_widget.insert(0, novo_total_formatado)
@@ -1133,30 +984,23 @@ class EventoForm(FormularioBase):
                     'data_registro': datetime.datetime.now().strftime("%d/%m/%Y")
                 }
                 
-                print(f"Debug: Salvando aditivo com dados: {dados_aditivo}")
-                
                 # Adicionar o aditivo (o controller já vai atualizar o valor total automaticamente)
                 adicionar_aditivo(**dados_aditivo)
-                
-                print(f"Debug: Aditivo salvo com sucesso para evento {self.id_evento}")
+                self.atualizar_versao_registro()
                 
                 mostrar_mensagem("Sucesso", f"Aditivo de R$ {valor_aditivo:,.2f} adicionado com sucesso!\nValor total do contrato atualizado automaticamente.", tipo="sucesso")
                 
                 # Fechar o diálogo
                 dialog.destroy()
                 
-                # Recarregar os aditivos na tabela
-                self.carregar_aditivos()
-                
                 # Recarregar também o formulário principal para mostrar o valor atualizado
                 if hasattr(self, 'form_contrato'):
                     novo_valor_total = obter_valor_total_contrato(self.id_evento)
                     total_contrato_widget = self.form_contrato.campos["total_contrato"]["widget"]
                     total_contrato_widget.delete(0, tk.END)
-                    total_contrato_widget.insert(0, f"R$ {novo_valor_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                    total_contrato_widget.insert(0, formatar_brl(novo_valor_total))
                 
             except Exception as e:
-                print(f"Debug: Erro ao salvar aditivo: {str(e)}")
                 mostrar_mensagem("Erro", f"Erro ao salvar aditivo: {str(e)}", tipo="erro")
         
         # Botões de ação
@@ -1178,12 +1022,7 @@ class EventoForm(FormularioBase):
             return
             
         # Buscar o aditivo selecionado
-        aditivos = listar_aditivos()
-        aditivo_selecionado = None
-        for aditivo in aditivos:
-            if str(aditivo[0]) == id_selecao:
-                aditivo_selecionado = aditivo
-                break
+        aditivo_selecionado = obter_aditivo(id_selecao)
                 
         if not aditivo_selecionado:
             mostrar_mensagem("Erro", "Aditivo não encontrado.", tipo="erro")
@@ -1192,8 +1031,7 @@ class EventoForm(FormularioBase):
         # Verificar se é o último aditivo (apenas no modo de edição)
         if not somente_leitura:
             try:
-                aditivos_evento = obter_aditivos_por_contrato(self.id_evento, "eventos")
-                if not aditivos_evento or aditivos_evento[-1][0] != int(id_selecao):
+                if not eh_ultimo_aditivo(id_selecao):
                     mostrar_mensagem("Atenção", "Apenas o último aditivo pode ser editado. Este não é o último aditivo do contrato.", tipo="aviso")
                     return
             except Exception as e:
@@ -1222,14 +1060,14 @@ class EventoForm(FormularioBase):
         valor_aditivo = aditivo_selecionado[5]
         
         # Formatar valor do aditivo para exibição
-        valor_aditivo_formatado = f"R$ {float(valor_aditivo):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if valor_aditivo else "R$ 0,00"
+        valor_aditivo_formatado = formatar_brl(float(valor_aditivo)) if valor_aditivo else "R$ 0,00"
         
         # Obter valor total atual do evento
         valor_total_atual = obter_valor_total_contrato(id_contrato)
         
         # Campo: valor total atual (somente leitura)
         form_aditivo.adicionar_campo("valor_total_atual", "Valor Total Atual do Contrato", tipo="numero", 
-                                    padrao=f"R$ {valor_total_atual:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                                    padrao=formatar_brl(valor_total_atual))
         valor_total_atual_widget = form_aditivo.campos["valor_total_atual"]["widget"]
         valor_total_atual_widget.configure(state="readonly")
         
@@ -1283,21 +1121,19 @@ class EventoForm(FormularioBase):
                 
                 # Atualizar o aditivo (o controller já vai recalcular o valor total automaticamente)
                 editar_aditivo_controller(id_aditivo, **dados_aditivo)
+                self.atualizar_versao_registro()
                 
                 mostrar_mensagem("Sucesso", f"Aditivo atualizado com sucesso!\nValor total do contrato recalculado automaticamente.", tipo="sucesso")
                 
                 # Fechar o diálogo
                 dialog.destroy()
                 
-                # Recarregar os aditivos na tabela
-                self.carregar_aditivos()
-                
                 # Recarregar também o formulário principal para mostrar o valor atualizado
                 if hasattr(self, 'form_contrato'):
                     novo_valor_total = obter_valor_total_contrato(self.id_evento)
                     total_contrato_widget = self.form_contrato.campos["total_contrato"]["widget"]
                     total_contrato_widget.delete(0, tk.END)
-                    total_contrato_widget.insert(0, f"R$ {novo_valor_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                    total_contrato_widget.insert(0, formatar_brl(novo_valor_total))
                 
             except ValueError as ve:
                 # Tratar especificamente a exceção de regra de negócio
@@ -1324,12 +1160,12 @@ class EventoForm(FormularioBase):
         
         # Verificar se é o último aditivo
         try:
-            aditivos_evento = obter_aditivos_por_contrato(self.id_evento, "eventos")
-            if not aditivos_evento:
+            ultimo = eh_ultimo_aditivo(id_selecao)
+            if ultimo is None:
                 mostrar_mensagem("Erro", "Nenhum aditivo encontrado para este evento.", tipo="erro")
                 return
                 
-            if aditivos_evento[-1][0] != int(id_selecao):
+            if not ultimo:
                 mostrar_mensagem("Regra de Negócio", 
                                "Apenas o último aditivo pode ser excluído.\n\n" +
                                "Para excluir este aditivo, primeiro você deve excluir " +
@@ -1344,11 +1180,9 @@ class EventoForm(FormularioBase):
         # Obter o valor do aditivo para mostrar na confirmação
         valor_aditivo = 0
         try:
-            aditivos = listar_aditivos()
-            for aditivo in aditivos:
-                if aditivo[0] == int(id_selecao):
-                    valor_aditivo = float(aditivo[5]) if aditivo[5] else 0
-                    break
+            aditivo = obter_aditivo(id_selecao)
+            if aditivo:
+                valor_aditivo = float(aditivo[5]) if aditivo[5] else 0
         except:
             pass
         
@@ -1360,19 +1194,17 @@ class EventoForm(FormularioBase):
             try:
                 # Excluir o aditivo (o controller já vai recalcular o valor total automaticamente)
                 excluir_aditivo(id_selecao)
+                self.atualizar_versao_registro()
                 
                 mostrar_mensagem("Sucesso", f"Aditivo excluído com sucesso!\nValor total do contrato atualizado automaticamente.", tipo="sucesso")
                 
-                # Recarregar os aditivos na tabela
-                self.carregar_aditivos()
-                
                 # Recarregar também o formulário principal para mostrar o valor atualizado
                 if hasattr(self, 'form_contrato'):
                     from controllers.eventos_controller import obter_valor_total_contrato
                     novo_valor_total = obter_valor_total_contrato(self.id_evento)
                     total_contrato_widget = self.form_contrato.campos["total_contrato"]["widget"]
                     total_contrato_widget.delete(0, tk.END)
-                    total_contrato_widget.insert(0, f"R$ {novo_valor_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                    total_contrato_widget.insert(0, formatar_brl(novo_valor_total))
                 
             except ValueError as ve:
                 # Tratar especificamente a exceção de regra de negócio
@@ -1383,18 +1215,14 @@ class EventoForm(FormularioBase):
     def carregar_titulos_eventos(self):
         """Carrega os títulos de eventos existentes no combobox"""
         try:
-            titulos = listar_titulos_eventos()
-            titulos_texto = [titulo[1] for titulo in titulos]  # Pega apenas o campo 'titulo'
-            self.titulo_evento_combobox['values'] = titulos_texto
+            self.titulo_evento_combobox['values'] = obter_titulos_eventos()
         except Exception as e:
             print(f"Erro ao carregar títulos de eventos: {e}")
     
     def carregar_fornecedores(self):
         """Carrega os fornecedores existentes no combobox"""
         try:
-            fornecedores = listar_fornecedores()
-            fornecedores_texto = [fornecedor[1] for fornecedor in fornecedores]  # Pega apenas o campo 'razao_social'
-            self.fornecedor_combobox['values'] = fornecedores_texto
+            self.fornecedor_combobox['values'] = obter_nomes_fornecedores()
         except Exception as e:
             print(f"Erro ao carregar fornecedores: {e}")
     
@@ -1571,6 +1399,9 @@ class EventoForm(FormularioBase):
                 resultado_widget.set(evento[8])
             if len(evento) > 9 and evento[9] is not None:
                 meta_widget.set(evento[9])
+            
+            # Os valores definidos aqui são os do registro carregado
+            self.form_custeio.marcar_estado_inicial()
                 
         except Exception as e:
             print(f"Erro ao definir valores de custeio na edição: {e}")
@@ -1635,11 +1466,9 @@ class EventosView:
         
         titulo = "Gestão de Eventos"
         if codigo_demanda:
-            demandas = listar_demandas()
-            for d in demandas:
-                if d[0] == int(codigo_demanda):
-                    titulo += f" - Demanda {codigo_demanda} ({d[2]})"
-                    break
+            demanda = obter_demanda_cache(codigo_demanda)
+            if demanda:
+                titulo += f" - Demanda {codigo_demanda} ({demanda[2]})"
                     
         ttk.Label(frame_cabecalho, text=titulo, style="Titulo.TLabel").pack(side=tk.LEFT)
         criar_botao(frame_cabecalho, "Novo Evento", self.adicionar, "Primario", 15).pack(side=tk.RIGHT)
@@ -1685,12 +1514,14 @@ class EventosView:
         # Formulário (inicialmente oculto)
         self.frame_formulario = ttk.Frame(self.master)
         
-        # Carrega os dados
+        # Carrega os dados e passa a acompanhar as alterações dos eventos
         self.carregar_dados()
+        assinar_enquanto_existir(self.frame, "eventos", self.ao_alterar_evento)
         
     def carregar_dados(self, filtro=None):
         """Carrega os dados dos eventos na tabela"""
         self.tabela.limpar()
+        self.filtro = filtro
         
         try:
             if self.codigo_demanda:
@@ -1698,41 +1529,17 @@ class EventosView:
             else:
                 eventos = listar_eventos()
             
-            for evento in eventos:
+            # Formata a coluna de valores de uma vez
+            totais_formatados = formatar_coluna_brl(evento[14] for evento in eventos)
+            
+            for evento, total_formatado in zip(eventos, totais_formatados):
                 try:
                     # Se tiver filtro, verifica se evento contém o texto do filtro em algum campo
-                    if filtro:
-                        texto_filtro = filtro.lower()
-                        texto_evento = ' '.join(str(campo).lower() for campo in evento)
-                        if texto_filtro not in texto_evento:
-                            continue
-                    
-                    # Mapear explicitamente cada coluna para garantir que estamos usando os valores corretos
-                    # Nova estrutura da tabela eventos após remoção do objetivo: id(0), codigo_demanda(1), instituicao(2), instrumento(3), 
-                    # subprojeto(4), ta(5), pta(6), acao(7), resultado(8), meta(9), titulo_evento(10), 
-                    # fornecedor(11), observacao(12), valor_estimado(13), total_contrato(14)
-                    valores = {
-                        "id": evento[0],
-                        "codigo_demanda": evento[1],
-                        "titulo_evento": evento[10],
-                        "fornecedor": evento[11],
-                        "total_contrato": evento[14]  # Atualizado de evento[15] para evento[14]
-                    }
-                    
-                    # Formatar valor monetário
-                    if valores["total_contrato"] is not None:
-                        try:
-                            # Tentar converter para float e formatar como moeda
-                            valor = float(valores['total_contrato'])
-                            valores["total_contrato"] = f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                        except (ValueError, TypeError):
-                            # Se não for possível converter para float, usar um valor padrão
-                            valores["total_contrato"] = "R$ 0,00"
-                    else:
-                        valores["total_contrato"] = "R$ 0,00"
+                    if not self._atende_filtro(evento):
+                        continue
                     
                     # Adicionar a linha à tabela
-                    self.tabela.adicionar_linha(valores, str(evento[0]))
+                    self.tabela.adicionar_linha(self._valores_linha(evento, total_formatado), str(evento[0]))
                 except Exception as e:
                     print(f"Erro ao processar evento: {e}")
                     continue
@@ -1740,6 +1547,52 @@ class EventosView:
             print(f"Erro ao carregar dados: {e}")
             mostrar_mensagem("Erro", f"Erro ao carregar dados: {str(e)}", tipo="erro")
     
+    @staticmethod
+    def _valores_linha(evento, total_formatado):
+        """Valores exibidos na tabela para um evento"""
+        # Mapear explicitamente cada coluna para garantir que estamos usando os valores corretos
+        # Nova estrutura da tabela eventos após remoção do objetivo: id(0), codigo_demanda(1), instituicao(2), instrumento(3), 
+        # subprojeto(4), ta(5), pta(6), acao(7), resultado(8), meta(9), titulo_evento(10), 
+        # fornecedor(11), observacao(12), valor_estimado(13), total_contrato(14)
+        return {
+            "id": evento[0],
+            "codigo_demanda": evento[1],
+            "titulo_evento": evento[10],
+            "fornecedor": evento[11],
+            "total_contrato": total_formatado  # evento[14] já formatado
+        }
+    
+    def _atende_filtro(self, evento):
+        """Indica se o evento pertence à listagem atual (demanda e texto de pesquisa)"""
+        if self.codigo_demanda and str(evento[1]) != str(self.codigo_demanda):
+            return False
+        if self.filtro:
+            texto_evento = ' '.join(str(campo).lower() for campo in evento)
+            return self.filtro.lower() in texto_evento
+        return True
+    
+    def ao_alterar_evento(self, alteracao):
+        """Atualiza apenas a linha do evento alterado (alteração local ou de outra instância)"""
+        if alteracao.operacao == RECARREGAR:
+            self.carregar_dados(self.filtro)
+            return
+        
+        id_linha = str(alteracao.id_registro)
+        existe = self.tabela.existe_linha(id_linha)
+        evento = None if alteracao.operacao == EXCLUIR else obter_evento(alteracao.id_registro)
+        
+        if evento is None or not self._atende_filtro(evento):
+            if existe:
+                self.tabela.remover_linha(id_linha)
+            return
+        
+        valores = self._valores_linha(evento, formatar_brl(evento[14]))
+        if existe:
+            self.tabela.atualizar_linha(id_linha, valores)
+        else:
+            # A listagem é ordenada por id decrescente: novos eventos vão para o topo
+            self.tabela.adicionar_linha(valores, id_linha, indice=0)
+    
     def pesquisar(self):
         """Filtra os eventos conforme o texto de pesquisa"""
         texto = self.pesquisa_entry.get().strip()
@@ -1810,7 +1663,11 @@ class EventosView:
                     # para garantir que todos os widgets estejam completamente criados
                     def desabilitar_campos():
                         # Desabilitar campos nas abas
-                        for form in [self.formulario.form_demanda, self.formulario.form_custeio, self.formulario.form_contrato]:
+                        for nome_form in ("form_demanda", "form_custeio", "form_contrato"):
+                            # Abas ainda não construídas são desabilitadas quando forem exibidas
+                            form = getattr(self.formulario, nome_form, None)
+                            if form is None:
+                                continue
                             for campo_nome, campo_info in form.campos.items():
                                 try:
                                     widget = campo_info["widget"]
@@ -1849,6 +1706,9 @@ class EventosView:
                     
                     # Executa a função após um pequeno delay
                     self.formulario.after(100, desabilitar_campos)
+                    
+                    # Abas construídas depois (sob demanda) também ficam somente leitura
+                    self.formulario.abas.ao_construir(lambda aba: self.formulario.after(100, desabilitar_campos))
                 
                 self.formulario.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
                 self.frame_formulario.pack(fill=tk.BOTH, expand=True)
@@ -1861,15 +1721,16 @@ class EventosView:
             mostrar_mensagem("Atenção", "Selecione um evento para excluir.", tipo="aviso")
             return
             
-        if mostrar_mensagem("Confirmação", "Deseja realmente excluir este evento?", tipo="pergunta"):
+        if mostrar_mensagem("Confirmação", "Deseja realmente excluir este evento?\nOs aditivos do contrato também serão excluídos.", tipo="pergunta"):
             excluir_evento(id_selecao)
             mostrar_mensagem("Sucesso", "Evento excluído com sucesso!", tipo="sucesso")
-            self.carregar_dados()
     
     def salvar_formulario(self):
-        """Callback quando o formulário é salvo"""
+        """Callback quando o formulário é salvo
+        
+        A linha do evento salvo já foi atualizada por ao_alterar_evento.
+        """
         self.cancelar_formulario()
-        self.carregar_dados()
     
     def cancelar_formulario(self):
         """Fecha o formulário e volta para a listagem"""
@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import ttk
 import datetime
-from controllers.aditivos_controller import adicionar_aditivo as controller_adicionar_aditivo, listar_aditivos, obter_aditivos_por_contrato, editar_aditivo, excluir_aditivo
+from controllers.aditivos_controller import adicionar_aditivo as controller_adicionar_aditivo, obter_aditivo, historico_aditivos, eh_ultimo_aditivo, editar_aditivo, excluir_aditivo
 from utils.ui_utils import FormularioBase, criar_botao, mostrar_mensagem
-from views.produtos_servicos_view import FormatadorCampos
+from utils.validator import FormatadorCampos, formatar_brl
+from utils.barramento import RECARREGAR
 
 def adicionar_aditivo(self):
     """Abre o formulário para adicionar um novo aditivo"""
@@ -30,7 +31,7 @@ def adicionar_aditivo(self):
     
     # Campo: valor total atual (somente leitura) - mostrar antes do valor do aditivo para contexto
     form.adicionar_campo("valor_total_atual", "Valor Total Atual do Contrato", tipo="numero", 
-                        padrao=f"R$ {valor_total_atual:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                        padrao=formatar_brl(valor_total_atual))
     valor_total_atual_widget = form.campos["valor_total_atual"]["widget"]
     valor_total_atual_widget.configure(state="readonly")
     
@@ -43,7 +44,7 @@ def adicionar_aditivo(self):
     
     # Campo calculado: novo valor total (será atualizado dinamicamente)
     form.adicionar_campo("novo_valor_total", "Novo Valor Total do Contrato", tipo="numero", 
-                        padrao=f"R$ {valor_total_atual:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                        padrao=formatar_brl(valor_total_atual))
     novo_valor_total_widget = form.campos["novo_valor_total"]["widget"]
     novo_valor_total_widget.configure(state="readonly")
     
@@ -55,7 +56,7 @@ def adicionar_aditivo(self):
             novo_total = valor_total_atual + valor_aditivo
             
             # Formatar e atualizar o campo
-            novo_total_formatado = f"R$ {novo_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            novo_total_formatado = formatar_brl(novo_total)
             novo_valor_total_widget.configure(state="normal")
             novo_valor_total_widget.delete(0, tk.END)
             novo_valor_total_widget.insert(0, novo_total_formatado)
@@ -108,15 +109,12 @@ def adicionar_aditivo(self):
             # Fechar o diálogo
             dialog.destroy()
             
-            # Recarregar os aditivos na tabela
-            self.carregar_aditivos()
-            
             # Recarregar também o formulário principal para mostrar o valor atualizado
             if hasattr(self, 'form_contrato'):
                 novo_valor_total = valor_total_atual + valor_aditivo
                 total_contrato_widget = self.form_contrato.campos["total_contrato"]["widget"]
                 total_contrato_widget.delete(0, tk.END)
-                total_contrato_widget.insert(0, f"R$ {novo_valor_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                total_contrato_widget.insert(0, formatar_brl(novo_valor_total))
             
         except Exception as e:
             mostrar_mensagem("Erro", f"Erro ao salvar aditivo: {str(e)}", tipo="erro")
@@ -140,12 +138,7 @@ def editar_aditivo(self, somente_leitura=False):
         return
         
     # Buscar o aditivo selecionado
-    aditivos = listar_aditivos()
-    aditivo_selecionado = None
-    for aditivo in aditivos:
-        if str(aditivo[0]) == id_selecao:
-            aditivo_selecionado = aditivo
-            break
+    aditivo_selecionado = obter_aditivo(id_selecao)
             
     if not aditivo_selecionado:
         mostrar_mensagem("Erro", "Aditivo não encontrado.", tipo="erro")
@@ -154,8 +147,7 @@ def editar_aditivo(self, somente_leitura=False):
     # Verificar se é o último aditivo (apenas no modo de edição)
     if not somente_leitura:
         try:
-            aditivos_produto = obter_aditivos_por_contrato(self.id_produto, "produtos_servicos")
-            if not aditivos_produto or aditivos_produto[-1][0] != int(id_selecao):
+            if not eh_ultimo_aditivo(id_selecao):
                 mostrar_mensagem("Atenção", "Apenas o último aditivo pode ser editado. Este não é o último aditivo do contrato.", tipo="aviso")
                 return
         except Exception as e:
@@ -187,7 +179,7 @@ def editar_aditivo(self, somente_leitura=False):
     valor_total_atual = float(self.produto[9]) if self.produto and self.produto[9] else 0.0
     
     # Formatar valor do aditivo para exibição
-    valor_aditivo_formatado = f"R$ {float(valor_aditivo):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if valor_aditivo else "R$ 0,00"
+    valor_aditivo_formatado = formatar_brl(float(valor_aditivo)) if valor_aditivo else "R$ 0,00"
     
     form.adicionar_campo("valor_aditivo", "Valor do Aditivo", tipo="numero", 
                         padrao=valor_aditivo_formatado, required=True)
@@ -197,7 +189,7 @@ def editar_aditivo(self, somente_leitura=False):
     
     # Mostrar o valor total atual (somente leitura)
     form.adicionar_campo("valor_total_atual", "Valor Total Atual do Contrato", tipo="numero", 
-                        padrao=f"R$ {valor_total_atual:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                        padrao=formatar_brl(valor_total_atual))
     valor_total_atual_widget = form.campos["valor_total_atual"]["widget"]
     valor_total_atual_widget.configure(state="readonly")
     
@@ -251,16 +243,13 @@ def editar_aditivo(self, somente_leitura=False):
             # Fechar o diálogo
             dialog.destroy()
             
-            # Recarregar os aditivos na tabela
-            self.carregar_aditivos()
-            
             # Recarregar também o formulário principal para mostrar o valor atualizado
             if hasattr(self, 'form_contrato'):
                 # Calcular o novo valor total (valor atual - valor antigo + valor novo)
                 novo_valor_total = valor_total_atual - float(valor_aditivo) + valor_aditivo_novo
                 total_contrato_widget = self.form_contrato.campos["total_contrato"]["widget"]
                 total_contrato_widget.delete(0, tk.END)
-                total_contrato_widget.insert(0, f"R$ {novo_valor_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                total_contrato_widget.insert(0, formatar_brl(novo_valor_total))
             
         except ValueError as ve:
             # Tratar especificamente a exceção de regra de negócio
@@ -287,12 +276,12 @@ def excluir_aditivo(self):
     
     # Verificar se é o último aditivo
     try:
-        aditivos_produto = obter_aditivos_por_contrato(self.id_produto, "produtos_servicos")
-        if not aditivos_produto:
+        ultimo = eh_ultimo_aditivo(id_selecao)
+        if ultimo is None:
             mostrar_mensagem("Erro", "Nenhum aditivo encontrado para este produto/serviço.", tipo="erro")
             return
             
-        if aditivos_produto[-1][0] != int(id_selecao):
+        if not ultimo:
             mostrar_mensagem("Regra de Negócio", 
                            "Apenas o último aditivo pode ser excluído.\n\n" +
                            "Para excluir este aditivo, primeiro você deve excluir " +
@@ -307,11 +296,9 @@ def excluir_aditivo(self):
     # Obter o valor do aditivo para mostrar na confirmação
     valor_aditivo = 0
     try:
-        aditivos = listar_aditivos()
-        for aditivo in aditivos:
-            if aditivo[0] == int(id_selecao):
-                valor_aditivo = float(aditivo[5]) if aditivo[5] else 0
-                break
+        aditivo = obter_aditivo(id_selecao)
+        if aditivo:
+            valor_aditivo = float(aditivo[5]) if aditivo[5] else 0
     except:
         pass
     
@@ -326,9 +313,6 @@ def excluir_aditivo(self):
             
             mostrar_mensagem("Sucesso", f"Aditivo excluído com sucesso!\nValor total do contrato atualizado automaticamente.", tipo="sucesso")
             
-            # Recarregar os aditivos na tabela
-            self.carregar_aditivos()
-            
             # Recarregar também o formulário principal para mostrar o valor atualizado
             if hasattr(self, 'form_contrato'):
                 # Obter valor total atual do contrato
@@ -338,7 +322,7 @@ def excluir_aditivo(self):
                 novo_valor_total = valor_total_atual - valor_aditivo
                 total_contrato_widget = self.form_contrato.campos["total_contrato"]["widget"]
                 total_contrato_widget.delete(0, tk.END)
-                total_contrato_widget.insert(0, f"R$ {novo_valor_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+                total_contrato_widget.insert(0, formatar_brl(novo_valor_total))
             
         except ValueError as ve:
             # Tratar especificamente a exceção de regra de negócio
@@ -351,36 +335,30 @@ def carregar_aditivos(self):
     if not hasattr(self, 'tabela_aditivos') or not self.id_produto:
         return
         
-    self.tabela_aditivos.limpar()
-    
-    # Obter aditivos do contrato
-    aditivos = obter_aditivos_por_contrato(self.id_produto, "produtos_servicos")
-    
-    # Obter o valor base do contrato (valor estimado)
-    valor_base = float(self.produto[8]) if self.produto and self.produto[8] else 0
-    
-    # Valor acumulado para calcular o valor total atualizado
-    valor_acumulado = valor_base
+    # Histórico do contrato já ordenado, com o valor total acumulado calculado no banco
+    aditivos = historico_aditivos("produtos_servicos", [self.id_produto])[self.id_produto]
     
+    linhas = []
     for aditivo in aditivos:
-        # Extrair dados do aditivo
-        id_aditivo = aditivo[0]
-        objetivo = aditivo[4]  # descricao
-        valor_aditivo = float(aditivo[5]) if aditivo[5] else 0
-        
-        # Atualizar valor acumulado
-        valor_acumulado += valor_aditivo
-        
-        # Criar um dicionário com os valores do aditivo
         valores = {
-            "id": id_aditivo,
-            "objetivo": objetivo,
-            "valor_aditivo": valor_aditivo,
-            "valor_total_atualizado": valor_acumulado
+            "id": aditivo["id"],
+            "objetivo": aditivo["descricao"],
+            "valor_aditivo": aditivo["valor_aditivo"] or 0,
+            "valor_total_atualizado": aditivo["valor_total_atualizado"]
         }
         
         # Formatar valores monetários
-        valores["valor_aditivo"] = f"R$ {valores['valor_aditivo']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        valores["valor_total_atualizado"] = f"R$ {valores['valor_total_atualizado']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        valores["valor_aditivo"] = formatar_brl(valores['valor_aditivo'])
+        valores["valor_total_atualizado"] = formatar_brl(valores['valor_total_atualizado'])
         
-        self.tabela_aditivos.adicionar_linha(valores, str(id_aditivo))
+        linhas.append((aditivo["id"], valores))
+    
+    # Só as linhas que mudaram são redesenhadas
+    self.tabela_aditivos.sincronizar_linhas(linhas)
+
+def ao_alterar_aditivo(self, evento):
+    """Atualiza a tabela quando um aditivo deste produto/serviço é incluído, editado ou excluído"""
+    if evento.operacao == RECARREGAR or (evento.contexto.get("tipo_contrato") == "produtos_servicos"
+            and str(evento.contexto.get("id_contrato")) == str(self.id_produto)):
+        self.carregar_aditivos()
+
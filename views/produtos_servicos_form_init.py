@@ -1,10 +1,12 @@
+import tkinter as tk
+from tkinter import ttk
+from utils.ui_utils import FormularioBase, TabelaBase, AbasPreguicosas, criar_botao, Cores, marcar_formularios_carregados
+from utils.dados_referencia import obter_valores_custeio, obter_demanda_cache
+from utils.validator import FormatadorCampos
+from utils.barramento import assinar_enquanto_existir
+
 def inicializar_formulario(self):
-    """Inicializa o formulário com todos os campos e abas"""
-    import tkinter as tk
-    from tkinter import ttk
-    from utils.ui_utils import FormularioBase, criar_botao, Cores
-    from views.produtos_servicos_view import FormatadorCampos
-    
+    """Inicializa o formulário; as abas são construídas sob demanda"""
     # Frame principal para organizar o layout
     self.frame_principal = ttk.Frame(self)
     self.frame_principal.pack(fill=tk.BOTH, expand=True, pady=(0, 60))  # Deixa espaço para os botões
@@ -23,9 +25,27 @@ def inicializar_formulario(self):
     self.btn_salvar = criar_botao(self.frame_botoes, "Salvar", self.salvar, "Primario", 15)
     self.btn_salvar.pack(side=tk.RIGHT)
     
-    # Aba de demanda (primeira aba)
-    self.tab_demanda = ttk.Frame(self.notebook)
-    self.notebook.add(self.tab_demanda, text="Demanda")
+    # Configurar estilo especial para a aba de aditivos (cor diferente)
+    style = ttk.Style()
+    style.map("TNotebook.Tab", background=[("selected", "#f0e68c")])
+    
+    # Abas construídas sob demanda: apenas a primeira é montada agora,
+    # as demais no primeiro acesso ou antes de salvar
+    self.abas = AbasPreguicosas(self.notebook)
+    # No modo de edição, cada formulário guarda os valores carregados assim que sua aba
+    # é construída, para que só os campos alterados sejam gravados
+    if self.modo_edicao:
+        self.abas.ao_construir(lambda aba: marcar_formularios_carregados(
+            getattr(self, "form_demanda", None), getattr(self, "form_custeio", None),
+            getattr(self, "form_contrato", None)))
+    self.abas.adicionar("Demanda", lambda aba: construir_aba_demanda(self, aba))
+    self.abas.adicionar("Custeio", lambda aba: construir_aba_custeio(self, aba))
+    self.abas.adicionar("Contrato", lambda aba: construir_aba_contrato(self, aba))
+    self.abas.adicionar("Aditivos", lambda aba: construir_aba_aditivos(self, aba))
+
+def construir_aba_demanda(self, aba):
+    """Cria os campos da aba de demanda"""
+    self.tab_demanda = aba
     
     # Configurar campos na aba de demanda
     self.form_demanda = FormularioBase(self.tab_demanda, "")
@@ -94,16 +114,10 @@ def inicializar_formulario(self):
                              padrao="Novo", required=True)
     else:
         # Para edição, buscamos os dados da demanda pelo código
-        from controllers.demanda_controller import listar_demandas
         codigo_demanda = self.produto[1]
-        demanda_encontrada = None
         
-        # Buscar a demanda pelo código
-        demandas = listar_demandas()
-        for d in demandas:
-            if d[0] == codigo_demanda:
-                demanda_encontrada = d
-                break
+        # Buscar a demanda pelo código (consulta pela chave, com cache)
+        demanda_encontrada = obter_demanda_cache(codigo_demanda)
         
         # Para edição, mostramos o código da demanda
         self.form_demanda.adicionar_campo("codigo_demanda", "Código da Demanda", 
@@ -206,10 +220,10 @@ def inicializar_formulario(self):
                 status_widget.set("Novo")
         else:
             status_widget.set("Novo")
-    
-    # Aba de custeio (segunda aba)
-    self.tab_custeio = ttk.Frame(self.notebook)
-    self.notebook.add(self.tab_custeio, text="Custeio")
+
+def construir_aba_custeio(self, aba):
+    """Cria os campos da aba de custeio"""
+    self.tab_custeio = aba
     
     # Configurar campos na aba de custeio
     self.form_custeio = FormularioBase(self.tab_custeio, "")
@@ -280,15 +294,11 @@ def inicializar_formulario(self):
         # Chamar novamente para garantir que os campos dependentes sejam atualizados
         self.atualizar_campos_custeio()
         
-        # Criar instância do CusteioManager
-        from utils.custeio_utils import CusteioManager
-        custeio_manager = CusteioManager()
-        
         # Configurar os valores salvos para os campos de custeio
         if instrumento:
             # Carregar projetos para a instituição selecionada
             filtros = {'instituicao_parceira': instituicao if instituicao else self.produto[2]}
-            projetos = custeio_manager.get_distinct_values('cod_projeto', filtros)
+            projetos = obter_valores_custeio('cod_projeto', filtros)
             
             # Garantir que temos pelo menos uma opção
             if not projetos:
@@ -312,7 +322,7 @@ def inicializar_formulario(self):
                     'instituicao_parceira': instituicao if instituicao else self.produto[2],
                     'cod_projeto': instrumento
                 }
-                tas = custeio_manager.get_distinct_values('cod_ta', filtros)
+                tas = obter_valores_custeio('cod_ta', filtros)
                 
                 # Garantir que temos pelo menos uma opção
                 if not tas:
@@ -337,7 +347,7 @@ def inicializar_formulario(self):
                         'cod_projeto': instrumento,
                         'cod_ta': ta
                     }
-                    resultados = custeio_manager.get_distinct_values('resultado', filtros)
+                    resultados = obter_valores_custeio('resultado', filtros)
                     
                     # Garantir que temos pelo menos uma opção
                     if not resultados:
@@ -369,7 +379,7 @@ def inicializar_formulario(self):
         if subprojeto:
             # Carregar subprojetos para a instituição selecionada
             filtros = {'instituicao_parceira': instituicao if instituicao else self.produto[2]}
-            subprojetos = custeio_manager.get_distinct_values('subprojeto', filtros)
+            subprojetos = obter_valores_custeio('subprojeto', filtros)
             
             # Garantir que temos pelo menos uma opção
             if not subprojetos:
@@ -383,10 +393,10 @@ def inicializar_formulario(self):
             subprojeto_widget = self.form_custeio.campos["subprojeto"]["widget"]
             subprojeto_widget["values"] = subprojetos
             subprojeto_widget.set(subprojeto)
-    
-    # Aba de contrato (terceira aba)
-    self.tab_contrato = ttk.Frame(self.notebook)
-    self.notebook.add(self.tab_contrato, text="Contrato")
+
+def construir_aba_contrato(self, aba):
+    """Cria os campos da aba de contrato"""
+    self.tab_contrato = aba
     
     self.form_contrato = FormularioBase(self.tab_contrato, "")
     self.form_contrato.pack(fill=tk.BOTH, expand=True)
@@ -468,14 +478,13 @@ def inicializar_formulario(self):
     
     self.form_contrato.adicionar_campo("observacao", "Observações", tipo="texto_longo", 
                                       padrao=self.produto[7] if self.produto else "")
+
+def construir_aba_aditivos(self, aba):
+    """Cria a tabela da aba de aditivos"""
+    self.tab_aditivos = aba
     
-    # Configurar estilo especial para a aba de aditivos (cor diferente)
-    style = ttk.Style()
-    style.map("TNotebook.Tab", background=[("selected", "#f0e68c")])
-    
-    # Aba de aditivos (quarta aba)
-    self.tab_aditivos = ttk.Frame(self.notebook)
-    self.notebook.add(self.tab_aditivos, text="Aditivos")
+    # Os aditivos atualizam o total exibido na aba de contrato, que precisa existir
+    self.abas.construir_todas()
     
     # Frame para a tabela de aditivos
     self.frame_tabela_aditivos = ttk.Frame(self.tab_aditivos)
@@ -501,7 +510,6 @@ def inicializar_formulario(self):
                  style="Info.TLabel").pack(pady=20)
     else:
         # Tabela de aditivos
-        from utils.ui_utils import TabelaBase
         colunas = ["id", "objetivo", "valor_aditivo", "valor_total_atualizado"]
         titulos = {
             "id": "ID",
@@ -521,5 +529,6 @@ def inicializar_formulario(self):
         criar_botao(frame_acoes_aditivos, "Editar", self.editar_aditivo, "Secundario", 15).pack(side=tk.LEFT, padx=(0, 5))
         criar_botao(frame_acoes_aditivos, "Excluir", self.excluir_aditivo, "Perigo", 15).pack(side=tk.LEFT)
         
-        # Carregar aditivos existentes
+        # Carregar aditivos existentes; alterações feitas em qualquer tela chegam pelo barramento
         self.carregar_aditivos()
+        assinar_enquanto_existir(self.tabela_aditivos, "aditivos", self.ao_alterar_aditivo)
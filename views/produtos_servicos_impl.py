@@ -1,9 +1,11 @@
 import tkinter as tk
 from tkinter import ttk
 import re
-from controllers.produtos_servicos_controller import listar_produtos_servicos, excluir_produto_servico, obter_produtos_por_demanda
-from controllers.demanda_controller import listar_demandas
+from controllers.produtos_servicos_controller import listar_produtos_servicos, excluir_produto_servico, obter_produtos_por_demanda, obter_produto_servico
 from controllers.fornecedores_controller import listar_fornecedores
+from utils.dados_referencia import obter_demanda_cache
+from utils.validator import formatar_brl, formatar_coluna_brl
+from utils.barramento import assinar_enquanto_existir, EXCLUIR, RECARREGAR
 from utils.ui_utils import FormularioBase, criar_botao, TabelaBase, mostrar_mensagem, Estilos, Cores
 from utils.custeio_utils import CusteioManager
 
@@ -39,11 +41,9 @@ class ProdutosServicosView:
         
         titulo = "Gestão de Produtos e Serviços"
         if codigo_demanda:
-            demandas = listar_demandas()
-            for d in demandas:
-                if d[0] == int(codigo_demanda):
-                    titulo += f" - Demanda {codigo_demanda} ({d[2]})"
-                    break
+            demanda = obter_demanda_cache(codigo_demanda)
+            if demanda:
+                titulo += f" - Demanda {codigo_demanda} ({demanda[2]})"
                     
         ttk.Label(frame_cabecalho, text=titulo, style="Titulo.TLabel").pack(side=tk.LEFT)
         criar_botao(frame_cabecalho, "Novo Produto/Serviço", self.adicionar, "Primario", 15).pack(side=tk.RIGHT)
@@ -91,46 +91,73 @@ class ProdutosServicosView:
         # Formulário (inicialmente oculto)
         self.frame_formulario = ttk.Frame(self.master)
         
-        # Carrega os dados
+        # Carrega os dados e passa a acompanhar as alterações dos produtos/serviços
         self.carregar_dados()
+        assinar_enquanto_existir(self.frame, "produtos_servicos", self.ao_alterar_produto)
         
     def carregar_dados(self, filtro=None):
         """Carrega os dados dos produtos/serviços na tabela"""
         self.tabela.limpar()
+        self.filtro = filtro
         
         if self.codigo_demanda:
             produtos = obter_produtos_por_demanda(self.codigo_demanda)
         else:
             produtos = listar_produtos_servicos()
         
-        for produto in produtos:
+        # Formata a coluna de valores de uma vez
+        totais_formatados = formatar_coluna_brl(produto[9] for produto in produtos)
+        
+        for produto, total_formatado in zip(produtos, totais_formatados):
             # Se tiver filtro, verifica se produto contém o texto do filtro em algum campo
-            if filtro:
-                texto_filtro = filtro.lower()
-                texto_produto = ' '.join(str(campo).lower() for campo in produto)
-                if texto_filtro not in texto_produto:
-                    continue
-                    
-            # Criar um dicionário com os valores do produto
-            valores = {
-                "id": produto[0],
-                "codigo_demanda": produto[1],
-                "fornecedor": produto[2],
-                "modalidade": produto[3],
-                "objetivo": produto[4],
-                "vigencia_final": produto[6],
-                "total_contrato": produto[9]
-            }
-            
-            # Formatar valor monetário
-            if "total_contrato" in valores and valores["total_contrato"]:
-                try:
-                    valores["total_contrato"] = f"R$ {float(valores['total_contrato']):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                except ValueError:
-                    # Mantém o valor original se não for possível converter para float
-                    valores["total_contrato"] = f"R$ {valores['total_contrato']}"
+            if not self._atende_filtro(produto):
+                continue
                 
-            self.tabela.adicionar_linha(valores, str(produto[0]))
+            self.tabela.adicionar_linha(self._valores_linha(produto, total_formatado), str(produto[0]))
+    
+    @staticmethod
+    def _valores_linha(produto, total_formatado):
+        """Valores exibidos na tabela para um produto/serviço"""
+        return {
+            "id": produto[0],
+            "codigo_demanda": produto[1],
+            "fornecedor": produto[2],
+            "modalidade": produto[3],
+            "objetivo": produto[4],
+            "vigencia_final": produto[6],
+            "total_contrato": total_formatado
+        }
+    
+    def _atende_filtro(self, produto):
+        """Indica se o produto/serviço pertence à listagem atual (demanda e texto de pesquisa)"""
+        if self.codigo_demanda and str(produto[1]) != str(self.codigo_demanda):
+            return False
+        if self.filtro:
+            texto_produto = ' '.join(str(campo).lower() for campo in produto)
+            return self.filtro.lower() in texto_produto
+        return True
+    
+    def ao_alterar_produto(self, alteracao):
+        """Atualiza apenas a linha do produto/serviço alterado (alteração local ou de outra instância)"""
+        if alteracao.operacao == RECARREGAR:
+            self.carregar_dados(self.filtro)
+            return
+        
+        id_linha = str(alteracao.id_registro)
+        existe = self.tabela.existe_linha(id_linha)
+        produto = None if alteracao.operacao == EXCLUIR else obter_produto_servico(alteracao.id_registro)
+        
+        if produto is None or not self._atende_filtro(produto):
+            if existe:
+                self.tabela.remover_linha(id_linha)
+            return
+        
+        valores = self._valores_linha(produto, formatar_brl(produto[9]))
+        if existe:
+            self.tabela.atualizar_linha(id_linha, valores)
+        else:
+            # A listagem é ordenada por id decrescente: novos registros vão para o topo
+            self.tabela.adicionar_linha(valores, id_linha, indice=0)
     
     def pesquisar(self):
         """Filtra os produtos/serviços conforme o texto de pesquisa"""
@@ -207,7 +234,11 @@ class ProdutosServicosView:
                     # para garantir que todos os widgets estejam completamente criados
                     def desabilitar_campos():
                         # Primeiro, desabilita todos os campos normais
-                        for form in [self.formulario.form_demanda, self.formulario.form_custeio, self.formulario.form_contrato]:
+                        for nome_form in ("form_demanda", "form_custeio", "form_contrato"):
+                            # Abas ainda não construídas são desabilitadas quando forem exibidas
+                            form = getattr(self.formulario, nome_form, None)
+                            if form is None:
+                                continue
                             for campo_nome, campo_info in form.campos.items():
                                 try:
                                     widget = campo_info["widget"]
@@ -243,6 +274,9 @@ class ProdutosServicosView:
                     
                     # Executa a função após um pequeno delay
                     self.formulario.after(100, desabilitar_campos)
+                    
+                    # Abas construídas depois (sob demanda) também ficam somente leitura
+                    self.formulario.abas.ao_construir(lambda aba: self.formulario.after(100, desabilitar_campos))
                 break
     
     def excluir(self):
@@ -252,15 +286,16 @@ class ProdutosServicosView:
             mostrar_mensagem("Atenção", "Selecione um produto/serviço para excluir.", tipo="aviso")
             return
             
-        if mostrar_mensagem("Confirmação", "Deseja realmente excluir este produto/serviço?", tipo="pergunta"):
+        if mostrar_mensagem("Confirmação", "Deseja realmente excluir este produto/serviço?\nOs aditivos do contrato também serão excluídos.", tipo="pergunta"):
             excluir_produto_servico(id_selecao)
             mostrar_mensagem("Sucesso", "Produto/serviço excluído com sucesso!", tipo="sucesso")
-            self.carregar_dados()
     
     def salvar_formulario(self):
-        """Callback quando o formulário é salvo"""
+        """Callback quando o formulário é salvo
+        
+        A linha do produto/serviço salvo já foi atualizada por ao_alterar_produto.
+        """
         self.cancelar_formulario()
-        self.carregar_dados()
     
     def cancelar_formulario(self):
         """Fecha o formulário e volta para a listagem"""
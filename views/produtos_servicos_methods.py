@@ -1,14 +1,19 @@
 import tkinter as tk
 from tkinter import ttk
-import re
 import datetime
 from controllers.produtos_servicos_controller import adicionar_produto_servico, listar_produtos_servicos, editar_produto_servico
-from controllers.demanda_controller import adicionar_demanda, listar_demandas, editar_demanda
-from controllers.fornecedores_controller import adicionar_fornecedor, buscar_fornecedor_por_nome, listar_fornecedores
-from utils.ui_utils import mostrar_mensagem
+from controllers.demanda_controller import adicionar_demanda, editar_demanda
+from controllers.fornecedores_controller import adicionar_fornecedor, buscar_fornecedor_por_nome
+from controllers.contrato_controller import ConflitoEdicao
+from utils.validator import converter_brl
+from utils.ui_utils import mostrar_mensagem, campos_alterados
+from utils.dados_referencia import obter_valores_custeio, obter_nomes_fornecedores
 
 def salvar_produto_servico(self):
     """Salva os dados do formulário de produto/serviço"""
+    # Abas ainda não exibidas precisam existir para validação e leitura dos valores
+    self.abas.construir_todas()
+    
     # Validar todos os formulários
     formularios = [self.form_demanda, self.form_custeio, self.form_contrato]
         
@@ -29,7 +34,7 @@ def salvar_produto_servico(self):
             codigo_demanda = int(valores_demanda["codigo_demanda"])
             
             # Verificar se temos os campos necessários para atualizar a demanda
-            if all(campo in valores_demanda for campo in ["data_entrada", "solicitante", "data_protocolo", "oficio", "nup_sei", "status"]):
+            if self.form_demanda.possui_alteracoes() and all(campo in valores_demanda for campo in ["data_entrada", "solicitante", "data_protocolo", "oficio", "nup_sei", "status"]):
                 editar_demanda(
                     codigo_demanda,
                     valores_demanda["data_entrada"],
@@ -77,14 +82,18 @@ def salvar_produto_servico(self):
                 'meta': valores_custeio.get("meta", "")
             }
             
-            editar_produto_servico(self.id_produto, **valores)
+            # Gravar apenas os campos alterados desde o carregamento do registro
+            alterados = campos_alterados(self.form_custeio, self.form_contrato)
+            valores = {campo: valor for campo, valor in valores.items() if campo in alterados}
+            
+            editar_produto_servico(self.id_produto, versao_esperada=self.versao_registro, **valores)
             mostrar_mensagem("Sucesso", "Produto/Serviço atualizado com sucesso!", tipo="sucesso")
         else:
             # Cadastrar nova demanda
             valores_demanda = self.form_demanda.obter_valores()
             
             # Criar a demanda
-            adicionar_demanda(
+            codigo_demanda = adicionar_demanda(
                 valores_demanda["data_entrada"],
                 valores_demanda["solicitante"],
                 valores_demanda["data_protocolo"],
@@ -93,10 +102,6 @@ def salvar_produto_servico(self):
                 valores_demanda["status"]
             )
             
-            # Obter o código da nova demanda (última demanda inserida)
-            demandas = listar_demandas()
-            codigo_demanda = demandas[-1][0] if demandas else 1
-            
             # Obter valores do produto/serviço
             valores_contrato = self.form_contrato.obter_valores()
             
@@ -143,31 +148,15 @@ def salvar_produto_servico(self):
             mostrar_mensagem("Sucesso", "Demanda e Produto/Serviço cadastrados com sucesso!", tipo="sucesso")
         
         self.callback_salvar()
+    except ConflitoEdicao as conflito:
+        mostrar_mensagem("Conflito de Edição", conflito.descrever(), tipo="aviso")
     except Exception as e:
         mostrar_mensagem("Erro", f"Erro ao salvar: {str(e)}", tipo="erro")
 
 def converter_valor_brl_para_float(self, valor_str):
     """Converte um valor em formato de moeda brasileira (R$ 1.234,56) para float (1234.56)"""
-    if not valor_str:
-        return 0.0
-        
-    # Se for um número, retorna diretamente
-    if isinstance(valor_str, (int, float)):
-        return float(valor_str)
-        
-    # Remove o símbolo de moeda e espaços
-    valor_str = str(valor_str).replace("R$", "").strip()
-    
-    # Remove pontos de milhar e substitui vírgula por ponto
-    valor_str = valor_str.replace(".", "").replace(",", ".")
-    
-    # Remove caracteres não numéricos, exceto ponto decimal
-    valor_str = re.sub(r'[^\d.]', '', valor_str)
-    
-    try:
-        return float(valor_str)
-    except ValueError:
-        return 0.0
+    return converter_brl(valor_str)
+
 
 def abrir_dialogo_novo_fornecedor(self):
     """Abre o diálogo para adicionar um novo fornecedor"""
@@ -187,7 +176,7 @@ def abrir_dialogo_novo_fornecedor(self):
     
     form.adicionar_campo("cnpj", "CNPJ", padrao="")
     # Configurar formatação para CNPJ
-    from views.produtos_servicos_view import FormatadorCampos
+    from utils.validator import FormatadorCampos
     cnpj_widget = form.campos["cnpj"]["widget"]
     cnpj_widget.bind("<KeyRelease>", lambda e: FormatadorCampos.formatar_cnpj(cnpj_widget, e))
     cnpj_widget.bind("<KeyPress>", FormatadorCampos.validar_numerico)
@@ -236,9 +225,7 @@ def abrir_dialogo_novo_fornecedor(self):
 def carregar_fornecedores(self):
     """Carrega os fornecedores existentes no combobox"""
     try:
-        fornecedores = listar_fornecedores()
-        fornecedores_texto = [fornecedor[1] for fornecedor in fornecedores]  # Pega apenas o campo 'razao_social'
-        self.fornecedor_combobox['values'] = fornecedores_texto
+        self.fornecedor_combobox['values'] = obter_nomes_fornecedores()
     except Exception as e:
         print(f"Erro ao carregar fornecedores: {e}")
 
@@ -265,15 +252,11 @@ def atualizar_campos_custeio(self, event=None):
     resultado_widget.set("")
     meta_widget.set("")
     
-    # Criar instância do CusteioManager
-    from utils.custeio_utils import CusteioManager
-    custeio_manager = CusteioManager()
-    
     # Configurar os campos com base na instituição
     if instituicao == "OPAS":
         # Carregar projetos para OPAS
         filtros = {'instituicao_parceira': 'OPAS'}
-        projetos = custeio_manager.get_distinct_values('cod_projeto', filtros)
+        projetos = obter_valores_custeio('cod_projeto', filtros)
         
         # Garantir que temos pelo menos uma opção
         if not projetos:
@@ -309,7 +292,7 @@ def atualizar_campos_custeio(self, event=None):
     elif instituicao == "FIOCRUZ":
         # Carregar projetos para FIOCRUZ
         filtros = {'instituicao_parceira': 'FIOCRUZ'}
-        projetos = custeio_manager.get_distinct_values('cod_projeto', filtros)
+        projetos = obter_valores_custeio('cod_projeto', filtros)
         
         # Garantir que temos pelo menos uma opção
         if not projetos:
@@ -318,7 +301,7 @@ def atualizar_campos_custeio(self, event=None):
         instrumento_widget["values"] = projetos
         
         # Carregar subprojetos para FIOCRUZ
-        subprojetos = custeio_manager.get_distinct_values('subprojeto', filtros)
+        subprojetos = obter_valores_custeio('subprojeto', filtros)
         
         # Garantir que temos pelo menos uma opção
         if not subprojetos:
@@ -358,16 +341,12 @@ def atualizar_ta(self, event=None):
         ta_widget["values"] = [""]
         return
     
-    # Criar instância do CusteioManager
-    from utils.custeio_utils import CusteioManager
-    custeio_manager = CusteioManager()
-    
     # Carregar TAs para o instrumento selecionado
     filtros = {
         'instituicao_parceira': instituicao,
         'cod_projeto': instrumento
     }
-    tas = custeio_manager.get_distinct_values('cod_ta', filtros)
+    tas = obter_valores_custeio('cod_ta', filtros)
     
     # Garantir que temos pelo menos uma opção
     if not tas:
@@ -396,17 +375,13 @@ def atualizar_resultado(self, event=None):
         resultado_widget["values"] = [""]
         return
     
-    # Criar instância do CusteioManager
-    from utils.custeio_utils import CusteioManager
-    custeio_manager = CusteioManager()
-    
     # Carregar Resultados para o TA selecionado
     filtros = {
         'instituicao_parceira': instituicao,
         'cod_projeto': instrumento,
         'cod_ta': ta
     }
-    resultados = custeio_manager.get_distinct_values('resultado', filtros)
+    resultados = obter_valores_custeio('resultado', filtros)
     
     # Garantir que temos pelo menos uma opção
     if not resultados:
@@ -0,0 +1,99 @@
+# views/relatorios_view.py
+import tkinter as tk
+from tkinter import ttk, filedialog
+from controllers.relatorio_controller import (abrir_sessao_relatorio, obter_resumo_por_status,
+                                              exportar_contratos_csv, exportar_aditivos_csv)
+from utils.ui_utils import TabelaBase, criar_botao, mostrar_mensagem
+from utils.validator import formatar_brl
+
+
+class RelatoriosView:
+    """Tela de relatórios e exportações
+
+    Resumo e exportações são lidos do mesmo instantâneo do banco (sessão de
+    relatório): os números conferem entre si e as leituras longas não travam
+    quem está gravando. A idade dos dados fica visível e "Atualizar dados"
+    troca o instantâneo pelo estado atual.
+    """
+
+    # Intervalo de atualização do texto com a idade dos dados
+    INTERVALO_IDADE_MS = 15000
+
+    def __init__(self, master):
+        self.master = master
+        self.sessao = abrir_sessao_relatorio()
+        self._agendamento = None
+
+        frame_titulo = ttk.Frame(master)
+        frame_titulo.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(frame_titulo, text="Relatórios", style="Titulo.TLabel").pack(anchor=tk.W)
+        ttk.Separator(frame_titulo).pack(fill=tk.X, pady=(5, 0))
+
+        frame_acoes = ttk.Frame(master)
+        frame_acoes.pack(fill=tk.X, pady=(0, 10))
+        self.label_idade = ttk.Label(frame_acoes)
+        self.label_idade.pack(side=tk.LEFT)
+        criar_botao(frame_acoes, "Exportar aditivos (CSV)", self.exportar_aditivos, "Secundario", 22).pack(
+            side=tk.RIGHT, padx=5)
+        criar_botao(frame_acoes, "Exportar contratos (CSV)", self.exportar_contratos, "Secundario", 22).pack(
+            side=tk.RIGHT, padx=5)
+        criar_botao(frame_acoes, "Atualizar dados", self.atualizar_dados, "Primario", 16).pack(side=tk.RIGHT, padx=5)
+
+        colunas = ["status", "demandas", "contratos", "aditivos", "valor_estimado", "valor_aditivos",
+                   "total_contrato"]
+        titulos = {"status": "Status da demanda", "demandas": "Demandas", "contratos": "Contratos",
+                   "aditivos": "Aditivos", "valor_estimado": "Valor estimado", "valor_aditivos": "Aditivos (R$)",
+                   "total_contrato": "Total contratado"}
+        self.tabela = TabelaBase(master, colunas, titulos)
+        self.tabela.pack(fill=tk.BOTH, expand=True)
+
+        # A tela sai do cache destruída: o instantâneo é liberado junto
+        master.bind("<Destroy>", self._ao_destruir, add="+")
+        master.after_idle(self.carregar_resumo)
+        self._atualizar_idade()
+
+    def carregar_resumo(self):
+        """Preenche a tabela com o resumo por status, lido do instantâneo"""
+        self.tabela.limpar()
+        for linha in obter_resumo_por_status(sessao=self.sessao):
+            self.tabela.adicionar_linha(dict(
+                linha,
+                valor_estimado=formatar_brl(linha["valor_estimado"]),
+                valor_aditivos=formatar_brl(linha["valor_aditivos"]),
+                total_contrato=formatar_brl(linha["total_contrato"]),
+            ))
+
+    def atualizar_dados(self):
+        """Troca o instantâneo pelo estado atual do banco e recarrega o resumo"""
+        self.sessao.renovar()
+        self.carregar_resumo()
+        self._atualizar_idade()
+
+    def _atualizar_idade(self):
+        if self._agendamento is not None:
+            self.master.after_cancel(self._agendamento)
+        self.label_idade.config(text=self.sessao.descricao_idade())
+        self._agendamento = self.master.after(self.INTERVALO_IDADE_MS, self._atualizar_idade)
+
+    def _exportar(self, nome_arquivo, exportar, descricao):
+        caminho = filedialog.asksaveasfilename(
+            parent=self.master, defaultextension=".csv", filetypes=[("CSV", "*.csv")], initialfile=nome_arquivo)
+        if not caminho:
+            return
+        try:
+            quantidade = exportar(caminho, sessao=self.sessao)
+        except OSError as e:
+            mostrar_mensagem("Erro", f"Erro ao exportar {descricao}: {e}", tipo="erro")
+            return
+        mostrar_mensagem("Sucesso", f"{quantidade} {descricao} exportados para {caminho}\n"
+                         f"{self.sessao.descricao_idade()}", tipo="sucesso")
+
+    def exportar_contratos(self):
+        self._exportar("contratos.csv", exportar_contratos_csv, "contratos")
+
+    def exportar_aditivos(self):
+        self._exportar("aditivos.csv", exportar_aditivos_csv, "aditivos")
+
+    def _ao_destruir(self, event):
+        if event.widget is self.master:
+            self.sessao.fechar()